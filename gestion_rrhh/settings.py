@@ -58,6 +58,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'nucleo.middleware.EmpleadoMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -159,4 +160,14 @@ DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 MEDIA_URL = '/media/'
 MEDIA_ROOT = Path('/srv/gestion_rrhh_media')
 
+# Adjuntos de licencias (nucleo.logic.adjuntos): el hash se calcula durante la subida
+# y nginx entrega las descargas desde una location interna que apunta a MEDIA_ROOT
+# (ver docs/nginx/adjuntos-x-accel.md). El prefijo se toma del entorno sólo donde está
+# configurada esa location; sin la variable (runserver, tests) los sirve Django.
+FILE_UPLOAD_HANDLERS = [
+    'nucleo.logic.adjuntos.HashMemoriaUploadHandler',
+    'nucleo.logic.adjuntos.HashTemporalUploadHandler',
+]
+ADJUNTOS_X_ACCEL_PREFIJO = os.environ.get('ADJUNTOS_X_ACCEL_PREFIJO') or None
+
 mimetypes.add_type("application/pdf", ".pdf", True)
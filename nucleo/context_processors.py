@@ -1,12 +1,12 @@
-from nucleo.models import Empleado
+from django.utils.functional import SimpleLazyObject
+
+from nucleo.logic.empleado_request import empleado_id_de, empleado_perezoso
+
 
 def empleado_context(request):
-    empleado = None
-    empleado_id = None
-    if request.user.is_authenticated:
-        try:
-            empleado = Empleado.objects.get(pk=request.user.id)
-            empleado_id = empleado.pk
-        except Empleado.DoesNotExist:
-            empleado = None
-    return {'empleado': empleado, 'empleado_id': empleado_id}
\ No newline at end of file
+    # Perezosos: sólo consultan si la plantilla los usa, y comparten el
+    # empleado de request.empleado con la vista
+    return {
+        'empleado': empleado_perezoso(request),
+        'empleado_id': SimpleLazyObject(lambda: empleado_id_de(request)),
+    }
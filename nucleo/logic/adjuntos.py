@@ -0,0 +1,144 @@
+"""Adjuntos de solicitudes de licencia, guardados por contenido (sha256) en el Storage de Django.
+
+Cada archivo se guarda una sola vez en ``adjuntos/<ab>/<sha256>``, sin el
+nombre original: dos subidas del mismo escaneo comparten el archivo y dos
+archivos distintos con el mismo nombre ya no se pisan. El nombre original
+queda en la solicitud (``archivo_nombre``) para mostrarlo y para la descarga.
+
+El hash se calcula mientras Django recibe la subida (los upload handlers de
+FILE_UPLOAD_HANDLERS), así no hace falta releer el archivo para guardarlo.
+
+La descarga la entrega nginx: la vista sólo valida permisos y responde con
+``X-Accel-Redirect`` hacia la location interna ADJUNTOS_X_ACCEL_PREFIJO, que
+apunta a MEDIA_ROOT. Sin ese setting (desarrollo) el archivo lo sirve Django.
+Siempre se entrega como descarga (attachment, con ``nosniff``): el tipo se
+deduce del nombre que eligió quien lo subió y no debe abrirse en el sitio.
+
+Los adjuntos anteriores (``licencias/<nombre>``, guardados en ``media/`` del
+directorio de trabajo y no en MEDIA_ROOT) se pasan a este esquema con
+``manage.py migrar_adjuntos_licencia`` (ver ``migrar_legados``).
+"""
+import hashlib
+import mimetypes
+import os
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.http import content_disposition_header
+
+CARPETA = 'adjuntos'
+
+
+class HashMemoriaUploadHandler(MemoryFileUploadHandler):
+    """MemoryFileUploadHandler que deja el sha256 del contenido en ``archivo.sha256``."""
+
+    def new_file(self, *args, **kwargs):
+        self._sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        # Si el archivo no entra en memoria, los datos siguen al handler temporal, que también calcula el hash
+        if self.activated:
+            self._sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        archivo = super().file_complete(file_size)
+        if archivo is not None:
+            archivo.sha256 = self._sha256.hexdigest()
+        return archivo
+
+
+class HashTemporalUploadHandler(TemporaryFileUploadHandler):
+    """TemporaryFileUploadHandler que deja el sha256 del contenido en ``archivo.sha256``."""
+
+    def new_file(self, *args, **kwargs):
+        self._sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self._sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        archivo = super().file_complete(file_size)
+        archivo.sha256 = self._sha256.hexdigest()
+        return archivo
+
+
+def _sha256(archivo):
+    sha256 = getattr(archivo, 'sha256', None)
+    if sha256:
+        return sha256
+    # Archivo que no pasó por los upload handlers (p. ej. creado desde código)
+    resumen = hashlib.sha256()
+    for chunk in archivo.chunks():
+        resumen.update(chunk)
+    archivo.seek(0)
+    return resumen.hexdigest()
+
+
+def ruta_de(sha256):
+    return f'{CARPETA}/{sha256[:2]}/{sha256}'
+
+
+def guardar(archivo):
+    """Guarda ``archivo`` (UploadedFile o File) si su contenido no estaba; devuelve el nombre en el Storage."""
+    nombre = ruta_de(_sha256(archivo))
+    if not default_storage.exists(nombre):
+        guardado = default_storage.save(nombre, archivo)
+        if guardado != nombre:
+            # Otra subida del mismo contenido lo guardó mientras tanto: el Storage le dio otro nombre
+            default_storage.delete(guardado)
+    return nombre
+
+
+def respuesta_descarga(nombre, nombre_original=None):
+    """Respuesta que entrega el adjunto ``nombre`` del Storage como descarga ``nombre_original``.
+
+    Con ADJUNTOS_X_ACCEL_PREFIJO la respuesta va vacía y nginx envía el cuerpo.
+    Si el archivo no está en el Storage responde 404.
+    """
+    if not default_storage.exists(nombre):
+        raise Http404('El adjunto no está disponible')
+    nombre_original = nombre_original or os.path.basename(nombre)
+    tipo = mimetypes.guess_type(nombre_original)[0] or 'application/octet-stream'
+    prefijo = getattr(settings, 'ADJUNTOS_X_ACCEL_PREFIJO', None)
+    if not prefijo:
+        response = FileResponse(
+            default_storage.open(nombre, 'rb'), content_type=tipo, as_attachment=True, filename=nombre_original,
+        )
+    else:
+        response = HttpResponse(content_type=tipo)
+        response['X-Accel-Redirect'] = prefijo.rstrip('/') + '/' + quote(nombre)
+        response['Content-Disposition'] = content_disposition_header(True, nombre_original)
+    response['X-Content-Type-Options'] = 'nosniff'
+    return response
+
+
+def migrar_legados(solicitudes, origen, aplicar=True):
+    """Pasa los adjuntos ``licencias/<nombre>`` de ``solicitudes`` al Storage por contenido.
+
+    ``origen`` es la carpeta donde se guardaban (el ``media/`` del directorio
+    de trabajo). Completa ``archivo`` y ``archivo_nombre`` de cada solicitud;
+    con ``aplicar=False`` sólo informa. Devuelve (migradas, rutas faltantes).
+    """
+    migradas, faltantes = 0, []
+    for solicitud in solicitudes.exclude(archivo__isnull=True).exclude(archivo='').exclude(archivo__startswith=f'{CARPETA}/'):
+        ruta = os.path.join(origen, solicitud.archivo)
+        if not os.path.isfile(ruta):
+            faltantes.append(ruta)
+            continue
+        migradas += 1
+        if not aplicar:
+            continue
+        with open(ruta, 'rb') as contenido:
+            nuevo = guardar(File(contenido, name=os.path.basename(ruta)))
+        solicitud.archivo_nombre = solicitud.archivo_nombre or os.path.basename(solicitud.archivo)
+        solicitud.archivo = nuevo
+        solicitud.save(update_fields=['archivo', 'archivo_nombre'])
+    return migradas, faltantes
@@ -0,0 +1,93 @@
+"""Filtros estructurados del log de auditoría.
+
+- por empleado afectado, sobre la columna indexada ``Log_auditoria.idempleado``
+  (un id o una subconsulta por nombre/apellido);
+- por campo modificado y, opcionalmente, por valor (nuevo o anterior). En
+  PostgreSQL se usan los operadores ``?`` y ``@>`` sobre ``cambio`` y
+  ``cambio -> 'changed'``, que resuelven los índices GIN de la migración 0011;
+  en otros motores, búsquedas por clave equivalentes.
+
+Los logs antiguos con el formato de texto ``fields_changed`` no se encuentran
+por campo/valor.
+
+Las fechas se filtran con un rango sobre ``fecha_cambio`` (no con ``__date``)
+para que PostgreSQL descarte las particiones mensuales que no intervienen.
+"""
+import re
+from datetime import date, datetime, time, timedelta
+
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+
+from nucleo.models import Empleado
+
+_CAMPO_VALIDO = re.compile(r'[A-Za-z0-9]+(_[A-Za-z0-9]+)*')
+
+
+def _valores(valor):
+    """El valor tal como se escribió y, si es numérico, también como número (el JSON guarda ambos)."""
+    valores = [valor]
+    try:
+        valores.append(int(valor))
+    except ValueError:
+        pass
+    return valores
+
+
+def filtrar_por_empleado(qs, modificado):
+    """Logs del empleado ``modificado`` (id o parte del nombre/apellido)."""
+    modificado = (modificado or '').strip()
+    if not modificado:
+        return qs
+    try:
+        return qs.filter(idempleado=int(modificado))
+    except ValueError:
+        empleados = Empleado.objects.filter(Q(nombres__icontains=modificado) | Q(apellido__icontains=modificado))
+        return qs.filter(idempleado__in=empleados.values('pk'))
+
+
+def filtrar_por_campo(qs, campo, valor=''):
+    """Logs cuyo ``cambio`` incluye ``campo`` (con ``valor`` como valor nuevo o anterior, si se indica)."""
+    campo = (campo or '').strip()
+    valor = (valor or '').strip()
+    if not campo:
+        return qs
+    if not _CAMPO_VALIDO.fullmatch(campo):
+        return qs.none()
+    if not valor:
+        return qs.filter(Q(cambio__changed__has_key=campo) | Q(cambio__has_key=campo))
+
+    q = Q()
+    postgres = connections[qs.db].vendor == 'postgresql'
+    for v in _valores(valor):
+        if postgres:
+            q |= Q(cambio__changed__contains={campo: {'new': v}})
+            q |= Q(cambio__changed__contains={campo: {'old': v}})
+            q |= Q(cambio__contains={campo: v})
+        else:
+            q |= Q(**{f'cambio__changed__{campo}__new__exact': v})
+            q |= Q(**{f'cambio__changed__{campo}__old__exact': v})
+            q |= Q(**{f'cambio__{campo}__exact': v})
+    return qs.filter(q)
+
+
+def _inicio_del_dia(texto):
+    try:
+        dia = date.fromisoformat(texto)
+    except (TypeError, ValueError):
+        return None
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+def filtrar_por_fechas(qs, desde, hasta=None, rango=False):
+    """Logs del día ``desde`` o, con ``rango``, desde ``desde`` y/o hasta ``hasta`` (inclusive; 'AAAA-MM-DD')."""
+    inicio = _inicio_del_dia(desde) if desde else None
+    fin = _inicio_del_dia(hasta) if hasta else None
+    if inicio is not None:
+        qs = qs.filter(fecha_cambio__gte=inicio)
+        if not rango:
+            qs = qs.filter(fecha_cambio__lt=inicio + timedelta(days=1))
+    if rango and fin is not None:
+        qs = qs.filter(fecha_cambio__lt=fin + timedelta(days=1))
+    return qs
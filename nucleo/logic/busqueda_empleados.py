@@ -0,0 +1,188 @@
+"""Búsqueda de empleados por nombre, apellido, DNI y CUIL (buscador de ver_empleados).
+
+El texto se normaliza igual en todos los motores: minúsculas, sin acentos y
+DNI/CUIL sólo con dígitos. Cada término de la consulta tiene que aparecer como
+subcadena y los resultados se ordenan por similitud de trigramas (primero el
+empleado cuyo id es la consulta, si es un número).
+
+- En PostgreSQL se filtra con ``LIKE '%término%'`` sobre la función
+  ``nucleo_empleado_busqueda`` de la migración 0014, que tiene un índice GIN
+  ``gin_trgm_ops``, y se ordena por ``word_similarity``: una sola consulta.
+- En otros motores (SQLite en los tests) se usa un índice de trigramas en
+  memoria por proceso, que se invalida como los catálogos (signals de
+  ``Empleado`` y versión en la caché de Django); la consulta a la base es por pk.
+"""
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Case, F, FloatField, Func, Q, TextField, Value, When
+
+from nucleo.models import Empleado
+
+CLAVE_VERSION = 'nucleo:busqueda_empleados:version'
+
+_indice = None
+_lock = threading.Lock()
+
+
+def normalizar(texto):
+    """Minúsculas y sin acentos (como ``lower(unaccent(...))``)."""
+    texto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def _solo_digitos(texto):
+    return re.sub(r'\D', '', texto or '')
+
+
+def texto_busqueda(nombres, apellido, dni, cuil):
+    """Texto indexado de un empleado; igual al que arma ``nucleo_empleado_busqueda`` en PostgreSQL."""
+    nombre = normalizar(f"{nombres or ''} {apellido or ''}")
+    return f'{nombre} {_solo_digitos(dni)} {_solo_digitos(cuil)}'
+
+
+def terminos(q):
+    """Términos normalizados de la consulta; en los que llevan dígitos se ignoran puntos y guiones."""
+    resultado = []
+    for termino in normalizar(q).split():
+        if any(c.isdigit() for c in termino):
+            termino = re.sub(r'[.\-]', '', termino)
+        if termino:
+            resultado.append(termino)
+    return resultado
+
+
+def _trigramas(palabra):
+    """Trigramas de una palabra al estilo pg_trgm (dos espacios antes y uno después)."""
+    palabra = f'  {palabra} '
+    return {palabra[i:i + 3] for i in range(len(palabra) - 2)}
+
+
+def _similitud(terminos_consulta, palabras):
+    """Suma, por término, de la mejor similitud de trigramas contra alguna palabra del empleado."""
+    total = 0.0
+    for termino in terminos_consulta:
+        buscados = _trigramas(termino)
+        mejor = 0.0
+        for palabra in palabras:
+            propios = _trigramas(palabra)
+            mejor = max(mejor, len(buscados & propios) / len(buscados | propios))
+        total += mejor
+    return total
+
+
+class _Indice:
+    """Texto de cada empleado y, por cada trigrama del texto, los empleados que lo contienen."""
+    __slots__ = ('version', 'textos', 'por_trigrama')
+
+    def __init__(self, version):
+        self.version = version
+        self.textos = {}
+        self.por_trigrama = defaultdict(set)
+        for pk, nombres, apellido, dni, cuil in Empleado.objects.values_list('pk', 'nombres', 'apellido', 'dni', 'cuil'):
+            texto = texto_busqueda(nombres, apellido, dni, cuil)
+            self.textos[pk] = texto
+            for i in range(len(texto) - 2):
+                self.por_trigrama[texto[i:i + 3]].add(pk)
+
+    def _candidatos(self, termino):
+        if len(termino) < 3:
+            return self.textos.keys()
+        conjuntos = sorted(
+            (self.por_trigrama.get(termino[i:i + 3], set()) for i in range(len(termino) - 2)), key=len,
+        )
+        return set.intersection(*conjuntos)
+
+    def buscar(self, terminos_consulta):
+        """{pk: puntaje} de los empleados que contienen todos los términos."""
+        pks = None
+        for termino in sorted(terminos_consulta, key=len, reverse=True):
+            candidatos = self._candidatos(termino) if pks is None else pks
+            pks = {pk for pk in candidatos if termino in self.textos[pk]}
+            if not pks:
+                return {}
+        return {pk: _similitud(terminos_consulta, self.textos[pk].split()) for pk in pks or ()}
+
+
+def _actual():
+    global _indice
+    version = cache.get(CLAVE_VERSION, 0)
+    indice = _indice
+    if indice is None or indice.version != version:
+        with _lock:
+            indice = _indice
+            if indice is None or indice.version != version:
+                indice = _indice = _Indice(version)
+    return indice
+
+
+def invalidar():
+    """Descarta el índice en memoria en este proceso y, al confirmar la transacción, en los demás."""
+    global _indice
+    _indice = None
+
+    def _incrementar_version():
+        global _indice
+        _indice = None
+        try:
+            cache.incr(CLAVE_VERSION)
+        except ValueError:
+            cache.set(CLAVE_VERSION, 1, None)
+
+    transaction.on_commit(_incrementar_version)
+
+
+def _id_buscado(q):
+    q = q.strip()
+    return int(q) if q.isdigit() else None
+
+
+def _buscar_postgres(empleados_qs, q, terminos_consulta, limite):
+    texto = Func(
+        F('nombres'), F('apellido'), F('dni'), F('cuil'), function='nucleo_empleado_busqueda', output_field=TextField(),
+    )
+    similitud = Func(Value(' '.join(terminos_consulta)), texto, function='word_similarity', output_field=FloatField())
+    condicion = Q()
+    for termino in terminos_consulta:
+        condicion &= Q(texto_busqueda__contains=termino)
+    id_buscado = _id_buscado(q)
+    if id_buscado is not None:
+        condicion |= Q(pk=id_buscado)
+        similitud = Case(When(pk=id_buscado, then=Value(2.0)), default=similitud, output_field=FloatField())
+    qs = (
+        empleados_qs.annotate(texto_busqueda=texto, puntaje_busqueda=similitud)
+        .filter(condicion)
+        .order_by('-puntaje_busqueda', 'apellido', 'nombres', 'pk')
+    )
+    return list(qs[:limite] if limite else qs)
+
+
+def _buscar_en_memoria(empleados_qs, q, terminos_consulta, limite):
+    puntajes = _actual().buscar(terminos_consulta)
+    id_buscado = _id_buscado(q)
+    if id_buscado is not None:
+        puntajes[id_buscado] = 2.0 * len(terminos_consulta)
+    if not puntajes:
+        return []
+    empleados = sorted(
+        empleados_qs.filter(pk__in=list(puntajes)),
+        key=lambda emp: (-puntajes[emp.pk], emp.apellido, emp.nombres, emp.pk),
+    )
+    return empleados[:limite] if limite else empleados
+
+
+def buscar(empleados_qs, q, limite=None):
+    """Empleados de ``empleados_qs`` que coinciden con ``q``, del más al menos parecido.
+
+    ``empleados_qs`` puede traer otros filtros y ``select_related``; se respetan.
+    """
+    terminos_consulta = terminos(q)
+    if not terminos_consulta:
+        return list(empleados_qs[:limite] if limite else empleados_qs)
+    if connections[empleados_qs.db].vendor == 'postgresql':
+        return _buscar_postgres(empleados_qs, q, terminos_consulta, limite)
+    return _buscar_en_memoria(empleados_qs, q, terminos_consulta, limite)
@@ -0,0 +1,105 @@
+"""Caché del HTML de ``render_cambio`` por entrada de Log_auditoria.
+
+Las entradas del log no cambian, pero su HTML muestra nombres que se buscan en
+otras tablas (empleados, registros EL/EO, planes de trabajo, catálogos y
+usuarios). El HTML se guarda en la caché de Django con clave
+``nucleo:render_cambio:<version>:<version del empleado>:<id>``:
+
+- la versión del empleado (``Log_auditoria.idempleado``) se incrementa desde
+  ``nucleo.signals`` cuando cambian su Empleado, EL, EO o plan de trabajo, y
+  sólo se recalcula el HTML de sus entradas. Las entradas sin empleado
+  comparten una versión que se incrementa con cualquier cambio de empleado;
+- la versión general se incrementa cuando cambia un catálogo (sucursal,
+  puesto, convenio, estado) o un nombre de usuario, y recalcula todo.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+CLAVE_VERSION = 'nucleo:render_cambio:version'
+# Una semana: el HTML vuelve a calcularse si nadie lo pidió en ese tiempo
+DURACION = 7 * 24 * 3600
+
+
+def _version(clave):
+    version = cache.get(clave)
+    if version is None:
+        # Nunca volver a una versión anterior si la clave fue desalojada de la caché
+        cache.add(clave, time.time_ns(), None)
+        version = cache.get(clave)
+    return version
+
+
+def _clave_version_empleado(idempleado):
+    return f'nucleo:render_cambio:empleado:{idempleado if idempleado is not None else "-"}:version'
+
+
+def _clave(log, versiones):
+    """Clave del HTML de ``log``; ``versiones`` = (general, {clave de versión del empleado: versión})."""
+    general, por_empleado = versiones
+    version_empleado = por_empleado[_clave_version_empleado(getattr(log, 'idempleado', None))]
+    return f'nucleo:render_cambio:{general}:{version_empleado}:{log.pk}'
+
+
+def _versiones(logs):
+    """Versión general y las de los empleados de ``logs``, en una lectura de caché (más las que falten)."""
+    claves = {_clave_version_empleado(getattr(l, 'idempleado', None)) for l in logs}
+    encontradas = cache.get_many([CLAVE_VERSION, *claves])
+    general = encontradas.get(CLAVE_VERSION) or _version(CLAVE_VERSION)
+    return general, {c: encontradas.get(c) or _version(c) for c in claves}
+
+
+def precargar(logs):
+    """Trae de la caché, en una sola lectura, el HTML de todos los ``logs`` y lo deja en cada instancia."""
+    logs = [l for l in logs if getattr(l, 'pk', None) is not None]
+    if not logs:
+        return
+    versiones = _versiones(logs)
+    claves = {l.pk: _clave(l, versiones) for l in logs}
+    encontrados = cache.get_many(list(claves.values()))
+    for l in logs:
+        html = encontrados.get(claves[l.pk])
+        if html is not None:
+            l._cambio_html = html
+
+
+def html_de(log, renderizar):
+    """HTML de ``log``: el precargado, el de la caché o ``renderizar(log)`` (que se guarda)."""
+    html = getattr(log, '_cambio_html', None)
+    if html is not None:
+        return html
+    if getattr(log, 'pk', None) is None:
+        return renderizar(log)
+    clave = _clave(log, _versiones([log]))
+    html = cache.get(clave)
+    if html is None:
+        html = renderizar(log)
+        cache.set(clave, str(html), DURACION)
+    log._cambio_html = html
+    return html
+
+
+def olvidar(log):
+    """Descarta el HTML de una entrada (si se corrige o borra la fila del log)."""
+    cache.delete(_clave(log, _versiones([log])))
+
+
+def _incrementar(clave):
+    try:
+        cache.incr(clave)
+    except ValueError:
+        cache.set(clave, time.time_ns(), None)
+
+
+def invalidar(idempleado=None):
+    """Invalida, al confirmar la transacción actual, el HTML de las entradas de ``idempleado`` (o todo)."""
+    if idempleado is None:
+        transaction.on_commit(lambda: _incrementar(CLAVE_VERSION))
+        return
+
+    def _incrementar_empleado():
+        _incrementar(_clave_version_empleado(idempleado))
+        _incrementar(_clave_version_empleado(None))
+
+    transaction.on_commit(_incrementar_empleado)
@@ -0,0 +1,133 @@
+"""Calendario de feriados en memoria (por proceso).
+
+Los feriados se cargan una vez y quedan en un arreglo ordenado de fechas, un
+set (``es_feriado`` en O(1)) y, por año, sumas acumuladas de días hábiles por
+día de la semana: ``dias_laborables`` cuenta los días no feriados de un rango
+(opcionalmente sólo ciertos días de la semana) restando dos prefijos por año,
+sin recorrer el rango. ``feriados_entre`` usa bisect sobre el arreglo.
+
+Se invalida como los catálogos (ver ``nucleo.logic.catalogos``): desde los
+signals de ``Feriado`` en este proceso y con una versión en la caché de Django
+para los demás workers. Mientras hay cambios sin confirmar en la transacción
+en curso el calendario se arma en cada consulta y no se guarda, así un rollback
+no deja feriados que no existen.
+
+Las instancias de ``del_anio`` se comparten entre requests: no deben modificarse.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from itertools import accumulate
+
+from django.core.cache import cache
+from django.db import transaction
+
+from nucleo.models import Feriado
+
+CLAVE_VERSION = 'nucleo:feriados:version'
+
+_calendario = None
+_cambios_sin_confirmar = False
+_lock = threading.Lock()
+
+
+class _Calendario:
+    __slots__ = ('version', 'filas', 'fechas', 'conjunto', '_prefijos')
+
+    def __init__(self, version):
+        self.version = version
+        self.filas = list(Feriado.objects.order_by('fecha'))
+        self.fechas = [f.fecha for f in self.filas]
+        self.conjunto = set(self.fechas)
+        # año -> 7 listas (lunes..domingo): prefijo[w][i] = días hábiles con ese día de semana entre los i primeros del año
+        self._prefijos = {}
+
+    def prefijos(self, anio):
+        prefijos = self._prefijos.get(anio)
+        if prefijos is None:
+            inicio = date(anio, 1, 1)
+            dias = [inicio + timedelta(days=i) for i in range((date(anio + 1, 1, 1) - inicio).days)]
+            prefijos = [
+                [0] + list(accumulate(d.weekday() == w and d not in self.conjunto for d in dias))
+                for w in range(7)
+            ]
+            self._prefijos[anio] = prefijos
+        return prefijos
+
+
+def _actual():
+    global _calendario, _cambios_sin_confirmar
+    if _cambios_sin_confirmar:
+        if transaction.get_connection().in_atomic_block:
+            return _Calendario(None)
+        # La transacción con cambios terminó sin confirmarse (rollback)
+        _cambios_sin_confirmar = False
+    version = cache.get(CLAVE_VERSION, 0)
+    calendario = _calendario
+    if calendario is None or calendario.version != version:
+        with _lock:
+            calendario = _calendario
+            if calendario is None or calendario.version != version:
+                calendario = _calendario = _Calendario(version)
+    return calendario
+
+
+def es_feriado(fecha):
+    return fecha in _actual().conjunto
+
+
+def fechas():
+    """Todas las fechas de feriados, ordenadas."""
+    return list(_actual().fechas)
+
+
+def feriados_entre(desde, hasta):
+    """Fechas de feriados en [desde, hasta], ordenadas."""
+    calendario = _actual()
+    return calendario.fechas[bisect_left(calendario.fechas, desde):bisect_right(calendario.fechas, hasta)]
+
+
+def cantidad_feriados(desde, hasta):
+    calendario = _actual()
+    return max(bisect_right(calendario.fechas, hasta) - bisect_left(calendario.fechas, desde), 0)
+
+
+def del_anio(anio):
+    """Feriados (instancias) del año, ordenados por fecha."""
+    calendario = _actual()
+    return calendario.filas[
+        bisect_left(calendario.fechas, date(anio, 1, 1)):bisect_left(calendario.fechas, date(anio + 1, 1, 1))
+    ]
+
+
+def dias_laborables(desde, hasta, dias_semana=range(7)):
+    """Días de [desde, hasta] que no son feriado y caen en ``dias_semana`` (0=lunes)."""
+    if hasta < desde:
+        return 0
+    calendario = _actual()
+    total = 0
+    for anio in range(desde.year, hasta.year + 1):
+        prefijos = calendario.prefijos(anio)
+        inicio = (max(desde, date(anio, 1, 1)) - date(anio, 1, 1)).days
+        fin = (min(hasta, date(anio, 12, 31)) - date(anio, 1, 1)).days + 1
+        total += sum(prefijos[w][fin] - prefijos[w][inicio] for w in set(dias_semana))
+    return total
+
+
+def invalidar():
+    """Descarta el calendario en este proceso y, al confirmar la transacción, en los demás."""
+    global _calendario, _cambios_sin_confirmar
+    _calendario = None
+    if transaction.get_connection().in_atomic_block:
+        _cambios_sin_confirmar = True
+
+    def _incrementar_version():
+        global _calendario, _cambios_sin_confirmar
+        _calendario = None
+        _cambios_sin_confirmar = False
+        try:
+            cache.incr(CLAVE_VERSION)
+        except ValueError:
+            cache.set(CLAVE_VERSION, 1, None)
+
+    transaction.on_commit(_incrementar_version)
@@ -0,0 +1,123 @@
+"""Caché en memoria (por proceso) de las tablas de catálogo.
+
+Cada catálogo se carga completo la primera vez que se consulta y queda
+indexado por id y por nombre (sin distinguir mayúsculas). Se invalida:
+
+- localmente, desde los signals post_save/post_delete de ``nucleo.signals``;
+- entre procesos (workers de gunicorn), con una clave de versión en la caché
+  de Django que se incrementa al confirmarse la transacción. Con la caché
+  por defecto (LocMemCache) la versión es local; con una caché compartida
+  (Redis/Memcached) todos los workers recargan el catálogo modificado.
+
+Las instancias devueltas se comparten entre requests: no deben modificarse.
+"""
+import threading
+
+from django.core.cache import cache
+from django.db import transaction
+
+from nucleo.models import (
+    Convenio, Estado_empleado, Estado_lic_vac, EstadoCivil, Nacionalidad, Puesto, Sexo, Sucursal,
+    Tipo_licencia,
+)
+
+# Modelo -> campo con el nombre legible
+CATALOGOS = {
+    Estado_lic_vac: 'estado',
+    Tipo_licencia: 'descripcion',
+    Estado_empleado: 'estado',
+    Puesto: 'tipo_puesto',
+    Convenio: 'tipo_convenio',
+    Sucursal: 'sucursal',
+    Nacionalidad: 'nacionalidad',
+    Sexo: 'sexo',
+    EstadoCivil: 'estado_civil',
+}
+
+_tablas = {}
+_lock = threading.Lock()
+
+
+class _Tabla:
+    __slots__ = ('version', 'por_id', 'por_nombre', 'filas')
+
+    def __init__(self, modelo, version):
+        campo = CATALOGOS[modelo]
+        self.version = version
+        self.filas = list(modelo.objects.order_by('pk'))
+        self.por_id = {obj.pk: obj for obj in self.filas}
+        self.por_nombre = {}
+        for obj in self.filas:
+            # Ante nombres repetidos gana el de menor pk, igual que filter(...).first()
+            self.por_nombre.setdefault(_normalizar(getattr(obj, campo)), obj)
+
+
+def _normalizar(nombre):
+    return (nombre or '').strip().casefold()
+
+
+def _clave_version(modelo):
+    return f'nucleo:catalogo:{modelo._meta.label_lower}:version'
+
+
+def _tabla(modelo):
+    if modelo not in CATALOGOS:
+        raise ValueError(f'{modelo.__name__} no es un catálogo cacheado')
+    version = cache.get(_clave_version(modelo), 0)
+    tabla = _tablas.get(modelo)
+    if tabla is None or tabla.version != version:
+        with _lock:
+            tabla = _tablas.get(modelo)
+            if tabla is None or tabla.version != version:
+                tabla = _tablas[modelo] = _Tabla(modelo, version)
+    return tabla
+
+
+def por_id(modelo, pk):
+    """Instancia de ``modelo`` con esa pk, o None."""
+    try:
+        pk = int(pk)
+    except (TypeError, ValueError):
+        return None
+    return _tabla(modelo).por_id.get(pk)
+
+
+def por_nombre(modelo, nombre):
+    """Instancia de ``modelo`` por nombre sin distinguir mayúsculas, o None (equivale a ``filter(...__iexact=).first()``)."""
+    return _tabla(modelo).por_nombre.get(_normalizar(nombre))
+
+
+def obtener(modelo, nombre):
+    """Como ``por_nombre`` pero lanza ``modelo.DoesNotExist`` (equivale a ``get(...__iexact=)``)."""
+    obj = por_nombre(modelo, nombre)
+    if obj is None:
+        raise modelo.DoesNotExist(f'{modelo.__name__} "{nombre}" no existe')
+    return obj
+
+
+def obtener_por_id(modelo, pk):
+    """Como ``por_id`` pero lanza ``modelo.DoesNotExist`` (equivale a ``get(pk=)``)."""
+    obj = por_id(modelo, pk)
+    if obj is None:
+        raise modelo.DoesNotExist(f'{modelo.__name__} con id {pk} no existe')
+    return obj
+
+
+def todos(modelo):
+    """Lista de instancias del catálogo ordenadas por pk."""
+    return list(_tabla(modelo).filas)
+
+
+def invalidar(modelo):
+    """Descarta el catálogo en este proceso y, al confirmar la transacción, en los demás."""
+    _tablas.pop(modelo, None)
+
+    def _incrementar_version():
+        _tablas.pop(modelo, None)
+        clave = _clave_version(modelo)
+        try:
+            cache.incr(clave)
+        except ValueError:
+            cache.set(clave, 1, None)
+
+    transaction.on_commit(_incrementar_version)
@@ -0,0 +1,118 @@
+"""Renderizado del certificado laboral en PDF a partir de sus datos.
+
+No accede a la base ni a los modelos: los workers del pool de procesos de
+``generar_certificados`` reciben sólo los datos (un dict de textos) y la ruta
+destino. Cambiar el diseño del PDF implica subir VERSION_PLANTILLA, que forma
+parte de la clave del cache en disco.
+"""
+import os
+import tempfile
+from datetime import date
+from pathlib import Path
+
+from nucleo.logic.pdf_simple import DocumentoPDF
+
+VERSION_PLANTILLA = 1
+
+EMPRESA = 'Farmacia Gómez de Galarze'
+FIRMANTE = 'Gómez Ana María'
+CARGO_FIRMANTE = 'Responsable de farmacia'
+
+MESES = [
+    '', 'enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio',
+    'julio', 'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre'
+]
+
+_MARGEN = 72
+
+
+def fecha_larga(fecha):
+    return f"{fecha.day} de {MESES[fecha.month]} del año {fecha.year}"
+
+
+def frase_convenio(convenio):
+    """Texto que sigue a la fecha de ingreso (misma regla que emitir_certificado.html)."""
+    if not convenio:
+        return ''
+    if convenio == 'Fuera de convenio':
+        return ', fuera de convenio'
+    return f', bajo convenio {convenio}'
+
+
+def renderizar(datos):
+    """Bytes del PDF del certificado. ``datos`` es el dict de certificados.datos_certificado."""
+    pdf = DocumentoPDF(titulo='Certificado Laboral')
+    y = pdf.alto - 110
+    pdf.texto_centrado(y, 'Certificado Laboral', tamanio=18, negrita=True)
+    y -= 16
+    pdf.linea(_MARGEN, y, pdf.ancho - _MARGEN, y)
+    ancho = pdf.ancho - 2 * _MARGEN
+    y = pdf.parrafo(_MARGEN, y - 40, ancho, [
+        ('Certificamos que el sr/sra ', False),
+        (f"{datos['nombres']} {datos['apellido']}", True),
+        (' DNI ', False),
+        (datos['dni'], True),
+        (' se encuentra trabajando en la empresa ', False),
+        (datos['empresa'], True),
+        (' en el cargo de ', False),
+        (datos['puesto'], True),
+        (' desde el día ', False),
+        (datos['fecha_ant'], True),
+        (f"{frase_convenio(datos['convenio'])}.", False),
+    ])
+    y = pdf.parrafo(_MARGEN, y - 12, ancho, [
+        ('A ser presentado a quien corresponda el día ', False),
+        (fecha_larga(date.fromisoformat(datos['fecha_emision'])), True),
+        ('.', False),
+    ])
+    y -= 90
+    pdf.linea(_MARGEN, y, _MARGEN + 180, y, grosor=0.5)
+    pdf.texto(_MARGEN, y - 16, FIRMANTE, tamanio=11)
+    pdf.texto(_MARGEN, y - 30, CARGO_FIRMANTE, tamanio=11)
+    return pdf.bytes()
+
+
+def nombre_archivo(fecha_emision, clave):
+    """``<fecha de emisión ISO>_<clave>.pdf``: la fecha va en el nombre para poder limpiar por antigüedad."""
+    return f'{fecha_emision}_{clave}.pdf'
+
+
+def _fecha_de(ruta):
+    try:
+        return date.fromisoformat(ruta.name.split('_', 1)[0])
+    except ValueError:
+        # Nombre con otro formato: se trata como el más viejo
+        return date.min
+
+
+def guardar(ruta, contenido):
+    """Escribe ``contenido`` en ``ruta`` de forma atómica y borra los PDF de fechas de emisión anteriores.
+
+    Los de la misma fecha o posteriores (p. ej. generados por adelantado con
+    ``generar_certificados --fecha``) se conservan, así dos procesos que
+    escriben claves distintas no se borran lo que acaban de generar. Un lector
+    concurrente ve el archivo completo o ninguno.
+    """
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=ruta.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, ruta)
+    except BaseException:
+        os.unlink(temporal)
+        raise
+    fecha = _fecha_de(ruta)
+    for anterior in ruta.parent.glob('*.pdf'):
+        if _fecha_de(anterior) < fecha:
+            anterior.unlink(missing_ok=True)
+    return ruta
+
+
+def generar(tarea):
+    """Worker del pool: ``tarea`` es (ruta, datos). Devuelve el contenido escrito."""
+    ruta, datos = tarea
+    contenido = renderizar(datos)
+    guardar(ruta, contenido)
+    return contenido
@@ -0,0 +1,114 @@
+"""Certificados laborales en PDF con cache en disco (MEDIA_ROOT/certificados/<empleado>/<fecha>_<clave>.pdf).
+
+La clave es el hash de los datos del empleado que aparecen en el certificado
+(la foto de Empleado_actual) junto con VERSION_PLANTILLA: mientras no cambien
+se sirve el mismo archivo del día, y un cambio de puesto, convenio, sucursal
+o diseño genera otro. La fecha de emisión se imprime en el certificado, así
+que va en el nombre del archivo; al escribir uno se borran los de fechas
+anteriores del mismo empleado (ver certificado_pdf.guardar).
+
+``generar_lote`` arma los certificados de muchos empleados repartiendo el
+renderizado en un pool de procesos; los datos se leen antes, en el proceso
+principal, así los workers no abren conexiones a la base.
+"""
+import hashlib
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+from nucleo.logic import certificado_pdf
+from nucleo.logic.empleado_actual import obtener_empleado_actual
+
+PUESTO_POR_DEFECTO = 'Responsable de farmacia'
+
+# Relaciones que usa datos_certificado: con select_related alcanza una consulta por empleado
+RELACIONES = ('empleado_actual__id_puesto', 'empleado_actual__id_convenio', 'empleado_actual__id_sucursal')
+
+
+def datos_certificado(empleado, fecha_emision=None):
+    """Dict (sólo textos) con lo que muestra el certificado de ``empleado``."""
+    actual = getattr(empleado, 'empleado_actual', None)
+    if actual is None:
+        # Empleado_actual todavía no generado para este empleado
+        actual = obtener_empleado_actual(empleado)
+    sucursal = actual.id_sucursal.sucursal if actual and actual.id_sucursal else 'Sin sucursal'
+    puesto = PUESTO_POR_DEFECTO
+    if actual and actual.id_puesto:
+        puesto = actual.id_puesto.tipo_puesto or puesto
+    convenio = ''
+    if actual and actual.id_convenio:
+        convenio = actual.id_convenio.tipo_convenio or str(actual.id_convenio)
+    fecha_ingreso = actual.fecha_est if actual else None
+    return {
+        'nombres': empleado.nombres,
+        'apellido': empleado.apellido,
+        'dni': empleado.dni,
+        'empresa': f'{certificado_pdf.EMPRESA}, {sucursal}',
+        'puesto': puesto,
+        'fecha_ant': fecha_ingreso.strftime('%d/%m/%Y') if fecha_ingreso else 'No disponible',
+        'convenio': convenio,
+        'fecha_emision': (fecha_emision or date.today()).isoformat(),
+    }
+
+
+def clave(datos):
+    """Hash de la foto del empleado y de la plantilla (sin la fecha de emisión, que va en el nombre)."""
+    foto = {k: v for k, v in datos.items() if k != 'fecha_emision'}
+    contenido = json.dumps([certificado_pdf.VERSION_PLANTILLA, foto], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:32]
+
+
+def ruta_certificado(empleado_id, datos):
+    nombre = certificado_pdf.nombre_archivo(datos['fecha_emision'], clave(datos))
+    return Path(settings.MEDIA_ROOT) / 'certificados' / str(empleado_id) / nombre
+
+
+def obtener_pdf(empleado, fecha_emision=None):
+    """PDF vigente de ``empleado`` como archivo abierto (binario); lo genera si no está en el cache.
+
+    Se abre el archivo existente en lugar de chequear que exista y abrirlo
+    después: si otro proceso lo reemplaza o borra mientras tanto, el handle
+    abierto sigue siendo válido. Si hay que generarlo, se devuelven los bytes
+    recién escritos.
+    """
+    datos = datos_certificado(empleado, fecha_emision)
+    ruta = ruta_certificado(empleado.pk, datos)
+    try:
+        return open(ruta, 'rb')
+    except FileNotFoundError:
+        return io.BytesIO(certificado_pdf.generar((ruta, datos)))
+
+
+def generar_lote(empleados_qs, procesos=None, fecha_emision=None):
+    """Genera los certificados faltantes de ``empleados_qs``. Devuelve (generados, ya_existentes).
+
+    Con ``procesos=1`` se renderiza en el mismo proceso; si no, en un pool de
+    ``procesos`` workers (por defecto, uno por CPU).
+    """
+    fecha_emision = fecha_emision or date.today()
+    tareas = []
+    existentes = 0
+    for empleado in empleados_qs.select_related(*RELACIONES).iterator(chunk_size=1000):
+        datos = datos_certificado(empleado, fecha_emision)
+        ruta = ruta_certificado(empleado.pk, datos)
+        if ruta.exists():
+            existentes += 1
+        else:
+            tareas.append((ruta, datos))
+    if not tareas:
+        return 0, existentes
+    if procesos == 1 or len(tareas) == 1:
+        for tarea in tareas:
+            certificado_pdf.generar(tarea)
+    else:
+        # Los procesos hijos heredan los sockets abiertos: se cierran antes de crearlos
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            for _ in pool.map(certificado_pdf.generar, tareas, chunksize=max(1, len(tareas) // 64)):
+                pass
+    return len(tareas), existentes
@@ -0,0 +1,187 @@
+"""Detección de solapamientos entre licencias y vacaciones.
+
+Todas las comparaciones son sobre rangos cerrados [fecha_desde, fecha_hasta].
+En PostgreSQL el filtro agrega ``daterange(...) && daterange(...)`` (ver
+``rango_cerrado``) para que el planificador pueda usar los índices GiST de la
+migración 0008; en el resto de los motores alcanza con el par
+``fecha_desde <= hasta AND fecha_hasta >= desde``.
+"""
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date
+from functools import reduce
+from operator import or_
+
+from django.contrib.postgres.fields import DateRangeField
+from django.db import connections
+from django.db.models import DateField, Func, Q, Value
+
+from nucleo.models import Solicitud_licencia, Solicitud_vacaciones
+
+ESTADOS_ACTIVOS = ('En espera', 'Aceptada')
+ESTADOS_APROBADOS = ('Aceptada', 'Aprobada')
+
+# Distingue "sin filtro de empleado" de empleado=None (que no matchea a nadie)
+_SIN_FILTRO = object()
+
+
+@dataclass(frozen=True)
+class Colision:
+    tipo: str  # 'licencia' | 'vacaciones'
+    id: int
+    idempleado_id: int
+    nombres: str
+    apellido: str
+    fecha_desde: date
+    fecha_hasta: date
+
+    @property
+    def empleado(self):
+        return f"{self.nombres} {self.apellido}"
+
+    def rango_texto(self):
+        return f"{self.fecha_desde.strftime('%d/%m/%Y')} - {self.fecha_hasta.strftime('%d/%m/%Y')}"
+
+
+def _q_estados(estados):
+    return reduce(or_, (Q(id_estado__estado__iexact=e) for e in estados))
+
+
+def rango_cerrado(desde='fecha_desde', hasta='fecha_hasta'):
+    """Expresión ``daterange(desde, hasta, '[]')`` (sólo PostgreSQL); los extremos son campos o fechas.
+
+    Sobre los campos coincide con la expresión de los índices GiST; dos rangos
+    se comparan con el lookup ``overlap`` (``&&``).
+    """
+    extremos = [v if isinstance(v, str) else Value(v, output_field=DateField()) for v in (desde, hasta)]
+    return Func(*extremos, Value('[]'), function='daterange', output_field=DateRangeField())
+
+
+def solicitudes_solapadas(modelo, desde, hasta, estados=None, empleado=_SIN_FILTRO, excluir_empleado=_SIN_FILTRO):
+    """QuerySet de ``modelo`` (Solicitud_licencia o Solicitud_vacaciones) que solapa [desde, hasta].
+
+    ``estados`` filtra por nombre de estado (sin distinguir mayúsculas);
+    ``empleado`` / ``excluir_empleado`` restringen a (o excluyen) un empleado.
+    """
+    qs = modelo.objects.filter(fecha_desde__lte=hasta, fecha_hasta__gte=desde)
+    if connections[qs.db].vendor == 'postgresql':
+        qs = qs.alias(rango=rango_cerrado()).filter(rango__overlap=rango_cerrado(desde, hasta))
+    if estados:
+        qs = qs.filter(_q_estados(estados))
+    if empleado is not _SIN_FILTRO:
+        qs = qs.filter(idempleado=empleado)
+    if excluir_empleado is not _SIN_FILTRO:
+        qs = qs.exclude(idempleado=excluir_empleado)
+    return qs
+
+
+def _colisiones(qs, tipo):
+    filas = qs.values_list(
+        'pk', 'idempleado_id', 'idempleado__nombres', 'idempleado__apellido', 'fecha_desde', 'fecha_hasta'
+    ).order_by('fecha_desde', 'pk')
+    return [Colision(tipo, *fila) for fila in filas]
+
+
+def buscar_colisiones(desde, hasta, estados=ESTADOS_ACTIVOS, estados_vacaciones=None,
+                      empleado=_SIN_FILTRO, excluir_empleado=_SIN_FILTRO):
+    """Licencias y vacaciones que solapan [desde, hasta], en dos consultas.
+
+    ``estados_vacaciones`` permite un criterio distinto para vacaciones
+    (por defecto el mismo que ``estados``). Devuelve una lista de Colision
+    con las licencias primero y luego las vacaciones.
+    """
+    filtros = {'empleado': empleado, 'excluir_empleado': excluir_empleado}
+    licencias = solicitudes_solapadas(Solicitud_licencia, desde, hasta, estados, **filtros)
+    vacaciones = solicitudes_solapadas(
+        Solicitud_vacaciones, desde, hasta, estados_vacaciones or estados, **filtros
+    )
+    return _colisiones(licencias, 'licencia') + _colisiones(vacaciones, 'vacaciones')
+
+
+class IndiceIntervalos:
+    """Árbol de intervalos estático (centrado) para consultas de solapamiento en memoria.
+
+    ``items`` es un iterable de (desde, hasta, valor) con extremos inclusivos.
+    """
+
+    __slots__ = ('centro', 'por_desde', 'por_hasta', 'izq', 'der', '_desdes')
+
+    def __init__(self, items):
+        items = list(items)
+        self.izq = self.der = None
+        self.por_desde = self.por_hasta = ()
+        self.centro = None
+        if not items:
+            return
+        extremos = sorted(x for d, h, _ in items for x in (d, h))
+        self.centro = extremos[len(extremos) // 2]
+        izq, der, aca = [], [], []
+        for item in items:
+            if item[1] < self.centro:
+                izq.append(item)
+            elif item[0] > self.centro:
+                der.append(item)
+            else:
+                aca.append(item)
+        self.por_desde = sorted(aca, key=lambda i: i[0])
+        self.por_hasta = sorted(aca, key=lambda i: i[1], reverse=True)
+        self._desdes = [i[0] for i in self.por_desde]
+        self.izq = IndiceIntervalos(izq) if izq else None
+        self.der = IndiceIntervalos(der) if der else None
+
+    def solapados(self, desde, hasta):
+        """Valores de los intervalos que se cruzan con [desde, hasta]."""
+        resultado = []
+        pendientes = [self]
+        while pendientes:
+            nodo = pendientes.pop()
+            if nodo.centro is None:
+                continue
+            if hasta < nodo.centro:
+                # Todos los intervalos del nodo terminan en o después del centro: alcanza con desde <= hasta
+                resultado.extend(i[2] for i in nodo.por_desde[:bisect_right(nodo._desdes, hasta)])
+                if nodo.izq:
+                    pendientes.append(nodo.izq)
+            elif desde > nodo.centro:
+                # Todos empiezan en o antes del centro: alcanza con hasta >= desde
+                for i in nodo.por_hasta:
+                    if i[1] < desde:
+                        break
+                    resultado.append(i[2])
+                if nodo.der:
+                    pendientes.append(nodo.der)
+            else:
+                resultado.extend(i[2] for i in nodo.por_desde)
+                if nodo.izq:
+                    pendientes.append(nodo.izq)
+                if nodo.der:
+                    pendientes.append(nodo.der)
+        return resultado
+
+
+def colisiones_en_lote(solicitudes, estados=ESTADOS_ACTIVOS, clave=lambda s: s.pk):
+    """Colisiones con solicitudes de OTROS empleados para un lote (p. ej. una página).
+
+    Trae en dos consultas todo lo que solapa el rango total del lote y resuelve
+    cada solicitud en memoria con un IndiceIntervalos. Devuelve
+    ``{clave(s): [Colision, ...]}`` sólo para las solicitudes con colisiones,
+    conservando el orden de ``buscar_colisiones``.
+    """
+    solicitudes = list(solicitudes)
+    if not solicitudes:
+        return {}
+    desde = min(s.fecha_desde for s in solicitudes)
+    hasta = max(s.fecha_hasta for s in solicitudes)
+    candidatas = buscar_colisiones(desde, hasta, estados)
+    indice = IndiceIntervalos((c.fecha_desde, c.fecha_hasta, (n, c)) for n, c in enumerate(candidatas))
+
+    resultado = {}
+    for s in solicitudes:
+        idempleado_id = getattr(s, 'idempleado_id', None)
+        hits = sorted(
+            (orden, c) for orden, c in indice.solapados(s.fecha_desde, s.fecha_hasta)
+            if c.idempleado_id != idempleado_id
+        )
+        if hits:
+            resultado[clave(s)] = [c for _, c in hits]
+    return resultado
@@ -0,0 +1,137 @@
+"""Outbox de mails: las vistas encolan y el comando ``enviar_correos`` envía.
+
+``encolar`` guarda el mail en ``Correo_saliente`` dentro de la transacción del
+request (si la transacción se revierte, el mail tampoco sale) y vuelve enseguida,
+sin tocar el servidor SMTP. ``enviar_pendientes`` toma un lote de mails vencidos,
+los envía por una única conexión del backend configurado y:
+
+- borra los enviados (el cuerpo puede tener contraseñas, no se conserva);
+- a los que fallan les suma un intento y los reprograma con espera exponencial;
+- al llegar a ``MAX_INTENTOS`` los deja en estado ``fallido`` (dead letter),
+  para revisarlos y reencolarlos con ``reintentar_fallidos``; pasados
+  ``DIAS_RETENCION`` desde que se encolaron, ``purgar_fallidos`` los borra.
+
+Antes de enviar, el lote se "reserva" corriendo ``proximo_intento`` unos minutos,
+así dos workers no mandan el mismo mail (en PostgreSQL con ``SKIP LOCKED``) y,
+si el worker se cae a mitad de lote, los mails vuelven a quedar pendientes.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from nucleo.models import Correo_saliente
+
+logger = logging.getLogger(__name__)
+
+MAX_INTENTOS = 8
+ESPERA_BASE = timedelta(minutes=1)
+ESPERA_MAXIMA = timedelta(hours=6)
+RESERVA = timedelta(minutes=10)
+# Días que se conservan los mails fallidos (pueden tener contraseñas en el cuerpo)
+DIAS_RETENCION = 7
+
+
+def encolar(asunto, mensaje, destinatarios, remitente=None):
+    """Agrega un mail al outbox; se envía cuando corra el worker. Devuelve el Correo_saliente."""
+    return Correo_saliente.objects.create(
+        asunto=asunto,
+        mensaje=mensaje,
+        remitente=remitente or settings.DEFAULT_FROM_EMAIL,
+        destinatarios=list(destinatarios),
+        proximo_intento=timezone.now(),
+    )
+
+
+def encolar_varios(correos, remitente=None):
+    """Agrega al outbox, con un solo INSERT, los ``correos`` dados como (asunto, mensaje, destinatarios)."""
+    ahora = timezone.now()
+    return Correo_saliente.objects.bulk_create([
+        Correo_saliente(
+            asunto=asunto, mensaje=mensaje, remitente=remitente or settings.DEFAULT_FROM_EMAIL,
+            destinatarios=list(destinatarios), proximo_intento=ahora,
+        )
+        for asunto, mensaje, destinatarios in correos
+    ])
+
+
+def espera(intentos):
+    """Espera antes del próximo intento tras ``intentos`` fallidos: 1, 2, 4... minutos, hasta 6 horas."""
+    return min(ESPERA_BASE * 2 ** max(intentos - 1, 0), ESPERA_MAXIMA)
+
+
+def _reservar(limite, ahora):
+    with transaction.atomic():
+        pendientes = Correo_saliente.objects.filter(
+            estado=Correo_saliente.PENDIENTE, proximo_intento__lte=ahora,
+        ).order_by('proximo_intento', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            pendientes = pendientes.select_for_update(skip_locked=True)
+        lote = list(pendientes[:limite])
+        Correo_saliente.objects.filter(pk__in=[c.pk for c in lote]).update(proximo_intento=ahora + RESERVA)
+    return lote
+
+
+def _registrar_fallo(correo, error, ahora):
+    correo.intentos += 1
+    correo.ultimo_error = str(error)[:2000]
+    if correo.intentos >= MAX_INTENTOS:
+        correo.estado = Correo_saliente.FALLIDO
+        logger.error('Correo %s descartado tras %s intentos: %s', correo.pk, correo.intentos, error)
+    else:
+        correo.proximo_intento = ahora + espera(correo.intentos)
+        logger.warning('Correo %s falló (intento %s): %s', correo.pk, correo.intentos, error)
+    correo.save(update_fields=['intentos', 'ultimo_error', 'estado', 'proximo_intento'])
+
+
+def enviar_pendientes(limite=100):
+    """Envía hasta ``limite`` mails vencidos por una sola conexión. Devuelve (enviados, fallidos)."""
+    ahora = timezone.now()
+    lote = _reservar(limite, ahora)
+    if not lote:
+        return 0, 0
+    conexion = get_connection(fail_silently=False)
+    try:
+        conexion.open()
+    except Exception as e:
+        # Sin conexión al servidor: cuenta como intento fallido para todo el lote
+        for correo in lote:
+            _registrar_fallo(correo, e, ahora)
+        return 0, len(lote)
+    enviados, fallidos = [], 0
+    try:
+        for correo in lote:
+            mensaje = EmailMessage(
+                subject=correo.asunto, body=correo.mensaje, from_email=correo.remitente,
+                to=correo.destinatarios, connection=conexion,
+            )
+            try:
+                mensaje.send()
+            except Exception as e:
+                _registrar_fallo(correo, e, ahora)
+                fallidos += 1
+            else:
+                enviados.append(correo.pk)
+    finally:
+        conexion.close()
+        Correo_saliente.objects.filter(pk__in=enviados).delete()
+    return len(enviados), fallidos
+
+
+def reintentar_fallidos():
+    """Vuelve a dejar pendientes los mails descartados. Devuelve cuántos."""
+    return Correo_saliente.objects.filter(estado=Correo_saliente.FALLIDO).update(
+        estado=Correo_saliente.PENDIENTE, intentos=0, proximo_intento=timezone.now(),
+    )
+
+
+def purgar_fallidos(dias=DIAS_RETENCION):
+    """Borra los mails fallidos encolados hace más de ``dias`` días. Devuelve cuántos."""
+    limite = timezone.now() - timedelta(days=dias)
+    borrados, _ = Correo_saliente.objects.filter(
+        estado=Correo_saliente.FALLIDO, fecha_creacion__lt=limite,
+    ).delete()
+    return borrados
@@ -0,0 +1,101 @@
+"""Días laborables de un empleado según su Plan_trabajo y los feriados, sin recorrer el rango.
+
+Cada plan se reduce a una máscara de 7 bits (bit 0 = lunes ... bit 6 =
+domingo). La cantidad de días de la máscara en [desde, hasta] se calcula en
+forma cerrada: semanas completas por la cantidad de bits encendidos, más los
+bits del resto de días (la máscara rotada al día de la semana de ``desde``).
+A eso se le restan los feriados del rango que caen en días de la máscara,
+que salen de ``calendario_feriados`` con bisect.
+
+Las listas de fechas se arman saltando de a 7 días por cada día de la
+semana de la máscara, así cuestan lo que mide la lista y no el rango.
+
+Un empleado sin plan trabaja todos los días (``TODOS``), como en
+``validar_solicitud_licencia``.
+"""
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import List
+
+from nucleo.logic import calendario_feriados
+from nucleo.models import Plan_trabajo
+
+DIAS_PLAN = ('lunes', 'martes', 'miercoles', 'jueves', 'viernes', 'sabado', 'domingo')
+TODOS = 0b1111111
+
+
+def mascara_plan(plan):
+    """Máscara de días que trabaja ``plan`` (TODOS si no hay plan)."""
+    if plan is None:
+        return TODOS
+    return sum(1 << w for w, dia in enumerate(DIAS_PLAN) if getattr(plan, dia, False))
+
+
+def trabaja(mascara, fecha):
+    return bool(mascara >> fecha.weekday() & 1)
+
+
+def _bits(mascara):
+    return bin(mascara & TODOS).count('1')
+
+
+def contar_dias(mascara, desde, hasta):
+    """Días de [desde, hasta] cuyo día de la semana está en ``mascara`` (sin mirar feriados)."""
+    if hasta < desde:
+        return 0
+    semanas, resto = divmod((hasta - desde).days + 1, 7)
+    inicio = desde.weekday()
+    # Rota la máscara para que el bit 0 sea el día de la semana de ``desde``
+    rotada = ((mascara >> inicio) | (mascara << (7 - inicio))) & TODOS
+    return semanas * _bits(mascara) + _bits(rotada & ((1 << resto) - 1))
+
+
+def fechas_de(mascara, desde, hasta):
+    """Fechas de [desde, hasta] cuyo día de la semana está en ``mascara``, ordenadas."""
+    fechas = []
+    for w in range(7):
+        if mascara >> w & 1:
+            dia = desde + timedelta(days=(w - desde.weekday()) % 7)
+            while dia <= hasta:
+                fechas.append(dia)
+                dia += timedelta(days=7)
+    fechas.sort()
+    return fechas
+
+
+@dataclass
+class ResumenRango:
+    laborables: int  # días del plan que no son feriado
+    dias_libres: List[date] = field(default_factory=list)  # días que el plan no trabaja
+    feriados: List[date] = field(default_factory=list)  # feriados del rango (trabaje o no ese día)
+
+    @property
+    def hay_laborables(self):
+        return self.laborables > 0
+
+
+def analizar(mascara, desde, hasta):
+    """ResumenRango de [desde, hasta] para un empleado con esa máscara."""
+    feriados = list(calendario_feriados.feriados_entre(desde, hasta))
+    feriados_trabajados = sum(1 for f in feriados if trabaja(mascara, f))
+    return ResumenRango(
+        laborables=contar_dias(mascara, desde, hasta) - feriados_trabajados,
+        dias_libres=fechas_de(TODOS & ~mascara, desde, hasta),
+        feriados=feriados,
+    )
+
+
+def mascaras_de(idempleados):
+    """{idempleado: máscara} en una consulta; ante varios planes gana el de menor pk, sin plan -> TODOS."""
+    idempleados = set(idempleados)
+    mascaras = {}
+    for plan in Plan_trabajo.objects.filter(idempleado__in=idempleados).order_by('pk'):
+        mascaras.setdefault(plan.idempleado_id, mascara_plan(plan))
+    return {pk: mascaras.get(pk, TODOS) for pk in idempleados}
+
+
+def analizar_en_lote(consultas):
+    """ResumenRango de cada (idempleado, desde, hasta) de ``consultas``, en orden, con una consulta de planes."""
+    consultas = list(consultas)
+    mascaras = mascaras_de(pk for pk, _, _ in consultas)
+    return [analizar(mascaras[pk], desde, hasta) for pk, desde, hasta in consultas]
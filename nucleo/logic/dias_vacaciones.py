@@ -0,0 +1,144 @@
+"""Cálculo de los días de vacaciones que corresponden a un empleado según su antigüedad."""
+from datetime import date
+
+
+def obtener_fecha_corte_generacion(year):
+    """Devuelve la fecha de corte (fin de ciclo) para calcular días de vacaciones."""
+    return date(year, 12, 31)
+
+
+def calcular_dias_vacaciones(alta_ant, fecha_referencia=None):
+    """
+    Calcula días de vacaciones usando base 30/360 para proporcionalidades.
+    - Todos los meses cuentan 30 días y el año 360.
+    - Días 31 y 28/29 se ajustan a 30 antes del cálculo.
+    - Mantiene los tramos tradicionales (14/21/28/35) según antigüedad real.
+    """
+    if not alta_ant:
+        return 0
+
+    if fecha_referencia is None:
+        fecha_referencia = date.today()
+
+    if alta_ant > fecha_referencia:
+        return 0
+
+    def _fecha_a_base_30(fecha):
+        """Convierte una fecha a su equivalente en base 30/360."""
+        dia = fecha.day
+        if fecha.month == 2 and dia >= 28:
+            dia = 30
+        elif dia > 30:
+            dia = 30
+        return fecha.year * 360 + (fecha.month - 1) * 30 + dia
+
+    dias_antiguedad_real = (fecha_referencia - alta_ant).days
+    dias_antiguedad_base = max(_fecha_a_base_30(fecha_referencia) - _fecha_a_base_30(alta_ant), 0)
+    corte_junio = date(fecha_referencia.year, 6, 1)
+
+    def _dias_proporcionales():
+        base = max(dias_antiguedad_base // 30, 0)
+        resto = dias_antiguedad_base % 30
+        if resto >= 15:
+            base += 1
+        return base
+
+    if alta_ant.year == fecha_referencia.year:
+        if alta_ant <= corte_junio:
+            return 14
+        return _dias_proporcionales()
+
+    if dias_antiguedad_base < 180:
+        return _dias_proporcionales()
+
+    años = fecha_referencia.year - alta_ant.year - (
+        (fecha_referencia.month, fecha_referencia.day) < (alta_ant.month, alta_ant.day)
+    )
+    if años < 5:
+        return 14
+    if años < 10:
+        return 21
+    if años < 20:
+        return 28
+    return 35
+
+
+def _clave_fecha(fecha):
+    """(año, mes*100+día, día en base 30/360) de una fecha, con el mismo ajuste que calcular_dias_vacaciones."""
+    dia = fecha.day
+    if fecha.month == 2 and dia >= 28:
+        dia = 30
+    elif dia > 30:
+        dia = 30
+    return fecha.year, fecha.month * 100 + fecha.day, fecha.year * 360 + (fecha.month - 1) * 30 + dia
+
+
+# Corte de junio (1/6) expresado como mes*100+día
+_CORTE_JUNIO = 601
+
+
+def _dias_desde_claves(alta, referencia):
+    anio_alta, md_alta, base_alta = alta
+    anio_ref, md_ref, base_ref = referencia
+    base = max(base_ref - base_alta, 0)
+    proporcionales = base // 30 + (1 if base % 30 >= 15 else 0)
+    if anio_alta == anio_ref:
+        return 14 if md_alta <= _CORTE_JUNIO else proporcionales
+    if base < 180:
+        return proporcionales
+    años = anio_ref - anio_alta - (md_ref < md_alta)
+    if años < 5:
+        return 14
+    if años < 10:
+        return 21
+    if años < 20:
+        return 28
+    return 35
+
+
+def calcular_dias_vacaciones_lote(altas, fechas_referencia=None):
+    """Versión en lote de ``calcular_dias_vacaciones``; devuelve una lista de días.
+
+    ``fechas_referencia`` puede ser una secuencia de la misma longitud que
+    ``altas``, una única fecha para todas o None (hoy). Cada fecha distinta se
+    convierte una sola vez a base 30/360 y cada par (alta, referencia) repetido
+    se resuelve una sola vez, así que proyectar toda la plantilla es lineal en
+    la cantidad de fechas distintas.
+    """
+    altas = list(altas)
+    if fechas_referencia is None or isinstance(fechas_referencia, date):
+        referencias = [fechas_referencia] * len(altas)
+    else:
+        referencias = list(fechas_referencia)
+        if len(referencias) != len(altas):
+            raise ValueError("altas y fechas_referencia deben tener la misma longitud")
+    hoy = date.today()
+    claves = {}
+    resultados = {}
+    dias = []
+    for alta, referencia in zip(altas, referencias):
+        if not alta:
+            dias.append(0)
+            continue
+        if referencia is None:
+            referencia = hoy
+        par = (alta, referencia)
+        valor = resultados.get(par)
+        if valor is None:
+            if alta > referencia:
+                valor = 0
+            else:
+                if alta not in claves:
+                    claves[alta] = _clave_fecha(alta)
+                if referencia not in claves:
+                    claves[referencia] = _clave_fecha(referencia)
+                valor = _dias_desde_claves(claves[alta], claves[referencia])
+            resultados[par] = valor
+        dias.append(valor)
+    return dias
+
+
+def proyectar_dias_vacaciones(altas, fechas_referencia):
+    """{fecha_referencia: [días por alta]} para evaluar a toda la plantilla en varias fechas."""
+    altas = list(altas)
+    return {fecha: calcular_dias_vacaciones_lote(altas, fecha) for fecha in fechas_referencia}
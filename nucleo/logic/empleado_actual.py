@@ -0,0 +1,79 @@
+"""Mantenimiento y lectura de Empleado_actual (estado laboral vigente por empleado)."""
+from django.db import transaction
+
+from nucleo.logic.empleados_listado import ultimo_el_subquery, ultimo_eo_subquery
+from nucleo.models import Empleado, Empleado_actual, Empleado_el, Empleado_eo
+
+
+def _valores(el, eo):
+    return {
+        'id_empleado_el': el.id if el else None,
+        'fecha_el': el.fecha_el if el else None,
+        'fecha_est': el.fecha_est if el else None,
+        'alta_ant': el.alta_ant if el else None,
+        'id_estado_id': el.id_estado_id if el else None,
+        'id_convenio_id': el.id_convenio_id if el else None,
+        'id_puesto_id': el.id_puesto_id if el else None,
+        'id_empleado_eo': eo.id if eo else None,
+        'id_sucursal_id': eo.id_sucursal_id if eo else None,
+    }
+
+
+def sincronizar_empleado_actual(idempleado_id, crear=True):
+    """Recalcula la fila de Empleado_actual de un empleado a partir de sus registros EL/EO.
+
+    Un empleado sin registros queda con una fila vacía (todos los campos en
+    None), así la lectura no vuelve a recalcularla. Con ``crear=False`` sólo se
+    actualiza una fila existente (se usa al borrar registros, cuando el propio
+    empleado puede estar eliminándose en cascada).
+    """
+    el = Empleado_el.objects.filter(idempleado_id=idempleado_id).order_by('-fecha_el', '-id').first()
+    eo = Empleado_eo.objects.filter(idempleado_id=idempleado_id).order_by('-fecha_eo', '-id').first()
+    with transaction.atomic():
+        if not crear:
+            Empleado_actual.objects.filter(pk=idempleado_id).update(**_valores(el, eo))
+            return None
+        actual, _ = Empleado_actual.objects.update_or_create(idempleado_id=idempleado_id, defaults=_valores(el, eo))
+    return actual
+
+
+def _vacia(actual):
+    return actual.id_empleado_el is None and actual.id_empleado_eo is None
+
+
+def obtener_empleado_actual(empleado):
+    """Devuelve el Empleado_actual de ``empleado`` (instancia o id) con sus catálogos precargados.
+
+    Es una lectura por clave primaria. Si la fila todavía no existe (p. ej.
+    antes de la primera reconstrucción) se genera en el momento, vacía si el
+    empleado no tiene registros EL/EO. Devuelve None si el empleado no existe o
+    no tiene registros.
+    """
+    pk = getattr(empleado, 'pk', empleado)
+    if pk is None:
+        return None
+    actual = (
+        Empleado_actual.objects.select_related('id_estado', 'id_convenio', 'id_puesto', 'id_sucursal')
+        .filter(pk=pk)
+        .first()
+    )
+    if actual is None:
+        # Con un id (p. ej. el del usuario) el empleado puede no existir
+        if not isinstance(empleado, Empleado) and not Empleado.objects.filter(pk=pk).exists():
+            return None
+        actual = sincronizar_empleado_actual(pk)
+    return None if _vacia(actual) else actual
+
+
+def reconstruir_empleados_actuales(batch_size=1000):
+    """Regenera toda la tabla Empleado_actual en una transacción. Devuelve la cantidad de filas."""
+    with transaction.atomic():
+        els = {el.idempleado_id: el for el in Empleado_el.objects.filter(id=ultimo_el_subquery())}
+        eos = {eo.idempleado_id: eo for eo in Empleado_eo.objects.filter(id=ultimo_eo_subquery())}
+        filas = [
+            Empleado_actual(idempleado_id=idempleado_id, **_valores(els.get(idempleado_id), eos.get(idempleado_id)))
+            for idempleado_id in sorted(set(els) | set(eos))
+        ]
+        Empleado_actual.objects.all().delete()
+        Empleado_actual.objects.bulk_create(filas, batch_size=batch_size)
+    return len(filas)
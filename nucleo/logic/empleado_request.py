@@ -0,0 +1,63 @@
+"""Empleado del usuario logueado, cargado a lo sumo una vez por request.
+
+``EmpleadoMiddleware`` deja en ``request.empleado`` un objeto perezoso que
+recién consulta la base cuando se lo usa; el context processor y las vistas
+comparten la misma instancia (con localidad/provincia y nacionalidad ya
+cargadas). Desde Python conviene ``empleado_de(request)``, que devuelve la
+instancia real o None (``request.empleado`` envuelve ese None y no es
+``is None``).
+
+El pk del empleado es el id del usuario, así que ``empleado_id_de`` guarda en
+la sesión el id de los usuarios que tienen empleado y en los requests
+siguientes lo responde sin consultar la base. Sólo se guarda el caso
+positivo: un usuario al que se le da de alta el empleado lo ve enseguida, y
+si al consultar el empleado ya no existe el id se quita de la sesión.
+"""
+from django.utils.functional import SimpleLazyObject
+
+from nucleo.models import Empleado
+
+CLAVE_SESION = 'nucleo:empleado_id'
+
+
+def empleado_de(request):
+    """Empleado del usuario del request (o None), consultado una sola vez."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+    cacheado = getattr(request, '_empleado_cache', None)
+    if cacheado is not None and cacheado[0] == user.pk:
+        return cacheado[1]
+    empleado = (
+        Empleado.objects.select_related('id_localidad__provincia', 'id_nacionalidad')
+        .filter(pk=user.pk).first()
+    )
+    request._empleado_cache = (user.pk, empleado)
+    session = getattr(request, 'session', None)
+    if session is not None:
+        # Sólo se escribe si cambia, para no marcar la sesión como modificada en cada request
+        if empleado is None:
+            session.pop(CLAVE_SESION, None)
+        elif session.get(CLAVE_SESION) != empleado.pk:
+            session[CLAVE_SESION] = empleado.pk
+    return empleado
+
+
+def empleado_id_de(request):
+    """pk del empleado del usuario (o None), usando la sesión antes que la base."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+    session = getattr(request, 'session', None)
+    if session is not None and session.get(CLAVE_SESION) == user.pk:
+        return user.pk
+    empleado = empleado_de(request)
+    return empleado.pk if empleado else None
+
+
+def empleado_perezoso(request):
+    """``request.empleado`` si lo puso el middleware; si no, uno nuevo con el mismo caché."""
+    empleado = getattr(request, 'empleado', None)
+    if isinstance(empleado, SimpleLazyObject):
+        return empleado
+    return SimpleLazyObject(lambda: empleado_de(request))
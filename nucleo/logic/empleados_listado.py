@@ -0,0 +1,156 @@
+"""Consultas en bloque para el listado de empleados (ver_empleados).
+
+Las filas se arman con un número constante de consultas, independiente de la
+cantidad de empleados: una para los empleados (con sus catálogos vía
+``select_related``), una para los registros laborales y, en vista ampliada,
+una para la sucursal más reciente de cada empleado.
+"""
+from collections import defaultdict
+
+from django.db.models import OuterRef, Subquery
+
+from nucleo.models import Empleado_el, Empleado_eo
+
+
+def ultimo_el_subquery():
+    """Subconsulta correlacionada con el id del Empleado_el vigente de ``OuterRef('idempleado')``."""
+    return Subquery(
+        Empleado_el.objects.filter(idempleado=OuterRef('idempleado'))
+        .order_by('-fecha_el', '-id')
+        .values('id')[:1]
+    )
+
+
+def ultimo_eo_subquery():
+    """Subconsulta correlacionada con el id del Empleado_eo más reciente de ``OuterRef('idempleado')``."""
+    return Subquery(
+        Empleado_eo.objects.filter(idempleado=OuterRef('idempleado'))
+        .order_by('-fecha_eo', '-id')
+        .values('id')[:1]
+    )
+
+
+def registros_el_por_empleado(empleados_qs, solo_actual=False):
+    """Devuelve {idempleado_id: [Empleado_el, ...]} ordenados del más reciente al más antiguo.
+
+    Con ``solo_actual`` cada lista contiene únicamente el registro vigente.
+    """
+    qs = Empleado_el.objects.filter(idempleado__in=empleados_qs.values('pk'))
+    if solo_actual:
+        qs = qs.filter(id=ultimo_el_subquery())
+    qs = qs.select_related('id_estado', 'id_puesto', 'id_convenio').order_by('idempleado', '-fecha_el', '-id')
+    registros = defaultdict(list)
+    for el in qs:
+        registros[el.idempleado_id].append(el)
+    return registros
+
+
+def eo_actual_por_empleado(empleados_qs):
+    """Devuelve {idempleado_id: Empleado_eo} con la sucursal y persona jurídica precargadas."""
+    qs = (
+        Empleado_eo.objects.filter(idempleado__in=empleados_qs.values('pk'))
+        .filter(id=ultimo_eo_subquery())
+        .select_related('id_sucursal__id_pers_juridica')
+    )
+    return {eo.idempleado_id: eo for eo in qs}
+
+
+def _datos_base(emp):
+    return {
+        'idempleado_id': emp.idempleado_id,
+        'nombres': emp.nombres,
+        'apellido': emp.apellido,
+        'dni': emp.dni,
+        'fecha_nac': emp.fecha_nac,
+        'id_nacionalidad': emp.id_nacionalidad.id if emp.id_nacionalidad else '',
+        'nacionalidad_nombre': emp.id_nacionalidad.nacionalidad if emp.id_nacionalidad else '',
+        'id_civil': emp.id_civil.id if emp.id_civil else '',
+        'civil_nombre': emp.id_civil.estado_civil if emp.id_civil else '',
+        'id_sexo': emp.id_sexo.id if emp.id_sexo else '',
+        'sexo_nombre': emp.id_sexo.sexo if emp.id_sexo else '',
+        'id_localidad': emp.id_localidad.id if emp.id_localidad else '',
+        'localidad_nombre': emp.id_localidad.localidad if emp.id_localidad else '',
+        'dr_personal': emp.dr_personal,
+        'email': emp.idempleado.email if getattr(emp, 'idempleado', None) else '',
+    }
+
+
+def _datos_ampliados(emp, el, eo, fecha_antiguedad):
+    suc = eo.id_sucursal if eo else None
+    pers_jur = suc.id_pers_juridica if suc else None
+    return {
+        'num_hijos': emp.num_hijos,
+        'telefono': emp.telefono,
+        'cuil': emp.cuil,
+        'convenio': el.id_convenio.tipo_convenio if el.id_convenio else '',
+        'puesto': el.id_puesto.tipo_puesto if el.id_puesto else '',
+        'fecha_antiguedad': fecha_antiguedad,
+        'sucursal': suc.sucursal if suc else '',
+        'suc_dire': suc.suc_dire if suc else '',
+        'pers_juridica': pers_jur.pers_juridica if pers_jur else '',
+        'domicilio_pers_juridica': pers_jur.domicilio if pers_jur else '',
+        'cond_iva': pers_jur.cond_iva if pers_jur else '',
+        'cuit': pers_jur.cuit if pers_jur else '',
+        'cond_iibb': pers_jur.cond_iibb if pers_jur else '',
+    }
+
+
+def filas_ver_empleados(empleados_qs, vista_ampliada=False, solo_estado_actual=False):
+    """Arma las filas que consume ``nucleo/ver_empleados.html``.
+
+    Cada empleado aporta su registro laboral vigente y, salvo que se pida
+    ``solo_estado_actual``, una fila por cada registro histórico.
+    """
+    empleados_qs = empleados_qs.select_related(
+        'idempleado', 'id_nacionalidad', 'id_civil', 'id_sexo', 'id_localidad'
+    )
+    registros_el = registros_el_por_empleado(empleados_qs, solo_actual=solo_estado_actual)
+    eos = eo_actual_por_empleado(empleados_qs) if vista_ampliada else {}
+
+    filas = []
+    for emp in empleados_qs:
+        base_data = _datos_base(emp)
+        registros = registros_el.get(emp.pk, [])
+        if not registros:
+            filas.append(base_data.copy())
+            continue
+
+        el_actual = registros[0]
+        data = base_data.copy()
+        data.update({
+            'estado': el_actual.id_estado.estado if el_actual.id_estado else '',
+            'fecha_estado': el_actual.fecha_est if el_actual.fecha_est else el_actual.fecha_el,
+            'puesto': el_actual.id_puesto.tipo_puesto if el_actual.id_puesto else '',
+            'id_puesto': el_actual.id_puesto.id_puesto if el_actual.id_puesto else '',
+            'is_historical': False,
+            'fecha_el': el_actual.fecha_el,
+        })
+        if vista_ampliada:
+            data.update(_datos_ampliados(
+                emp, el_actual, eos.get(emp.pk),
+                el_actual.alta_ant if el_actual.alta_ant else '',
+            ))
+        filas.append(data)
+
+        if solo_estado_actual:
+            continue
+
+        for el_historico in registros[1:]:
+            data_hist = base_data.copy()
+            data_hist.update({
+                'estado': el_historico.id_estado.estado if el_historico.id_estado else '',
+                'fecha_estado': el_historico.fecha_est,
+                'puesto': el_historico.id_puesto.tipo_puesto if el_historico.id_puesto else '',
+                'is_historical': True,
+                'fecha_el': el_historico.fecha_el,
+                'id_estado': el_historico.id_estado_id if el_historico.id_estado else '',
+                'id_puesto': el_historico.id_puesto_id if el_historico.id_puesto else '',
+            })
+            if vista_ampliada:
+                # Para registros históricos, usar la sucursal actual del empleado
+                data_hist.update(_datos_ampliados(
+                    emp, el_historico, eos.get(emp.pk),
+                    el_historico.alta_ant or el_historico.fecha_el,
+                ))
+            filas.append(data_hist)
+    return filas
@@ -0,0 +1,216 @@
+"""Exportación de filas a CSV, JSON Lines o XLSX como StreamingHttpResponse, con memoria constante.
+
+Las filas llegan de un generador (listas de valores: texto, números, fechas o
+None) y se escriben a medida que se consumen, sin armar el archivo completo.
+
+El XLSX se genera sin dependencias: una hoja con textos en línea
+(``inlineStr``), números y fechas con formato, dentro de un zip que se escribe
+sobre un destino no posicionable y se va vaciando en cada bloque de filas.
+"""
+import csv
+import json
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Cantidad de filas que se acumulan antes de entregar un bloque de la respuesta
+FILAS_POR_BLOQUE = 200
+
+_EPOCA_EXCEL = date(1899, 12, 30)
+_CARACTERES_INVALIDOS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _texto(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    return str(valor)
+
+
+class _Eco:
+    """Destino de csv.writer que devuelve la línea escrita en lugar de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
+def filas_csv(encabezados, filas):
+    """Genera el CSV (str) por bloques de filas."""
+    writer = csv.writer(_Eco())
+    bloque = [writer.writerow(encabezados)]
+    for fila in filas:
+        bloque.append(writer.writerow([_texto(v) for v in fila]))
+        if len(bloque) >= FILAS_POR_BLOQUE:
+            yield ''.join(bloque)
+            bloque = []
+    if bloque:
+        yield ''.join(bloque)
+
+
+def filas_jsonl(claves, filas):
+    """Genera un objeto JSON por línea ({clave: valor}) por bloques de filas."""
+    bloque = []
+    for fila in filas:
+        bloque.append(json.dumps(dict(zip(claves, fila)), ensure_ascii=False, default=_texto) + '\n')
+        if len(bloque) >= FILAS_POR_BLOQUE:
+            yield ''.join(bloque)
+            bloque = []
+    if bloque:
+        yield ''.join(bloque)
+
+
+class _Salida:
+    """Destino no posicionable para ZipFile: acumula lo escrito hasta que se lo vacía."""
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        datos = b''.join(self._partes)
+        self._partes = []
+        return datos
+
+
+def _columna(indice):
+    """Letra de la columna (0 -> A, 26 -> AA)."""
+    letras = ''
+    indice += 1
+    while indice:
+        indice, resto = divmod(indice - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def _celda(ref, valor):
+    if valor is None or valor == '':
+        return ''
+    if isinstance(valor, bool):
+        return f'<c r="{ref}" t="b"><v>{int(valor)}</v></c>'
+    if isinstance(valor, (int, float, Decimal)):
+        return f'<c r="{ref}"><v>{valor}</v></c>'
+    if isinstance(valor, datetime):
+        valor = valor.date()
+    if isinstance(valor, date):
+        # Estilo 1 de styles.xml: formato de fecha
+        return f'<c r="{ref}" s="1"><v>{(valor - _EPOCA_EXCEL).days}</v></c>'
+    texto = escape(_CARACTERES_INVALIDOS.sub('', str(valor)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def _fila_xml(numero, columnas, valores):
+    celdas = ''.join(_celda(f'{col}{numero}', v) for col, v in zip(columnas, valores))
+    return f'<row r="{numero}">{celdas}</row>'.encode('utf-8')
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{hoja}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="dd/mm/yyyy"/></numFmts>'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '</styleSheet>'
+)
+_HOJA_INICIO = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_HOJA_FIN = b'</sheetData></worksheet>'
+
+
+def filas_xlsx(encabezados, filas, hoja='Hoja1'):
+    """Genera el XLSX (bytes) por bloques de filas."""
+    salida = _Salida()
+    columnas = [_columna(i) for i in range(len(encabezados))]
+    with zipfile.ZipFile(salida, 'w', compression=zipfile.ZIP_DEFLATED) as libro:
+        libro.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        libro.writestr('_rels/.rels', _RELS)
+        libro.writestr('xl/workbook.xml', _WORKBOOK.format(hoja=escape(hoja[:31], {'"': '&quot;'})))
+        libro.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        libro.writestr('xl/styles.xml', _STYLES)
+        with libro.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as datos:
+            datos.write(_HOJA_INICIO)
+            datos.write(_fila_xml(1, columnas, encabezados))
+            for numero, fila in enumerate(filas, start=2):
+                datos.write(_fila_xml(numero, columnas, fila))
+                if numero % FILAS_POR_BLOQUE == 0:
+                    yield salida.vaciar()
+            datos.write(_HOJA_FIN)
+    yield salida.vaciar()
+
+
+def respuesta(formato, nombre, encabezados, filas, claves=None, hoja='Hoja1'):
+    """StreamingHttpResponse con las filas en ``formato`` ('csv', 'jsonl' o 'xlsx'), como adjunto ``nombre``.<ext>.
+
+    En JSON Lines cada fila es un objeto con ``claves`` (por defecto los encabezados).
+    """
+    if formato == 'xlsx':
+        contenido = filas_xlsx(encabezados, filas, hoja=hoja)
+    elif formato == 'jsonl':
+        contenido = filas_jsonl(claves or encabezados, filas)
+    else:
+        formato = 'csv'
+        contenido = filas_csv(encabezados, filas)
+    response = StreamingHttpResponse(contenido, content_type=FORMATOS[formato])
+    response['Content-Disposition'] = f'attachment; filename="{nombre}.{formato}"'
+    return response
@@ -0,0 +1,152 @@
+"""Filas de la exportación de empleados (exportar_empleados_excel).
+
+Los empleados se leen con ``iterator()`` (cursor del lado del servidor en
+PostgreSQL) junto con sus catálogos y el estado vigente de Empleado_actual
+(estado, puesto, convenio, sucursal y persona jurídica) en la misma consulta.
+Por cada bloque de empleados se agrega, sólo si alguna columna elegida lo
+necesita, una consulta para los planes de trabajo y otra para el saldo de
+vacaciones del periodo: la cantidad de consultas depende de la cantidad de
+bloques y no de la de empleados.
+"""
+from dataclasses import dataclass
+from datetime import date
+from itertools import islice
+from typing import Callable, Optional
+
+from nucleo.logic.dias_habiles import DIAS_PLAN
+from nucleo.models import Plan_trabajo, Saldo_vacaciones
+
+TAMANIO_BLOQUE = 500
+
+_ABREVIATURAS_PLAN = dict(zip(DIAS_PLAN, ('Lu', 'Ma', 'Mi', 'Ju', 'Vi', 'Sa', 'Do')))
+
+
+@dataclass
+class _Fila:
+    emp: object
+    actual: Optional[object]
+    plan: Optional[Plan_trabajo]
+    saldo: Optional[Saldo_vacaciones]
+    hoy: date
+
+
+@dataclass(frozen=True)
+class Columna:
+    titulo: str
+    valor: Callable[[_Fila], object]
+    requiere: Optional[str] = None  # 'plan' o 'saldo': datos que se cargan por bloque
+
+
+def _actual(campo):
+    return lambda f: getattr(f.actual, campo, None) if f.actual else None
+
+
+def _nombre(relacion, campo):
+    def valor(f):
+        obj = getattr(f.actual, relacion, None) if f.actual else None
+        return getattr(obj, campo, None) if obj else None
+    return valor
+
+
+def _anios_antiguedad(f):
+    alta = f.actual.alta_ant if f.actual else None
+    if not alta:
+        return None
+    return f.hoy.year - alta.year - ((f.hoy.month, f.hoy.day) < (alta.month, alta.day))
+
+
+def _dias_plan(f):
+    if not f.plan:
+        return None
+    return ' '.join(abrev for dia, abrev in _ABREVIATURAS_PLAN.items() if getattr(f.plan, dia))
+
+
+def _horario_plan(f):
+    if not f.plan:
+        return None
+    return f'{f.plan.start_time:%H:%M}-{f.plan.end_time:%H:%M}'
+
+
+def _empresa(f):
+    sucursal = f.actual.id_sucursal if f.actual else None
+    return sucursal.id_pers_juridica.pers_juridica if sucursal else None
+
+
+COLUMNAS = {
+    'id': Columna('ID', lambda f: f.emp.pk),
+    'apellido': Columna('Apellido', lambda f: f.emp.apellido),
+    'nombres': Columna('Nombres', lambda f: f.emp.nombres),
+    'dni': Columna('DNI', lambda f: f.emp.dni),
+    'cuil': Columna('CUIL', lambda f: f.emp.cuil),
+    'email': Columna('Email', lambda f: f.emp.idempleado.email),
+    'fecha_nac': Columna('Fecha de nacimiento', lambda f: f.emp.fecha_nac),
+    'telefono': Columna('Teléfono', lambda f: f.emp.telefono),
+    'domicilio': Columna('Domicilio', lambda f: f.emp.dr_personal),
+    'localidad': Columna('Localidad', lambda f: f.emp.id_localidad.localidad),
+    'provincia': Columna('Provincia', lambda f: f.emp.id_localidad.provincia.provincia),
+    'nacionalidad': Columna('Nacionalidad', lambda f: f.emp.id_nacionalidad.nacionalidad),
+    'estado_civil': Columna('Estado civil', lambda f: f.emp.id_civil.estado_civil),
+    'sexo': Columna('Sexo', lambda f: f.emp.id_sexo.sexo),
+    'num_hijos': Columna('Hijos', lambda f: f.emp.num_hijos),
+    'estado': Columna('Estado', _nombre('id_estado', 'estado')),
+    'fecha_estado': Columna('Fecha de estado', lambda f: f.actual and (f.actual.fecha_est or f.actual.fecha_el)),
+    'puesto': Columna('Puesto', _nombre('id_puesto', 'tipo_puesto')),
+    'convenio': Columna('Convenio', _nombre('id_convenio', 'tipo_convenio')),
+    'sucursal': Columna('Sucursal', _nombre('id_sucursal', 'sucursal')),
+    'empresa': Columna('Persona jurídica', _empresa),
+    'alta_antiguedad': Columna('Fecha de antigüedad', _actual('alta_ant')),
+    'antiguedad': Columna('Antigüedad (años)', _anios_antiguedad),
+    'plan_dias': Columna('Días de trabajo', _dias_plan, requiere='plan'),
+    'plan_horario': Columna('Horario', _horario_plan, requiere='plan'),
+    'vacaciones_otorgadas': Columna('Vacaciones otorgadas', lambda f: f.saldo.dias_otorgados if f.saldo else 0, 'saldo'),
+    'vacaciones_consumidas': Columna('Vacaciones consumidas', lambda f: f.saldo.dias_consumidos if f.saldo else 0, 'saldo'),
+    'vacaciones_disponibles': Columna('Vacaciones disponibles', lambda f: f.saldo.dias_disponibles if f.saldo else 0, 'saldo'),
+}
+
+
+def columnas_elegidas(claves):
+    """Valida las claves pedidas (en su orden, sin repetir); sin claves, todas las columnas.
+
+    Lanza ValueError con las claves desconocidas.
+    """
+    claves = [c.strip() for c in claves if c and c.strip()]
+    if not claves:
+        return list(COLUMNAS)
+    desconocidas = [c for c in claves if c not in COLUMNAS]
+    if desconocidas:
+        raise ValueError(f"Columnas desconocidas: {', '.join(desconocidas)}")
+    return list(dict.fromkeys(claves))
+
+
+def encabezados(columnas):
+    return [COLUMNAS[c].titulo for c in columnas]
+
+
+def filas(empleados_qs, columnas, periodo=None, tamanio=TAMANIO_BLOQUE):
+    """Genera una lista de valores por empleado de ``empleados_qs``, en el orden de ``columnas``."""
+    hoy = date.today()
+    periodo = periodo or hoy.year
+    requeridos = {COLUMNAS[c].requiere for c in columnas}
+    valores = [COLUMNAS[c].valor for c in columnas]
+    qs = empleados_qs.select_related(
+        'idempleado', 'id_nacionalidad', 'id_civil', 'id_sexo', 'id_localidad__provincia',
+        'empleado_actual__id_estado', 'empleado_actual__id_puesto', 'empleado_actual__id_convenio',
+        'empleado_actual__id_sucursal__id_pers_juridica',
+    ).order_by('apellido', 'nombres', 'pk')
+    iterador = qs.iterator(chunk_size=tamanio)
+    while True:
+        bloque = list(islice(iterador, tamanio))
+        if not bloque:
+            return
+        pks = [emp.pk for emp in bloque]
+        planes = {}
+        if 'plan' in requeridos:
+            # Ante varios planes gana el de menor pk, como en dias_habiles.mascaras_de
+            for plan in Plan_trabajo.objects.filter(idempleado__in=pks).order_by('pk'):
+                planes.setdefault(plan.idempleado_id, plan)
+        saldos = {}
+        if 'saldo' in requeridos:
+            saldos = {s.idempleado_id: s for s in Saldo_vacaciones.objects.filter(idempleado__in=pks, periodo=periodo)}
+        for emp in bloque:
+            fila = _Fila(emp, getattr(emp, 'empleado_actual', None), planes.get(emp.pk), saldos.get(emp.pk), hoy)
+            yield [valor(fila) for valor in valores]
@@ -0,0 +1,179 @@
+"""Generación anual de vacaciones para toda la plantilla.
+
+Todo lo que necesita el cálculo (estado laboral vigente, solicitudes del año,
+saldos de años anteriores, licencias consumidas y otorgamientos existentes) se
+precarga en una consulta por tabla; los días se calculan en memoria y los
+otorgamientos anuales se escriben con ``bulk_create(update_conflicts=True)``
+sobre la restricción única (idempleado, periodo_anual), en transacciones por
+lote. Como ``bulk_create`` no dispara signals, los movimientos del libro de
+vacaciones se registran explícitamente con ``registrar_movimientos``.
+"""
+from dataclasses import dataclass, field
+from datetime import date
+from typing import List, Optional
+
+from django.db import transaction
+
+from nucleo.logic.dias_vacaciones import calcular_dias_vacaciones_lote, obtener_fecha_corte_generacion
+from nucleo.logic.empleado_actual import obtener_empleado_actual
+from nucleo.logic.saldo_vacaciones import acumulados_previos, registrar_movimientos, saldos_del_periodo
+from nucleo.models import (
+    Empleado, Empleado_actual, Movimiento_vacaciones, Solicitud_licencia, Solicitud_vacaciones, Vacaciones_otorgadas,
+)
+
+TAMANIO_LOTE = 500
+
+
+@dataclass
+class FilaVacaciones:
+    empleado: Empleado
+    alta_ant: date
+    dias_otorgados: int
+    dias_consumidos: int
+    vacaciones_solicitadas: int
+    dias_acumulados: int
+    dias_licencia: int
+    # (fecha_desde, fecha_hasta) de la solicitud del año más reciente
+    ultima_solicitud: Optional[tuple] = None
+
+    @property
+    def dias_disponibles(self):
+        return max((self.dias_otorgados or 0) - (self.dias_consumidos or 0), 0)
+
+
+@dataclass
+class ResultadoGeneracion:
+    year: int
+    filas: List[FilaVacaciones] = field(default_factory=list)
+    creados: int = 0
+    actualizados: int = 0
+    dry_run: bool = False
+
+
+def empleados_a_generar():
+    # El usuario 1 es el administrador del sistema, no un empleado real
+    return Empleado.objects.exclude(idempleado=1)
+
+
+def _agrupar(filas):
+    agrupadas = {}
+    for idempleado_id, *resto in filas:
+        agrupadas.setdefault(idempleado_id, []).append(tuple(resto))
+    return agrupadas
+
+
+def calcular_filas(year, empleados=None, desde_saldo=False):
+    """Calcula la generación de ``year`` para ``empleados`` (por defecto, toda la plantilla).
+
+    Con ``desde_saldo`` los días otorgados y consumidos se toman del saldo ya
+    registrado cuando existe (vista de una generación ya hecha); si no, se
+    calculan por antigüedad y se conservan los consumos del otorgamiento anual.
+    """
+    empleados = list(empleados_a_generar() if empleados is None else empleados)
+    ids = [e.pk for e in empleados]
+    fecha_corte = obtener_fecha_corte_generacion(year)
+
+    actuales = {a.pk: a for a in Empleado_actual.objects.filter(pk__in=ids)}
+    solicitudes = _agrupar(
+        Solicitud_vacaciones.objects.filter(idempleado_id__in=ids, fecha_desde__year=year)
+        .order_by('-fecha_desde')
+        .values_list('idempleado_id', 'fecha_desde', 'fecha_hasta')
+    )
+    licencias = _agrupar(
+        Solicitud_licencia.objects.filter(idempleado_id__in=ids, id_estado__estado__iexact="Consumida")
+        .values_list('idempleado_id', 'fecha_desde', 'fecha_hasta')
+    )
+    previos = acumulados_previos(year)
+    saldos = saldos_del_periodo(year) if desde_saldo else {}
+    consumidos_anual = dict(
+        Vacaciones_otorgadas.objects.filter(idempleado_id__in=ids, periodo_anual=year)
+        .values_list('idempleado_id', 'dias_consumidos')
+    )
+
+    con_alta = []
+    for emp in empleados:
+        actual = actuales.get(emp.pk)
+        if actual is None:
+            # Empleado_actual todavía no reconstruida para este empleado: se genera en el momento
+            actual = obtener_empleado_actual(emp)
+        if actual is None or actual.id_empleado_el is None:
+            continue
+        con_alta.append((emp, actual.alta_ant or actual.fecha_est or actual.fecha_el))
+    calculados = calcular_dias_vacaciones_lote([alta for _, alta in con_alta], fecha_corte)
+
+    filas = []
+    for (emp, alta_ant), dias_calculados in zip(con_alta, calculados):
+        saldo = saldos.get(emp.pk)
+        if saldo is not None:
+            dias_otorgados, dias_consumidos = saldo.dias_otorgados, saldo.dias_consumidos
+        else:
+            dias_otorgados = dias_calculados
+            dias_consumidos = consumidos_anual.get(emp.pk, 0)
+
+        propias = solicitudes.get(emp.pk, [])
+        otorgados_previos, consumidos_previos = previos.get(emp.pk, (0, 0))
+        filas.append(FilaVacaciones(
+            empleado=emp,
+            alta_ant=alta_ant,
+            dias_otorgados=dias_otorgados,
+            dias_consumidos=dias_consumidos,
+            vacaciones_solicitadas=sum((hasta - desde).days + 1 for desde, hasta in propias),
+            dias_acumulados=max(otorgados_previos - consumidos_previos, 0),
+            dias_licencia=sum((hasta - desde).days + 1 for desde, hasta in licencias.get(emp.pk, [])),
+            ultima_solicitud=propias[0] if propias else None,
+        ))
+    return filas
+
+
+def _guardar_lote(year, lote):
+    ids = [f.empleado.pk for f in lote]
+    previos = {
+        v.idempleado_id: v
+        for v in Vacaciones_otorgadas.objects.select_for_update().filter(idempleado_id__in=ids, periodo_anual=year)
+    }
+    objs = [
+        Vacaciones_otorgadas(
+            idempleado_id=f.empleado.pk,
+            periodo_anual=year,
+            inicio_consumo=date(year, 1, 1),
+            fin_consumo=date(year, 12, 31),
+            dias_disponibles=f.dias_otorgados,
+            dias_consumidos=0,  # Sólo para registros nuevos: en conflicto se actualizan los otorgados
+        )
+        for f in lote
+    ]
+    Vacaciones_otorgadas.objects.bulk_create(
+        objs, update_conflicts=True, unique_fields=['idempleado', 'periodo_anual'], update_fields=['dias_disponibles'],
+    )
+    movimientos = []
+    for f, obj in zip(lote, objs):
+        previo = previos.get(f.empleado.pk)
+        if previo is not None:
+            f.dias_consumidos = previo.dias_consumidos
+        movimientos.append(Movimiento_vacaciones(
+            idempleado_id=f.empleado.pk,
+            periodo=year,
+            tipo=Movimiento_vacaciones.OTORGAMIENTO,
+            dias_otorgados=f.dias_otorgados - (previo.dias_disponibles if previo else 0),
+            id_vacaciones=previo.pk if previo else obj.pk,
+        ))
+    registrar_movimientos(movimientos)
+    return len(lote) - len(previos), len(previos)
+
+
+def generar_vacaciones_anuales(year, empleados=None, dry_run=False, tamanio_lote=TAMANIO_LOTE):
+    """Calcula y (salvo ``dry_run``) guarda el otorgamiento anual de ``year``.
+
+    Los días consumidos de otorgamientos existentes se conservan; sólo se
+    reemplazan los días otorgados.
+    """
+    resultado = ResultadoGeneracion(year=year, dry_run=dry_run)
+    resultado.filas = calcular_filas(year, empleados)
+    if dry_run:
+        return resultado
+    for inicio in range(0, len(resultado.filas), tamanio_lote):
+        with transaction.atomic():
+            creados, actualizados = _guardar_lote(year, resultado.filas[inicio:inicio + tamanio_lote])
+        resultado.creados += creados
+        resultado.actualizados += actualizados
+    return resultado
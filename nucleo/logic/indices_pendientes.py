@@ -0,0 +1,36 @@
+"""Índices parciales de PostgreSQL sobre las solicitudes "En espera".
+
+El predicado usa el id del estado "En espera", que es un dato de
+Estado_lic_vac y no existe en una base recién migrada: la migración 0008 sólo
+los crea si el estado ya estaba cargado. Se completan después de cada
+``migrate`` (``nucleo.signals``) y con ``manage.py crear_indices_pendientes``.
+"""
+from django.db import connections
+
+from nucleo.models import Estado_lic_vac, Solicitud_licencia, Solicitud_vacaciones
+
+INDICES = (
+    (Solicitud_licencia, 'sol_lic_pendientes_idx'),
+    (Solicitud_vacaciones, 'sol_vac_pendientes_idx'),
+)
+
+
+def crear_indices_pendientes(using='default'):
+    """Crea los índices que falten. None si la base no es PostgreSQL, False si falta el estado "En espera"."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    en_espera = (
+        Estado_lic_vac.objects.using(using).filter(estado__iexact='En espera')
+        .values_list('id_estado', flat=True).first()
+    )
+    if en_espera is None:
+        return False
+    with connection.cursor() as cursor:
+        for modelo, nombre in INDICES:
+            tabla = connection.ops.quote_name(modelo._meta.db_table)
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} (idempleado, fecha_desde) WHERE id_estado = %s",
+                [en_espera],
+            )
+    return True
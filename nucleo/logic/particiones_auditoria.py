@@ -0,0 +1,262 @@
+"""Particiones mensuales y archivo en disco de Log_auditoria.
+
+En PostgreSQL la tabla del log está particionada por rango mensual de
+``fecha_cambio`` (migración 0012): ``<tabla>_pAAAA_MM`` por mes más una
+partición ``<tabla>_pdefault`` para filas de meses sin partición. Las consultas
+con rango sobre ``fecha_cambio`` (o que ordenan por fecha con LIMIT) sólo leen
+las particiones recientes.
+
+Los meses fuera de la ventana de retención se exportan a
+``log_auditoria_AAAA-MM.jsonl.gz`` (una entrada JSON por línea) y luego se
+borran: en PostgreSQL se desengancha y elimina la partición completa. Un mes
+archivado puede restaurarse y los archivos pueden buscarse sin base de datos
+(``buscar_en_archivos``, o ``zgrep`` directamente).
+
+En otros motores no hay particiones; archivar y restaurar funcionan igual con
+DELETE/INSERT por rango.
+"""
+import gzip
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from django.db import connection, transaction
+
+from nucleo.models import Log_auditoria
+
+CAMPOS = ('id', 'idusuario', 'fecha_cambio', 'nombre_tabla', 'idregistro', 'accion', 'cambio', 'idempleado')
+TAMANIO_LOTE = 2000
+
+
+@dataclass(frozen=True, order=True)
+class Mes:
+    anio: int
+    mes: int
+
+    @classmethod
+    def de_texto(cls, texto):
+        """'AAAA-MM' -> Mes (ValueError si no tiene ese formato)."""
+        anio, mes = texto.split('-')
+        resultado = cls(int(anio), int(mes))
+        if not 1 <= resultado.mes <= 12:
+            raise ValueError(f'Mes inválido: {texto}')
+        return resultado
+
+    @classmethod
+    def de_fecha(cls, fecha):
+        return cls(fecha.year, fecha.month)
+
+    def __str__(self):
+        return f'{self.anio:04d}-{self.mes:02d}'
+
+    def mas(self, meses):
+        total = self.anio * 12 + self.mes - 1 + meses
+        return Mes(total // 12, total % 12 + 1)
+
+    @property
+    def inicio(self):
+        return datetime(self.anio, self.mes, 1, tzinfo=timezone.utc)
+
+    @property
+    def fin(self):
+        return self.mas(1).inicio
+
+
+def _tabla():
+    return Log_auditoria._meta.db_table
+
+
+def nombre_particion(mes):
+    return f'{_tabla()}_p{mes.anio:04d}_{mes.mes:02d}'
+
+
+def particionada():
+    """True si la tabla del log es una tabla particionada de PostgreSQL."""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [_tabla()])
+        fila = cursor.fetchone()
+    return bool(fila) and fila[0] == 'p'
+
+
+def particiones():
+    """{Mes: nombre} de las particiones mensuales existentes (vacío si la tabla no está particionada)."""
+    if not particionada():
+        return {}
+    prefijo = f'{_tabla()}_p'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s)",
+            [_tabla()],
+        )
+        nombres = [fila[0] for fila in cursor.fetchall()]
+    resultado = {}
+    for nombre in nombres:
+        sufijo = nombre[len(prefijo):]
+        if nombre.startswith(prefijo) and sufijo != 'default':
+            anio, mes = sufijo.split('_')
+            resultado[Mes(int(anio), int(mes))] = nombre
+    return resultado
+
+
+def crear_particion(mes, cursor):
+    """Crea la partición de ``mes`` moviendo antes las filas que hubieran caído en la partición default."""
+    tabla = connection.ops.quote_name(_tabla())
+    nombre = connection.ops.quote_name(nombre_particion(mes))
+    default = connection.ops.quote_name(f'{_tabla()}_pdefault')
+    rango = [mes.inicio, mes.fin]
+    cursor.execute(
+        f"CREATE TEMP TABLE log_auditoria_mover AS "
+        f"SELECT * FROM {default} WHERE fecha_cambio >= %s AND fecha_cambio < %s",
+        rango,
+    )
+    cursor.execute(f"DELETE FROM {default} WHERE fecha_cambio >= %s AND fecha_cambio < %s", rango)
+    cursor.execute(f"CREATE TABLE {nombre} PARTITION OF {tabla} FOR VALUES FROM (%s) TO (%s)", rango)
+    cursor.execute(f"INSERT INTO {tabla} SELECT * FROM log_auditoria_mover")
+    cursor.execute("DROP TABLE log_auditoria_mover")
+    # Verifica ya las FK diferidas: con eventos pendientes no se puede crear otra partición en la transacción
+    connection.check_constraints()
+
+
+def asegurar_particiones(desde, hasta):
+    """Crea las particiones que falten entre los meses ``desde`` y ``hasta`` (inclusive). Devuelve las creadas."""
+    if not particionada():
+        return []
+    existentes = particiones()
+    creadas = []
+    mes = desde
+    with transaction.atomic(), connection.cursor() as cursor:
+        while mes <= hasta:
+            if mes not in existentes:
+                crear_particion(mes, cursor)
+                creadas.append(mes)
+            mes = mes.mas(1)
+    return creadas
+
+
+def meses_anteriores_a(corte):
+    """Meses (con filas o con partición) anteriores al mes ``corte``, en orden."""
+    fechas = Log_auditoria.objects.filter(fecha_cambio__lt=corte.inicio).dates('fecha_cambio', 'month')
+    meses = {Mes.de_fecha(f) for f in fechas}
+    meses.update(m for m in particiones() if m.inicio < corte.inicio)
+    return sorted(meses)
+
+
+def ruta_archivo(directorio, mes):
+    return os.path.join(directorio, f'log_auditoria_{mes}.jsonl.gz')
+
+
+def _fila_a_json(fila):
+    fila = dict(fila)
+    fila['fecha_cambio'] = fila['fecha_cambio'].isoformat()
+    return json.dumps(fila, ensure_ascii=False, default=str)
+
+
+def archivar_mes(mes, directorio):
+    """Exporta las filas de ``mes`` a su archivo JSONL comprimido y las borra de la base.
+
+    El archivo se escribe primero con otro nombre y se renombra al terminar, así
+    nunca se borra un mes sin su archivo completo. Devuelve la cantidad de filas.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    ruta = ruta_archivo(directorio, mes)
+    if os.path.exists(ruta):
+        raise FileExistsError(f'Ya existe el archivo de {mes}: {ruta}')
+    filas = Log_auditoria.objects.filter(fecha_cambio__gte=mes.inicio, fecha_cambio__lt=mes.fin).order_by('fecha_cambio', 'id')
+    temporal = ruta + '.tmp'
+    with transaction.atomic():
+        cantidad = 0
+        with gzip.open(temporal, 'wt', encoding='utf-8') as archivo:
+            for fila in filas.values(*CAMPOS).iterator(chunk_size=TAMANIO_LOTE):
+                archivo.write(_fila_a_json(fila) + '\n')
+                cantidad += 1
+        os.replace(temporal, ruta)
+        particion = particiones().get(mes)
+        tabla = connection.ops.quote_name(_tabla())
+        with connection.cursor() as cursor:
+            if particion is not None:
+                cursor.execute(f"ALTER TABLE {tabla} DETACH PARTITION {connection.ops.quote_name(particion)}")
+                cursor.execute(f"DROP TABLE {connection.ops.quote_name(particion)}")
+            # Sin partición (o filas del mes en la partición default): borrado por rango.
+            # SQL directo para no cargar cada fila como haría QuerySet.delete() con signals conectados.
+            cursor.execute(f"DELETE FROM {tabla} WHERE fecha_cambio >= %s AND fecha_cambio < %s", [mes.inicio, mes.fin])
+    return cantidad
+
+
+def leer_archivo(ruta):
+    """Itera las entradas (dict) de un archivo del log."""
+    with gzip.open(ruta, 'rt', encoding='utf-8') as archivo:
+        for linea in archivo:
+            if linea.strip():
+                yield json.loads(linea)
+
+
+def restaurar_mes(mes, directorio):
+    """Vuelve a cargar en la base las filas archivadas de ``mes`` (omite ids que ya estén). Devuelve las insertadas."""
+    ruta = ruta_archivo(directorio, mes)
+    if not os.path.exists(ruta):
+        raise FileNotFoundError(f'No hay archivo de {mes}: {ruta}')
+    asegurar_particiones(mes, mes)
+    insertadas = 0
+    with transaction.atomic():
+        lote = []
+        for entrada in leer_archivo(ruta):
+            entrada['fecha_cambio'] = datetime.fromisoformat(entrada['fecha_cambio'])
+            lote.append(entrada)
+            if len(lote) >= TAMANIO_LOTE:
+                insertadas += _insertar(lote)
+                lote = []
+        insertadas += _insertar(lote)
+    return insertadas
+
+
+def _insertar(lote):
+    # INSERT directo: bulk_create pisaría fecha_cambio (auto_now_add) con la fecha actual
+    if not lote:
+        return 0
+    existentes = set(Log_auditoria.objects.filter(id__in=[e['id'] for e in lote]).values_list('id', flat=True))
+    nuevas = [e for e in lote if e['id'] not in existentes]
+    if not nuevas:
+        return 0
+    campos = [Log_auditoria._meta.get_field(c) for c in CAMPOS]
+    columnas = ', '.join(connection.ops.quote_name(f.column) for f in campos)
+    marcadores = ', '.join(['%s'] * len(campos))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {connection.ops.quote_name(_tabla())} ({columnas}) VALUES ({marcadores})",
+            [[f.get_db_prep_save(e[c], connection) for f, c in zip(campos, CAMPOS)] for e in nuevas],
+        )
+    return len(nuevas)
+
+
+def buscar_en_archivos(directorio, texto=None, idempleado=None, tabla=None, desde=None, hasta=None):
+    """Entradas archivadas que cumplen los filtros, leyendo sólo los archivos de los meses pedidos.
+
+    ``texto`` se busca (sin distinguir mayúsculas) en la línea JSON completa.
+    """
+    texto = texto.lower() if texto else None
+    tabla = tabla.lower() if tabla else None
+    if not os.path.isdir(directorio):
+        return
+    for nombre in sorted(os.listdir(directorio)):
+        if not (nombre.startswith('log_auditoria_') and nombre.endswith('.jsonl.gz')):
+            continue
+        try:
+            mes = Mes.de_texto(nombre[len('log_auditoria_'):-len('.jsonl.gz')])
+        except ValueError:
+            continue
+        if (desde and mes.inicio < desde.inicio) or (hasta and mes.inicio > hasta.inicio):
+            continue
+        with gzip.open(os.path.join(directorio, nombre), 'rt', encoding='utf-8') as archivo:
+            for linea in archivo:
+                if texto and texto not in linea.lower():
+                    continue
+                entrada = json.loads(linea)
+                if idempleado is not None and entrada.get('idempleado') != idempleado:
+                    continue
+                if tabla and (entrada.get('nombre_tabla') or '').lower() != tabla:
+                    continue
+                yield entrada
@@ -0,0 +1,145 @@
+"""Generador mínimo de PDF en Python puro (sin dependencias).
+
+Alcanza para documentos de texto de una página como los certificados:
+Helvetica y Helvetica-Bold (fuentes estándar, no se incrustan) con
+WinAnsiEncoding, párrafos con tramos en negrita ajustados al ancho y líneas.
+La salida es determinística: el mismo contenido produce los mismos bytes.
+"""
+import re
+import unicodedata
+import zlib
+
+A4 = (595, 842)
+
+# Anchos de glifo (1/1000 del tamaño) de los caracteres 32..126, de las métricas AFM de Adobe
+_ANCHOS = {
+    False: (
+        278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+        1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+        333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+        556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+    ),
+    True: (
+        278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+        975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+        333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+        611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+    ),
+}
+_FUENTES = {False: 'F1', True: 'F2'}
+
+
+def _ancho_caracter(c, negrita):
+    codigo = ord(c)
+    if not 32 <= codigo <= 126:
+        # Letras acentuadas: el ancho de la letra base
+        base = unicodedata.normalize('NFKD', c)[:1]
+        codigo = ord(base) if base and 32 <= ord(base) <= 126 else ord('n')
+    return _ANCHOS[negrita][codigo - 32]
+
+
+def ancho_texto(texto, tamanio, negrita=False):
+    return sum(_ancho_caracter(c, negrita) for c in texto) * tamanio / 1000
+
+
+def _literal(texto):
+    datos = texto.encode('cp1252', errors='replace')
+    return b'(' + datos.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+def _numero(valor):
+    return f'{valor:.2f}'.rstrip('0').rstrip('.')
+
+
+class DocumentoPDF:
+    """Una página A4 en la que se escribe de arriba hacia abajo (``y`` desde el borde inferior)."""
+
+    def __init__(self, titulo='', tamanio=A4):
+        self.titulo = titulo
+        self.ancho, self.alto = tamanio
+        self._contenido = []
+
+    def texto(self, x, y, texto, tamanio=12, negrita=False):
+        self._contenido.append(
+            b'BT /' + _FUENTES[negrita].encode() + f' {_numero(tamanio)} Tf {_numero(x)} {_numero(y)} Td '.encode()
+            + _literal(texto) + b' Tj ET'
+        )
+
+    def texto_centrado(self, y, texto, tamanio=12, negrita=False):
+        self.texto((self.ancho - ancho_texto(texto, tamanio, negrita)) / 2, y, texto, tamanio, negrita)
+
+    def linea(self, x1, y1, x2, y2, grosor=0.8):
+        self._contenido.append(f'{_numero(grosor)} w {_numero(x1)} {_numero(y1)} m {_numero(x2)} {_numero(y2)} l S'.encode())
+
+    def parrafo(self, x, y, ancho, tramos, tamanio=12, interlineado=1.5):
+        """Escribe ``tramos`` [(texto, negrita), ...] ajustados a ``ancho``; devuelve la ``y`` siguiente.
+
+        Sólo se corta renglón en los espacios: un tramo pegado al anterior
+        (p. ej. el punto después de un texto en negrita) queda en el mismo renglón.
+        """
+        # Palabras: listas de partes (texto, negrita) sin espacios entre sí
+        palabras = []
+        espacio_pendiente = True
+        for texto, negrita in tramos:
+            for parte in re.split(r'( +)', texto):
+                if not parte:
+                    continue
+                if parte[0] == ' ':
+                    espacio_pendiente = True
+                elif espacio_pendiente or not palabras:
+                    palabras.append([(parte, negrita)])
+                    espacio_pendiente = False
+                else:
+                    palabras[-1].append((parte, negrita))
+        espacio = ancho_texto(' ', tamanio)
+        renglones, renglon, ocupado = [], [], 0.0
+        for palabra in palabras:
+            medida = sum(ancho_texto(t, tamanio, n) for t, n in palabra)
+            if renglon and ocupado + espacio + medida > ancho:
+                renglones.append(renglon)
+                renglon, ocupado = [], 0.0
+            ocupado += medida + (espacio if renglon else 0)
+            renglon.append(palabra)
+        if renglon:
+            renglones.append(renglon)
+        for renglon in renglones:
+            cursor = x
+            for palabra in renglon:
+                for texto, negrita in palabra:
+                    self.texto(cursor, y, texto, tamanio, negrita)
+                    cursor += ancho_texto(texto, tamanio, negrita)
+                cursor += espacio
+            y -= tamanio * interlineado
+        return y
+
+    def bytes(self):
+        contenido = zlib.compress(b'\n'.join(self._contenido), 9)
+        fuentes = ''.join(
+            f'/{clave} << /Type /Font /Subtype /Type1 /BaseFont /{nombre} /Encoding /WinAnsiEncoding >> '
+            for clave, nombre in (('F1', 'Helvetica'), ('F2', 'Helvetica-Bold'))
+        )
+        objetos = [
+            b'<< /Type /Catalog /Pages 2 0 R >>',
+            b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+            (
+                f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.ancho} {self.alto}] '
+                f'/Resources << /Font << {fuentes}>> >> /Contents 4 0 R >>'
+            ).encode(),
+            f'<< /Length {len(contenido)} /Filter /FlateDecode >>\nstream\n'.encode() + contenido + b'\nendstream',
+            b'<< /Title ' + _literal(self.titulo) + b' /Producer (GRHP) >>',
+        ]
+        salida = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        posiciones = []
+        for numero, objeto in enumerate(objetos, start=1):
+            posiciones.append(len(salida))
+            salida += f'{numero} 0 obj\n'.encode() + objeto + b'\nendobj\n'
+        inicio_xref = len(salida)
+        salida += f'xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n'.encode()
+        for posicion in posiciones:
+            salida += f'{posicion:010d} 00000 n \n'.encode()
+        salida += f'trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R /Info 5 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n'.encode()
+        return bytes(salida)
@@ -0,0 +1,122 @@
+"""Resolución en bloque de los registros que nombra una página del log de auditoría.
+
+``render_cambio`` y la vista ``ver_log_auditoria`` muestran, para cada
+entrada, el empleado afectado (directamente o a través de su registro
+EL/EO/plan de trabajo). ``ReferenciasAuditoria.de_logs`` recorre los ``cambio``
+de la página, junta los ids por modelo y los carga con un ``in_bulk`` por
+modelo, así la cantidad de queries no depende de las filas de la página. Los
+catálogos (sucursal, estado, puesto, convenio) ya salen de
+``nucleo.logic.catalogos``.
+
+Un id que no se pidió al precargar se busca en el momento, de modo que el
+renderizador funciona igual sin precarga.
+
+``idempleado_de`` calcula el valor de la columna desnormalizada
+``Log_auditoria.idempleado``.
+"""
+import json
+
+from nucleo.models import Empleado, Empleado_el, Empleado_eo, Plan_trabajo
+
+# nombre_tabla (en minúsculas) -> modelo al que apunta idregistro
+MODELOS_POR_TABLA = {
+    'empleado': Empleado,
+    'empleado_el': Empleado_el,
+    'empleado_eo': Empleado_eo,
+    'plan_trabajo': Plan_trabajo,
+}
+# Claves del payload que pueden traer el id del empleado
+CLAVES_EMPLEADO = ('idempleado', 'id', 'idregistro', 'idempleado_id')
+
+
+def _id(valor):
+    if isinstance(valor, (list, tuple)):
+        valor = valor[0] if valor else None
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _payload(log):
+    cambio = getattr(log, 'cambio', None)
+    if isinstance(cambio, str):
+        try:
+            return json.loads(cambio)
+        except ValueError:
+            return None
+    return cambio
+
+
+def _queryset(modelo):
+    if modelo is Empleado:
+        return Empleado.objects.all()
+    return modelo.objects.select_related('idempleado')
+
+
+class ReferenciasAuditoria:
+    def __init__(self, mapas=None):
+        # modelo -> {pk: instancia}; un pk pedido y no encontrado queda con None
+        self._mapas = mapas or {}
+
+    @classmethod
+    def de_logs(cls, logs):
+        pedidos = {modelo: set() for modelo in MODELOS_POR_TABLA.values()}
+        for log in logs:
+            modelo = MODELOS_POR_TABLA.get((getattr(log, 'nombre_tabla', '') or '').lower())
+            idregistro = _id(getattr(log, 'idregistro', None))
+            if idregistro is not None:
+                pedidos[Empleado].add(idregistro)
+                if modelo is not None:
+                    pedidos[modelo].add(idregistro)
+            payload = _payload(log)
+            if isinstance(payload, dict):
+                for clave in CLAVES_EMPLEADO:
+                    pk = _id(payload.get(clave))
+                    if pk is not None:
+                        pedidos[Empleado].add(pk)
+        mapas = {}
+        for modelo, ids in pedidos.items():
+            if ids:
+                encontrados = _queryset(modelo).in_bulk(ids)
+                mapas[modelo] = {pk: encontrados.get(pk) for pk in ids}
+        return cls(mapas)
+
+    def obtener(self, modelo, pk):
+        """Instancia de ``modelo`` con ese ``pk`` (o None), precargada si se pidió en ``de_logs``."""
+        pk = _id(pk)
+        if pk is None:
+            return None
+        mapa = self._mapas.setdefault(modelo, {})
+        if pk not in mapa:
+            mapa[pk] = _queryset(modelo).filter(pk=pk).first()
+        return mapa[pk]
+
+    def empleado_de(self, log):
+        """Empleado afectado por la entrada ``log`` (según la tabla e idregistro), o None."""
+        modelo = MODELOS_POR_TABLA.get((getattr(log, 'nombre_tabla', '') or '').lower())
+        if modelo is None:
+            return None
+        registro = self.obtener(modelo, getattr(log, 'idregistro', None))
+        if registro is None or modelo is Empleado:
+            return registro
+        return registro.idempleado
+
+    def idempleado_de(self, log):
+        """Id del empleado afectado por ``log`` para guardar en ``Log_auditoria.idempleado``, o None.
+
+        Empleado y auth_user usan el idregistro (el usuario y su empleado comparten id);
+        EL/EO/plan de trabajo, el empleado del registro o, si ya se borró, el del payload.
+        """
+        tabla = (getattr(log, 'nombre_tabla', '') or '').lower()
+        if tabla in ('empleado', 'auth_user'):
+            return _id(getattr(log, 'idregistro', None))
+        modelo = MODELOS_POR_TABLA.get(tabla)
+        if modelo is not None:
+            registro = self.obtener(modelo, getattr(log, 'idregistro', None))
+            if registro is not None:
+                return registro.idempleado_id
+        payload = _payload(log)
+        if isinstance(payload, dict):
+            return _id(payload.get('idempleado'))
+        return None
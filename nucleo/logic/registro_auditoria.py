@@ -0,0 +1,201 @@
+"""Escritura en lote de Log_auditoria.
+
+Las vistas registran entradas con ``registro_de(request).registrar(...)``; cada
+entrada queda en memoria hasta que se confirma la transacción en la que se
+registró (``transaction.on_commit``: si hay rollback, la entrada se descarta).
+Dentro de ``lote()`` (o de una vista decorada con ``@auditoria_en_lote``) las
+entradas confirmadas se acumulan y se escriben todas juntas al salir, con un
+solo ``bulk_create``; fuera de un lote se escriben al confirmarse.
+
+Al escribir se descartan, con una única consulta, las entradas cuyo ``cambio``
+es idéntico al de la última entrada de la misma (tabla, registro, acción), y se
+completa ``idempleado`` en bloque (``bulk_create`` no dispara signals).
+
+Con ``AUDITORIA_ASINCRONA = True`` en settings los lotes se encolan y los
+escribe un hilo en segundo plano, así el request no espera al INSERT. Las
+entradas encoladas que no se escribieron se pierden si el proceso termina de
+golpe; al salir normalmente se vacía la cola.
+"""
+import atexit
+import json
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from functools import partial, reduce, wraps
+from operator import or_
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Max, Q
+
+from nucleo.logic.referencias_auditoria import ReferenciasAuditoria
+from nucleo.models import Log_auditoria
+
+logger = logging.getLogger(__name__)
+
+
+def _huella(cambio):
+    return json.dumps(cambio, default=str, sort_keys=True)
+
+
+def _clave(entrada):
+    return (entrada.nombre_tabla, entrada.idregistro, entrada.accion)
+
+
+def _sin_repetidas(entradas):
+    """Quita las entradas iguales a la última registrada (en la base o antes en el mismo lote)."""
+    claves = {_clave(e) for e in entradas if e.deduplicar}
+    ultimas = {}
+    if claves:
+        filtro = reduce(or_, (Q(nombre_tabla=t, idregistro=r, accion=a) for t, r, a in claves))
+        ultimos_ids = (
+            Log_auditoria.objects.filter(filtro).values('nombre_tabla', 'idregistro', 'accion')
+            .annotate(ultimo=Max('id')).values('ultimo')
+        )
+        ultimas = {_clave(l): _huella(l.cambio) for l in Log_auditoria.objects.filter(id__in=ultimos_ids)}
+    resultado = []
+    for e in entradas:
+        huella = _huella(e.cambio)
+        if e.deduplicar and ultimas.get(_clave(e)) == huella:
+            continue
+        ultimas[_clave(e)] = huella
+        resultado.append(e)
+    return resultado
+
+
+def guardar(entradas):
+    """Escribe ``entradas`` (Log_auditoria sin guardar) con un bulk_create. Devuelve las escritas."""
+    sin_usuario = [e for e in entradas if e.idusuario_id is None]
+    if sin_usuario:
+        logger.warning('Se descartan %s entradas de auditoría sin usuario', len(sin_usuario))
+    entradas = _sin_repetidas([e for e in entradas if e.idusuario_id is not None])
+    referencias = ReferenciasAuditoria.de_logs([e for e in entradas if e.idempleado is None])
+    for e in entradas:
+        if e.idempleado is None:
+            e.idempleado = referencias.idempleado_de(e)
+    return Log_auditoria.objects.bulk_create(entradas)
+
+
+_cola = queue.Queue()
+_escritor = None
+_escritor_lock = threading.Lock()
+
+
+def _escribir_cola():
+    while True:
+        entradas = _cola.get()
+        try:
+            close_old_connections()
+            guardar(entradas)
+        except Exception:
+            logger.exception('No se pudo escribir un lote de auditoría (%s entradas)', len(entradas))
+        finally:
+            _cola.task_done()
+
+
+def _asegurar_escritor():
+    global _escritor
+    with _escritor_lock:
+        if _escritor is None or not _escritor.is_alive():
+            _escritor = threading.Thread(target=_escribir_cola, name='escritor-auditoria', daemon=True)
+            _escritor.start()
+
+
+def vaciar_cola():
+    """Escribe en este hilo los lotes que sigan en la cola."""
+    while True:
+        try:
+            entradas = _cola.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            guardar(entradas)
+        except Exception:
+            logger.exception('No se pudo escribir un lote de auditoría (%s entradas)', len(entradas))
+        finally:
+            _cola.task_done()
+
+
+atexit.register(vaciar_cola)
+
+
+class RegistroAuditoria:
+    def __init__(self, usuario=None):
+        self.usuario = usuario
+        self._confirmadas = []
+        self._profundidad = 0
+        self._escritura_programada = False
+
+    def _revisar_programacion(self):
+        # Fuera de toda transacción, una escritura programada que no corrió fue descartada por un rollback
+        if self._escritura_programada and not transaction.get_connection().in_atomic_block:
+            self._escritura_programada = False
+
+    def registrar(self, nombre_tabla, idregistro, accion, cambio, deduplicar=True):
+        """Agrega una entrada; devuelve el Log_auditoria (sin guardar hasta que se escriba el lote).
+
+        ``cambio`` debe ser serializable a JSON. Con ``deduplicar`` se omite si es
+        igual al de la última entrada de la misma tabla, registro y acción.
+        """
+        self._revisar_programacion()
+        entrada = Log_auditoria(
+            idusuario=self.usuario, nombre_tabla=nombre_tabla, idregistro=idregistro, accion=accion, cambio=cambio,
+        )
+        entrada.deduplicar = deduplicar
+        transaction.on_commit(partial(self._confirmar, entrada))
+        return entrada
+
+    def _confirmar(self, entrada):
+        self._confirmadas.append(entrada)
+        if not self._profundidad and not self._escritura_programada:
+            self.escribir()
+
+    @contextmanager
+    def lote(self):
+        """Acumula las entradas confirmadas y las escribe juntas al salir (o al confirmar la transacción en curso)."""
+        self._revisar_programacion()
+        self._profundidad += 1
+        try:
+            yield self
+        finally:
+            # También si hubo una excepción: lo ya confirmado en la base debe quedar auditado
+            self._profundidad -= 1
+            if not self._profundidad:
+                if transaction.get_connection().in_atomic_block:
+                    self._escritura_programada = True
+                transaction.on_commit(self.escribir)
+
+    def escribir(self):
+        self._escritura_programada = False
+        entradas, self._confirmadas = self._confirmadas, []
+        if not entradas:
+            return
+        if getattr(settings, 'AUDITORIA_ASINCRONA', False):
+            _cola.put(entradas)
+            _asegurar_escritor()
+            return
+        try:
+            guardar(entradas)
+        except Exception:
+            logger.exception('No se pudo escribir un lote de auditoría (%s entradas)', len(entradas))
+
+
+def registro_de(request):
+    """El RegistroAuditoria del request (se crea la primera vez), con el usuario autenticado."""
+    registro = getattr(request, '_registro_auditoria', None)
+    if registro is None:
+        user = getattr(request, 'user', None)
+        registro = RegistroAuditoria(user if user is not None and user.is_authenticated else None)
+        request._registro_auditoria = registro
+    return registro
+
+
+def auditoria_en_lote(vista):
+    """Decorador de vistas (funciones o métodos de vistas basadas en clases): escribe la auditoría del request en un lote."""
+    @wraps(vista)
+    def envoltura(primero, *args, **kwargs):
+        request = getattr(primero, 'request', primero)
+        with registro_de(request).lote():
+            return vista(primero, *args, **kwargs)
+    return envoltura
@@ -0,0 +1,274 @@
+"""Listado unificado de licencias y vacaciones ordenado y paginado en la base de datos.
+
+Ambas tablas se combinan con un UNION de (fecha_desde, orden_tipo, id) que se
+ordena, cuenta y recorta en SQL; sólo las filas de la página se hidratan como
+instancias (una consulta por tabla). Para páginas profundas se usa paginación
+por cursor sobre la misma clave en lugar de OFFSET.
+
+``FiltrosReporte`` interpreta los filtros GET del reporte (año, tipo, estado,
+empleado, fecha o rango) y los aplica a ambos querysets; lo usan la vista y la
+exportación, que recorre el mismo UNION con todas las columnas ya resueltas en
+SQL (sin hidratar instancias) con un cursor por bloques.
+"""
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import List, Optional
+
+from django.core.paginator import Paginator
+from django.db.models import CharField, F, IntegerField, Q, Value
+
+from nucleo.logic import catalogos
+from nucleo.models import Solicitud_licencia, Solicitud_vacaciones, Tipo_licencia
+
+# A igual fecha_desde las licencias van antes que las vacaciones (orden descendente)
+TIPO_LICENCIA = 1
+TIPO_VACACIONES = 0
+
+POR_PAGINA = 12
+# A partir de esta página el botón "Siguiente" pasa a paginar por cursor
+PAGINA_KEYSET_DESDE = 20
+
+
+def _claves(qs, orden_tipo):
+    return (
+        qs.order_by()
+        .annotate(orden_tipo=Value(orden_tipo, output_field=IntegerField()), ident=F('pk'))
+        .values_list('fecha_desde', 'orden_tipo', 'ident')
+    )
+
+
+def solicitudes_unificadas(licencias, vacaciones):
+    """UNION ALL de las claves (fecha_desde, orden_tipo, id) de ambos querysets, más reciente primero."""
+    return _claves(licencias, TIPO_LICENCIA).union(_claves(vacaciones, TIPO_VACACIONES), all=True).order_by(
+        '-fecha_desde', '-orden_tipo', '-ident'
+    )
+
+
+def hidratar(filas, tipo_vacaciones=None):
+    """Convierte claves (fecha_desde, orden_tipo, id) en instancias, en el mismo orden.
+
+    Las vacaciones se completan con los atributos que las plantillas esperan de
+    una licencia (``id_licencia`` = tipo "Vacaciones", ``archivo``), y todas
+    reciben ``dias``.
+    """
+    filas = list(filas)
+    ids_lic = [i for _, t, i in filas if t == TIPO_LICENCIA]
+    ids_vac = [i for _, t, i in filas if t == TIPO_VACACIONES]
+    licencias = Solicitud_licencia.objects.select_related(
+        'idempleado__idempleado', 'id_licencia', 'id_estado'
+    ).in_bulk(ids_lic) if ids_lic else {}
+    vacaciones = Solicitud_vacaciones.objects.select_related(
+        'idempleado__idempleado', 'id_estado'
+    ).in_bulk(ids_vac) if ids_vac else {}
+    if vacaciones and tipo_vacaciones is None:
+        tipo_vacaciones = catalogos.por_nombre(Tipo_licencia, "Vacaciones")
+
+    resultado = []
+    for _, t, i in filas:
+        if t == TIPO_LICENCIA:
+            s = licencias.get(i)
+        else:
+            s = vacaciones.get(i)
+            if s is not None:
+                s.id_licencia = tipo_vacaciones
+                s.archivo = None
+        if s is None:
+            # Borrada entre la consulta de claves y la hidratación
+            continue
+        s.dias = (s.fecha_hasta - s.fecha_desde).days + 1
+        resultado.append(s)
+    return resultado
+
+
+def cursor_de(fila):
+    fecha_desde, orden_tipo, ident = fila
+    return f"{fecha_desde.isoformat()}.{orden_tipo}.{ident}"
+
+
+def parsear_cursor(cursor):
+    """Devuelve (fecha_desde, orden_tipo, id) o None si el cursor es inválido."""
+    try:
+        fecha, orden_tipo, ident = (cursor or '').split('.')
+        return date.fromisoformat(fecha), int(orden_tipo), int(ident)
+    except ValueError:
+        return None
+
+
+def _despues_de(qs, orden_tipo, clave):
+    """Filtra ``qs`` a las filas que siguen a ``clave`` en el orden descendente del listado."""
+    fecha, orden_cursor, ident = clave
+    if orden_tipo < orden_cursor:
+        return qs.filter(fecha_desde__lte=fecha)
+    if orden_tipo > orden_cursor:
+        return qs.filter(fecha_desde__lt=fecha)
+    return qs.filter(Q(fecha_desde__lt=fecha) | Q(fecha_desde=fecha, pk__lt=ident))
+
+
+@dataclass
+class PaginaKeyset:
+    """Página obtenida por cursor; expone lo que usan las plantillas de un Page."""
+    object_list: List
+    cursor_siguiente: Optional[str] = None
+    modo_keyset: bool = field(default=True, init=False)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.cursor_siguiente is not None
+
+    def has_previous(self):
+        return False
+
+
+def pagina_keyset(licencias, vacaciones, cursor, por_pagina=POR_PAGINA):
+    clave = parsear_cursor(cursor)
+    if clave:
+        licencias = _despues_de(licencias, TIPO_LICENCIA, clave)
+        vacaciones = _despues_de(vacaciones, TIPO_VACACIONES, clave)
+    filas = list(solicitudes_unificadas(licencias, vacaciones)[:por_pagina + 1])
+    siguiente = cursor_de(filas[por_pagina - 1]) if len(filas) > por_pagina else None
+    return PaginaKeyset(hidratar(filas[:por_pagina]), siguiente)
+
+
+def paginar_solicitudes(licencias, vacaciones, page_number=None, cursor=None, por_pagina=POR_PAGINA):
+    """Página del listado unificado.
+
+    Con ``cursor`` devuelve una PaginaKeyset; si no, un Page de Django cuyo
+    ``object_list`` ya está hidratado. En páginas a partir de
+    PAGINA_KEYSET_DESDE el Page trae ``cursor_siguiente`` para continuar por cursor.
+    """
+    if cursor:
+        return pagina_keyset(licencias, vacaciones, cursor, por_pagina)
+    page = Paginator(solicitudes_unificadas(licencias, vacaciones), por_pagina).get_page(page_number)
+    filas = list(page.object_list)
+    page.object_list = hidratar(filas)
+    page.modo_keyset = False
+    page.cursor_siguiente = None
+    if filas and page.has_next() and page.number >= PAGINA_KEYSET_DESDE:
+        page.cursor_siguiente = cursor_de(filas[-1])
+    return page
+
+
+@dataclass
+class FiltrosReporte:
+    """Filtros GET de gestion_reporte_licencias, tal como llegan (texto o None)."""
+    anio: Optional[str] = None
+    empleado: Optional[str] = None
+    tipo_id: Optional[str] = None
+    estado: Optional[str] = None
+    fecha_desde: Optional[str] = None
+    fecha_hasta: Optional[str] = None
+    fecha_rango: Optional[str] = None
+
+    @classmethod
+    def de_get(cls, get):
+        return cls(
+            anio=get.get('anio'),
+            empleado=get.get('empleado'),
+            tipo_id=get.get('tipo'),
+            estado=get.get('estado'),
+            fecha_desde=get.get('fecha_desde'),
+            fecha_hasta=get.get('fecha_hasta'),
+            fecha_rango=get.get('fecha_rango'),
+        )
+
+    def aplicar(self, licencias, vacaciones):
+        """Devuelve (licencias, vacaciones) filtrados."""
+        if self.anio:
+            licencias = licencias.filter(fecha_desde__year=self.anio)
+            vacaciones = vacaciones.filter(fecha_desde__year=self.anio)
+        if self.tipo_id:
+            licencias = licencias.filter(id_licencia__id_licencia=self.tipo_id)
+            # Vacaciones solo si el tipo es "Vacaciones"
+            tipo_vacaciones = catalogos.por_nombre(Tipo_licencia, "Vacaciones")
+            if not (tipo_vacaciones and str(tipo_vacaciones.id_licencia) == str(self.tipo_id)):
+                vacaciones = vacaciones.none()
+        if self.estado:
+            licencias = licencias.filter(id_estado__estado__iexact=self.estado)
+            vacaciones = vacaciones.filter(id_estado__estado__iexact=self.estado)
+        if self.empleado:
+            if self.empleado.isdigit():
+                filtro = Q(idempleado__idempleado=self.empleado)
+            else:
+                filtro = Q(idempleado__nombres__icontains=self.empleado) | Q(idempleado__apellido__icontains=self.empleado)
+            licencias = licencias.filter(filtro)
+            vacaciones = vacaciones.filter(filtro)
+        # Fecha (se aplica junto con los demás filtros); una fecha inválida se ignora
+        if self.fecha_desde:
+            try:
+                desde = datetime.strptime(self.fecha_desde, '%Y-%m-%d').date()
+                if self.fecha_rango and self.fecha_hasta:
+                    # Rango explícito: la solicitud completa debe estar dentro del rango
+                    hasta = datetime.strptime(self.fecha_hasta, '%Y-%m-%d').date()
+                    filtro = Q(fecha_desde__gte=desde, fecha_hasta__lte=hasta)
+                else:
+                    # Fecha única: solicitudes cuya ventana contiene la fecha
+                    filtro = Q(fecha_desde__lte=desde, fecha_hasta__gte=desde)
+            except ValueError:
+                pass
+            else:
+                licencias = licencias.filter(filtro)
+                vacaciones = vacaciones.filter(filtro)
+        return licencias, vacaciones
+
+
+COLUMNAS_EXPORTACION = (
+    ('id', 'ID'),
+    ('clase', 'Clase'),
+    ('idempleado', 'Legajo'),
+    ('apellido', 'Apellido'),
+    ('nombres', 'Nombres'),
+    ('tipo', 'Tipo'),
+    ('fecha_desde', 'Desde'),
+    ('fecha_hasta', 'Hasta'),
+    ('dias', 'Días'),
+    ('estado', 'Estado'),
+    ('comentario', 'Comentario'),
+    ('fecha_solicitud', 'Fecha de solicitud'),
+)
+
+
+def _columnas_exportacion(qs, orden_tipo, clase, tipo, fecha_solicitud):
+    # Todo como anotaciones para que ambos lados del UNION tengan las mismas columnas en el mismo orden
+    return (
+        qs.order_by()
+        .annotate(
+            x_desde=F('fecha_desde'), orden_tipo=Value(orden_tipo, output_field=IntegerField()), ident=F('pk'),
+            x_clase=Value(clase, output_field=CharField()), x_legajo=F('idempleado_id'),
+            x_apellido=F('idempleado__apellido'), x_nombres=F('idempleado__nombres'), x_tipo=tipo,
+            x_hasta=F('fecha_hasta'), x_estado=F('id_estado__estado'), x_comentario=F('comentario'),
+            x_solicitud=F(fecha_solicitud),
+        )
+        .values_list(
+            'x_desde', 'orden_tipo', 'ident', 'x_clase', 'x_legajo', 'x_apellido', 'x_nombres', 'x_tipo',
+            'x_hasta', 'x_estado', 'x_comentario', 'x_solicitud',
+        )
+    )
+
+
+def filas_exportacion(licencias, vacaciones, tamanio_lote=2000):
+    """Genera una fila por solicitud (en el orden de COLUMNAS_EXPORTACION), más reciente primero.
+
+    Una sola consulta (UNION ALL de ambas tablas con empleado, tipo y estado
+    resueltos por JOIN) recorrida con ``iterator()``: en PostgreSQL es un
+    cursor del lado del servidor y la memoria no depende del total de filas.
+    """
+    union = _columnas_exportacion(
+        licencias, TIPO_LICENCIA, 'Licencia', F('id_licencia__descripcion'), 'fecha_sqllc',
+    ).union(
+        _columnas_exportacion(
+            vacaciones, TIPO_VACACIONES, 'Vacaciones', Value('Vacaciones', output_field=CharField()), 'fecha_sol_vac',
+        ),
+        all=True,
+    ).order_by('-x_desde', '-orden_tipo', '-ident')
+    for desde, _, ident, clase, legajo, apellido, nombres, tipo, hasta, estado, comentario, solicitud in union.iterator(
+        chunk_size=tamanio_lote
+    ):
+        yield [
+            ident, clase, legajo, apellido, nombres, tipo, desde, hasta, (hasta - desde).days + 1, estado,
+            comentario or '', solicitud,
+        ]
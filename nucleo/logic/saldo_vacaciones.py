@@ -0,0 +1,248 @@
+"""Libro de movimientos y saldos de vacaciones por empleado y periodo.
+
+Vacaciones_otorgadas sigue siendo la fuente de verdad de los periodos. Cada vez
+que una fila se crea, modifica o borra, ``nucleo.signals`` llama a
+``registrar_cambio`` con la diferencia: se agrega un Movimiento_vacaciones y se
+actualiza Saldo_vacaciones en la misma transacción. El periodo es el año de
+``inicio_consumo``, igual que en los filtros ``inicio_consumo__year`` previos.
+
+Quien modifica los periodos indica el tipo de movimiento con el context manager
+``movimiento`` (consumo al aprobar, cancelación al cancelar, otorgamiento al
+generar). Sin contexto el tipo se deduce del signo de la variación.
+"""
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import ExtractYear
+
+from nucleo.models import Movimiento_vacaciones, Saldo_vacaciones, Vacaciones_otorgadas
+
+_contexto = contextvars.ContextVar('movimiento_vacaciones', default=None)
+
+
+@contextmanager
+def movimiento(tipo, solicitud=None, anio=None):
+    """Los cambios de Vacaciones_otorgadas dentro del bloque se registran como ``tipo``.
+
+    ``solicitud`` (Solicitud_vacaciones) queda referenciada en el movimiento. Un
+    consumo que cae en un periodo anterior a ``anio`` (por defecto el año de la
+    solicitud) se registra como arrastre.
+    """
+    if anio is None and solicitud is not None:
+        anio = solicitud.fecha_desde.year
+    token = _contexto.set((tipo, getattr(solicitud, 'pk', None), anio))
+    try:
+        yield
+    finally:
+        _contexto.reset(token)
+
+
+def _tipo_y_solicitud(periodo, dias_otorgados, dias_consumidos):
+    actual = _contexto.get()
+    if actual is not None:
+        tipo, idsolicitudvac, anio = actual
+        if tipo == Movimiento_vacaciones.CONSUMO and anio is not None and periodo < anio:
+            tipo = Movimiento_vacaciones.ARRASTRE
+        return tipo, idsolicitudvac
+    if dias_otorgados > 0 and dias_consumidos == 0:
+        return Movimiento_vacaciones.OTORGAMIENTO, None
+    if dias_otorgados == 0 and dias_consumidos > 0:
+        return Movimiento_vacaciones.CONSUMO, None
+    if dias_otorgados == 0 and dias_consumidos < 0:
+        return Movimiento_vacaciones.CANCELACION, None
+    return Movimiento_vacaciones.AJUSTE, None
+
+
+def _aplicar(idempleado_id, periodo, dias_otorgados, dias_consumidos):
+    cambios = {
+        'dias_otorgados': F('dias_otorgados') + dias_otorgados,
+        'dias_consumidos': F('dias_consumidos') + dias_consumidos,
+    }
+    filas = Saldo_vacaciones.objects.filter(idempleado_id=idempleado_id, periodo=periodo)
+    if filas.update(**cambios):
+        return
+    _, creado = Saldo_vacaciones.objects.get_or_create(
+        idempleado_id=idempleado_id, periodo=periodo,
+        defaults={'dias_otorgados': dias_otorgados, 'dias_consumidos': dias_consumidos},
+    )
+    if not creado:
+        # Otra transacción creó la fila entre el UPDATE y el INSERT
+        filas.update(**cambios)
+
+
+def registrar_movimiento(idempleado_id, periodo, dias_otorgados=0, dias_consumidos=0, tipo=None,
+                         id_vacaciones=None, idsolicitudvac=None):
+    """Agrega un movimiento y lo suma al saldo del periodo. Devuelve el movimiento (None si no hay variación)."""
+    if not (dias_otorgados or dias_consumidos):
+        return None
+    if tipo is None:
+        tipo, idsolicitudvac = _tipo_y_solicitud(periodo, dias_otorgados, dias_consumidos)
+    with transaction.atomic():
+        mov = Movimiento_vacaciones.objects.create(
+            idempleado_id=idempleado_id, periodo=periodo, tipo=tipo,
+            dias_otorgados=dias_otorgados, dias_consumidos=dias_consumidos,
+            id_vacaciones=id_vacaciones, idsolicitudvac=idsolicitudvac,
+        )
+        _aplicar(idempleado_id, periodo, dias_otorgados, dias_consumidos)
+    return mov
+
+
+def registrar_movimientos(movimientos):
+    """Versión en lote de ``registrar_movimiento`` para escrituras que no disparan
+    signals (``bulk_create``). Recibe instancias de Movimiento_vacaciones sin guardar."""
+    movimientos = [m for m in movimientos if m.dias_otorgados or m.dias_consumidos]
+    if not movimientos:
+        return []
+    deltas = {}
+    for m in movimientos:
+        delta = deltas.setdefault((m.idempleado_id, m.periodo), [0, 0])
+        delta[0] += m.dias_otorgados
+        delta[1] += m.dias_consumidos
+    with transaction.atomic():
+        Movimiento_vacaciones.objects.bulk_create(movimientos)
+        existentes = {
+            (s.idempleado_id, s.periodo): s
+            for s in Saldo_vacaciones.objects.select_for_update().filter(
+                idempleado_id__in={emp for emp, _ in deltas}, periodo__in={periodo for _, periodo in deltas}
+            )
+        }
+        nuevos, modificados = [], []
+        for (idempleado_id, periodo), (otorgados, consumidos) in deltas.items():
+            saldo = existentes.get((idempleado_id, periodo))
+            if saldo is None:
+                nuevos.append(Saldo_vacaciones(
+                    idempleado_id=idempleado_id, periodo=periodo, dias_otorgados=otorgados, dias_consumidos=consumidos,
+                ))
+            else:
+                saldo.dias_otorgados += otorgados
+                saldo.dias_consumidos += consumidos
+                modificados.append(saldo)
+        Saldo_vacaciones.objects.bulk_update(modificados, ['dias_otorgados', 'dias_consumidos'])
+        Saldo_vacaciones.objects.bulk_create(nuevos)
+    return movimientos
+
+
+def estado_de(vacaciones):
+    """(idempleado_id, periodo, otorgados, consumidos) de una fila de Vacaciones_otorgadas."""
+    return (
+        vacaciones.idempleado_id,
+        vacaciones.inicio_consumo.year,
+        vacaciones.dias_disponibles or 0,
+        vacaciones.dias_consumidos or 0,
+    )
+
+
+def registrar_cambio(anterior, actual, id_vacaciones=None):
+    """Registra la diferencia entre dos estados (ver ``estado_de``); cualquiera puede ser None."""
+    if anterior and actual and anterior[:2] == actual[:2]:
+        registrar_movimiento(
+            actual[0], actual[1], actual[2] - anterior[2], actual[3] - anterior[3], id_vacaciones=id_vacaciones
+        )
+        return
+    # Alta, baja o cambio de empleado/periodo: se revierte el estado anterior y se suma el nuevo
+    if anterior:
+        registrar_movimiento(anterior[0], anterior[1], -anterior[2], -anterior[3], id_vacaciones=id_vacaciones)
+    if actual:
+        registrar_movimiento(actual[0], actual[1], actual[2], actual[3], id_vacaciones=id_vacaciones)
+
+
+def obtener_saldo(empleado, periodo):
+    """Saldo del empleado (instancia o id) en el periodo; si no hay movimientos, uno en cero sin guardar."""
+    idempleado_id = getattr(empleado, 'pk', empleado)
+    saldo = Saldo_vacaciones.objects.filter(idempleado_id=idempleado_id, periodo=periodo).first()
+    return saldo or Saldo_vacaciones(idempleado_id=idempleado_id, periodo=periodo)
+
+
+def saldos_del_periodo(periodo):
+    """{idempleado_id: Saldo_vacaciones} de todos los empleados con movimientos en el periodo."""
+    return {s.idempleado_id: s for s in Saldo_vacaciones.objects.filter(periodo=periodo)}
+
+
+def acumulados_previos(periodo):
+    """{idempleado_id: (otorgados, consumidos)} sumando los periodos anteriores a ``periodo``."""
+    filas = (
+        Saldo_vacaciones.objects.filter(periodo__lt=periodo)
+        .values('idempleado_id')
+        .annotate(otorgados=Sum('dias_otorgados'), consumidos=Sum('dias_consumidos'))
+    )
+    return {f['idempleado_id']: (f['otorgados'] or 0, f['consumidos'] or 0) for f in filas}
+
+
+def totales_del_periodo(periodo, empleado=None):
+    """(otorgados, consumidos) del periodo, de un empleado o de toda la plantilla."""
+    qs = Saldo_vacaciones.objects.filter(periodo=periodo)
+    if empleado is not None:
+        qs = qs.filter(idempleado_id=getattr(empleado, 'pk', empleado))
+    agg = qs.aggregate(otorgados=Sum('dias_otorgados'), consumidos=Sum('dias_consumidos'))
+    return agg['otorgados'] or 0, agg['consumidos'] or 0
+
+
+@dataclass
+class Diferencia:
+    idempleado_id: int
+    periodo: int
+    origen: str
+    esperado: tuple
+    encontrado: tuple
+
+    def __str__(self):
+        return (
+            f"Empleado {self.idempleado_id} periodo {self.periodo} ({self.origen}): "
+            f"esperado otorgados/consumidos={self.esperado}, encontrado={self.encontrado}"
+        )
+
+
+def _por_clave(filas):
+    return {(f['idempleado_id'], f['periodo']): (f['otorgados'] or 0, f['consumidos'] or 0) for f in filas}
+
+
+def _comparar(esperados, encontrados, origen):
+    diferencias = []
+    for clave in sorted(set(esperados) | set(encontrados)):
+        esperado = esperados.get(clave, (0, 0))
+        encontrado = encontrados.get(clave, (0, 0))
+        if esperado != encontrado:
+            diferencias.append(Diferencia(clave[0], clave[1], origen, esperado, encontrado))
+    return diferencias
+
+
+def verificar_saldos():
+    """Reproduce el libro y lo compara con Saldo_vacaciones y con Vacaciones_otorgadas.
+
+    Devuelve dos listas de Diferencia: (saldo vs libro, libro vs periodos otorgados).
+    """
+    libro = _por_clave(
+        Movimiento_vacaciones.objects.values('idempleado_id', 'periodo')
+        .annotate(otorgados=Sum('dias_otorgados'), consumidos=Sum('dias_consumidos'))
+    )
+    saldos = _por_clave(
+        Saldo_vacaciones.objects.annotate(otorgados=F('dias_otorgados'), consumidos=F('dias_consumidos'))
+        .values('idempleado_id', 'periodo', 'otorgados', 'consumidos')
+    )
+    otorgadas = _por_clave(
+        Vacaciones_otorgadas.objects.annotate(periodo=ExtractYear('inicio_consumo'))
+        .values('idempleado_id', 'periodo')
+        .annotate(otorgados=Sum('dias_disponibles'), consumidos=Sum('dias_consumidos'))
+    )
+    return _comparar(libro, saldos, 'saldo'), _comparar(otorgadas, libro, 'libro')
+
+
+def corregir_saldos(diferencias_saldo, diferencias_libro):
+    """Aplica lo que devuelve ``verificar_saldos``: reescribe los saldos según el libro y
+    agrega movimientos de ajuste donde el libro no coincide con Vacaciones_otorgadas."""
+    with transaction.atomic():
+        for d in diferencias_saldo:
+            otorgados, consumidos = d.esperado
+            Saldo_vacaciones.objects.update_or_create(
+                idempleado_id=d.idempleado_id, periodo=d.periodo,
+                defaults={'dias_otorgados': otorgados, 'dias_consumidos': consumidos},
+            )
+        for d in diferencias_libro:
+            registrar_movimiento(
+                d.idempleado_id, d.periodo,
+                d.esperado[0] - d.encontrado[0], d.esperado[1] - d.encontrado[1],
+                tipo=Movimiento_vacaciones.AJUSTE,
+            )
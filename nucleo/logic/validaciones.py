@@ -1,8 +1,10 @@
-from datetime import date, timedelta
+from datetime import date
 from django.db import transaction
 from django.utils import timezone
 
-from nucleo.models import Feriado, Plan_trabajo, Solicitud_licencia, Estado_lic_vac
+from nucleo.logic import calendario_feriados, dias_habiles
+from nucleo.logic.colisiones import ESTADOS_APROBADOS, Colision, IndiceIntervalos, buscar_colisiones, solicitudes_solapadas
+from nucleo.models import Plan_trabajo, Solicitud_licencia, Solicitud_vacaciones, Estado_lic_vac
 
 
 class ValidacionError(Exception):
@@ -17,55 +19,108 @@ def fecha_en_pasado(fecha_desde):
 
 
 def incluye_feriado(fecha_desde, fecha_hasta):
-    return Feriado.objects.filter(fecha__range=(fecha_desde, fecha_hasta)).exists()
+    return calendario_feriados.cantidad_feriados(fecha_desde, fecha_hasta) > 0
 
 
 def dias_feriados_en_rango(fecha_desde, fecha_hasta):
-    return list(Feriado.objects.filter(fecha__range=(fecha_desde, fecha_hasta)).values_list('fecha', flat=True))
+    return calendario_feriados.feriados_entre(fecha_desde, fecha_hasta)
 
 
 def empleado_trabaja_en_rango(empleado, fecha_desde, fecha_hasta):
     # devuelve lista de dias de la semana (0=lunes) que el empleado NO trabaja
     plan = Plan_trabajo.objects.filter(idempleado=empleado).first()
+    return _dias_laborales(plan, fecha_desde, fecha_hasta)
+
+
+def _dias_laborales(plan, fecha_desde, fecha_hasta):
     if not plan:
         # si no hay plan, asumimos que trabaja todos los días
         return True, []
-    dias_no_trabaja = []
-    current = fecha_desde
-    dias = []
-    while current <= fecha_hasta:
-        weekday = current.weekday()  # 0=lunes
-        trabaja = [plan.lunes, plan.martes, plan.miercoles, plan.jueves, plan.viernes, plan.sabado, plan.domingo][weekday]
-        if not trabaja:
-            dias_no_trabaja.append(current)
-        dias.append((current, trabaja))
-        current += timedelta(days=1)
+    mascara = dias_habiles.mascara_plan(plan)
     # True si hay al menos un dia laboral en el rango
-    hay_dia_laboral = any(trabaja for (_, trabaja) in dias)
+    hay_dia_laboral = dias_habiles.contar_dias(mascara, fecha_desde, fecha_hasta) > 0
+    dias_no_trabaja = dias_habiles.fechas_de(dias_habiles.TODOS & ~mascara, fecha_desde, fecha_hasta)
     return hay_dia_laboral, dias_no_trabaja
 
 
+class ContextoValidacion:
+    """Feriados, planes de trabajo y licencias/vacaciones aprobadas para validar un lote de solicitudes.
+
+    Se carga con ``para(solicitudes)`` en tres consultas sobre el rango total
+    del lote (los feriados salen de ``calendario_feriados``); después cada
+    validación se resuelve en memoria. Las solicitudes
+    que se aprueban dentro del lote se agregan con ``registrar_aprobada`` para
+    que las siguientes las tengan en cuenta, igual que si se aprobaran de a una.
+    """
+
+    def __init__(self, feriados=(), planes=None, aprobadas=()):
+        self.feriados = sorted(feriados)
+        self.planes = planes or {}
+        self._indice = IndiceIntervalos((c.fecha_desde, c.fecha_hasta, c) for c in aprobadas)
+        self._aprobadas_lote = []
+
+    @classmethod
+    def para(cls, solicitudes):
+        solicitudes = list(solicitudes)
+        if not solicitudes:
+            return cls()
+        desde = min(s.fecha_desde for s in solicitudes)
+        hasta = max(s.fecha_hasta for s in solicitudes)
+        feriados = calendario_feriados.feriados_entre(desde, hasta)
+        planes = {}
+        empleados = {s.idempleado_id for s in solicitudes}
+        for plan in Plan_trabajo.objects.filter(idempleado__in=empleados).order_by('pk'):
+            planes.setdefault(plan.idempleado_id, plan)
+        aprobadas = buscar_colisiones(desde, hasta, ESTADOS_APROBADOS, estados_vacaciones=('Aceptada',))
+        return cls(feriados, planes, aprobadas)
+
+    def feriados_en_rango(self, fecha_desde, fecha_hasta):
+        return [f for f in self.feriados if fecha_desde <= f <= fecha_hasta]
+
+    def plan_de(self, idempleado_id):
+        return self.planes.get(idempleado_id)
+
+    def aprobadas_solapadas(self, solicitud):
+        """Licencias/vacaciones aprobadas (Colision) que solapan ``solicitud``, sin contarla a ella misma."""
+        fd, fh = solicitud.fecha_desde, solicitud.fecha_hasta
+        candidatas = self._indice.solapados(fd, fh) + [
+            c for c in self._aprobadas_lote if c.fecha_desde <= fh and c.fecha_hasta >= fd
+        ]
+        return [c for c in candidatas if not (c.tipo == 'licencia' and c.id == solicitud.pk)]
+
+    def registrar_aprobada(self, solicitud):
+        """Agrega una licencia o vacación aprobada en el lote."""
+        empleado = solicitud.idempleado
+        tipo = 'vacaciones' if isinstance(solicitud, Solicitud_vacaciones) else 'licencia'
+        self._aprobadas_lote.append(Colision(
+            tipo, solicitud.pk, solicitud.idempleado_id, empleado.nombres, empleado.apellido,
+            solicitud.fecha_desde, solicitud.fecha_hasta,
+        ))
+
+
 def solapa_con_licencia_existente(empleado, fecha_desde, fecha_hasta):
     # (Legacy) Esta función se reemplaza por lógica en validar_solicitud_licencia.
     # Mantener una implementación simple por compatibilidad: buscar cualquier solapamiento
-    qs = Solicitud_licencia.objects.filter(idempleado=empleado)
-    for s in qs:
-        if not (s.fecha_hasta < fecha_desde or s.fecha_desde > fecha_hasta):
-            return True, s
-    return False, None
+    s = solicitudes_solapadas(Solicitud_licencia, fecha_desde, fecha_hasta, empleado=empleado).first()
+    return s is not None, s
 
 
 @transaction.atomic
 
-def validar_solicitud_licencia(solicitud):
+def validar_solicitud_licencia(solicitud, contexto=None):
     """
     Valida una instancia de Solicitud_licencia antes de aceptarla.
     Reglas implementadas según requerimiento del cliente.
 
+    ``contexto`` (ContextoValidacion) permite validar un lote con los datos ya
+    cargados; si no se pasa, se cargan sólo para esta solicitud.
+
     Lanza ValidacionError con motivo si la solicitud debe ser rechazada.
     Devuelve una tupla (aceptable, warnings) donde acceptable es True/False
     y warnings es lista de strings.
     """
+    if contexto is None:
+        contexto = ContextoValidacion.para([solicitud])
     warnings = []
     hoy = date.today()
     fd = solicitud.fecha_desde
@@ -76,7 +131,7 @@ def validar_solicitud_licencia(solicitud):
         raise ValidacionError('fechas en el pasado')
 
     # Regla 1: feriados
-    feriados = dias_feriados_en_rango(fd, fh)
+    feriados = contexto.feriados_en_rango(fd, fh)
     total_dias = (fh - fd).days + 1
     if feriados:
         # Tests expect the phrase 'contiene feriado' in messages/warnings.
@@ -86,7 +141,7 @@ def validar_solicitud_licencia(solicitud):
             warnings.append('contiene feriado')
 
     # Regla 2 & 3: plan_trabajo (no laboral)
-    hay_laboral, dias_no_trabaja = empleado_trabaja_en_rango(solicitud.idempleado, fd, fh)
+    hay_laboral, dias_no_trabaja = _dias_laborales(contexto.plan_de(solicitud.idempleado_id), fd, fh)
     if not hay_laboral:
         # si todos los dias son no laborales -> rechazar
         raise ValidacionError('es su día libre')
@@ -99,36 +154,14 @@ def validar_solicitud_licencia(solicitud):
         raise ValidacionError('no cubre días hábiles')
 
     # Regla 6: colisiones con otras solicitudes/aprobadas
-    from django.db.models import Q
-    from nucleo.models import Solicitud_licencia as SL, Solicitud_vacaciones as SV
-    aprobado_q = Q(id_estado__estado__iexact='Aceptada') | Q(id_estado__estado__iexact='Aprobada')
+    solapadas = contexto.aprobadas_solapadas(solicitud)
 
     # 6a) Misma persona: si solapa con una solicitud VACÍA o LICENCIA aprobada -> rechazar
-    same_lic_aprobada = SL.objects.filter(
-        idempleado=solicitud.idempleado
-    ).filter(aprobado_q).filter(
-        fecha_desde__lte=fh,
-        fecha_hasta__gte=fd,
-    ).exists()
-    same_vac_aprobada = SV.objects.filter(
-        idempleado=solicitud.idempleado
-    ).filter(id_estado__estado__iexact='Aceptada').filter(
-        fecha_desde__lte=fh,
-        fecha_hasta__gte=fd,
-    ).exists()
-    if same_lic_aprobada or same_vac_aprobada:
+    if any(c.idempleado_id == solicitud.idempleado_id for c in solapadas):
         raise ValidacionError('solapa con licencia/vacaciones aprobada del mismo empleado')
 
     # 6b) Otras personas: si solapa con licencia/vacaciones aprobada de OTRO empleado -> warning (no bloquear)
-    other_lic_aprobada = SL.objects.filter(~Q(idempleado=solicitud.idempleado)).filter(aprobado_q).filter(
-        fecha_desde__lte=fh,
-        fecha_hasta__gte=fd,
-    )
-    other_vac_aprobada = SV.objects.filter(~Q(idempleado=solicitud.idempleado)).filter(id_estado__estado__iexact='Aceptada').filter(
-        fecha_desde__lte=fh,
-        fecha_hasta__gte=fd,
-    )
-    if other_lic_aprobada.exists() or other_vac_aprobada.exists():
+    if any(c.idempleado_id != solicitud.idempleado_id for c in solapadas):
         warnings.append('solapa con licencia/vacaciones aprobada de otro empleado')
 
     # Si llegamos acá, es aceptable (pero retornamos warnings si los hay)
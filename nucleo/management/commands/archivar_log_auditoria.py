@@ -0,0 +1,86 @@
+import json
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from nucleo.logic.particiones_auditoria import (
+    Mes, archivar_mes, asegurar_particiones, buscar_en_archivos, meses_anteriores_a, particionada, restaurar_mes,
+)
+
+
+def _mes(texto):
+    try:
+        return Mes.de_texto(texto)
+    except ValueError:
+        raise CommandError(f'Mes inválido (se espera AAAA-MM): {texto}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Archiva en disco (JSONL comprimido, un archivo por mes) los meses del log de auditoría fuera de la '
+        'ventana de retención, los restaura, busca en los archivos o crea las particiones mensuales próximas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('accion', choices=['archivar', 'restaurar', 'buscar', 'particiones'])
+        parser.add_argument('--dir', default='backups/log_auditoria', help='Directorio de los archivos')
+        parser.add_argument('--retencion-meses', type=int, default=24, dest='retencion',
+                            help='archivar: meses completos que se conservan en la base además del actual')
+        parser.add_argument('--dry-run', action='store_true', dest='dry_run', help='archivar: sólo lista los meses')
+        parser.add_argument('--mes', action='append', default=[], help='restaurar: mes AAAA-MM (repetible)')
+        parser.add_argument('--meses-adelante', type=int, default=3, dest='adelante',
+                            help='particiones: meses futuros a crear')
+        parser.add_argument('--texto', help='buscar: texto en cualquier parte de la entrada')
+        parser.add_argument('--empleado', type=int, help='buscar: idempleado afectado')
+        parser.add_argument('--tabla', help='buscar: nombre_tabla')
+        parser.add_argument('--desde', help='buscar: primer mes AAAA-MM')
+        parser.add_argument('--hasta', help='buscar: último mes AAAA-MM')
+
+    def handle(self, *args, **options):
+        getattr(self, '_' + options['accion'])(options)
+
+    def _archivar(self, options):
+        corte = Mes.de_fecha(date.today()).mas(-options['retencion'])
+        meses = meses_anteriores_a(corte)
+        if not meses:
+            self.stdout.write(f'Nada que archivar antes de {corte}.')
+            return
+        for mes in meses:
+            if options['dry_run']:
+                self.stdout.write(f'{mes}: se archivaría')
+                continue
+            try:
+                cantidad = archivar_mes(mes, options['dir'])
+            except FileExistsError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f'{mes}: {cantidad} entradas archivadas'))
+
+    def _restaurar(self, options):
+        if not options['mes']:
+            raise CommandError('Indicar al menos un --mes AAAA-MM')
+        for texto in options['mes']:
+            try:
+                cantidad = restaurar_mes(_mes(texto), options['dir'])
+            except FileNotFoundError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f'{texto}: {cantidad} entradas restauradas'))
+
+    def _buscar(self, options):
+        entradas = buscar_en_archivos(
+            options['dir'],
+            texto=options['texto'],
+            idempleado=options['empleado'],
+            tabla=options['tabla'],
+            desde=_mes(options['desde']) if options['desde'] else None,
+            hasta=_mes(options['hasta']) if options['hasta'] else None,
+        )
+        for entrada in entradas:
+            self.stdout.write(json.dumps(entrada, ensure_ascii=False))
+
+    def _particiones(self, options):
+        if not particionada():
+            self.stdout.write('La tabla del log no está particionada (sólo PostgreSQL).')
+            return
+        actual = Mes.de_fecha(date.today())
+        creadas = asegurar_particiones(actual, actual.mas(options['adelante']))
+        self.stdout.write(self.style.SUCCESS(f"Particiones creadas: {', '.join(map(str, creadas)) or 'ninguna'}"))
@@ -8,11 +8,14 @@ class Command(BaseCommand):
     help = 'Backfill Log_auditoria for insert rows: populate idempleado and nombres/apellido when possible.'
 
     def add_arguments(self, parser):
-        parser.add_argument('--what', choices=['empleado_eo', 'plan_trabajo', 'all'], default='all')
+        parser.add_argument('--what', choices=['empleado_eo', 'plan_trabajo', 'all', 'idempleado'], default='all',
+                            help='idempleado: completa la columna Log_auditoria.idempleado de los logs que no la tienen')
         parser.add_argument('--limit', type=int, default=0, help='Max number of rows to process (0 = no limit)')
         parser.add_argument('--dry-run', action='store_true', dest='dry_run', default=False, help='Do not write changes, only report')
         parser.add_argument('--apply', action='store_true', dest='apply', default=False, help='Apply changes to DB')
         parser.add_argument('--backup-dir', default='backups', help='Directory to write backup file')
+        parser.add_argument('--batch-size', type=int, default=1000, dest='batch_size',
+                            help='Logs por lote al completar idempleado')
 
     def handle(self, *args, **options):
         from nucleo.models import Log_auditoria, Empleado_eo, Plan_trabajo, Empleado
@@ -23,6 +26,9 @@ class Command(BaseCommand):
         do_apply = options['apply']
         backup_dir = options['backup_dir']
 
+        if what == 'idempleado':
+            return self._backfill_idempleado(limit, do_apply, options['batch_size'])
+
         now = timezone.now().strftime('%Y%m%d_%H%M%S')
         os.makedirs(backup_dir, exist_ok=True)
         backup_path = os.path.join(backup_dir, f'log_audit_backfill_{what}_{now}.json')
@@ -144,3 +150,37 @@ class Command(BaseCommand):
             self.stderr.write(f'Failed writing backup file: {e}')
 
         self.stdout.write(f'Processed {processed} rows, modified {len(modified)} rows. apply={do_apply}, dry_run={dry}')
+
+    def _backfill_idempleado(self, limit, do_apply, batch_size):
+        """Completa Log_auditoria.idempleado por lotes: un in_bulk por modelo referenciado y un bulk_update."""
+        from nucleo.models import Log_auditoria
+        from nucleo.logic.referencias_auditoria import ReferenciasAuditoria
+
+        pendientes = Log_auditoria.objects.filter(idempleado__isnull=True).order_by('id')
+        total = pendientes.count()
+        if limit and limit > 0:
+            total = min(total, limit)
+        self.stdout.write(f'Found {total} logs without idempleado')
+
+        ultimo_id = 0
+        processed = resolved = 0
+        while processed < total:
+            lote = list(
+                pendientes.filter(id__gt=ultimo_id).only('id', 'nombre_tabla', 'idregistro', 'cambio')[:min(batch_size, total - processed)]
+            )
+            if not lote:
+                break
+            ultimo_id = lote[-1].id
+            processed += len(lote)
+            referencias = ReferenciasAuditoria.de_logs(lote)
+            completos = []
+            for log in lote:
+                log.idempleado = referencias.idempleado_de(log)
+                if log.idempleado is not None:
+                    completos.append(log)
+            resolved += len(completos)
+            if do_apply and completos:
+                with transaction.atomic():
+                    Log_auditoria.objects.bulk_update(completos, ['idempleado'])
+
+        self.stdout.write(f'Processed {processed} rows, resolved idempleado for {resolved} rows. apply={do_apply}')
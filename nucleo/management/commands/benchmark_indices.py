@@ -0,0 +1,144 @@
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from nucleo.logic.colisiones import rango_cerrado
+from nucleo.models import (
+    Empleado, Estado_lic_vac, EstadoCivil, Localidad, Log_auditoria, Nacionalidad, Provincia, Sexo,
+    Solicitud_licencia, Solicitud_vacaciones, Tipo_licencia,
+)
+
+# Índices creados por la migración 0008 (los *_gist/_pendientes_idx sólo existen en PostgreSQL)
+INDICES = (
+    (Solicitud_licencia, ('sol_lic_emp_fechas_idx', 'sol_lic_estado_desde_idx', 'sol_lic_rango_gist', 'sol_lic_pendientes_idx')),
+    (Solicitud_vacaciones, ('sol_vac_emp_fechas_idx', 'sol_vac_estado_desde_idx', 'sol_vac_rango_gist', 'sol_vac_pendientes_idx')),
+    (Log_auditoria, ('log_aud_tabla_reg_acc_idx', 'log_aud_fecha_idx')),
+)
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Carga un set de datos sintético (por defecto 100k filas por tabla), muestra los planes de las '
+        'consultas calientes con y sin los índices de la migración 0008 y deshace todo al terminar. '
+        'Bloquea las tablas durante la ejecución: usar contra una base de prueba.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=100000)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                ctx = self._sembrar(options['filas'], random.Random(options['seed']))
+                if connection.vendor == 'postgresql':
+                    with connection.cursor() as cursor:
+                        for modelo, _ in INDICES:
+                            cursor.execute(f'ANALYZE {connection.ops.quote_name(modelo._meta.db_table)}')
+                self._explicar('CON ÍNDICES', ctx)
+                self._borrar_indices()
+                self._explicar('SIN ÍNDICES', ctx)
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(self.style.SUCCESS('Benchmark terminado; datos sintéticos descartados.'))
+
+    def _sembrar(self, filas, rnd):
+        self.stdout.write(f'Sembrando {filas} filas por tabla...')
+        prov = Provincia.objects.create(provincia='Benchmark')
+        localidad = Localidad.objects.create(localidad='Benchmark', provincia=prov)
+        nac, _ = Nacionalidad.objects.get_or_create(nacionalidad='Benchmark')
+        civil, _ = EstadoCivil.objects.get_or_create(estado_civil='Benchmark')
+        sexo, _ = Sexo.objects.get_or_create(sexo='Benchmark')
+        tipo = Tipo_licencia.objects.create(descripcion='Benchmark', dias=None, pago=False)
+        estados = [Estado_lic_vac.objects.get_or_create(estado=e)[0] for e in ('En espera', 'Aceptada', 'Rechazada')]
+
+        cant_empleados = max(1, filas // 100)
+        users = User.objects.bulk_create(
+            [User(username=f'bench_{i}', password='!') for i in range(cant_empleados)], batch_size=1000
+        )
+        empleados = Empleado.objects.bulk_create([
+            Empleado(
+                idempleado=u, nombres='Bench', apellido=f'B{i}', dni=f'B{i:09d}', fecha_nac=date(1990, 1, 1),
+                id_nacionalidad=nac, id_civil=civil, id_sexo=sexo, id_localidad=localidad,
+                dr_personal='', telefono='', cuil=f'B{i:09d}',
+            )
+            for i, u in enumerate(users)
+        ], batch_size=1000)
+
+        inicio = date(2015, 1, 1)
+
+        def rango():
+            desde = inicio + timedelta(days=rnd.randrange(3650))
+            return desde, desde + timedelta(days=rnd.randrange(1, 21))
+
+        lic, vac, logs = [], [], []
+        for i in range(filas):
+            emp = empleados[i % cant_empleados]
+            estado = estados[0] if rnd.random() < 0.05 else rnd.choice(estados[1:])
+            d, h = rango()
+            lic.append(Solicitud_licencia(idempleado=emp, id_licencia=tipo, fecha_desde=d, fecha_hasta=h, id_estado=estado))
+            d, h = rango()
+            vac.append(Solicitud_vacaciones(idempleado=emp, fecha_desde=d, fecha_hasta=h, id_estado=estado, comentario=''))
+            logs.append(Log_auditoria(
+                idusuario=users[0], nombre_tabla=rnd.choice(('Empleado', 'Empleado_el', 'Empleado_eo', 'Solicitud_licencia')),
+                idregistro=rnd.randrange(cant_empleados), accion=rnd.choice(('create', 'update', 'delete')), cambio={},
+            ))
+        Solicitud_licencia.objects.bulk_create(lic, batch_size=5000)
+        Solicitud_vacaciones.objects.bulk_create(vac, batch_size=5000)
+        Log_auditoria.objects.bulk_create(logs, batch_size=5000)
+        return {'empleado': empleados[len(empleados) // 2], 'en_espera': estados[0]}
+
+    def _consultas(self, ctx):
+        desde, hasta = date(2020, 3, 1), date(2020, 3, 15)
+        consultas = {
+            'solapamiento de un empleado (validar_solicitud_licencia)': Solicitud_licencia.objects.filter(
+                idempleado=ctx['empleado'], fecha_desde__lte=hasta, fecha_hasta__gte=desde,
+            ),
+            'vacaciones pendientes de un empleado': Solicitud_vacaciones.objects.filter(
+                idempleado=ctx['empleado'], id_estado=ctx['en_espera'],
+            ),
+            'licencias en espera (gestionar_solicitudes)': Solicitud_licencia.objects.filter(
+                id_estado=ctx['en_espera'],
+            ).order_by('fecha_desde'),
+            'último log de un registro (_create_log_if_new)': Log_auditoria.objects.filter(
+                nombre_tabla='Empleado_el', idregistro=ctx['empleado'].pk, accion='update',
+            ).order_by('-id')[:1],
+            'página del log de auditoría': Log_auditoria.objects.order_by('-fecha_cambio')[:50],
+        }
+        if connection.vendor == 'postgresql':
+            consultas['solapamiento global por daterange (&&)'] = Solicitud_licencia.objects.alias(
+                rango=rango_cerrado(),
+            ).filter(rango__overlap=rango_cerrado(desde, hasta))
+        return consultas
+
+    def _explicar(self, titulo, ctx):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'== {titulo} =='))
+        for nombre, qs in self._consultas(ctx).items():
+            self.stdout.write(self.style.MIGRATE_LABEL(f'-- {nombre}'))
+            if connection.vendor == 'postgresql':
+                self.stdout.write(qs.explain(analyze=True))
+                continue
+            # SQLite cachea la sentencia preparada por texto SQL y no replanifica
+            # tras el DROP INDEX: el comentario fuerza un plan nuevo por fase.
+            sql, params = qs.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql} /* {titulo} */', params)
+                self.stdout.write('\n'.join(' '.join(str(c) for c in fila) for fila in cursor.fetchall()))
+
+    def _borrar_indices(self):
+        existentes = {}
+        with connection.cursor() as cursor:
+            for modelo, _ in INDICES:
+                existentes[modelo] = set(connection.introspection.get_constraints(cursor, modelo._meta.db_table))
+            for modelo, nombres in INDICES:
+                for nombre in nombres:
+                    if nombre in existentes[modelo]:
+                        cursor.execute(f'DROP INDEX {connection.ops.quote_name(nombre)}')
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from nucleo.logic.indices_pendientes import crear_indices_pendientes
+
+
+class Command(BaseCommand):
+    help = (
+        'Crea los índices parciales de PostgreSQL sobre las solicitudes "En espera" '
+        '(sol_lic_pendientes_idx, sol_vac_pendientes_idx) si todavía no existen.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        resultado = crear_indices_pendientes(options['database'])
+        if resultado is None:
+            self.stdout.write('La base no es PostgreSQL: no hay índices parciales que crear.')
+        elif not resultado:
+            raise CommandError('No existe el estado "En espera" en Estado_lic_vac: cargarlo y volver a ejecutar.')
+        else:
+            self.stdout.write(self.style.SUCCESS('Índices de solicitudes en espera creados.'))
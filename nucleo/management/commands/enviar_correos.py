@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from nucleo.logic.correo_saliente import DIAS_RETENCION, enviar_pendientes, purgar_fallidos, reintentar_fallidos
+
+
+class Command(BaseCommand):
+    help = (
+        'Envía los mails del outbox (Correo_saliente) en lotes por una sola conexión SMTP, con reintentos. '
+        'Sin --loop procesa lo pendiente y termina (para cron); con --loop queda corriendo como worker. '
+        'En cada pasada borra los fallidos más viejos que --dias-retencion.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=100, help='Mails por conexión SMTP')
+        parser.add_argument('--loop', action='store_true', help='Seguir corriendo y revisar el outbox periódicamente')
+        parser.add_argument('--intervalo', type=float, default=10, help='--loop: segundos entre revisiones')
+        parser.add_argument('--reintentar-fallidos', action='store_true', dest='reintentar',
+                            help='Antes de enviar, vuelve a encolar los mails que agotaron sus intentos')
+        parser.add_argument('--dias-retencion', type=int, default=DIAS_RETENCION, dest='dias_retencion',
+                            help='Días que se conservan los mails fallidos antes de borrarlos')
+
+    def handle(self, *args, **options):
+        if options['reintentar']:
+            self.stdout.write(f'Reencolados: {reintentar_fallidos()}')
+        while True:
+            purgados = purgar_fallidos(options['dias_retencion'])
+            if purgados:
+                self.stdout.write(f'Fallidos borrados por antigüedad: {purgados}')
+            total_enviados = total_fallidos = 0
+            while True:
+                enviados, fallidos = enviar_pendientes(options['lote'])
+                total_enviados += enviados
+                total_fallidos += fallidos
+                # Un lote incompleto significa que no quedan vencidos; uno con fallas se reintenta más tarde
+                if enviados + fallidos < options['lote'] or fallidos:
+                    break
+            if total_enviados or total_fallidos or not options['loop']:
+                self.stdout.write(f'Enviados: {total_enviados}, fallidos: {total_fallidos}')
+            if not options['loop']:
+                return
+            time.sleep(options['intervalo'])
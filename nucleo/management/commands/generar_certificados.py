@@ -0,0 +1,35 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from nucleo.logic.certificados import generar_lote
+from nucleo.models import Empleado, Sucursal
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera por adelantado los certificados laborales en PDF (cache en MEDIA_ROOT/certificados) de los '
+        'empleados de una sucursal, o de todas con --todas, renderizándolos en un pool de procesos. '
+        'Los certificados vigentes que ya están en disco no se vuelven a generar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sucursal', help='Id o nombre de la sucursal vigente de los empleados')
+        parser.add_argument('--todas', action='store_true', help='Todas las sucursales')
+        parser.add_argument('--procesos', type=int, default=None, help='Procesos del pool (por defecto, uno por CPU)')
+        parser.add_argument('--fecha', type=date.fromisoformat, default=None,
+                            help='Fecha de emisión AAAA-MM-DD (por defecto, hoy)')
+
+    def handle(self, *args, **options):
+        empleados = Empleado.objects.exclude(idempleado_id=1)
+        if options['sucursal']:
+            valor = options['sucursal']
+            filtro = {'pk': int(valor)} if valor.isdigit() else {'sucursal__iexact': valor}
+            sucursal = Sucursal.objects.filter(**filtro).first()
+            if sucursal is None:
+                raise CommandError(f'Sucursal inexistente: {valor}')
+            empleados = empleados.filter(empleado_actual__id_sucursal=sucursal)
+        elif not options['todas']:
+            raise CommandError('Indicar --sucursal o --todas.')
+        generados, existentes = generar_lote(empleados, procesos=options['procesos'], fecha_emision=options['fecha'])
+        self.stdout.write(self.style.SUCCESS(f'Certificados generados: {generados}, ya vigentes: {existentes}.'))
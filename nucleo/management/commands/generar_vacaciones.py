@@ -0,0 +1,35 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from nucleo.logic.generacion_vacaciones import TAMANIO_LOTE, generar_vacaciones_anuales
+
+
+class Command(BaseCommand):
+    help = 'Genera (o actualiza) el otorgamiento anual de vacaciones de toda la plantilla.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, default=date.today().year)
+        parser.add_argument('--dry-run', action='store_true', dest='dry_run',
+                            help='Calcula y muestra los días sin guardar nada.')
+        parser.add_argument('--batch-size', type=int, default=TAMANIO_LOTE, dest='batch_size')
+
+    def handle(self, *args, **options):
+        resultado = generar_vacaciones_anuales(
+            options['year'], dry_run=options['dry_run'], tamanio_lote=options['batch_size']
+        )
+        if options['verbosity'] > 1 or resultado.dry_run:
+            for fila in resultado.filas:
+                emp = fila.empleado
+                self.stdout.write(
+                    f"{emp.pk}\t{emp.apellido}, {emp.nombres}\totorgados={fila.dias_otorgados}"
+                    f"\tconsumidos={fila.dias_consumidos}\tacumulados={fila.dias_acumulados}"
+                )
+        if resultado.dry_run:
+            self.stdout.write(self.style.WARNING(
+                f'Dry run {resultado.year}: {len(resultado.filas)} empleados calculados, no se guardó nada.'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Vacaciones {resultado.year}: {resultado.creados} creadas, {resultado.actualizados} actualizadas.'
+            ))
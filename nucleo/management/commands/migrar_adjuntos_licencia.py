@@ -0,0 +1,29 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from nucleo.logic.adjuntos import migrar_legados
+from nucleo.models import Solicitud_licencia
+
+
+class Command(BaseCommand):
+    help = (
+        'Pasa los adjuntos de licencias guardados con el esquema anterior (media/licencias/<nombre> en el '
+        'directorio de trabajo) al Storage por contenido (adjuntos/<ab>/<sha256> en MEDIA_ROOT) y completa '
+        'archivo y archivo_nombre de cada solicitud.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--origen', default=str(Path(settings.BASE_DIR) / 'media'),
+                            help='Carpeta que contiene licencias/ (por defecto, BASE_DIR/media)')
+        parser.add_argument('--dry-run', action='store_true', dest='dry_run', help='Sólo informar, sin mover nada')
+
+    def handle(self, *args, **options):
+        migradas, faltantes = migrar_legados(
+            Solicitud_licencia.objects.order_by('pk'), options['origen'], aplicar=not options['dry_run'],
+        )
+        for ruta in faltantes:
+            self.stdout.write(self.style.WARNING(f'No se encontró {ruta}'))
+        verbo = 'a migrar' if options['dry_run'] else 'migrados'
+        self.stdout.write(self.style.SUCCESS(f'Adjuntos {verbo}: {migradas}, faltantes: {len(faltantes)}.'))
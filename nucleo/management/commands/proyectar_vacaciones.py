@@ -0,0 +1,31 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from nucleo.logic.dias_vacaciones import proyectar_dias_vacaciones
+from nucleo.logic.generacion_vacaciones import empleados_a_generar
+from nucleo.models import Empleado_actual
+
+
+class Command(BaseCommand):
+    help = 'Proyecta los días de vacaciones de toda la plantilla en una o más fechas de referencia (AAAA-MM-DD).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('fechas', nargs='+')
+
+    def handle(self, *args, **options):
+        try:
+            fechas = [date.fromisoformat(f) for f in options['fechas']]
+        except ValueError as e:
+            raise CommandError(f'Fecha inválida: {e}')
+        actuales = (
+            Empleado_actual.objects.filter(idempleado__in=empleados_a_generar(), id_empleado_el__isnull=False)
+            .select_related('idempleado')
+            .order_by('idempleado__apellido', 'idempleado__nombres')
+        )
+        filas = [(a.idempleado, a.alta_ant or a.fecha_est or a.fecha_el) for a in actuales]
+        proyeccion = proyectar_dias_vacaciones([alta for _, alta in filas], fechas)
+        self.stdout.write('\t'.join(['empleado', 'alta'] + [f.isoformat() for f in fechas]))
+        for i, (emp, alta) in enumerate(filas):
+            dias = [str(proyeccion[f][i]) for f in fechas]
+            self.stdout.write('\t'.join([f'{emp.apellido}, {emp.nombres}', str(alta or '')] + dias))
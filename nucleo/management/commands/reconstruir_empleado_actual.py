@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from nucleo.logic.empleado_actual import reconstruir_empleados_actuales
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye la tabla Empleado_actual (estado laboral vigente) a partir de Empleado_el y Empleado_eo.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, dest='batch_size')
+
+    def handle(self, *args, **options):
+        total = reconstruir_empleados_actuales(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Empleado_actual reconstruida: {total} empleados.'))
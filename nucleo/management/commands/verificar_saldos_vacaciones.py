@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from nucleo.logic.saldo_vacaciones import corregir_saldos, verificar_saldos
+
+
+class Command(BaseCommand):
+    help = (
+        'Reproduce el libro de movimientos de vacaciones y lo compara con Saldo_vacaciones '
+        'y con Vacaciones_otorgadas. Con --corregir reescribe los saldos y agrega movimientos de ajuste.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corregir', action='store_true')
+
+    def handle(self, *args, **options):
+        diferencias_saldo, diferencias_libro = verificar_saldos()
+        for diferencia in diferencias_saldo + diferencias_libro:
+            self.stdout.write(str(diferencia))
+        if not (diferencias_saldo or diferencias_libro):
+            self.stdout.write(self.style.SUCCESS('Libro y saldos de vacaciones consistentes.'))
+            return
+        if options['corregir']:
+            corregir_saldos(diferencias_saldo, diferencias_libro)
+            self.stdout.write(self.style.SUCCESS(
+                f'Corregidos {len(diferencias_saldo)} saldos y {len(diferencias_libro)} periodos del libro.'
+            ))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f'{len(diferencias_saldo)} saldos y {len(diferencias_libro)} periodos del libro no coinciden '
+                '(usar --corregir para repararlos).'
+            ))
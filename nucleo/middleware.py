@@ -0,0 +1,17 @@
+from django.utils.functional import SimpleLazyObject
+
+from nucleo.logic.empleado_request import empleado_de
+
+
+class EmpleadoMiddleware:
+    """Agrega ``request.empleado``: el Empleado del usuario, cargado recién al usarlo.
+
+    Va después de AuthenticationMiddleware (necesita ``request.user``).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.empleado = SimpleLazyObject(lambda: empleado_de(request))
+        return self.get_response(request)
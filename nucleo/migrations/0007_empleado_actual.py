@@ -0,0 +1,58 @@
+# Generated by Django 5.2.3 on 2026-10-18 09:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def cargar_empleados_actuales(apps, schema_editor):
+    """Arma Empleado_actual de los empleados existentes (misma regla que reconstruir_empleados_actuales)."""
+    Empleado_el = apps.get_model('nucleo', 'Empleado_el')
+    Empleado_eo = apps.get_model('nucleo', 'Empleado_eo')
+    Empleado_actual = apps.get_model('nucleo', 'Empleado_actual')
+    els, eos = {}, {}
+    for el in Empleado_el.objects.order_by('idempleado_id', '-fecha_el', '-id').iterator():
+        els.setdefault(el.idempleado_id, el)
+    for eo in Empleado_eo.objects.order_by('idempleado_id', '-fecha_eo', '-id').iterator():
+        eos.setdefault(eo.idempleado_id, eo)
+    filas = []
+    for idempleado_id in sorted(set(els) | set(eos)):
+        el, eo = els.get(idempleado_id), eos.get(idempleado_id)
+        filas.append(Empleado_actual(
+            idempleado_id=idempleado_id,
+            id_empleado_el=el.id if el else None,
+            fecha_el=el.fecha_el if el else None,
+            fecha_est=el.fecha_est if el else None,
+            alta_ant=el.alta_ant if el else None,
+            id_estado_id=el.id_estado_id if el else None,
+            id_convenio_id=el.id_convenio_id if el else None,
+            id_puesto_id=el.id_puesto_id if el else None,
+            id_empleado_eo=eo.id if eo else None,
+            id_sucursal_id=eo.id_sucursal_id if eo else None,
+        ))
+    Empleado_actual.objects.bulk_create(filas, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nucleo', '0006_alter_feriado_fecha'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Empleado_actual',
+            fields=[
+                ('idempleado', models.OneToOneField(db_column='idempleado', on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='nucleo.empleado')),
+                ('id_empleado_el', models.IntegerField(blank=True, null=True)),
+                ('fecha_el', models.DateField(blank=True, null=True)),
+                ('fecha_est', models.DateField(blank=True, null=True)),
+                ('alta_ant', models.DateField(blank=True, null=True)),
+                ('id_empleado_eo', models.IntegerField(blank=True, null=True)),
+                ('id_convenio', models.ForeignKey(blank=True, db_column='id_convenio', null=True, on_delete=django.db.models.deletion.SET_NULL, to='nucleo.convenio')),
+                ('id_estado', models.ForeignKey(blank=True, db_column='id_estado', null=True, on_delete=django.db.models.deletion.SET_NULL, to='nucleo.estado_empleado')),
+                ('id_puesto', models.ForeignKey(blank=True, db_column='id_puesto', null=True, on_delete=django.db.models.deletion.SET_NULL, to='nucleo.puesto')),
+                ('id_sucursal', models.ForeignKey(blank=True, db_column='id_sucursal', null=True, on_delete=django.db.models.deletion.SET_NULL, to='nucleo.sucursal')),
+            ],
+        ),
+        migrations.RunPython(cargar_empleados_actuales, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.3 on 2026-10-18 09:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Índices propios de PostgreSQL (en otros motores se omiten):
+#  - GiST sobre daterange(fecha_desde, fecha_hasta) para los chequeos de solapamiento.
+#  - Parcial sobre las solicitudes "En espera", que es lo que listan los gestores. Depende del
+#    id del estado: en una base nueva (sin datos) lo crean después post_migrate o
+#    manage.py crear_indices_pendientes (ver nucleo.logic.indices_pendientes).
+INDICES_POSTGRES = (
+    ('Solicitud_licencia', 'sol_lic_rango_gist'),
+    ('Solicitud_vacaciones', 'sol_vac_rango_gist'),
+    ('Solicitud_licencia', 'sol_lic_pendientes_idx'),
+    ('Solicitud_vacaciones', 'sol_vac_pendientes_idx'),
+)
+
+
+def crear_indices_postgres(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Estado_lic_vac = apps.get_model('nucleo', 'Estado_lic_vac')
+    en_espera = Estado_lic_vac.objects.filter(estado__iexact='En espera').values_list('id_estado', flat=True).first()
+    for modelo, nombre in INDICES_POSTGRES:
+        tabla = schema_editor.quote_name(apps.get_model('nucleo', modelo)._meta.db_table)
+        if nombre.endswith('_gist'):
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} "
+                f"USING gist (daterange(fecha_desde, fecha_hasta, '[]'))"
+            )
+        elif en_espera is not None:
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} (idempleado, fecha_desde) "
+                f"WHERE id_estado = %s",
+                [en_espera],
+            )
+
+
+def borrar_indices_postgres(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for _modelo, nombre in INDICES_POSTGRES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {nombre}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nucleo', '0007_empleado_actual'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='empleado_el',
+            index=models.Index(fields=['idempleado', '-fecha_el', '-id'], name='empleado_el_emp_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='empleado_eo',
+            index=models.Index(fields=['idempleado', '-fecha_eo', '-id'], name='empleado_eo_emp_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='log_auditoria',
+            index=models.Index(fields=['nombre_tabla', 'idregistro', 'accion'], name='log_aud_tabla_reg_acc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='log_auditoria',
+            index=models.Index(fields=['-fecha_cambio'], name='log_aud_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitud_licencia',
+            index=models.Index(fields=['idempleado', 'fecha_desde', 'fecha_hasta'], name='sol_lic_emp_fechas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitud_licencia',
+            index=models.Index(fields=['id_estado', 'fecha_desde'], name='sol_lic_estado_desde_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitud_vacaciones',
+            index=models.Index(fields=['idempleado', 'fecha_desde', 'fecha_hasta'], name='sol_vac_emp_fechas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitud_vacaciones',
+            index=models.Index(fields=['id_estado', 'fecha_desde'], name='sol_vac_estado_desde_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacaciones_otorgadas',
+            index=models.Index(fields=['idempleado', 'inicio_consumo'], name='vac_otorg_emp_inicio_idx'),
+        ),
+        migrations.RunPython(crear_indices_postgres, borrar_indices_postgres),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def abrir_libro(apps, schema_editor):
+    """Carga los periodos existentes como movimientos iniciales y arma los saldos."""
+    Vacaciones_otorgadas = apps.get_model('nucleo', 'Vacaciones_otorgadas')
+    Movimiento_vacaciones = apps.get_model('nucleo', 'Movimiento_vacaciones')
+    Saldo_vacaciones = apps.get_model('nucleo', 'Saldo_vacaciones')
+    movimientos = []
+    saldos = {}
+    for v in Vacaciones_otorgadas.objects.order_by('pk').iterator():
+        periodo = v.inicio_consumo.year
+        otorgados, consumidos = v.dias_disponibles or 0, v.dias_consumidos or 0
+        if otorgados:
+            movimientos.append(Movimiento_vacaciones(
+                idempleado_id=v.idempleado_id, periodo=periodo, tipo='otorgamiento',
+                dias_otorgados=otorgados, id_vacaciones=v.pk,
+            ))
+        if consumidos:
+            movimientos.append(Movimiento_vacaciones(
+                idempleado_id=v.idempleado_id, periodo=periodo, tipo='consumo',
+                dias_consumidos=consumidos, id_vacaciones=v.pk,
+            ))
+        acumulado = saldos.setdefault((v.idempleado_id, periodo), [0, 0])
+        acumulado[0] += otorgados
+        acumulado[1] += consumidos
+    Movimiento_vacaciones.objects.bulk_create(movimientos, batch_size=1000)
+    Saldo_vacaciones.objects.bulk_create(
+        [
+            Saldo_vacaciones(idempleado_id=emp, periodo=periodo, dias_otorgados=o, dias_consumidos=c)
+            for (emp, periodo), (o, c) in saldos.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nucleo', '0008_indices_filtros'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Movimiento_vacaciones',
+            fields=[
+                ('id_movimiento', models.AutoField(primary_key=True, serialize=False)),
+                ('periodo', models.IntegerField()),
+                ('tipo', models.CharField(choices=[('otorgamiento', 'Otorgamiento'), ('consumo', 'Consumo'), ('cancelacion', 'Cancelación'), ('arrastre', 'Consumo de periodo anterior'), ('ajuste', 'Ajuste')], max_length=20)),
+                ('dias_otorgados', models.IntegerField(default=0)),
+                ('dias_consumidos', models.IntegerField(default=0)),
+                ('id_vacaciones', models.IntegerField(blank=True, null=True)),
+                ('idsolicitudvac', models.IntegerField(blank=True, null=True)),
+                ('fecha', models.DateTimeField(auto_now_add=True)),
+                ('idempleado', models.ForeignKey(db_column='idempleado', on_delete=django.db.models.deletion.CASCADE, to='nucleo.empleado')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['idempleado', 'periodo'], name='mov_vac_emp_periodo_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Saldo_vacaciones',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('periodo', models.IntegerField()),
+                ('dias_otorgados', models.IntegerField(default=0)),
+                ('dias_consumidos', models.IntegerField(default=0)),
+                ('idempleado', models.ForeignKey(db_column='idempleado', on_delete=django.db.models.deletion.CASCADE, to='nucleo.empleado')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('idempleado', 'periodo'), name='saldo_vac_emp_periodo_uniq')],
+            },
+        ),
+        migrations.RunPython(abrir_libro, migrations.RunPython.noop),
+    ]
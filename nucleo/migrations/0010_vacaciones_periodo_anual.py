@@ -0,0 +1,40 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:10
+
+from django.db import migrations, models
+
+
+def marcar_periodos_anuales(apps, schema_editor):
+    """Marca como anual el primer periodo 01/01-31/12 de cada empleado y año."""
+    Vacaciones_otorgadas = apps.get_model('nucleo', 'Vacaciones_otorgadas')
+    vistos = set()
+    marcados = []
+    for v in Vacaciones_otorgadas.objects.filter(inicio_consumo__month=1, inicio_consumo__day=1).order_by('pk'):
+        anio = v.inicio_consumo.year
+        if v.fin_consumo.month != 12 or v.fin_consumo.day != 31 or v.fin_consumo.year != anio:
+            continue
+        if (v.idempleado_id, anio) in vistos:
+            continue
+        vistos.add((v.idempleado_id, anio))
+        v.periodo_anual = anio
+        marcados.append(v)
+    Vacaciones_otorgadas.objects.bulk_update(marcados, ['periodo_anual'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nucleo', '0009_libro_vacaciones'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacaciones_otorgadas',
+            name='periodo_anual',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='vacaciones_otorgadas',
+            constraint=models.UniqueConstraint(fields=('idempleado', 'periodo_anual'), name='vac_otorg_emp_anual_uniq'),
+        ),
+        migrations.RunPython(marcar_periodos_anuales, migrations.RunPython.noop),
+    ]
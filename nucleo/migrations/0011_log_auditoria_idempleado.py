@@ -0,0 +1,48 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Índices GIN (sólo PostgreSQL) sobre el JSONB del cambio: uno sobre el documento
+# completo (payloads de altas: ``cambio ? campo`` / ``cambio @> {...}``) y otro
+# sobre ``cambio -> 'changed'`` (diffs de modificaciones).
+INDICES_POSTGRES = (
+    ('log_aud_cambio_gin', '(cambio)'),
+    ('log_aud_cambio_changed_gin', "((cambio -> 'changed'))"),
+)
+
+
+def crear_indices_postgres(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    tabla = schema_editor.quote_name(apps.get_model('nucleo', 'Log_auditoria')._meta.db_table)
+    for nombre, expresion in INDICES_POSTGRES:
+        schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} USING gin {expresion}")
+
+
+def borrar_indices_postgres(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nombre, _expresion in INDICES_POSTGRES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {nombre}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nucleo', '0010_vacaciones_periodo_anual'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='log_auditoria',
+            name='idempleado',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='log_auditoria',
+            index=models.Index(fields=['idempleado', '-fecha_cambio'], name='log_aud_empleado_idx'),
+        ),
+        migrations.RunPython(crear_indices_postgres, borrar_indices_postgres),
+    ]
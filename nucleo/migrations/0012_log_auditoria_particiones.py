@@ -0,0 +1,112 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:40
+
+from datetime import datetime, timezone
+
+from django.db import migrations
+
+# Sólo PostgreSQL: convierte nucleo_log_auditoria en una tabla particionada por
+# rango mensual de fecha_cambio (ver nucleo.logic.particiones_auditoria). La
+# clave primaria pasa a ser (id, fecha_cambio), como exige PostgreSQL; id sigue
+# saliendo de una secuencia. Se crean particiones desde el mes más antiguo con
+# datos hasta MESES_ADELANTE meses después del actual, más una partición default.
+MESES_ADELANTE = 3
+
+
+def _mes_siguiente(anio, mes):
+    return (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+
+
+def _definiciones(cursor, tabla):
+    """Índices (salvo la PK) y FKs de ``tabla``, para recrearlos sobre la tabla nueva."""
+    cursor.execute(
+        "SELECT pg_get_indexdef(indexrelid) FROM pg_index WHERE indrelid = to_regclass(%s) AND NOT indisprimary",
+        [tabla],
+    )
+    indices = [fila[0] for fila in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+        [tabla],
+    )
+    return indices, cursor.fetchall()
+
+
+def _reemplazar(cursor, q, tabla, nueva, indices, fks):
+    """Borra ``tabla``, renombra ``nueva`` a su nombre y recrea índices y FKs."""
+    cursor.execute(f"DROP TABLE {q(tabla)}")
+    cursor.execute(f"ALTER TABLE {q(nueva)} RENAME TO {q(tabla)}")
+    cursor.execute(f"ALTER TABLE {q(tabla)} RENAME CONSTRAINT {q(nueva + '_pkey')} TO {q(tabla + '_pkey')}")
+    cursor.execute(f"ALTER SEQUENCE {q(nueva + '_id_seq')} RENAME TO {q(tabla + '_id_seq')}")
+    cursor.execute(f"ALTER SEQUENCE {q(tabla + '_id_seq')} OWNED BY {q(tabla)}.id")
+    for definicion in indices:
+        cursor.execute(definicion)
+    for nombre, definicion in fks:
+        cursor.execute(f"ALTER TABLE {q(tabla)} ADD CONSTRAINT {q(nombre)} {definicion}")
+
+
+def _secuencia(cursor, q, tabla, nueva):
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {q(nueva)}")
+    siguiente = cursor.fetchone()[0]
+    cursor.execute(f"CREATE SEQUENCE {q(nueva + '_id_seq')} START WITH {int(siguiente)}")
+    cursor.execute(f"ALTER TABLE {q(nueva)} ALTER COLUMN id SET DEFAULT nextval('{nueva}_id_seq')")
+
+
+def particionar(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    q = schema_editor.quote_name
+    tabla = apps.get_model('nucleo', 'Log_auditoria')._meta.db_table
+    nueva = f'{tabla}_nueva'
+    with schema_editor.connection.cursor() as cursor:
+        indices, fks = _definiciones(cursor, tabla)
+        cursor.execute(
+            f"CREATE TABLE {q(nueva)} (LIKE {q(tabla)} INCLUDING DEFAULTS) PARTITION BY RANGE (fecha_cambio)"
+        )
+        cursor.execute(f"ALTER TABLE {q(nueva)} ALTER COLUMN id DROP DEFAULT")
+        cursor.execute(f"ALTER TABLE {q(nueva)} ADD CONSTRAINT {q(nueva + '_pkey')} PRIMARY KEY (id, fecha_cambio)")
+
+        cursor.execute(f"SELECT MIN(fecha_cambio) FROM {q(tabla)}")
+        hoy = datetime.now(timezone.utc)
+        primera = cursor.fetchone()[0] or hoy
+        anio, mes = primera.year, primera.month
+        hasta = (hoy.year * 12 + hoy.month - 1) + MESES_ADELANTE
+        while anio * 12 + mes - 1 <= hasta:
+            siguiente = _mes_siguiente(anio, mes)
+            cursor.execute(
+                f"CREATE TABLE {q(f'{tabla}_p{anio:04d}_{mes:02d}')} PARTITION OF {q(nueva)} "
+                f"FOR VALUES FROM (%s) TO (%s)",
+                [datetime(anio, mes, 1, tzinfo=timezone.utc), datetime(*siguiente, 1, tzinfo=timezone.utc)],
+            )
+            anio, mes = siguiente
+        cursor.execute(f"CREATE TABLE {q(tabla + '_pdefault')} PARTITION OF {q(nueva)} DEFAULT")
+
+        cursor.execute(f"INSERT INTO {q(nueva)} SELECT * FROM {q(tabla)}")
+        _secuencia(cursor, q, tabla, nueva)
+        _reemplazar(cursor, q, tabla, nueva, indices, fks)
+
+
+def desparticionar(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    q = schema_editor.quote_name
+    tabla = apps.get_model('nucleo', 'Log_auditoria')._meta.db_table
+    nueva = f'{tabla}_nueva'
+    with schema_editor.connection.cursor() as cursor:
+        indices, fks = _definiciones(cursor, tabla)
+        cursor.execute(f"CREATE TABLE {q(nueva)} (LIKE {q(tabla)} INCLUDING DEFAULTS)")
+        cursor.execute(f"ALTER TABLE {q(nueva)} ALTER COLUMN id DROP DEFAULT")
+        cursor.execute(f"ALTER TABLE {q(nueva)} ADD CONSTRAINT {q(nueva + '_pkey')} PRIMARY KEY (id)")
+        cursor.execute(f"INSERT INTO {q(nueva)} SELECT * FROM {q(tabla)}")
+        _secuencia(cursor, q, tabla, nueva)
+        # DROP TABLE de la particionada borra también sus particiones
+        _reemplazar(cursor, q, tabla, nueva, indices, fks)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nucleo', '0011_log_auditoria_idempleado'),
+    ]
+
+    operations = [
+        migrations.RunPython(particionar, desparticionar),
+    ]
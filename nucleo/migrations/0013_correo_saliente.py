@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nucleo', '0012_log_auditoria_particiones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Correo_saliente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asunto', models.CharField(max_length=255)),
+                ('mensaje', models.TextField()),
+                ('remitente', models.CharField(max_length=254)),
+                ('destinatarios', models.JSONField()),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('fallido', 'Fallido')], default='pendiente', max_length=20)),
+                ('intentos', models.PositiveIntegerField(default=0)),
+                ('proximo_intento', models.DateTimeField()),
+                ('ultimo_error', models.TextField(blank=True, default='')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['estado', 'proximo_intento'], name='correo_estado_proximo_idx')],
+            },
+        ),
+    ]
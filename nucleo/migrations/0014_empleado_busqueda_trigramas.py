@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# Búsqueda de empleados (sólo PostgreSQL): texto normalizado de nombre, apellido,
+# DNI y CUIL (sin acentos, en minúsculas y los documentos sólo con dígitos) y un
+# índice GIN de trigramas sobre esa expresión, que resuelve ``LIKE '%...%'``.
+# unaccent() no es IMMUTABLE, por eso se envuelve en una función propia con el
+# diccionario explícito (requisito para usarla en un índice).
+SQL_CREAR = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    r"""
+    CREATE OR REPLACE FUNCTION nucleo_empleado_busqueda(nombres text, apellido text, dni text, cuil text)
+    RETURNS text LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT lower(public.unaccent('public.unaccent'::regdictionary, coalesce(nombres, '') || ' ' || coalesce(apellido, '')))
+            || ' ' || regexp_replace(coalesce(dni, ''), '\D', '', 'g')
+            || ' ' || regexp_replace(coalesce(cuil, ''), '\D', '', 'g')
+    $$
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS empleado_busqueda_trgm ON {tabla}
+    USING gin (nucleo_empleado_busqueda(nombres, apellido, dni, cuil) gin_trgm_ops)
+    """,
+)
+SQL_BORRAR = (
+    "DROP INDEX IF EXISTS empleado_busqueda_trgm",
+    "DROP FUNCTION IF EXISTS nucleo_empleado_busqueda(text, text, text, text)",
+)
+
+
+def crear_busqueda_postgres(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    tabla = schema_editor.quote_name(apps.get_model('nucleo', 'Empleado')._meta.db_table)
+    for sql in SQL_CREAR:
+        schema_editor.execute(sql.replace('{tabla}', tabla))
+
+
+def borrar_busqueda_postgres(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in SQL_BORRAR:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nucleo', '0013_correo_saliente'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_busqueda_postgres, borrar_busqueda_postgres),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nucleo', '0014_empleado_busqueda_trigramas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='solicitud_licencia',
+            name='archivo_nombre',
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+    ]
@@ -1,2 +1,3 @@
 from .empleados import *
-from .licencias import *
\ No newline at end of file
+from .licencias import *
+from .correos import *
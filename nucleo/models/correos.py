@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class Correo_saliente(models.Model):
+    """Mail pendiente de envío (outbox). Lo envía el comando ``enviar_correos``; ver nucleo.logic.correo_saliente."""
+    PENDIENTE = 'pendiente'
+    FALLIDO = 'fallido'
+    ESTADOS = [(PENDIENTE, 'Pendiente'), (FALLIDO, 'Fallido')]
+
+    asunto = models.CharField(max_length=255)
+    mensaje = models.TextField()
+    remitente = models.CharField(max_length=254)
+    destinatarios = models.JSONField()
+    estado = models.CharField(max_length=20, choices=ESTADOS, default=PENDIENTE)
+    intentos = models.PositiveIntegerField(default=0)
+    proximo_intento = models.DateTimeField()
+    ultimo_error = models.TextField(blank=True, default='')
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'proximo_intento'], name='correo_estado_proximo_idx'),
+        ]
+    def __str__(self):
+        return f"Correo {self.id} - {self.asunto} ({self.estado})"
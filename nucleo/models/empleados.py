@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 
 class Nacionalidad(models.Model):
@@ -84,8 +84,16 @@ class Empleado_eo(models.Model):
     )
     class Meta:
         unique_together = ('fecha_eo', 'idempleado')
+        indexes = [
+            # Último registro por empleado: order_by('-fecha_eo', '-id')
+            models.Index(fields=['idempleado', '-fecha_eo', '-id'], name='empleado_eo_emp_fecha_idx'),
+        ]
     def __str__(self):
         return f"Empleado {self.idempleado} EO el {self.fecha_eo} en Suc {self.id_sucursal}"
+    def save(self, *args, **kwargs):
+        # Empleado_actual se actualiza en post_save: misma transacción que este INSERT/UPDATE
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
 
 class Convenio(models.Model):
     id_convenio = models.AutoField(primary_key=True)
@@ -123,6 +131,14 @@ class Log_auditoria(models.Model):
     idregistro = models.IntegerField()
     accion = models.CharField(max_length=40)
     cambio = models.JSONField()
+    # Empleado afectado (desnormalizado desde idregistro/cambio para filtrar sin joins); sin FK para conservar el log
+    idempleado = models.IntegerField(null=True, blank=True)
+    class Meta:
+        indexes = [
+            models.Index(fields=['nombre_tabla', 'idregistro', 'accion'], name='log_aud_tabla_reg_acc_idx'),
+            models.Index(fields=['-fecha_cambio'], name='log_aud_fecha_idx'),
+            models.Index(fields=['idempleado', '-fecha_cambio'], name='log_aud_empleado_idx'),
+        ]
     def __str__(self):
         return f"Log {self.id} - {self.nombre_tabla} - {self.accion}"
 
@@ -148,8 +164,46 @@ class Empleado_el(models.Model):
         Puesto, on_delete=models.PROTECT, db_column='id_puesto', to_field='id_puesto'
     )
     alta_ant = models.DateField()
+    class Meta:
+        indexes = [
+            # Último registro por empleado: order_by('-fecha_el', '-id')
+            models.Index(fields=['idempleado', '-fecha_el', '-id'], name='empleado_el_emp_fecha_idx'),
+        ]
     def __str__(self):
         return f"Empleado_EL {self.idempleado} - Estado: {self.id_estado}, Convenio: {self.id_convenio}, Puesto: {self.id_puesto}"
+    def save(self, *args, **kwargs):
+        # Empleado_actual se actualiza en post_save: misma transacción que este INSERT/UPDATE
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+class Empleado_actual(models.Model):
+    """Foto desnormalizada del último Empleado_el y Empleado_eo de cada empleado.
+
+    Se mantiene desde ``nucleo.signals`` y puede reconstruirse con
+    ``manage.py reconstruir_empleado_actual``.
+    """
+    idempleado = models.OneToOneField(
+        Empleado, on_delete=models.CASCADE, primary_key=True, db_column='idempleado', to_field='idempleado'
+    )
+    id_empleado_el = models.IntegerField(null=True, blank=True)
+    fecha_el = models.DateField(null=True, blank=True)
+    fecha_est = models.DateField(null=True, blank=True)
+    alta_ant = models.DateField(null=True, blank=True)
+    id_estado = models.ForeignKey(
+        Estado_empleado, on_delete=models.SET_NULL, null=True, blank=True, db_column='id_estado', to_field='id_estado'
+    )
+    id_convenio = models.ForeignKey(
+        Convenio, on_delete=models.SET_NULL, null=True, blank=True, db_column='id_convenio', to_field='id_convenio'
+    )
+    id_puesto = models.ForeignKey(
+        Puesto, on_delete=models.SET_NULL, null=True, blank=True, db_column='id_puesto', to_field='id_puesto'
+    )
+    id_empleado_eo = models.IntegerField(null=True, blank=True)
+    id_sucursal = models.ForeignKey(
+        Sucursal, on_delete=models.SET_NULL, null=True, blank=True, db_column='id_sucursal', to_field='id_sucursal'
+    )
+    def __str__(self):
+        return f"Empleado_actual {self.idempleado_id} - Estado: {self.id_estado}, Sucursal: {self.id_sucursal}"
 
 class Estado_laboral(models.Model):
     id_estado = models.AutoField(primary_key=True)
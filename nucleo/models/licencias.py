@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from nucleo.models.empleados import Empleado
 
 class Tipo_licencia(models.Model):
@@ -36,7 +36,16 @@ class Solicitud_licencia(models.Model):
     )
     comentario = models.CharField(max_length=200, blank=True, null=True)
     texto_gestor = models.CharField(max_length=200, blank=True, null=True)
+    # Nombre en el Storage (adjuntos/<ab>/<sha256>, ver nucleo.logic.adjuntos) y nombre original del archivo subido
     archivo = models.CharField(max_length=200, blank=True, null=True)
+    archivo_nombre = models.CharField(max_length=200, blank=True, null=True)
+    class Meta:
+        # Los índices GiST sobre daterange y los parciales de pendientes son
+        # propios de PostgreSQL y se crean en la migración 0008.
+        indexes = [
+            models.Index(fields=['idempleado', 'fecha_desde', 'fecha_hasta'], name='sol_lic_emp_fechas_idx'),
+            models.Index(fields=['id_estado', 'fecha_desde'], name='sol_lic_estado_desde_idx'),
+        ]
     def __str__(self):
         return f"Solicitud {self.idsolicitudlic} - {self.fecha_sqllc}"
 
@@ -52,6 +61,11 @@ class Solicitud_vacaciones(models.Model):
         'nucleo.Estado_lic_vac', on_delete=models.PROTECT, db_column='id_estado', to_field='id_estado'
     )
     comentario = models.CharField(max_length=200)
+    class Meta:
+        indexes = [
+            models.Index(fields=['idempleado', 'fecha_desde', 'fecha_hasta'], name='sol_vac_emp_fechas_idx'),
+            models.Index(fields=['id_estado', 'fecha_desde'], name='sol_vac_estado_desde_idx'),
+        ]
     def __str__(self):
         return f"Solicitud Vacaciones {self.idsolicitudvac}"
 
@@ -64,9 +78,81 @@ class Vacaciones_otorgadas(models.Model):
     fin_consumo = models.DateField()
     dias_disponibles = models.IntegerField()
     dias_consumidos = models.IntegerField()
+    # Año del otorgamiento anual (generar_vacaciones); NULL en los periodos creados al consumir
+    periodo_anual = models.IntegerField(null=True, blank=True)
+    class Meta:
+        indexes = [
+            models.Index(fields=['idempleado', 'inicio_consumo'], name='vac_otorg_emp_inicio_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['idempleado', 'periodo_anual'], name='vac_otorg_emp_anual_uniq'),
+        ]
+    def save(self, *args, **kwargs):
+        # El movimiento y el saldo se registran en pre/post_save: misma transacción que este INSERT/UPDATE
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
     def __str__(self):
         return f"Vacaciones {self.id_vacaciones} - Empleado {self.idempleado}"
 
+class Movimiento_vacaciones(models.Model):
+    """Libro de movimientos de vacaciones (sólo se insertan filas, nunca se modifican).
+
+    Cada cambio de Vacaciones_otorgadas deja un movimiento con la variación de
+    días otorgados y consumidos del periodo (año de ``inicio_consumo``). Se
+    registra desde ``nucleo.signals`` y alimenta a Saldo_vacaciones.
+    """
+    OTORGAMIENTO = 'otorgamiento'
+    CONSUMO = 'consumo'
+    CANCELACION = 'cancelacion'
+    ARRASTRE = 'arrastre'
+    AJUSTE = 'ajuste'
+    TIPOS = [
+        (OTORGAMIENTO, 'Otorgamiento'),
+        (CONSUMO, 'Consumo'),
+        (CANCELACION, 'Cancelación'),
+        (ARRASTRE, 'Consumo de periodo anterior'),
+        (AJUSTE, 'Ajuste'),
+    ]
+    id_movimiento = models.AutoField(primary_key=True)
+    idempleado = models.ForeignKey(
+        Empleado, on_delete=models.CASCADE, db_column='idempleado', to_field='idempleado'
+    )
+    periodo = models.IntegerField()
+    tipo = models.CharField(max_length=20, choices=TIPOS)
+    dias_otorgados = models.IntegerField(default=0)
+    dias_consumidos = models.IntegerField(default=0)
+    # Referencias sin FK: el movimiento debe sobrevivir al borrado del origen
+    id_vacaciones = models.IntegerField(null=True, blank=True)
+    idsolicitudvac = models.IntegerField(null=True, blank=True)
+    fecha = models.DateTimeField(auto_now_add=True)
+    class Meta:
+        indexes = [
+            models.Index(fields=['idempleado', 'periodo'], name='mov_vac_emp_periodo_idx'),
+        ]
+    def __str__(self):
+        return f"{self.get_tipo_display()} {self.periodo} - Empleado {self.idempleado_id}"
+
+class Saldo_vacaciones(models.Model):
+    """Saldo acumulado por empleado y periodo, suma de sus Movimiento_vacaciones.
+
+    Se verifica y reconstruye con ``manage.py verificar_saldos_vacaciones``.
+    """
+    idempleado = models.ForeignKey(
+        Empleado, on_delete=models.CASCADE, db_column='idempleado', to_field='idempleado'
+    )
+    periodo = models.IntegerField()
+    dias_otorgados = models.IntegerField(default=0)
+    dias_consumidos = models.IntegerField(default=0)
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['idempleado', 'periodo'], name='saldo_vac_emp_periodo_uniq'),
+        ]
+    @property
+    def dias_disponibles(self):
+        return max(self.dias_otorgados - self.dias_consumidos, 0)
+    def __str__(self):
+        return f"Saldo {self.periodo} - Empleado {self.idempleado_id}"
+
 class Feriado(models.Model):
     id_feriado = models.AutoField(primary_key=True)
     descripcion = models.CharField(max_length=120)
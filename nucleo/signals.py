@@ -0,0 +1,132 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from nucleo.logic import busqueda_empleados, cache_auditoria, calendario_feriados, indices_pendientes
+from nucleo.logic.catalogos import CATALOGOS, invalidar
+from nucleo.logic.referencias_auditoria import ReferenciasAuditoria
+from nucleo.models import (
+    Convenio, Empleado, Empleado_el, Empleado_eo, Estado_empleado, Feriado, Log_auditoria, Plan_trabajo, Puesto,
+    Sucursal, Vacaciones_otorgadas,
+)
+
+
+@receiver(post_save, sender=Empleado_el)
+@receiver(post_save, sender=Empleado_eo)
+def sincronizar_empleado_actual_al_guardar(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from nucleo.logic.empleado_actual import sincronizar_empleado_actual
+    sincronizar_empleado_actual(instance.idempleado_id)
+
+
+@receiver(post_delete, sender=Empleado_el)
+@receiver(post_delete, sender=Empleado_eo)
+def sincronizar_empleado_actual_al_borrar(sender, instance, **kwargs):
+    from nucleo.logic.empleado_actual import sincronizar_empleado_actual
+    sincronizar_empleado_actual(instance.idempleado_id, crear=False)
+
+
+@receiver(pre_save, sender=Vacaciones_otorgadas)
+def recordar_vacaciones_previas(sender, instance, raw=False, **kwargs):
+    instance._estado_saldo_previo = None
+    if raw or instance.pk is None:
+        return
+    from nucleo.logic.saldo_vacaciones import estado_de
+    previa = sender.objects.filter(pk=instance.pk).first()
+    instance._estado_saldo_previo = estado_de(previa) if previa else None
+
+
+@receiver(post_save, sender=Vacaciones_otorgadas)
+def registrar_movimiento_al_guardar(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from nucleo.logic.saldo_vacaciones import estado_de, registrar_cambio
+    registrar_cambio(getattr(instance, '_estado_saldo_previo', None), estado_de(instance), instance.pk)
+
+
+@receiver(post_delete, sender=Vacaciones_otorgadas)
+def registrar_movimiento_al_borrar(sender, instance, **kwargs):
+    from nucleo.logic.saldo_vacaciones import estado_de, registrar_cambio
+    registrar_cambio(estado_de(instance), None, instance.pk)
+
+
+def invalidar_catalogo(sender, **kwargs):
+    invalidar(sender)
+
+
+for _modelo in CATALOGOS:
+    post_save.connect(invalidar_catalogo, sender=_modelo, dispatch_uid=f'catalogo_save_{_modelo.__name__}')
+    post_delete.connect(invalidar_catalogo, sender=_modelo, dispatch_uid=f'catalogo_delete_{_modelo.__name__}')
+
+
+@receiver(post_save, sender=Feriado)
+@receiver(post_delete, sender=Feriado)
+def invalidar_calendario_feriados(sender, **kwargs):
+    calendario_feriados.invalidar()
+
+
+@receiver(post_save, sender=Empleado)
+@receiver(post_delete, sender=Empleado)
+def invalidar_busqueda_empleados(sender, **kwargs):
+    busqueda_empleados.invalidar()
+
+
+# Tablas cuyos nombres aparecen en el HTML de render_cambio: las de cada empleado
+# invalidan sólo sus entradas, los catálogos invalidan todo
+REFERENCIADAS_POR_EMPLEADO = (Empleado_el, Empleado_eo, Plan_trabajo)
+REFERENCIADAS_EN_AUDITORIA = (Sucursal, Estado_empleado, Puesto, Convenio)
+
+
+@receiver(post_save, sender=Empleado)
+@receiver(post_delete, sender=Empleado)
+def invalidar_html_auditoria_de_empleado(sender, instance, **kwargs):
+    cache_auditoria.invalidar(instance.pk)
+
+
+def invalidar_html_auditoria_de_registro(sender, instance, **kwargs):
+    cache_auditoria.invalidar(instance.idempleado_id)
+
+
+for _modelo in REFERENCIADAS_POR_EMPLEADO:
+    post_save.connect(invalidar_html_auditoria_de_registro, sender=_modelo,
+                      dispatch_uid=f'auditoria_save_{_modelo.__name__}')
+    post_delete.connect(invalidar_html_auditoria_de_registro, sender=_modelo,
+                        dispatch_uid=f'auditoria_delete_{_modelo.__name__}')
+
+
+def invalidar_html_auditoria(sender, **kwargs):
+    cache_auditoria.invalidar()
+
+
+for _modelo in REFERENCIADAS_EN_AUDITORIA:
+    post_save.connect(invalidar_html_auditoria, sender=_modelo, dispatch_uid=f'auditoria_save_{_modelo.__name__}')
+    post_delete.connect(invalidar_html_auditoria, sender=_modelo, dispatch_uid=f'auditoria_delete_{_modelo.__name__}')
+
+
+@receiver(post_save, sender=User)
+def invalidar_html_auditoria_por_usuario(sender, update_fields=None, **kwargs):
+    # El login guarda sólo last_login: no afecta al HTML
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    cache_auditoria.invalidar()
+
+
+@receiver(post_save, sender=Log_auditoria)
+@receiver(post_delete, sender=Log_auditoria)
+def olvidar_html_auditoria(sender, instance, created=False, **kwargs):
+    if not created:
+        cache_auditoria.olvidar(instance)
+
+
+@receiver(pre_save, sender=Log_auditoria)
+def completar_idempleado_log(sender, instance, **kwargs):
+    if instance.idempleado is None:
+        instance.idempleado = ReferenciasAuditoria().idempleado_de(instance)
+
+
+@receiver(post_migrate)
+def completar_indices_pendientes(sender, using='default', **kwargs):
+    # En una base nueva el estado "En espera" se carga después de 0008
+    if sender.name == 'nucleo':
+        indices_pendientes.crear_indices_pendientes(using)
@@ -310,10 +310,15 @@ class GestionReporteLicencias {
             tbodyActual.innerHTML = nuevoTbody.innerHTML;
         }
 
-        const nuevaTablaExport = doc.querySelector('#tabla-licencias-excel tbody');
-        const tablaExportActual = document.querySelector('#tabla-licencias-excel tbody');
-        if (nuevaTablaExport && tablaExportActual) {
-            tablaExportActual.innerHTML = nuevaTablaExport.innerHTML;
+        // Los enlaces de exportación llevan los filtros vigentes en la URL
+        const exportNuevo = doc.querySelector('.export-buttons-group');
+        const exportActual = document.querySelector('.export-buttons-group');
+        if (exportNuevo && exportActual) {
+            exportActual.innerHTML = exportNuevo.innerHTML;
+            // Los botones PDF/Excel (página visible) son nodos nuevos: volver a enlazarlos
+            if (window.exportUtils) {
+                window.exportUtils.bindExportButtons(exportActual);
+            }
         }
 
         const paginacionNueva = doc.querySelector('.paginacion');
@@ -5,6 +5,9 @@ from django.utils.safestring import mark_safe
 from django.db import DatabaseError
 import unicodedata
 
+from nucleo.logic import cache_auditoria, catalogos
+from nucleo.logic.referencias_auditoria import ReferenciasAuditoria
+
 register = template.Library()
 
 
@@ -31,11 +34,20 @@ def accion_label(value):
 
 
 @register.simple_tag
-def render_cambio(log):
+def render_cambio(log, referencias=None):
     """Render user-friendly HTML for the `cambio` field depending on action.
 
-    Usage in template: {% render_cambio l %}
+    The HTML of each log entry is cached (see ``nucleo.logic.cache_auditoria``)
+    and only rebuilt after the referenced names change. ``referencias`` is an
+    optional ``ReferenciasAuditoria`` preloaded for the whole page.
+
+    Usage in template: {% render_cambio l referencias %}
     """
+    return mark_safe(cache_auditoria.html_de(log, lambda l: _render_cambio_html(l, referencias)))
+
+
+def _render_cambio_html(log, referencias=None):
+    refs = referencias or ReferenciasAuditoria()
     accion = getattr(log, 'accion', '') or ''
     cambio = getattr(log, 'cambio', None)
     usuario = getattr(log, 'idusuario', None)
@@ -163,9 +175,7 @@ def render_cambio(log):
             # import model lazily
             try:
                 from nucleo.models import Empleado
-                emp = Empleado.objects.filter(idempleado_id=cid).first()
-                if not emp:
-                    emp = Empleado.objects.filter(pk=cid).first()
+                emp = refs.obtener(Empleado, cid)
                 if emp:
                     n = getattr(emp, 'nombres', '') or ''
                     a = getattr(emp, 'apellido', '') or ''
@@ -317,7 +327,7 @@ def render_cambio(log):
             try:
                 from nucleo.models import Empleado, Empleado_el as _EmpleadoEl
                 if table_name == 'empleado_el':
-                    el = _EmpleadoEl.objects.filter(pk=getattr(log, 'idregistro', None)).first()
+                    el = refs.obtener(_EmpleadoEl, getattr(log, 'idregistro', None))
                     if el and getattr(el, 'idempleado', None):
                         emp = getattr(el, 'idempleado')
                         tn = (getattr(emp, 'nombres', '') or '') + ' ' + (getattr(emp, 'apellido', '') or '')
@@ -325,12 +335,12 @@ def render_cambio(log):
                         if tn:
                             target_display = tn
                 else:
-                    emp = Empleado.objects.filter(pk=getattr(log, 'idregistro', None)).first()
+                    emp = refs.obtener(Empleado, getattr(log, 'idregistro', None))
                     if not emp and isinstance(parsed, dict):
                         cid = parsed.get('idempleado') or parsed.get('id') or parsed.get('idregistro')
                         try:
                             if cid:
-                                emp = Empleado.objects.filter(idempleado_id=int(cid)).first() or Empleado.objects.filter(pk=int(cid)).first()
+                                emp = refs.obtener(Empleado, int(cid))
                         except Exception:
                             emp = None
                     if emp:
@@ -345,7 +355,7 @@ def render_cambio(log):
         if table_name == 'empleado_eo':
             try:
                 from nucleo.models import Empleado as _Empleado, Empleado_eo as _EmpleadoEo, Sucursal as _Sucursal
-                eo_rec = _EmpleadoEo.objects.filter(pk=getattr(log, 'idregistro', None)).first()
+                eo_rec = refs.obtener(_EmpleadoEo, getattr(log, 'idregistro', None))
                 if not target_display and eo_rec and getattr(eo_rec, 'idempleado', None):
                     emp = getattr(eo_rec, 'idempleado')
                     tn = (getattr(emp, 'nombres', '') or '') + ' ' + (getattr(emp, 'apellido', '') or '')
@@ -363,7 +373,7 @@ def render_cambio(log):
                             if not _id:
                                 return 'Sin sucursal'
                             try:
-                                s = _Sucursal.objects.filter(pk=int(_id)).first()
+                                s = catalogos.por_id(_Sucursal, _id)
                                 return getattr(s, 'sucursal', None) or f"#{_id}"
                             except Exception:
                                 return f"#{_id}"
@@ -392,7 +402,7 @@ def render_cambio(log):
                         from nucleo.models import Empleado
                         emp = None
                         try:
-                            emp = Empleado.objects.filter(idempleado_id=int(cid)).first() or Empleado.objects.filter(pk=int(cid)).first()
+                            emp = refs.obtener(Empleado, int(cid))
                         except Exception:
                             emp = None
                         if emp:
@@ -492,7 +502,7 @@ def render_cambio(log):
 
             try:
                 from nucleo.models import Plan_trabajo
-                pt = Plan_trabajo.objects.filter(pk=getattr(log, 'idregistro', None)).first()
+                pt = refs.obtener(Plan_trabajo, getattr(log, 'idregistro', None))
             except Exception:
                 pt = None
 
@@ -809,7 +819,7 @@ def render_cambio(log):
             if not idempleado_val or not suc_id:
                 try:
                     from nucleo.models import Empleado_eo, Sucursal
-                    eo = Empleado_eo.objects.filter(pk=getattr(log, 'idregistro', None)).first()
+                    eo = refs.obtener(Empleado_eo, getattr(log, 'idregistro', None))
                     if eo:
                         if not idempleado_val:
                             idempleado_val = getattr(eo, 'idempleado_id', None)
@@ -824,7 +834,7 @@ def render_cambio(log):
             if suc_id:
                 try:
                     from nucleo.models import Sucursal
-                    suc = Sucursal.objects.filter(pk=suc_id).first()
+                    suc = catalogos.por_id(Sucursal, suc_id)
                     if suc:
                         sucursal_name = getattr(suc, 'sucursal', None)
                 except Exception:
@@ -852,7 +862,7 @@ def render_cambio(log):
             if not idempleado_val or not dias:
                 try:
                     from nucleo.models import Plan_trabajo
-                    pt = Plan_trabajo.objects.filter(pk=getattr(log, 'idregistro', None)).first()
+                    pt = refs.obtener(Plan_trabajo, getattr(log, 'idregistro', None))
                     if pt:
                         if not idempleado_val:
                             idempleado_val = getattr(pt, 'idempleado_id', None)
@@ -918,7 +928,7 @@ def render_cambio(log):
             # try to resolve missing pieces from DB using log.idregistro
             try:
                 from nucleo.models import Empleado_el, Estado_empleado, Puesto, Convenio
-                el = Empleado_el.objects.filter(pk=getattr(log, 'idregistro', None)).first()
+                el = refs.obtener(Empleado_el, getattr(log, 'idregistro', None))
                 if el:
                     if not idempleado_val:
                         idempleado_val = getattr(el, 'idempleado_id', None)
@@ -937,17 +947,17 @@ def render_cambio(log):
             try:
                 from nucleo.models import Estado_empleado as _Estado, Puesto as _Puesto, Convenio as _Convenio
                 if id_estado:
-                    st = _Estado.objects.filter(pk=id_estado).first()
+                    st = catalogos.por_id(_Estado, id_estado)
                     if st:
                         estado_name = getattr(st, 'estado', None)
                 puesto_name = None
                 if id_puesto:
-                    p = _Puesto.objects.filter(pk=id_puesto).first()
+                    p = catalogos.por_id(_Puesto, id_puesto)
                     if p:
                         puesto_name = getattr(p, 'tipo_puesto', None)
                 convenio_name = None
                 if id_convenio:
-                    c = _Convenio.objects.filter(pk=id_convenio).first()
+                    c = catalogos.por_id(_Convenio, id_convenio)
                     if c:
                         convenio_name = getattr(c, 'tipo_convenio', None)
             except Exception:
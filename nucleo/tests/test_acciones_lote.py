@@ -0,0 +1,115 @@
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from nucleo.models import (
+    Correo_saliente, Estado_lic_vac, Tipo_licencia, Solicitud_licencia, Solicitud_vacaciones,
+)
+from nucleo.tests.utils import crear_catalogos, crear_empleado
+
+
+class AccionesEnLoteTest(TestCase):
+    def setUp(self):
+        catalogos = crear_catalogos()
+        self.gestor = User.objects.create_user(username='gestor', password='pass', is_staff=True, email='g@example.com')
+        self.empleados = [
+            crear_empleado(n, catalogos, usuario=usuario, apellido='Test')
+            for n, usuario in enumerate([self.gestor] + [
+                User.objects.create_user(username=f'emp{n}', password='p', email=f'emp{n}@example.com') for n in (1, 2)
+            ])
+        ]
+        self.espera = Estado_lic_vac.objects.create(estado='En espera')
+        Estado_lic_vac.objects.create(estado='Aceptada')
+        Estado_lic_vac.objects.create(estado='Rechazada')
+        self.tipo = Tipo_licencia.objects.create(descripcion='Otra', dias=5, pago=True)
+        self.client.login(username='gestor', password='pass')
+
+    def _licencia(self, empleado, desde, dias=1):
+        inicio = date.today() + timedelta(days=desde)
+        return Solicitud_licencia.objects.create(
+            idempleado=empleado, id_licencia=self.tipo, fecha_desde=inicio,
+            fecha_hasta=inicio + timedelta(days=dias - 1), id_estado=self.espera,
+        )
+
+    def _vacaciones(self, empleado, desde):
+        inicio = date.today() + timedelta(days=desde)
+        return Solicitud_vacaciones.objects.create(
+            idempleado=empleado, fecha_desde=inicio, fecha_hasta=inicio, id_estado=self.espera, comentario='Pedido',
+        )
+
+    def _post(self, accion, seleccion, **extra):
+        return self.client.post(
+            reverse('nucleo:gestionar_estado_solicitudes_lote'),
+            {'accion': accion, 'seleccion': seleccion, **extra},
+            HTTP_ACCEPT='application/json',
+        ).json()['resultados']
+
+    def test_aprobar_lote_valida_contra_un_mismo_snapshot(self):
+        propio, emp1, emp2 = self.empleados
+        primera = self._licencia(emp1, 10, dias=2)
+        solapada = self._licencia(emp1, 11)
+        otra = self._licencia(emp2, 10)
+        vac = self._vacaciones(emp2, 30)
+        mia = self._licencia(propio, 40)
+
+        resultados = self._post('aprobar', [
+            f'licencia:{primera.pk}', f'licencia:{solapada.pk}', f'licencia:{otra.pk}',
+            f'vacacion:{vac.pk}', f'licencia:{mia.pk}', 'licencia:9999',
+        ])
+
+        self.assertEqual([r['ok'] for r in resultados], [True, False, True, True, False, False])
+        self.assertIn('mismo empleado', resultados[1]['mensaje'])
+        self.assertEqual(resultados[2]['advertencias'], ['solapa con licencia/vacaciones aprobada de otro empleado'])
+        self.assertIn('propias solicitudes', resultados[4]['mensaje'])
+        estados = {s.pk: s.id_estado.estado for s in Solicitud_licencia.objects.select_related('id_estado')}
+        self.assertEqual(
+            [estados[s.pk] for s in (primera, solapada, otra, mia)], ['Aceptada', 'Rechazada', 'Aceptada', 'En espera'],
+        )
+        vac.refresh_from_db()
+        self.assertEqual(vac.id_estado.estado, 'Aceptada')
+        self.assertEqual(
+            sorted(c.destinatarios[0] for c in Correo_saliente.objects.all()),
+            ['emp1@example.com', 'emp2@example.com', 'emp2@example.com'],
+        )
+
+    def test_vacacion_aprobada_en_el_lote_cuenta_para_las_licencias_siguientes(self):
+        _, emp1, _ = self.empleados
+        vac = self._vacaciones(emp1, 20)
+        lic = self._licencia(emp1, 20)
+
+        resultados = self._post('aprobar', [f'vacacion:{vac.pk}', f'licencia:{lic.pk}'])
+
+        # Igual que aprobando primero la vacación y después la licencia
+        self.assertEqual([r['ok'] for r in resultados], [True, False])
+        self.assertIn('mismo empleado', resultados[1]['mensaje'])
+        vac.refresh_from_db()
+        lic.refresh_from_db()
+        self.assertEqual((vac.id_estado.estado, lic.id_estado.estado), ('Aceptada', 'Rechazada'))
+
+    def test_rechazar_lote_y_omitir_las_que_no_estan_en_espera(self):
+        _, emp1, emp2 = self.empleados
+        lic = self._licencia(emp1, 5)
+        vac = self._vacaciones(emp2, 5)
+        self._post('aprobar', [f'licencia:{lic.pk}'])
+
+        resultados = self._post('rechazar', [f'licencia:{lic.pk}', f'vacacion:{vac.pk}'], motivo_rechazo='Sin cupo')
+
+        self.assertEqual([r['ok'] for r in resultados], [False, True])
+        vac.refresh_from_db()
+        self.assertEqual((vac.id_estado.estado, vac.comentario), ('Rechazada', 'Pedido - Motivo rechazo: Sin cupo'))
+        lic.refresh_from_db()
+        self.assertEqual(lic.id_estado.estado, 'Aceptada')
+
+    def test_sin_staff_no_aprueba_ni_rechaza_en_lote(self):
+        _, emp1, emp2 = self.empleados
+        lic = self._licencia(emp2, 10)
+        vac = self._vacaciones(emp2, 20)
+        self.client.force_login(emp1.idempleado)
+        for accion in ('aprobar', 'rechazar'):
+            resultados = self._post(accion, [f'licencia:{lic.pk}', f'vacacion:{vac.pk}'])
+            self.assertEqual([r['ok'] for r in resultados], [False, False])
+        lic.refresh_from_db()
+        vac.refresh_from_db()
+        self.assertEqual((lic.id_estado, vac.id_estado), (self.espera, self.espera))
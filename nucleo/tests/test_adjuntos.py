@@ -0,0 +1,101 @@
+import hashlib
+import shutil
+import tempfile
+from datetime import date
+from io import StringIO
+from pathlib import Path
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from nucleo.logic import adjuntos
+from nucleo.models import (
+    Estado_lic_vac, Tipo_licencia, Solicitud_licencia,
+)
+from nucleo.tests.utils import crear_catalogos, crear_empleado
+
+ESCANEO = b'%PDF-1.4 certificado medico ' * 100
+
+
+class AdjuntosLicenciaTest(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        ajuste = override_settings(MEDIA_ROOT=self.media, ADJUNTOS_X_ACCEL_PREFIJO='/_adjuntos/')
+        ajuste.enable()
+        self.addCleanup(ajuste.disable)
+
+        catalogos = crear_catalogos()
+        self.ana, self.beto = [crear_empleado(n, catalogos, nombres=nombre) for n, nombre in ((1, 'Ana'), (2, 'Beto'))]
+        Estado_lic_vac.objects.create(estado='En espera')
+        self.tipo = Tipo_licencia.objects.create(descripcion='Enfermedad', dias=5, pago=True)
+        self.client.force_login(self.ana.idempleado)
+
+    def _solicitar(self, nombre, desde, contenido=ESCANEO):
+        self.client.post(reverse('nucleo:solicitar_licencia'), {
+            'id_licencia': self.tipo.pk, 'fecha_desde': desde, 'fecha_hasta': desde, 'comentario': '',
+            'archivo': SimpleUploadedFile(nombre, contenido, content_type='application/pdf'),
+        })
+        return Solicitud_licencia.objects.latest('pk')
+
+    def test_mismo_contenido_se_guarda_una_vez(self):
+        primera = self._solicitar('certificado.pdf', '2030-03-04')
+        segunda = self._solicitar('escaneo (1).pdf', '2030-03-11')
+        sha256 = hashlib.sha256(ESCANEO).hexdigest()
+        self.assertEqual(primera.archivo, f'adjuntos/{sha256[:2]}/{sha256}')
+        self.assertEqual(segunda.archivo, primera.archivo)
+        self.assertEqual((primera.archivo_nombre, segunda.archivo_nombre), ('certificado.pdf', 'escaneo (1).pdf'))
+
+        # Mismo nombre con otro contenido: otro archivo, sin pisar el primero
+        tercera = self._solicitar('certificado.pdf', '2030-03-18', contenido=b'otro escaneo')
+        self.assertNotEqual(tercera.archivo, primera.archivo)
+        self.assertEqual((Path(self.media) / primera.archivo).read_bytes(), ESCANEO)
+        self.assertEqual(len(list((Path(self.media) / primera.archivo).parent.iterdir())), 1)
+
+    def test_guardar_sin_upload_handler(self):
+        nombre = adjuntos.guardar(SimpleUploadedFile('a.txt', b'hola'))
+        self.assertEqual(nombre, adjuntos.ruta_de(hashlib.sha256(b'hola').hexdigest()))
+        self.assertEqual(adjuntos.guardar(SimpleUploadedFile('b.txt', b'hola')), nombre)
+
+    def test_descarga_por_x_accel_redirect(self):
+        solicitud = self._solicitar('certificado médico.pdf', '2030-03-04')
+        url = reverse('nucleo:adjunto_licencia', args=[solicitud.pk])
+        resp = self.client.get(url)
+        self.assertEqual(resp.content, b'')
+        self.assertEqual(resp['X-Accel-Redirect'], f'/_adjuntos/{solicitud.archivo}')
+        self.assertEqual(resp['Content-Type'], 'application/pdf')
+        self.assertTrue(resp['Content-Disposition'].startswith('attachment;'))
+        self.assertIn("filename*=utf-8''certificado%20m%C3%A9dico.pdf", resp['Content-Disposition'])
+        self.assertEqual(resp['X-Content-Type-Options'], 'nosniff')
+
+        with override_settings(ADJUNTOS_X_ACCEL_PREFIJO=None):
+            resp = self.client.get(url)
+            self.assertEqual(b''.join(resp.streaming_content), ESCANEO)
+            self.assertTrue(resp['Content-Disposition'].startswith('attachment;'))
+            self.assertEqual(resp['X-Content-Type-Options'], 'nosniff')
+
+        # Otro empleado sin permisos de gestor
+        self.client.force_login(self.beto.idempleado)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_adjuntos_anteriores_se_migran_y_los_faltantes_dan_404(self):
+        origen = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, origen, ignore_errors=True)
+        (origen / 'licencias').mkdir()
+        (origen / 'licencias' / 'escaneo.pdf').write_bytes(ESCANEO)
+        campos = {'idempleado': self.ana, 'id_licencia': self.tipo, 'fecha_desde': date(2030, 3, 4),
+                  'fecha_hasta': date(2030, 3, 4), 'id_estado': Estado_lic_vac.objects.get()}
+        vieja = Solicitud_licencia.objects.create(archivo='licencias/escaneo.pdf', **campos)
+        perdida = Solicitud_licencia.objects.create(archivo='licencias/perdido.pdf', **campos)
+        url = reverse('nucleo:adjunto_licencia', args=[perdida.pk])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        salida = StringIO()
+        call_command('migrar_adjuntos_licencia', f'--origen={origen}', stdout=salida)
+        self.assertIn('migrados: 1, faltantes: 1', salida.getvalue())
+        vieja.refresh_from_db()
+        sha256 = hashlib.sha256(ESCANEO).hexdigest()
+        self.assertEqual((vieja.archivo, vieja.archivo_nombre), (adjuntos.ruta_de(sha256), 'escaneo.pdf'))
+        self.assertEqual((Path(self.media) / vieja.archivo).read_bytes(), ESCANEO)
@@ -0,0 +1,67 @@
+import json
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from nucleo.logic.busqueda_auditoria import filtrar_por_fechas
+from nucleo.logic.particiones_auditoria import Mes, ruta_archivo
+from nucleo.models import Log_auditoria
+
+
+class ArchivoLogAuditoriaTest(TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.user = User.objects.create_user(username='tester', password='pass')
+        self.viejos = []
+        for n, fecha in enumerate([datetime(2020, 1, 10, 12, tzinfo=timezone.utc), datetime(2020, 3, 5, 8, tzinfo=timezone.utc)]):
+            log = Log_auditoria.objects.create(
+                idusuario=self.user, nombre_tabla='Empleado', idregistro=100 + n, accion='update',
+                cambio={'id': 100 + n, 'changed': {'apellido': {'old': 'Pérez', 'new': f'Gómez {n}'}}},
+            )
+            Log_auditoria.objects.filter(pk=log.pk).update(fecha_cambio=fecha)
+            self.viejos.append(Log_auditoria.objects.get(pk=log.pk))
+        self.reciente = Log_auditoria.objects.create(
+            idusuario=self.user, nombre_tabla='Empleado', idregistro=200, accion='update', cambio={'changed': {}},
+        )
+
+    def _comando(self, *args):
+        salida = StringIO()
+        call_command('archivar_log_auditoria', *args, '--dir', self.dir, stdout=salida)
+        return salida.getvalue()
+
+    def test_archivar_buscar_y_restaurar(self):
+        self.assertIn('2020-01: se archivaría', self._comando('archivar', '--dry-run'))
+        self.assertEqual(Log_auditoria.objects.count(), 3)
+
+        salida = self._comando('archivar')
+        self.assertIn('2020-03: 1 entradas archivadas', salida)
+        self.assertEqual(list(Log_auditoria.objects.all()), [self.reciente])
+
+        encontrados = [json.loads(l) for l in self._comando('buscar', '--texto', 'gómez 1').splitlines()]
+        self.assertEqual([e['id'] for e in encontrados], [self.viejos[1].pk])
+        self.assertEqual(self._comando('buscar', '--empleado', '100', '--desde', '2020-02'), '')
+
+        self.assertIn('2020-01: 1 entradas restauradas', self._comando('restaurar', '--mes', '2020-01'))
+        restaurado = Log_auditoria.objects.get(pk=self.viejos[0].pk)
+        self.assertEqual(restaurado.fecha_cambio, self.viejos[0].fecha_cambio)
+        self.assertEqual((restaurado.cambio, restaurado.idempleado), (self.viejos[0].cambio, 100))
+        # Restaurar dos veces no duplica
+        self.assertIn('0 entradas restauradas', self._comando('restaurar', '--mes', '2020-01'))
+
+    def test_no_pisa_un_archivo_existente(self):
+        open(ruta_archivo(self.dir, Mes(2020, 1)), 'w').close()
+        with self.assertRaises(Exception):
+            self._comando('archivar')
+        self.assertEqual(Log_auditoria.objects.count(), 3)
+
+    def test_filtro_por_fechas_con_rango(self):
+        logs = Log_auditoria.objects.all()
+        self.assertEqual(list(filtrar_por_fechas(logs, '2020-01-10')), [self.viejos[0]])
+        self.assertEqual(set(filtrar_por_fechas(logs, '2020-01-01', '2020-03-05', rango=True)), set(self.viejos))
+        self.assertEqual(list(filtrar_por_fechas(logs, None, '2020-01-31', rango=True)), [self.viejos[0]])
@@ -77,7 +77,9 @@ class AuditoriaEmpleadoTest(TestCase):
             # include post_data_json so server can recover if session lost
             'post_data_json': json.dumps(post_data),
         }
-        resp2 = self.client.post(url, data=confirm_data)
+        # La auditoría se escribe al confirmar la transacción (on_commit)
+        with self.captureOnCommitCallbacks(execute=True):
+            resp2 = self.client.post(url, data=confirm_data)
         self.assertIn(resp2.status_code, (200, 302))
 
         # Check that a Log_auditoria was created for Empleado_eo (Sucursal change)
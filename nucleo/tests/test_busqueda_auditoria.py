@@ -0,0 +1,68 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from nucleo.logic.busqueda_auditoria import filtrar_por_campo, filtrar_por_empleado
+from nucleo.models import Empleado_eo, Log_auditoria
+from nucleo.tests.utils import crear_catalogos, crear_empleado, crear_sucursales
+
+
+class BusquedaAuditoriaTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='pass', is_staff=True)
+        self.suc_a, self.suc_b = crear_sucursales('Sucursal A', 'Sucursal B')
+        catalogos = crear_catalogos()
+        self.empleados = [
+            crear_empleado(n, catalogos, nombres=nombres, apellido=apellido)
+            for n, (nombres, apellido) in enumerate([('Ana', 'Pérez'), ('Juan', 'Gómez')], start=1)
+        ]
+        ana, juan = self.empleados
+        eo = Empleado_eo.objects.create(idempleado=ana, id_sucursal=self.suc_a)
+        self.log_eo = Log_auditoria.objects.create(
+            idusuario=self.user, nombre_tabla='Empleado_eo', idregistro=eo.pk, accion='update',
+            cambio={'id': ana.pk, 'changed': {'id_sucursal': {'old': self.suc_a.pk, 'new': self.suc_b.pk}}},
+        )
+        self.log_emp = Log_auditoria.objects.create(
+            idusuario=self.user, nombre_tabla='Empleado', idregistro=juan.pk, accion='update',
+            cambio={'id': juan.pk, 'changed': {'telefono': {'old': '', 'new': '4455'}}},
+        )
+        # Registro EO ya borrado: el empleado sale del payload
+        self.log_borrado = Log_auditoria.objects.create(
+            idusuario=self.user, nombre_tabla='Empleado_eo', idregistro=9999, accion='delete',
+            cambio={'idempleado': juan.pk, 'id_sucursal': self.suc_a.pk},
+        )
+
+    def test_idempleado_se_completa_al_guardar(self):
+        ana, juan = self.empleados
+        self.assertEqual(
+            [Log_auditoria.objects.get(pk=l.pk).idempleado for l in (self.log_eo, self.log_emp, self.log_borrado)],
+            [ana.pk, juan.pk, juan.pk],
+        )
+
+    def test_filtros_por_empleado_campo_y_valor(self):
+        logs = Log_auditoria.objects.all()
+        self.assertEqual(set(filtrar_por_empleado(logs, 'gómez')), {self.log_emp, self.log_borrado})
+        self.assertEqual(list(filtrar_por_empleado(logs, str(self.empleados[0].pk))), [self.log_eo])
+        self.assertEqual(list(filtrar_por_campo(logs, 'telefono')), [self.log_emp])
+        self.assertEqual(set(filtrar_por_campo(logs, 'id_sucursal', str(self.suc_a.pk))), {self.log_eo, self.log_borrado})
+        self.assertEqual(list(filtrar_por_campo(logs, 'id_sucursal', str(self.suc_b.pk))), [self.log_eo])
+        self.assertEqual(list(filtrar_por_campo(logs, 'id_sucursal__x')), [])
+
+        self.client.force_login(self.user)
+        with self.assertNumQueries(1):
+            list(filtrar_por_empleado(logs, 'ana'))
+        resp = self.client.get(reverse('nucleo:log_auditoria'), {'modificado': 'Ana', 'campo': 'id_sucursal'})
+        self.assertEqual([l.pk for l in resp.context['logs']], [self.log_eo.pk])
+
+    def test_backfill_completa_idempleado(self):
+        Log_auditoria.objects.update(idempleado=None)
+        call_command('backfill_log_auditoria', '--what', 'idempleado', '--batch-size', '2', stdout=StringIO())
+        self.assertEqual(Log_auditoria.objects.filter(idempleado__isnull=True).count(), 3)
+        salida = StringIO()
+        call_command('backfill_log_auditoria', '--what', 'idempleado', '--batch-size', '2', '--apply', stdout=salida)
+        self.assertIn('resolved idempleado for 3 rows', salida.getvalue())
+        self.assertFalse(Log_auditoria.objects.filter(idempleado__isnull=True).exists())
+        self.assertEqual(Log_auditoria.objects.get(pk=self.log_eo.pk).idempleado, self.empleados[0].pk)
@@ -0,0 +1,86 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from nucleo.logic import busqueda_empleados
+from nucleo.models import (
+    Empleado, Empleado_el, Empleado_eo, Estado_empleado, Convenio, Puesto,
+)
+from nucleo.tests.utils import crear_catalogos, crear_empleado, crear_sucursales
+
+
+class BusquedaEmpleadosTest(TestCase):
+    def setUp(self):
+        admin = User.objects.create_user(username='admin', password='pass', is_staff=True)
+        self.client.login(username='admin', password='pass')
+        self.catalogos = crear_catalogos(sexo='F')
+        self.sucursal, = crear_sucursales('Centro')
+        self.activo = Estado_empleado.objects.create(estado='Activo')
+        self.baja = Estado_empleado.objects.create(estado='Baja')
+        self.convenio = Convenio.objects.create(tipo_convenio='Comercio')
+        self.puesto = Puesto.objects.create(tipo_puesto='Cajero')
+        self.assertEqual(admin.pk, 1)  # excluido del buscador
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ines = self._empleado(1, 'Inés', 'Núñez', '30.111.222', '27-30111222-4')
+            self.ignacio = self._empleado(2, 'Ignacio', 'Borghi', '31222333', '20-31222333-1')
+            self.nunez = self._empleado(3, 'Martín', 'Nunes', '32333444', '20-32333444-5')
+
+    def _empleado(self, n, nombres, apellido, dni, cuil):
+        emp = crear_empleado(n, self.catalogos, nombres=nombres, apellido=apellido, dni=dni, cuil=cuil)
+        Empleado_el.objects.create(
+            idempleado=emp, fecha_el=date(2020, 1, 1), fecha_est=date(2020, 1, 1), id_estado=self.baja,
+            id_convenio=self.convenio, id_puesto=self.puesto, alta_ant=date(2019, 6, 1),
+        )
+        Empleado_el.objects.create(
+            idempleado=emp, fecha_el=date(2022, 1, 1), fecha_est=date(2022, 1, 1), id_estado=self.activo,
+            id_convenio=self.convenio, id_puesto=self.puesto, alta_ant=date(2019, 6, 1),
+        )
+        Empleado_eo.objects.create(idempleado=emp, id_sucursal=self.sucursal, fecha_eo=date(2022, 1, 1))
+        return emp
+
+    def _buscar(self, q):
+        return [e.pk for e in busqueda_empleados.buscar(Empleado.objects.exclude(pk=1), q)]
+
+    def test_sin_acentos_por_documento_y_ordenado_por_parecido(self):
+        self.assertEqual(self._buscar('ines nuñez'), [self.ines.pk])
+        self.assertEqual(self._buscar('NUNE'), [self.nunez.pk, self.ines.pk])
+        self.assertEqual(self._buscar('30111'), [self.ines.pk])
+        self.assertEqual(self._buscar('20-31222333-1'), [self.ignacio.pk])
+        self.assertEqual(self._buscar(str(self.nunez.pk))[0], self.nunez.pk)
+        self.assertEqual(self._buscar('zzz'), [])
+
+    def test_el_indice_se_actualiza_al_modificar_empleados(self):
+        self.assertEqual(self._buscar('gomez'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ignacio.apellido = 'Gómez'
+            self.ignacio.save()
+        self.assertEqual(self._buscar('gomez'), [self.ignacio.pk])
+
+    def test_ajax_consultas_constantes_con_estado_precargado(self):
+        busqueda_empleados.buscar(Empleado.objects.all(), 'calentar')  # índice en memoria ya armado
+        url = reverse('nucleo:buscar_empleados_ajax')
+        with CaptureQueriesContext(connection) as solo_actual:
+            resp = self.client.get(url, {'q': 'n', 'solo_estado_actual': '1', 'vista_ampliada': '1'})
+        filas = resp.json()['empleados']
+        self.assertEqual([f['id'] for f in filas], [self.nunez.pk, self.ines.pk, self.ignacio.pk])
+        fila = filas[1]
+        self.assertEqual(
+            (fila['estado'], fila['puesto'], fila['fecha_antiguedad'], fila['sucursal'], fila['pers_juridica']),
+            ('Activo', 'Cajero', '2019-06-01', 'Centro', 'Empresa X'),
+        )
+
+        with CaptureQueriesContext(connection) as con_historial:
+            resp = self.client.get(url, {'q': 'nu', 'vista_ampliada': '1'})
+        filas = resp.json()['empleados']
+        self.assertEqual(
+            [(f['id'], f['estado'], f['is_historical']) for f in filas],
+            [(self.nunez.pk, 'Activo', False), (self.nunez.pk, 'Baja', True),
+             (self.ines.pk, 'Activo', False), (self.ines.pk, 'Baja', True)],
+        )
+        # Una consulta más que con solo_estado_actual: la del historial laboral de todos los resultados
+        self.assertEqual(len(con_historial), len(solo_actual) + 1)
@@ -0,0 +1,105 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.template import Context, Template
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from nucleo.models import Empleado_eo, Log_auditoria
+from nucleo.tests.utils import crear_catalogos, crear_empleado, crear_sucursales
+
+
+class CacheRenderCambioTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='tester', password='pass')
+        self.suc_a, self.suc_b = crear_sucursales('Sucursal A', 'Sucursal B')
+        self.catalogos = crear_catalogos()
+        self.empleado = crear_empleado(1, self.catalogos, nombres='T', apellido='U')
+        eo = Empleado_eo.objects.create(idempleado=self.empleado, id_sucursal=self.suc_a)
+        self.log = Log_auditoria.objects.create(
+            idusuario=self.user, nombre_tabla='Empleado_eo', idregistro=eo.pk, accion='update',
+            cambio={'changed': {'id_sucursal': {'old': self.suc_a.pk, 'new': self.suc_b.pk}}},
+        )
+        self.template = Template('{% load dict_filters %}{% render_cambio log as html %}{{ html|safe }}')
+
+    def _render(self):
+        log = Log_auditoria.objects.get(pk=self.log.pk)
+        return self.template.render(Context({'log': log}))
+
+    def test_segundo_render_sale_de_la_cache(self):
+        primero = self._render()
+        self.assertIn('Sucursal B', primero)
+        log = Log_auditoria.objects.get(pk=self.log.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            segundo = self.template.render(Context({'log': log}))
+        self.assertEqual(segundo, primero)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_cambio_en_tabla_referenciada_invalida(self):
+        self.assertIn('T U', self._render())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.empleado.nombres = 'Nuevo'
+            self.empleado.save()
+        self.assertIn('Nuevo U', self._render())
+
+    def test_cambio_de_otro_empleado_no_invalida(self):
+        self._render()
+        otro = crear_empleado(2, self.catalogos)
+        with self.captureOnCommitCallbacks(execute=True):
+            otro.nombres = 'Otro'
+            otro.save()
+            Empleado_eo.objects.create(idempleado=otro, id_sucursal=self.suc_b)
+        log = Log_auditoria.objects.get(pk=self.log.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            self.template.render(Context({'log': log}))
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        # Un catálogo sí invalida todas las entradas
+        with self.captureOnCommitCallbacks(execute=True):
+            self.suc_b.sucursal = 'Sucursal Sur'
+            self.suc_b.save()
+        self.assertIn('Sucursal Sur', self._render())
+
+    def test_login_no_invalida(self):
+        self._render()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.login(username='tester', password='pass')
+        log = Log_auditoria.objects.get(pk=self.log.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            self.template.render(Context({'log': log}))
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def _logs_de_empleados_nuevos(self, cantidad, desde):
+        for n in range(desde, desde + cantidad):
+            emp = crear_empleado(n, self.catalogos)
+            eo = Empleado_eo.objects.create(idempleado=emp, id_sucursal=self.suc_a)
+            Log_auditoria.objects.create(
+                idusuario=self.user, nombre_tabla='Empleado_eo', idregistro=eo.pk, accion='update',
+                cambio={'changed': {'id_sucursal': {'old': self.suc_a.pk, 'new': self.suc_b.pk}}},
+            )
+            Log_auditoria.objects.create(
+                idusuario=self.user, nombre_tabla='Empleado', idregistro=emp.pk, accion='update',
+                cambio={'changed': {'telefono': {'old': '', 'new': '123'}}},
+            )
+
+    def _queries_de_la_pagina(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse('nucleo:log_auditoria'))
+        self.assertEqual(resp.status_code, 200)
+        return resp, len(ctx.captured_queries)
+
+    def test_pagina_con_cantidad_constante_de_queries(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+        self._logs_de_empleados_nuevos(1, 100)
+        self._queries_de_la_pagina()  # carga los catálogos en memoria
+        _, pocas = self._queries_de_la_pagina()
+        self._logs_de_empleados_nuevos(8, 200)
+        resp, muchas = self._queries_de_la_pagina()
+        self.assertEqual(pocas, muchas)
+        self.assertEqual(resp.context['log_targets'][self.log.pk], 'U, T (%s)' % self.empleado.pk)
+        self.assertContains(resp, 'N205 A205')
@@ -0,0 +1,55 @@
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.test import TestCase
+
+from nucleo.logic import calendario_feriados
+from nucleo.models import Feriado
+
+
+class CalendarioFeriadosTest(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for fecha in (date(2030, 12, 25), date(2031, 1, 1), date(2031, 1, 6), date(2031, 3, 24)):
+                Feriado.objects.create(descripcion=f'F {fecha}', fecha=fecha)
+
+    def test_consultas_en_memoria(self):
+        calendario_feriados.fechas()
+        with self.assertNumQueries(0):
+            self.assertTrue(calendario_feriados.es_feriado(date(2031, 1, 6)))
+            self.assertFalse(calendario_feriados.es_feriado(date(2031, 1, 7)))
+            self.assertEqual(
+                calendario_feriados.feriados_entre(date(2030, 12, 24), date(2031, 1, 6)),
+                [date(2030, 12, 25), date(2031, 1, 1), date(2031, 1, 6)],
+            )
+            self.assertEqual(calendario_feriados.cantidad_feriados(date(2031, 1, 2), date(2031, 1, 5)), 0)
+            self.assertEqual([f.fecha for f in calendario_feriados.del_anio(2030)], [date(2030, 12, 25)])
+
+    def test_dias_laborables_coincide_con_recorrer_el_rango(self):
+        desde, hasta = date(2030, 12, 20), date(2031, 3, 31)
+        for dias_semana in (range(7), (0, 1, 2, 3, 4), (2,)):
+            esperado = sum(
+                1 for i in range((hasta - desde).days + 1)
+                if (d := desde + timedelta(days=i)).weekday() in dias_semana
+                and d not in {date(2030, 12, 25), date(2031, 1, 1), date(2031, 1, 6), date(2031, 3, 24)}
+            )
+            self.assertEqual(calendario_feriados.dias_laborables(desde, hasta, dias_semana), esperado)
+        self.assertEqual(calendario_feriados.dias_laborables(date(2031, 1, 1), date(2031, 1, 1)), 0)
+
+    def test_signals_invalidan_y_un_rollback_no_deja_feriados(self):
+        self.assertFalse(calendario_feriados.es_feriado(date(2031, 5, 1)))
+        with self.captureOnCommitCallbacks(execute=True):
+            mayo = Feriado.objects.create(descripcion='Trabajador', fecha=date(2031, 5, 1))
+        self.assertTrue(calendario_feriados.es_feriado(date(2031, 5, 1)))
+        with self.captureOnCommitCallbacks(execute=True):
+            mayo.delete()
+        self.assertFalse(calendario_feriados.es_feriado(date(2031, 5, 1)))
+
+        try:
+            with transaction.atomic():
+                Feriado.objects.create(descripcion='Revertido', fecha=date(2031, 7, 9))
+                self.assertTrue(calendario_feriados.es_feriado(date(2031, 7, 9)))
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertFalse(calendario_feriados.es_feriado(date(2031, 7, 9)))
@@ -0,0 +1,57 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from nucleo.logic import catalogos
+from nucleo.models import Estado_lic_vac, Tipo_licencia
+
+
+class CatalogosTest(TestCase):
+    def setUp(self):
+        self.aceptada = Estado_lic_vac.objects.create(estado='Aceptada')
+        self.rechazada = Estado_lic_vac.objects.create(estado='Rechazada')
+
+    def test_busquedas_por_nombre_e_id_sin_queries_repetidas(self):
+        catalogos.todos(Estado_lic_vac)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(catalogos.obtener(Estado_lic_vac, 'aceptada'), self.aceptada)
+            self.assertEqual(catalogos.por_nombre(Estado_lic_vac, ' RECHAZADA '), self.rechazada)
+            self.assertEqual(catalogos.por_id(Estado_lic_vac, str(self.rechazada.pk)), self.rechazada)
+            self.assertIsNone(catalogos.por_nombre(Estado_lic_vac, 'En espera'))
+            self.assertIsNone(catalogos.por_id(Estado_lic_vac, 'x'))
+        self.assertEqual(len(ctx.captured_queries), 0)
+        with self.assertRaises(Estado_lic_vac.DoesNotExist):
+            catalogos.obtener(Estado_lic_vac, 'En espera')
+
+    def test_signals_invalidan(self):
+        self.assertIsNone(catalogos.por_nombre(Estado_lic_vac, 'En espera'))
+        espera = Estado_lic_vac.objects.create(estado='En espera')
+        self.assertEqual(catalogos.por_nombre(Estado_lic_vac, 'en espera'), espera)
+        espera.estado = 'Pendiente'
+        espera.save()
+        self.assertIsNone(catalogos.por_nombre(Estado_lic_vac, 'en espera'))
+        espera.delete()
+        self.assertIsNone(catalogos.por_nombre(Estado_lic_vac, 'pendiente'))
+
+    def test_version_compartida_invalida_otros_procesos(self):
+        vac = Tipo_licencia.objects.create(descripcion='Vacaciones', dias=None, pago=True)
+        self.assertEqual(catalogos.por_nombre(Tipo_licencia, 'vacaciones'), vac)
+        clave = catalogos._clave_version(Tipo_licencia)
+
+        # Otro worker modificó la tabla: este proceso sólo se entera por la versión compartida
+        Tipo_licencia.objects.filter(pk=vac.pk).update(descripcion='Vacaciones anuales')
+        self.assertEqual(catalogos.por_nombre(Tipo_licencia, 'vacaciones'), vac)
+        cache.set(clave, cache.get(clave, 0) + 1, None)
+        self.assertIsNone(catalogos.por_nombre(Tipo_licencia, 'vacaciones'))
+        self.assertEqual(catalogos.por_nombre(Tipo_licencia, 'vacaciones anuales').pk, vac.pk)
+
+        antes = cache.get(clave)
+        with self.captureOnCommitCallbacks(execute=True):
+            catalogos.invalidar(Tipo_licencia)
+        self.assertEqual(cache.get(clave), antes + 1)
+
+    def test_nombres_repetidos_devuelven_el_primero(self):
+        primero = Tipo_licencia.objects.create(descripcion='Estudio', dias=None, pago=False)
+        Tipo_licencia.objects.create(descripcion='estudio', dias=2, pago=True)
+        self.assertEqual(catalogos.por_nombre(Tipo_licencia, 'ESTUDIO'), primero)
@@ -0,0 +1,133 @@
+import re
+import shutil
+import tempfile
+import zlib
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from nucleo.logic import certificados
+from nucleo.models import (
+    Empleado, Empleado_el, Empleado_eo, Estado_empleado, Convenio, Puesto,
+)
+from nucleo.tests.utils import crear_catalogos, crear_empleado, crear_sucursales
+
+EMISION = date(2025, 12, 30)
+
+
+class CertificadosTest(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        ajuste = override_settings(MEDIA_ROOT=self.media)
+        ajuste.enable()
+        self.addCleanup(ajuste.disable)
+
+        User.objects.create_user(username='admin', password='pass', is_staff=True)
+        self.client.login(username='admin', password='pass')
+        catalogos = crear_catalogos(localidad='Rosario', provincia='Santa Fe', sexo='F')
+        self.centro, self.norte = crear_sucursales('Centro', 'Norte')
+        activo = Estado_empleado.objects.create(estado='Activo')
+        self.cajero = Puesto.objects.create(tipo_puesto='Cajero')
+        convenio = Convenio.objects.create(tipo_convenio='CCT430/05')
+        self.empleados = []
+        for n, (apellido, sucursal) in enumerate((('Muñoz', self.centro), ('Benitez', self.centro), ('Castro', self.norte)), start=1):
+            emp = crear_empleado(n, catalogos, apellido=apellido)
+            Empleado_el.objects.create(
+                idempleado=emp, fecha_el=date(2021, 3, 1), fecha_est=date(2021, 3, 1), id_estado=activo,
+                id_convenio=convenio, id_puesto=self.cajero, alta_ant=date(2021, 3, 1),
+            )
+            Empleado_eo.objects.create(idempleado=emp, id_sucursal=sucursal, fecha_eo=date(2021, 3, 1))
+            self.empleados.append(emp)
+
+    def _emp(self, emp):
+        return Empleado.objects.select_related(*certificados.RELACIONES).get(pk=emp.pk)
+
+    def _pdf(self, emp, fecha=EMISION):
+        with certificados.obtener_pdf(self._emp(emp), fecha_emision=fecha) as archivo:
+            return archivo.read()
+
+    def _ruta(self, emp, fecha=EMISION):
+        return certificados.ruta_certificado(emp.pk, certificados.datos_certificado(self._emp(emp), fecha))
+
+    def test_pdf_con_los_datos_del_empleado(self):
+        contenido = self._pdf(self.empleados[0])
+        self.assertTrue(contenido.startswith(b'%PDF-1.4'))
+        self.assertTrue(contenido.rstrip().endswith(b'%%EOF'))
+        inicio = contenido.index(b'stream\n') + len(b'stream\n')
+        texto = zlib.decompress(contenido[inicio:contenido.index(b'\nendstream')])
+        # Un literal por palabra (texto en WinAnsi): se reconstruyen los renglones
+        palabras = [p.decode('cp1252') for p in re.findall(rb'\((.*?)\) Tj', texto)]
+        cuerpo = ' '.join(palabras)
+        for parte in ('N1 Muñoz DNI 00000001', 'Farmacia Gómez de Galarze, Centro', 'cargo de Cajero',
+                      '01/03/2021 , bajo convenio CCT430/05.', '30 de diciembre del año 2025'):
+            self.assertIn(parte, cuerpo)
+
+    def test_cache_por_foto_del_empleado(self):
+        emp = self.empleados[0]
+        contenido = self._pdf(emp)
+        ruta = self._ruta(emp)
+        self.assertEqual(ruta.read_bytes(), contenido)
+        modificado = ruta.stat().st_mtime_ns
+        self.assertEqual(self._pdf(emp), contenido)
+        self.assertEqual(ruta.stat().st_mtime_ns, modificado)
+
+        # La clave no depende de la fecha de emisión, sólo de la foto del empleado
+        siguiente = date(2025, 12, 31)
+        self.assertEqual(self._ruta(emp, siguiente).name.split('_', 1)[1], ruta.name.split('_', 1)[1])
+
+        # Un cambio de puesto cambia la clave; el certificado del mismo día se conserva
+        anterior = Empleado_el.objects.get(idempleado=emp)
+        Empleado_el.objects.create(
+            idempleado=emp, fecha_el=date(2024, 1, 1), fecha_est=date(2021, 3, 1), id_estado=anterior.id_estado,
+            id_convenio=anterior.id_convenio, id_puesto=Puesto.objects.create(tipo_puesto='Encargado'),
+            alta_ant=date(2021, 3, 1),
+        )
+        self._pdf(emp)
+        nueva = self._ruta(emp)
+        self.assertNotEqual(nueva, ruta)
+        self.assertEqual(sorted(nueva.parent.glob('*.pdf')), sorted([ruta, nueva]))
+
+        # Uno de una fecha posterior borra los anteriores
+        self._pdf(emp, siguiente)
+        self.assertEqual(list(nueva.parent.glob('*.pdf')), [self._ruta(emp, siguiente)])
+
+    def test_no_borra_los_generados_por_adelantado(self):
+        emp = self.empleados[0]
+        call_command('generar_certificados', '--todas', '--procesos=1', '--fecha=2025-12-31', stdout=StringIO())
+        adelantado = self._ruta(emp, date(2025, 12, 31))
+        self.assertTrue(adelantado.exists())
+        self._pdf(emp)
+        self.assertTrue(adelantado.exists())
+        self.assertTrue(self._ruta(emp).exists())
+
+    def test_descarga_aunque_otro_proceso_borre_el_archivo(self):
+        emp = self.empleados[1]
+        contenido = self._pdf(emp)
+        archivo = certificados.obtener_pdf(self._emp(emp), fecha_emision=EMISION)
+        self._ruta(emp).unlink()
+        with archivo:
+            self.assertEqual(archivo.read(), contenido)
+
+    def test_descarga_en_una_consulta_de_datos(self):
+        emp = self.empleados[1]
+        resp = self.client.get(reverse('nucleo:descargar_certificado', args=[emp.pk]))
+        self.assertEqual(resp['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(resp.streaming_content).startswith(b'%PDF'))
+        with self.assertNumQueries(1):
+            certificados.datos_certificado(self._emp(emp))
+
+    def test_comando_por_sucursal_con_pool(self):
+        salida = StringIO()
+        call_command('generar_certificados', '--sucursal=centro', '--procesos=2', '--fecha=2025-12-30', stdout=salida)
+        self.assertIn('generados: 2, ya vigentes: 0', salida.getvalue())
+        for emp in self.empleados[:2]:
+            self.assertTrue(self._ruta(emp).exists())
+
+        salida = StringIO()
+        call_command('generar_certificados', '--todas', '--procesos=1', '--fecha=2025-12-30', stdout=salida)
+        self.assertIn('generados: 1, ya vigentes: 2', salida.getvalue())
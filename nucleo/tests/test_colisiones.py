@@ -0,0 +1,103 @@
+import random
+from datetime import date, timedelta
+
+from django.db import connection
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresWrapper
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from nucleo.logic.colisiones import IndiceIntervalos, buscar_colisiones, colisiones_en_lote, rango_cerrado
+from nucleo.models import (
+    Estado_lic_vac, Tipo_licencia, Solicitud_licencia, Solicitud_vacaciones,
+)
+from nucleo.tests.utils import crear_catalogos, crear_empleado
+
+
+class IndiceIntervalosTest(SimpleTestCase):
+    def test_coincide_con_fuerza_bruta(self):
+        rnd = random.Random(7)
+        base = date(2024, 1, 1)
+        intervalos = []
+        for n in range(300):
+            d = base + timedelta(days=rnd.randrange(365))
+            intervalos.append((d, d + timedelta(days=rnd.randrange(30)), n))
+        indice = IndiceIntervalos(intervalos)
+        for _ in range(200):
+            d = base + timedelta(days=rnd.randrange(-10, 380))
+            h = d + timedelta(days=rnd.randrange(20))
+            esperado = sorted(n for (a, b, n) in intervalos if a <= h and b >= d)
+            self.assertEqual(sorted(indice.solapados(d, h)), esperado)
+
+    def test_vacio(self):
+        self.assertEqual(IndiceIntervalos([]).solapados(date(2024, 1, 1), date(2024, 1, 2)), [])
+
+    def test_rango_cerrado_genera_daterange_con_solapamiento(self):
+        # Se compila para PostgreSQL sin conectarse: alcanza con el wrapper del backend
+        pg = PostgresWrapper({**connection.settings_dict, 'ENGINE': 'django.db.backends.postgresql'})
+        qs = Solicitud_licencia.objects.alias(rango=rango_cerrado()).filter(
+            rango__overlap=rango_cerrado(date(2024, 1, 1), date(2024, 1, 5)),
+        )
+        sql, params = qs.query.get_compiler(connection=pg).as_sql()
+        self.assertIn(
+            'daterange("nucleo_solicitud_licencia"."fecha_desde", "nucleo_solicitud_licencia"."fecha_hasta", %s) '
+            '&& (daterange(%s, %s, %s))', sql,
+        )
+        self.assertEqual(list(params), ['[]', date(2024, 1, 1), date(2024, 1, 5), '[]'])
+
+
+class ColisionesTest(TestCase):
+    def setUp(self):
+        catalogos = crear_catalogos()
+        self.empleados = [crear_empleado(n, catalogos) for n in range(3)]
+        self.espera = Estado_lic_vac.objects.create(estado='En espera')
+        self.aceptada = Estado_lic_vac.objects.create(estado='Aceptada')
+        self.rechazada = Estado_lic_vac.objects.create(estado='Rechazada')
+        self.tipo = Tipo_licencia.objects.create(descripcion='Prueba', dias=None, pago=False)
+
+    def _lic(self, emp, desde, hasta, estado):
+        return Solicitud_licencia.objects.create(
+            idempleado=emp, id_licencia=self.tipo, fecha_desde=desde, fecha_hasta=hasta, id_estado=estado
+        )
+
+    def _vac(self, emp, desde, hasta, estado):
+        return Solicitud_vacaciones.objects.create(
+            idempleado=emp, fecha_desde=desde, fecha_hasta=hasta, id_estado=estado, comentario=''
+        )
+
+    def test_buscar_colisiones_respeta_bordes_estados_y_empleado(self):
+        e0, e1, e2 = self.empleados
+        self._lic(e1, date(2025, 3, 10), date(2025, 3, 10), self.aceptada)   # toca el borde inicial
+        self._lic(e1, date(2025, 3, 1), date(2025, 3, 9), self.aceptada)     # termina un día antes
+        self._lic(e2, date(2025, 3, 12), date(2025, 3, 20), self.rechazada)  # estado ignorado
+        self._vac(e2, date(2025, 3, 15), date(2025, 3, 25), self.espera)     # toca el borde final
+        self._vac(e0, date(2025, 3, 11), date(2025, 3, 11), self.aceptada)   # mismo empleado
+
+        with CaptureQueriesContext(connection) as ctx:
+            hits = buscar_colisiones(date(2025, 3, 10), date(2025, 3, 15), excluir_empleado=e0)
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertEqual(
+            [(c.tipo, c.empleado, c.rango_texto()) for c in hits],
+            [('licencia', 'N1 A1', '10/03/2025 - 10/03/2025'), ('vacaciones', 'N2 A2', '15/03/2025 - 25/03/2025')],
+        )
+        propias = buscar_colisiones(date(2025, 3, 10), date(2025, 3, 15), empleado=e0)
+        self.assertEqual([c.idempleado_id for c in propias], [e0.pk])
+        self.assertEqual(buscar_colisiones(date(2025, 3, 10), date(2025, 3, 15), empleado=None), [])
+
+    def test_colisiones_en_lote_equivale_a_consultas_individuales(self):
+        rnd = random.Random(3)
+        estados = [self.espera, self.aceptada, self.rechazada]
+        solicitudes = []
+        for _ in range(40):
+            d = date(2025, 1, 1) + timedelta(days=rnd.randrange(90))
+            h = d + timedelta(days=rnd.randrange(10))
+            crear = self._lic if rnd.random() < 0.5 else self._vac
+            solicitudes.append(crear(rnd.choice(self.empleados), d, h, rnd.choice(estados)))
+        pagina = [s for s in solicitudes if isinstance(s, Solicitud_licencia)][:12]
+
+        with CaptureQueriesContext(connection) as ctx:
+            lote = colisiones_en_lote(pagina)
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+        for s in pagina:
+            esperado = buscar_colisiones(s.fecha_desde, s.fecha_hasta, excluir_empleado=s.idempleado)
+            self.assertEqual(lote.get(s.pk, []), esperado)
@@ -0,0 +1,67 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from nucleo.logic import correo_saliente
+from nucleo.logic.correo_saliente import encolar, enviar_pendientes, reintentar_fallidos
+from nucleo.models import Correo_saliente
+from nucleo.utils_mail import enviar_mail_estado_licencia
+
+
+class CorreoSalienteTest(TestCase):
+    def test_notificacion_se_encola_sin_enviar(self):
+        enviar_mail_estado_licencia('ana@example.com', 'Ana', 'licencia', 'Aceptada')
+        self.assertEqual(len(mail.outbox), 0)
+        correo = Correo_saliente.objects.get()
+        self.assertEqual(correo.destinatarios, ['ana@example.com'])
+        self.assertEqual(correo.asunto, 'Solicitud de licencia aprobada')
+
+    def test_worker_envia_el_lote_por_una_conexion_y_borra_los_enviados(self):
+        for n in range(3):
+            encolar(f'Asunto {n}', 'Cuerpo', [f'u{n}@example.com'])
+        with mock.patch.object(EmailBackend, 'open', autospec=True, return_value=True) as abrir:
+            self.assertEqual(enviar_pendientes(), (3, 0))
+        abrir.assert_called_once()
+        self.assertEqual([m.subject for m in mail.outbox], ['Asunto 0', 'Asunto 1', 'Asunto 2'])
+        self.assertFalse(Correo_saliente.objects.exists())
+
+    def test_reintentos_con_espera_y_dead_letter(self):
+        correo = encolar('Asunto', 'Cuerpo', ['u@example.com'])
+        with mock.patch.object(EmailBackend, 'send_messages', side_effect=OSError('SMTP caído')):
+            self.assertEqual(enviar_pendientes(), (0, 1))
+            correo.refresh_from_db()
+            self.assertEqual((correo.estado, correo.intentos), (Correo_saliente.PENDIENTE, 1))
+            self.assertGreater(correo.proximo_intento, timezone.now())
+            # No vencido todavía: el worker no lo toma
+            self.assertEqual(enviar_pendientes(), (0, 0))
+            for _ in range(correo_saliente.MAX_INTENTOS - 1):
+                Correo_saliente.objects.update(proximo_intento=timezone.now())
+                enviar_pendientes()
+        correo.refresh_from_db()
+        self.assertEqual((correo.estado, correo.intentos), (Correo_saliente.FALLIDO, correo_saliente.MAX_INTENTOS))
+        self.assertIn('SMTP caído', correo.ultimo_error)
+
+        self.assertEqual(reintentar_fallidos(), 1)
+        out = StringIO()
+        call_command('enviar_correos', stdout=out)
+        self.assertIn('Enviados: 1', out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_fallidos_viejos_se_borran(self):
+        viejo, reciente, pendiente = [encolar('Clave', 'Contraseña: x', [f'u{n}@example.com']) for n in range(3)]
+        Correo_saliente.objects.filter(pk__in=[viejo.pk, reciente.pk]).update(estado=Correo_saliente.FALLIDO)
+        Correo_saliente.objects.filter(pk__in=[viejo.pk, pendiente.pk]).update(
+            fecha_creacion=timezone.now() - timedelta(days=correo_saliente.DIAS_RETENCION + 1),
+        )
+        out = StringIO()
+        with mock.patch.object(EmailBackend, 'open', autospec=True, return_value=True):
+            call_command('enviar_correos', stdout=out)
+        self.assertIn('Fallidos borrados por antigüedad: 1', out.getvalue())
+        # El pendiente se envió (y se borró); el fallido reciente se conserva para reintentarlo
+        self.assertEqual(list(Correo_saliente.objects.values_list('pk', flat=True)), [reciente.pk])
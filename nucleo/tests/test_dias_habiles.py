@@ -0,0 +1,53 @@
+from datetime import date, time, timedelta
+
+from django.test import TestCase
+
+from nucleo.logic import calendario_feriados, dias_habiles
+from nucleo.models import Feriado, Plan_trabajo
+from nucleo.tests.utils import crear_catalogos, crear_empleado
+
+
+class DiasHabilesTest(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.feriados = {date(2031, 1, 1), date(2031, 1, 4), date(2031, 2, 12)}
+            for fecha in self.feriados:
+                Feriado.objects.create(descripcion='F', fecha=fecha)
+
+    def _por_recorrido(self, mascara, desde, hasta):
+        dias = [desde + timedelta(days=i) for i in range((hasta - desde).days + 1)]
+        trabajados = [d for d in dias if mascara >> d.weekday() & 1]
+        return (
+            len([d for d in trabajados if d not in self.feriados]),
+            [d for d in dias if not mascara >> d.weekday() & 1],
+            sorted(d for d in dias if d in self.feriados),
+        )
+
+    def test_forma_cerrada_coincide_con_recorrer_el_rango(self):
+        desde = date(2030, 12, 29)
+        for mascara in (0, 0b0011111, 0b1000001, 0b0100100, dias_habiles.TODOS):
+            for largo in (0, 1, 5, 6, 7, 8, 13, 50):
+                for corrimiento in range(7):
+                    inicio = desde + timedelta(days=corrimiento)
+                    fin = inicio + timedelta(days=largo)
+                    resumen = dias_habiles.analizar(mascara, inicio, fin)
+                    self.assertEqual(
+                        (resumen.laborables, resumen.dias_libres, resumen.feriados),
+                        self._por_recorrido(mascara, inicio, fin),
+                    )
+
+    def test_lote_carga_los_planes_en_una_consulta(self):
+        catalogos = crear_catalogos()
+        empleados = [crear_empleado(n, catalogos) for n in (1, 2)]
+        Plan_trabajo.objects.create(
+            idempleado=empleados[0], lunes=True, martes=True, miercoles=True, jueves=True, viernes=True,
+            start_time=time(9, 0), end_time=time(17, 0),
+        )
+        semana = (date(2031, 1, 6), date(2031, 1, 12))
+        calendario_feriados.fechas()  # el calendario ya cargado: sólo queda la consulta de planes
+        with self.assertNumQueries(1):
+            lunes_a_viernes, sin_plan = dias_habiles.analizar_en_lote(
+                [(empleados[0].pk, *semana), (empleados[1].pk, *semana)]
+            )
+        self.assertEqual((lunes_a_viernes.laborables, lunes_a_viernes.dias_libres), (5, [date(2031, 1, 11), date(2031, 1, 12)]))
+        self.assertEqual((sin_plan.laborables, sin_plan.dias_libres), (7, []))
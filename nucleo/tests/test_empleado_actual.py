@@ -0,0 +1,87 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from nucleo.logic.empleado_actual import obtener_empleado_actual
+from nucleo.models import (
+    Empleado_actual, Empleado_el, Empleado_eo, Estado_empleado, Convenio, Puesto,
+)
+from nucleo.tests.utils import crear_catalogos, crear_empleado, crear_sucursales
+
+
+class EmpleadoActualTest(TestCase):
+    def setUp(self):
+        self.centro, self.norte = crear_sucursales('Centro', 'Norte')
+        self.activo = Estado_empleado.objects.create(estado='Activo')
+        self.baja = Estado_empleado.objects.create(estado='Baja')
+        self.convenio = Convenio.objects.create(tipo_convenio='Comercio')
+        self.puesto = Puesto.objects.create(tipo_puesto='Cajero')
+        self.empleado = crear_empleado(1, crear_catalogos())
+
+    def _crear_el(self, estado):
+        return Empleado_el.objects.create(
+            idempleado=self.empleado, id_estado=estado, id_convenio=self.convenio,
+            id_puesto=self.puesto, alta_ant=date(2020, 1, 1),
+        )
+
+    def test_se_actualiza_al_guardar_y_borrar_registros(self):
+        self._crear_el(self.activo)
+        eo = Empleado_eo.objects.create(idempleado=self.empleado, id_sucursal=self.centro)
+        actual = Empleado_actual.objects.get(pk=self.empleado.pk)
+        self.assertEqual(actual.id_estado, self.activo)
+        self.assertEqual(actual.id_sucursal, self.centro)
+
+        baja = self._crear_el(self.baja)
+        eo.id_sucursal = self.norte
+        eo.save()
+        actual.refresh_from_db()
+        self.assertEqual(actual.id_estado, self.baja)
+        self.assertEqual(actual.id_empleado_el, baja.id)
+        self.assertEqual(actual.id_sucursal, self.norte)
+
+        baja.delete()
+        actual.refresh_from_db()
+        self.assertEqual(actual.id_estado, self.activo)
+
+    def test_borrar_empleado_elimina_la_fila(self):
+        self._crear_el(self.activo)
+        self.empleado.delete()
+        self.assertFalse(Empleado_actual.objects.exists())
+
+    def test_lectura_en_una_query(self):
+        self._crear_el(self.activo)
+        Empleado_eo.objects.create(idempleado=self.empleado, id_sucursal=self.centro)
+        with CaptureQueriesContext(connection) as ctx:
+            actual = obtener_empleado_actual(self.empleado)
+            datos = (actual.id_estado.estado, actual.id_puesto.tipo_puesto,
+                     actual.id_convenio.tipo_convenio, actual.id_sucursal.sucursal)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(datos, ('Activo', 'Cajero', 'Comercio', 'Centro'))
+
+    def test_sin_registros_no_se_recalcula_en_cada_lectura(self):
+        self.assertIsNone(obtener_empleado_actual(self.empleado))
+        with self.assertNumQueries(1):
+            self.assertIsNone(obtener_empleado_actual(self.empleado))
+        with self.assertNumQueries(2):
+            self.assertIsNone(obtener_empleado_actual(9999))
+
+        # Al cargar el primer registro la fila vacía se completa
+        self._crear_el(self.activo)
+        self.assertEqual(obtener_empleado_actual(self.empleado).id_estado, self.activo)
+
+    def test_reconstruir_y_generacion_perezosa(self):
+        self._crear_el(self.activo)
+        self._crear_el(self.baja)
+        Empleado_actual.objects.all().delete()
+
+        self.assertEqual(obtener_empleado_actual(self.empleado).id_estado, self.baja)
+
+        Empleado_actual.objects.all().delete()
+        call_command('reconstruir_empleado_actual', stdout=StringIO())
+        actual = Empleado_actual.objects.get(pk=self.empleado.pk)
+        self.assertEqual(actual.id_estado, self.baja)
+        self.assertIsNone(actual.id_sucursal)
@@ -0,0 +1,73 @@
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.sessions.backends.db import SessionStore
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from nucleo.context_processors import empleado_context
+from nucleo.logic.empleado_request import CLAVE_SESION, empleado_de, empleado_id_de
+from nucleo.models import Empleado
+from nucleo.tests.utils import crear_catalogos, crear_empleado
+
+
+class EmpleadoRequestTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='emp', password='pass')
+        self.empleado = crear_empleado(1, crear_catalogos(), usuario=self.user)
+
+    def _consultas_empleado(self, consultas):
+        return [q for q in consultas if 'FROM "nucleo_empleado"' in q['sql']]
+
+    def test_una_sola_consulta_compartida_en_el_request(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        request.session = {}
+        contexto = empleado_context(request)
+        with self.assertNumQueries(1):
+            empleado = empleado_de(request)
+            self.assertEqual(contexto['empleado'].pk, empleado.pk)
+            self.assertEqual(contexto['empleado_id'], self.empleado.pk)
+            self.assertEqual(empleado.id_localidad.provincia.provincia, 'P')
+            self.assertEqual(empleado.id_nacionalidad.nacionalidad, 'Arg')
+        self.assertIs(empleado_de(request), empleado)
+
+    def test_anonimo_no_consulta(self):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        with self.assertNumQueries(0):
+            contexto = empleado_context(request)
+            self.assertFalse(contexto['empleado'])
+            self.assertFalse(contexto['empleado_id'])
+
+    def test_paginas_no_repiten_la_consulta_del_empleado(self):
+        self.client.login(username='emp', password='pass')
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.client.get(reverse('nucleo:mi_perfil')).status_code, 200)
+        self.assertEqual(len(self._consultas_empleado(consultas)), 1)
+
+        # El menú sólo necesita el id, que ya quedó en la sesión
+        with CaptureQueriesContext(connection) as consultas:
+            resp = self.client.get(reverse('nucleo:ver_feriados'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, reverse('nucleo:emitir_certificado', args=[self.empleado.pk]))
+        self.assertEqual(self._consultas_empleado(consultas), [])
+
+    def test_sesion_solo_se_modifica_si_cambia_el_id(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        request.session = SessionStore()
+        empleado_de(request)
+        self.assertEqual(request.session[CLAVE_SESION], self.empleado.pk)
+        request.session.modified = False
+
+        request._empleado_cache = None
+        empleado_de(request)
+        self.assertFalse(request.session.modified)
+
+        # Empleado borrado: el id guardado se descarta
+        Empleado.objects.filter(pk=self.empleado.pk).delete()
+        request._empleado_cache = None
+        self.assertIsNone(empleado_de(request))
+        self.assertNotIn(CLAVE_SESION, request.session)
+        self.assertIsNone(empleado_id_de(request))
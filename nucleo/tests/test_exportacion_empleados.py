@@ -0,0 +1,95 @@
+import csv
+import io
+import zipfile
+from datetime import date, time
+from xml.etree import ElementTree
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from nucleo.logic import exportacion_empleados
+from nucleo.models import (
+    Empleado, Empleado_el, Empleado_eo, Estado_empleado, Convenio, Puesto, Plan_trabajo, Saldo_vacaciones,
+)
+from nucleo.tests.utils import crear_catalogos, crear_empleado, crear_sucursales
+
+NS = {'x': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+
+class ExportacionEmpleadosTest(TestCase):
+    def setUp(self):
+        User.objects.create_user(username='admin', password='pass', is_staff=True)
+        self.client.login(username='admin', password='pass')
+        catalogos = crear_catalogos(localidad='Rosario', provincia='Santa Fe', sexo='F')
+        sucursal, = crear_sucursales('Centro')
+        activo = Estado_empleado.objects.create(estado='Activo')
+        self.empleados = [
+            crear_empleado(
+                n, catalogos, usuario=User.objects.create_user(username=f'e{n}', password='p', email=f'e{n}@x.com'),
+                apellido=apellido, cuil=f'27-{n:08d}-1', fecha_nac=date(1990, 1, n),
+            )
+            for n, apellido in enumerate(('Alvarez', 'Benitez', 'Castro'), start=1)
+        ]
+        primero = self.empleados[0]
+        Empleado_el.objects.create(
+            idempleado=primero, fecha_el=date(2021, 3, 1), fecha_est=date(2021, 3, 1), id_estado=activo,
+            id_convenio=Convenio.objects.create(tipo_convenio='Comercio'),
+            id_puesto=Puesto.objects.create(tipo_puesto='Cajero'), alta_ant=date(2015, 1, 10),
+        )
+        Empleado_eo.objects.create(idempleado=primero, id_sucursal=sucursal, fecha_eo=date(2021, 3, 1))
+        Plan_trabajo.objects.create(
+            idempleado=primero, lunes=True, martes=True, miercoles=True, jueves=True, viernes=True,
+            start_time=time(9, 0), end_time=time(17, 30),
+        )
+        Saldo_vacaciones.objects.create(idempleado=primero, periodo=2030, dias_otorgados=14, dias_consumidos=4)
+
+    def _get(self, **params):
+        return self.client.get(reverse('nucleo:exportar_empleados_excel'), params)
+
+    def test_csv_con_todas_las_columnas(self):
+        resp = self._get(periodo='2030')
+        self.assertTrue(resp.streaming)
+        filas = list(csv.DictReader(io.StringIO(b''.join(resp.streaming_content).decode('utf-8'))))
+        self.assertEqual([f['Apellido'] for f in filas], ['Alvarez', 'Benitez', 'Castro'])
+        alvarez = filas[0]
+        self.assertEqual(
+            [alvarez[c] for c in ('Provincia', 'Estado', 'Puesto', 'Convenio', 'Sucursal', 'Persona jurídica',
+                                  'Fecha de antigüedad', 'Días de trabajo', 'Horario', 'Vacaciones disponibles')],
+            ['Santa Fe', 'Activo', 'Cajero', 'Comercio', 'Centro', 'Empresa X',
+             '2015-01-10', 'Lu Ma Mi Ju Vi', '09:00-17:30', '10'],
+        )
+        self.assertEqual((filas[1]['Estado'], filas[1]['Vacaciones disponibles']), ('', '0'))
+
+    def test_columnas_elegidas_y_desconocidas(self):
+        resp = self._get(columnas='dni,apellido')
+        contenido = b''.join(resp.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(contenido[:2], ['DNI,Apellido', '00000001,Alvarez'])
+        self.assertEqual(self._get(columnas='dni,sueldo').status_code, 400)
+
+    def test_solo_staff(self):
+        self.client.force_login(self.empleados[0].idempleado)
+        self.assertEqual(self._get().status_code, 403)
+
+    def test_xlsx(self):
+        resp = self._get(formato='xlsx', columnas='apellido,fecha_nac,vacaciones_otorgadas', periodo='2030')
+        self.assertEqual(resp['Content-Disposition'], 'attachment; filename="empleados.xlsx"')
+        libro = zipfile.ZipFile(io.BytesIO(b''.join(resp.streaming_content)))
+        self.assertIsNone(libro.testzip())
+        hoja = ElementTree.fromstring(libro.read('xl/worksheets/sheet1.xml'))
+        filas = hoja.findall('.//x:row', NS)
+        self.assertEqual(len(filas), 4)
+        celdas = filas[1].findall('x:c', NS)
+        self.assertEqual(celdas[0].find('x:is/x:t', NS).text, 'Alvarez')
+        self.assertEqual((celdas[1].get('s'), celdas[1].find('x:v', NS).text), ('1', str((date(1990, 1, 1) - date(1899, 12, 30)).days)))
+        self.assertEqual(celdas[2].find('x:v', NS).text, '14')
+
+    def test_consultas_por_bloque(self):
+        columnas = exportacion_empleados.columnas_elegidas([])
+        qs = Empleado.objects.all()
+        # Empleados con su estado vigente en una consulta + planes y saldos por cada uno de los 2 bloques
+        with self.assertNumQueries(5):
+            filas = list(exportacion_empleados.filas(qs, columnas, periodo=2030, tamanio=2))
+        self.assertEqual(len(filas), 3)
+        with self.assertNumQueries(1):
+            list(exportacion_empleados.filas(qs, ['apellido', 'estado', 'sucursal'], tamanio=2))
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from nucleo.logic.reporte_solicitudes import FiltrosReporte, filas_exportacion
+from nucleo.models import (
+    Estado_lic_vac, Tipo_licencia, Solicitud_licencia, Solicitud_vacaciones,
+)
+from nucleo.tests.utils import crear_catalogos, crear_empleado
+
+
+class ExportacionReporteLicenciasTest(TestCase):
+    def setUp(self):
+        admin = User.objects.create_user(username='admin', password='pass', is_staff=True)
+        self.client.force_login(admin)
+        catalogos = crear_catalogos()
+        self.ana, self.beto = [crear_empleado(n, catalogos, nombres=nombre) for n, nombre in ((1, 'Ana'), (2, 'Beto'))]
+        espera = Estado_lic_vac.objects.create(estado='En espera')
+        aceptada = Estado_lic_vac.objects.create(estado='Aceptada')
+        estudio = Tipo_licencia.objects.create(descripcion='Estudio', dias=None, pago=False)
+        self.lic_2016 = Solicitud_licencia.objects.create(
+            idempleado=self.ana, id_licencia=estudio, fecha_desde=date(2016, 3, 1), fecha_hasta=date(2016, 3, 2),
+            id_estado=aceptada,
+        )
+        self.lic_2025 = Solicitud_licencia.objects.create(
+            idempleado=self.beto, id_licencia=estudio, fecha_desde=date(2025, 5, 10), fecha_hasta=date(2025, 5, 10),
+            id_estado=espera, comentario='Final',
+        )
+        self.vac_2025 = Solicitud_vacaciones.objects.create(
+            idempleado=self.ana, fecha_desde=date(2025, 5, 10), fecha_hasta=date(2025, 5, 16), id_estado=aceptada,
+            comentario='Verano',
+        )
+
+    def _get(self, **params):
+        return self.client.get(reverse('nucleo:exportar_reporte_licencias'), params)
+
+    def test_csv_completo_mas_reciente_primero(self):
+        resp = self._get()
+        self.assertTrue(resp.streaming)
+        filas = list(csv.reader(io.StringIO(b''.join(resp.streaming_content).decode('utf-8'))))
+        self.assertEqual(filas[0][:3], ['ID', 'Clase', 'Legajo'])
+        # A igual fecha_desde, la licencia antes que las vacaciones (como en el reporte)
+        self.assertEqual(
+            [(f[1], f[0], f[5], f[8], f[9]) for f in filas[1:]],
+            [('Licencia', str(self.lic_2025.pk), 'Estudio', '1', 'En espera'),
+             ('Vacaciones', str(self.vac_2025.pk), 'Vacaciones', '7', 'Aceptada'),
+             ('Licencia', str(self.lic_2016.pk), 'Estudio', '2', 'Aceptada')],
+        )
+
+    def test_jsonl_con_los_filtros_del_reporte(self):
+        resp = self._get(formato='jsonl', anio='2025', estado='aceptada')
+        self.assertEqual(resp['Content-Disposition'], 'attachment; filename="licencias.jsonl"')
+        filas = [json.loads(linea) for linea in b''.join(resp.streaming_content).decode('utf-8').splitlines()]
+        self.assertEqual(filas, [{
+            'id': self.vac_2025.pk, 'clase': 'Vacaciones', 'idempleado': self.ana.pk, 'apellido': 'A1',
+            'nombres': 'Ana', 'tipo': 'Vacaciones', 'fecha_desde': '2025-05-10', 'fecha_hasta': '2025-05-16',
+            'dias': 7, 'estado': 'Aceptada', 'comentario': 'Verano', 'fecha_solicitud': date.today().isoformat(),
+        }])
+
+        resp = self._get(formato='jsonl', empleado='beto', fecha_desde='2025-05-01', fecha_hasta='2025-05-31', fecha_rango='1')
+        self.assertEqual([json.loads(linea)['id'] for linea in b''.join(resp.streaming_content).splitlines()], [self.lic_2025.pk])
+
+    def test_una_sola_consulta_y_solo_gestores(self):
+        licencias, vacaciones = FiltrosReporte().aplicar(Solicitud_licencia.objects.all(), Solicitud_vacaciones.objects.all())
+        with self.assertNumQueries(1):
+            self.assertEqual(len(list(filas_exportacion(licencias, vacaciones, tamanio_lote=1))), 3)
+
+        self.client.force_login(self.ana.idempleado)
+        self.assertEqual(self._get().status_code, 403)
+
+    def test_botones_del_reporte_exportan_pagina_y_servidor(self):
+        resp = self.client.get(reverse('nucleo:gestion_reporte_licencias'), {'anio': '2025'})
+        url = reverse('nucleo:exportar_reporte_licencias')
+        # PDF/Excel en el cliente sobre la tabla visible, junto a la exportación completa del servidor
+        self.assertContains(resp, 'id="export-licencias-pdf"')
+        self.assertContains(resp, 'data-export-target="#tabla-licencias-completa"', count=2)
+        self.assertContains(resp, f'href="{url}?anio=2025&amp;formato=xlsx"')
+        self.assertContains(resp, f'href="{url}?anio=2025&amp;formato=csv"')
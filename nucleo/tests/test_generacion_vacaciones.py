@@ -0,0 +1,103 @@
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from nucleo.logic.dias_vacaciones import calcular_dias_vacaciones
+from nucleo.logic.generacion_vacaciones import generar_vacaciones_anuales
+from nucleo.logic.saldo_vacaciones import obtener_saldo, verificar_saldos
+from nucleo.models import (
+    Empleado_el, Estado_empleado, Convenio, Puesto, Vacaciones_otorgadas,
+)
+from nucleo.tests.utils import crear_catalogos, crear_empleado
+
+
+class GeneracionVacacionesTest(TestCase):
+    def setUp(self):
+        # El usuario 1 queda reservado para el administrador
+        User.objects.create_user(username='admin', password='p')
+        self.catalogos = crear_catalogos()
+        self.activo = Estado_empleado.objects.create(estado='Activo')
+        self.convenio = Convenio.objects.create(tipo_convenio='Comercio')
+        self.puesto = Puesto.objects.create(tipo_puesto='Cajero')
+        self.creados = 0
+
+    def _crear_empleados(self, cantidad, alta=date(2015, 3, 1)):
+        empleados = []
+        for _ in range(cantidad):
+            self.creados += 1
+            n = self.creados
+            emp = crear_empleado(n, self.catalogos)
+            Empleado_el.objects.create(
+                idempleado=emp, id_estado=self.activo, id_convenio=self.convenio, id_puesto=self.puesto, alta_ant=alta,
+            )
+            empleados.append(emp)
+        return empleados
+
+    def test_genera_en_lotes_con_cantidad_constante_de_queries(self):
+        self._crear_empleados(3)
+        with CaptureQueriesContext(connection) as pocos:
+            generar_vacaciones_anuales(2025, tamanio_lote=100)
+        self._crear_empleados(12)
+        with CaptureQueriesContext(connection) as muchos:
+            resultado = generar_vacaciones_anuales(2025, tamanio_lote=100)
+        self.assertEqual(len(pocos.captured_queries), len(muchos.captured_queries))
+        self.assertEqual((resultado.creados, resultado.actualizados), (12, 3))
+        esperados = calcular_dias_vacaciones(date(2015, 3, 1), date(2025, 12, 31))
+        self.assertEqual(
+            set(Vacaciones_otorgadas.objects.filter(periodo_anual=2025).values_list('dias_disponibles', flat=True)),
+            {esperados},
+        )
+        self.assertEqual(verificar_saldos(), ([], []))
+
+    def test_regenerar_conserva_consumidos_y_actualiza_el_saldo(self):
+        emp, = self._crear_empleados(1, alta=date(2023, 3, 1))
+        generar_vacaciones_anuales(2025)
+        vac = Vacaciones_otorgadas.objects.get(idempleado=emp, periodo_anual=2025)
+        self.assertEqual(vac.dias_disponibles, 14)
+        vac.dias_consumidos = 5
+        vac.save()
+
+        Empleado_el.objects.filter(idempleado=emp).update(alta_ant=date(2015, 3, 1))
+        call_command('reconstruir_empleado_actual', stdout=StringIO())
+        resultado = generar_vacaciones_anuales(2025, tamanio_lote=1)
+        vac.refresh_from_db()
+        self.assertEqual((vac.dias_disponibles, vac.dias_consumidos), (28, 5))
+        self.assertEqual(resultado.filas[0].dias_disponibles, 23)
+        saldo = obtener_saldo(emp, 2025)
+        self.assertEqual((saldo.dias_otorgados, saldo.dias_consumidos), (28, 5))
+        self.assertEqual(verificar_saldos(), ([], []))
+
+    def test_comando_dry_run_no_guarda(self):
+        self._crear_empleados(2)
+        salida = StringIO()
+        call_command('generar_vacaciones', '--year', '2025', '--dry-run', stdout=salida)
+        self.assertIn('2 empleados calculados', salida.getvalue())
+        self.assertFalse(Vacaciones_otorgadas.objects.exists())
+
+        call_command('generar_vacaciones', '--year', '2025', stdout=StringIO())
+        self.assertEqual(Vacaciones_otorgadas.objects.filter(periodo_anual=2025).count(), 2)
+
+    def test_vista_genera_y_luego_muestra_lo_generado(self):
+        self._crear_empleados(2)
+        gestor = User.objects.create_user(username='gestor', password='p', is_staff=True)
+        self.client.force_login(gestor)
+        resp = self.client.post(reverse('nucleo:generar_vacaciones'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.context['generado'])
+        self.assertEqual([f['nombre_apellido'] for f in resp.context['empleados']], ['N1 A1', 'N2 A2'])
+
+        resp = self.client.get(reverse('nucleo:generar_vacaciones'))
+        self.assertTrue(resp.context['already_generated'])
+        self.assertEqual(resp.context['empleados'][0]['dias_otorgados'], 28)
+
+    def test_comando_proyeccion(self):
+        self._crear_empleados(1, alta=date(2021, 3, 1))
+        salida = StringIO()
+        call_command('proyectar_vacaciones', '2025-12-31', '2026-12-31', stdout=salida)
+        self.assertIn('A1, N1\t2021-03-01\t14\t21', salida.getvalue())
@@ -0,0 +1,22 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+from nucleo.logic.indices_pendientes import crear_indices_pendientes
+
+
+class IndicesPendientesTest(TestCase):
+    def test_fuera_de_postgres_no_hace_nada(self):
+        salida = StringIO()
+        call_command('crear_indices_pendientes', stdout=salida)
+        self.assertIn('no es PostgreSQL', salida.getvalue())
+
+    def test_sin_estado_en_espera_falla(self):
+        with mock.patch.object(connection, 'vendor', 'postgresql'):
+            self.assertFalse(crear_indices_pendientes())
+            with self.assertRaises(CommandError):
+                call_command('crear_indices_pendientes', stdout=StringIO())
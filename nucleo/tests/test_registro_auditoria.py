@@ -0,0 +1,73 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from nucleo.logic import registro_auditoria
+from nucleo.logic.registro_auditoria import RegistroAuditoria
+from nucleo.models import Empleado_eo, Log_auditoria
+from nucleo.tests.utils import crear_catalogos, crear_empleado, crear_sucursales
+
+
+class RegistroAuditoriaTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='pass', is_staff=True)
+        self.empleado = crear_empleado(1, crear_catalogos(sexo='F'), nombres='Ana', apellido='Pérez')
+        sucursal, = crear_sucursales('Sucursal A')
+        self.eo = Empleado_eo.objects.create(idempleado=self.empleado, id_sucursal=sucursal)
+        self.registro = RegistroAuditoria(self.user)
+
+    def _inserts(self, queries):
+        return [q for q in queries if q['sql'].startswith('INSERT') and Log_auditoria._meta.db_table in q['sql']]
+
+    def test_lote_escribe_con_un_solo_insert_y_completa_idempleado(self):
+        with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+            with self.registro.lote():
+                self.registro.registrar('Empleado', self.empleado.pk, 'update', {'changed': {'telefono': 'x'}})
+                self.registro.registrar('Empleado_eo', self.eo.pk, 'update', {'changed': {'id_sucursal': 1}})
+                self.registro.registrar('auth_user', self.empleado.pk, 'insert', {'username': 'emp'})
+            self.assertEqual(Log_auditoria.objects.count(), 0)
+        self.assertEqual(len(self._inserts(ctx.captured_queries)), 1)
+        self.assertEqual(
+            sorted(Log_auditoria.objects.values_list('nombre_tabla', 'idempleado')),
+            [('Empleado', self.empleado.pk), ('Empleado_eo', self.empleado.pk), ('auth_user', self.empleado.pk)],
+        )
+
+    def test_omite_entrada_igual_a_la_ultima(self):
+        Log_auditoria.objects.create(
+            idusuario=self.user, nombre_tabla='Empleado', idregistro=self.empleado.pk, accion='update', cambio={'a': 1},
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.registro.lote():
+                self.registro.registrar('Empleado', self.empleado.pk, 'update', {'a': 1})
+                self.registro.registrar('Empleado', self.empleado.pk, 'update', {'a': 2})
+                self.registro.registrar('Empleado', self.empleado.pk, 'update', {'a': 2})
+        self.assertEqual(
+            list(Log_auditoria.objects.order_by('id').values_list('cambio', flat=True)), [{'a': 1}, {'a': 2}],
+        )
+
+    def test_entrada_de_transaccion_revertida_no_se_escribe(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.registro.lote():
+                self.registro.registrar('Empleado', self.empleado.pk, 'update', {'a': 1})
+                try:
+                    with transaction.atomic():
+                        self.registro.registrar('Empleado', self.empleado.pk, 'delete', {'a': 1})
+                        raise ValueError
+                except ValueError:
+                    pass
+        self.assertEqual(list(Log_auditoria.objects.values_list('accion', flat=True)), ['update'])
+
+    @override_settings(AUDITORIA_ASINCRONA=True)
+    def test_modo_asincrono_encola_el_lote(self):
+        with mock.patch.object(registro_auditoria, '_asegurar_escritor') as escritor:
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.registro.lote():
+                    self.registro.registrar('Empleado', self.empleado.pk, 'update', {'a': 1})
+                    self.registro.registrar('Empleado', self.empleado.pk, 'update', {'a': 2})
+            escritor.assert_called_once()
+            self.assertEqual(Log_auditoria.objects.count(), 0)
+            registro_auditoria.vaciar_cola()
+        self.assertEqual(Log_auditoria.objects.count(), 2)
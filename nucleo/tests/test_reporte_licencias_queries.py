@@ -0,0 +1,66 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from nucleo.models import (
+    Estado_lic_vac, Tipo_licencia, Solicitud_licencia,
+)
+from nucleo.tests.utils import crear_catalogos, crear_empleado
+
+
+class ReporteLicenciasColisionesTest(TestCase):
+    def setUp(self):
+        admin = User.objects.create_user(username='admin', password='pass', is_staff=True)
+        self.client = Client()
+        self.client.force_login(admin)
+        self.catalogos = crear_catalogos()
+        self.espera = Estado_lic_vac.objects.create(estado='En espera')
+        self.tipo = Tipo_licencia.objects.create(descripcion='Estudio', dias=None, pago=False)
+        self.creados = 0
+
+    def _crear_solicitudes(self, cantidad):
+        for _ in range(cantidad):
+            self.creados += 1
+            n = self.creados
+            emp = crear_empleado(n, self.catalogos)
+            Solicitud_licencia.objects.create(
+                idempleado=emp, id_licencia=self.tipo, fecha_desde=date(2025, 5, n), fecha_hasta=date(2025, 5, n + 2),
+                id_estado=self.espera,
+            )
+
+    def _get(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse('nucleo:gestion_reporte_licencias'))
+        self.assertEqual(resp.status_code, 200)
+        return len(ctx.captured_queries), resp
+
+    def test_colisiones_de_la_pagina_en_cantidad_constante_de_queries(self):
+        self._crear_solicitudes(2)
+        self._get()  # carga los catálogos cacheados
+        pocas, _ = self._get()
+        self._crear_solicitudes(10)
+        muchas, resp = self._get()
+        self.assertEqual(pocas, muchas)
+
+        colisiones = resp.context['colisiones_por_solicitud']
+        # La solicitud del empleado 5 (5 al 7 de mayo) cruza con las de 3, 4, 6 y 7
+        s5 = Solicitud_licencia.objects.get(idempleado__nombres='N5')
+        self.assertEqual(colisiones[s5.pk], [
+            'N3 A3: 03/05/2025 - 05/05/2025',
+            'N4 A4: 04/05/2025 - 06/05/2025',
+            'N6 A6: 06/05/2025 - 08/05/2025',
+            'N7 A7: 07/05/2025 - 09/05/2025',
+        ])
+
+    def test_la_pagina_solo_carga_sus_filas(self):
+        self._crear_solicitudes(15)
+        _, resp = self._get()
+        self.assertNotIn('solicitudes_completas', resp.context)
+        self.assertEqual(len(resp.context['solicitudes']), 12)
+        # Las solicitudes fuera de la primera página no se renderizan (ni en tablas ocultas)
+        self.assertNotContains(resp, 'tabla-licencias-excel')
+        self.assertNotContains(resp, '>N1 A1<')
@@ -0,0 +1,73 @@
+import random
+from datetime import date, timedelta
+
+from django.test import TestCase
+
+from nucleo.logic.reporte_solicitudes import (
+    PAGINA_KEYSET_DESDE, pagina_keyset, paginar_solicitudes, solicitudes_unificadas,
+)
+from nucleo.models import (
+    Estado_lic_vac, Tipo_licencia, Solicitud_licencia, Solicitud_vacaciones,
+)
+from nucleo.tests.utils import crear_catalogos, crear_empleado
+
+
+class ReporteSolicitudesTest(TestCase):
+    def setUp(self):
+        self.empleado = crear_empleado(1, crear_catalogos())
+        estado = Estado_lic_vac.objects.create(estado='En espera')
+        tipo = Tipo_licencia.objects.create(descripcion='Estudio', dias=None, pago=False)
+        self.tipo_vacaciones = Tipo_licencia.objects.create(descripcion='Vacaciones', dias=None, pago=True)
+        rnd = random.Random(5)
+        # Fechas repetidas a propósito para ejercitar el desempate por tipo e id
+        for _ in range(70):
+            d = date(2024, 1, 1) + timedelta(days=rnd.randrange(40))
+            h = d + timedelta(days=rnd.randrange(5))
+            if rnd.random() < 0.5:
+                Solicitud_licencia.objects.create(
+                    idempleado=self.empleado, id_licencia=tipo, fecha_desde=d, fecha_hasta=h, id_estado=estado
+                )
+            else:
+                Solicitud_vacaciones.objects.create(
+                    idempleado=self.empleado, fecha_desde=d, fecha_hasta=h, id_estado=estado, comentario='c'
+                )
+        self.lic = Solicitud_licencia.objects.all()
+        self.vac = Solicitud_vacaciones.objects.all()
+
+    def _esperado(self):
+        filas = [(s.fecha_desde, 1, s.pk) for s in self.lic] + [(s.fecha_desde, 0, s.pk) for s in self.vac]
+        return sorted(filas, reverse=True)
+
+    @staticmethod
+    def _clave(s):
+        return (s.fecha_desde, 1 if isinstance(s, Solicitud_licencia) else 0, s.pk)
+
+    def test_union_ordenada_y_contada_en_sql(self):
+        self.assertEqual(list(solicitudes_unificadas(self.lic, self.vac)), self._esperado())
+        page = paginar_solicitudes(self.lic, self.vac, page_number=2, por_pagina=12)
+        self.assertEqual(page.paginator.count, 70)
+        self.assertEqual([self._clave(s) for s in page], self._esperado()[12:24])
+
+    def test_vacaciones_hidratadas_como_licencias(self):
+        filas = list(paginar_solicitudes(self.lic, self.vac, page_number=1, por_pagina=70))
+        self.assertEqual([self._clave(s) for s in filas], self._esperado())
+        for s in filas:
+            self.assertEqual(s.dias, (s.fecha_hasta - s.fecha_desde).days + 1)
+            if isinstance(s, Solicitud_vacaciones):
+                self.assertEqual(s.id_licencia, self.tipo_vacaciones)
+                self.assertIsNone(s.archivo)
+
+    def test_keyset_recorre_lo_mismo_que_offset(self):
+        vistas, cursor = [], None
+        while True:
+            pagina = pagina_keyset(self.lic, self.vac, cursor, por_pagina=9)
+            vistas.extend(self._clave(s) for s in pagina)
+            if not pagina.has_next():
+                break
+            cursor = pagina.cursor_siguiente
+        self.assertEqual(vistas, self._esperado())
+
+    def test_paginas_profundas_ofrecen_cursor(self):
+        page = paginar_solicitudes(self.lic, self.vac, page_number=PAGINA_KEYSET_DESDE, por_pagina=1)
+        siguiente = paginar_solicitudes(self.lic, self.vac, cursor=page.cursor_siguiente, por_pagina=1)
+        self.assertEqual(self._clave(list(siguiente)[0]), self._esperado()[PAGINA_KEYSET_DESDE])
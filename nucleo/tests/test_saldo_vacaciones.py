@@ -0,0 +1,79 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from nucleo.logic.saldo_vacaciones import obtener_saldo, verificar_saldos
+from nucleo.models import (
+    Estado_lic_vac, Movimiento_vacaciones, Saldo_vacaciones, Solicitud_vacaciones, Vacaciones_otorgadas,
+)
+from nucleo.tests.utils import crear_catalogos, crear_empleado
+from nucleo.views.vacaciones import aprobar_solicitud_vacaciones
+
+
+class SaldoVacacionesTest(TestCase):
+    def setUp(self):
+        self.empleado = crear_empleado(1, crear_catalogos())
+        Estado_lic_vac.objects.create(estado='Aceptada')
+        self.espera = Estado_lic_vac.objects.create(estado='En espera')
+
+    def _otorgar(self, anio, dias):
+        return Vacaciones_otorgadas.objects.create(
+            idempleado=self.empleado, inicio_consumo=date(anio, 1, 1), fin_consumo=date(anio, 12, 31),
+            dias_disponibles=dias, dias_consumidos=0,
+        )
+
+    def _saldo(self, anio):
+        saldo = obtener_saldo(self.empleado, anio)
+        return saldo.dias_otorgados, saldo.dias_consumidos
+
+    def test_aprobar_consume_con_arrastre_y_el_libro_cuadra(self):
+        self._otorgar(2024, 3)
+        self._otorgar(2025, 14)
+        solicitud = Solicitud_vacaciones.objects.create(
+            idempleado=self.empleado, fecha_desde=date(2025, 2, 3), fecha_hasta=date(2025, 2, 9),
+            id_estado=self.espera, comentario='c',
+        )
+        aprobar_solicitud_vacaciones(solicitud, enviar_notificacion=False)
+
+        self.assertEqual(self._saldo(2024), (3, 3))
+        self.assertEqual(self._saldo(2025), (14, 4))
+        self.assertEqual(obtener_saldo(self.empleado, 2025).dias_disponibles, 10)
+        consumos = Movimiento_vacaciones.objects.filter(idsolicitudvac=solicitud.pk).order_by('periodo')
+        self.assertEqual(
+            [(m.periodo, m.tipo, m.dias_consumidos) for m in consumos],
+            [(2024, Movimiento_vacaciones.ARRASTRE, 3), (2025, Movimiento_vacaciones.CONSUMO, 4)],
+        )
+        self.assertEqual(verificar_saldos(), ([], []))
+
+    def test_modificar_y_borrar_periodos_revierte_el_saldo(self):
+        vac = self._otorgar(2025, 10)
+        vac.dias_consumidos = 6
+        vac.save()
+        vac.dias_consumidos = 2
+        vac.save()
+        self.assertEqual(self._saldo(2025), (10, 2))
+        self.assertEqual(
+            list(Movimiento_vacaciones.objects.order_by('pk').values_list('tipo', flat=True)),
+            ['otorgamiento', 'consumo', 'cancelacion'],
+        )
+        vac.delete()
+        self.assertEqual(self._saldo(2025), (0, 0))
+        self.assertEqual(verificar_saldos(), ([], []))
+
+    def test_comando_detecta_y_corrige_diferencias(self):
+        self._otorgar(2025, 10)
+        # Escrituras que saltean los signals: saldo desfasado y periodo sin movimientos
+        Saldo_vacaciones.objects.filter(periodo=2025).update(dias_otorgados=99)
+        Vacaciones_otorgadas.objects.filter(inicio_consumo__year=2025).update(dias_consumidos=4)
+
+        salida = StringIO()
+        call_command('verificar_saldos_vacaciones', stdout=salida)
+        self.assertIn('no coinciden', salida.getvalue())
+        self.assertEqual(self._saldo(2025), (99, 0))
+
+        call_command('verificar_saldos_vacaciones', '--corregir', stdout=StringIO())
+        self.assertEqual(self._saldo(2025), (10, 4))
+        self.assertEqual(verificar_saldos(), ([], []))
+        self.assertTrue(Movimiento_vacaciones.objects.filter(tipo=Movimiento_vacaciones.AJUSTE).exists())
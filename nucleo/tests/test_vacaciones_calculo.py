@@ -1,4 +1,5 @@
 import os
+import random
 import unittest
 from datetime import date, timedelta
 
@@ -7,6 +8,7 @@ import django
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "gestion_rrhh.settings")
 django.setup()
 
+from nucleo.logic.dias_vacaciones import calcular_dias_vacaciones_lote, proyectar_dias_vacaciones
 from nucleo.views.vacaciones import (
     calcular_dias_vacaciones,
     obtener_fecha_corte_generacion,
@@ -31,3 +33,51 @@ class VacacionesCalculoTests(unittest.TestCase):
 
         dias_proporcionales = calcular_dias_vacaciones(alta, fecha_corte)
         self.assertEqual(dias_proporcionales, 4)
+        self.assertEqual(calcular_dias_vacaciones_lote([alta], fecha_corte), [4])
+
+
+class VacacionesCalculoLoteTests(unittest.TestCase):
+    """El cálculo en lote debe coincidir exactamente con calcular_dias_vacaciones."""
+
+    # Bordes del cálculo: fin de mes, febrero, corte de junio, aniversarios y cambios de tramo
+    REFERENCIAS = [
+        date(2024, 12, 31), date(2025, 2, 28), date(2024, 2, 29), date(2025, 6, 1), date(2025, 5, 31),
+        date(2025, 1, 1), date(2030, 3, 31),
+    ]
+
+    def _altas_aleatorias(self, rnd, cantidad):
+        inicio = date(1985, 1, 1)
+        return [inicio + timedelta(days=rnd.randrange(365 * 46)) for _ in range(cantidad)]
+
+    def test_coincide_con_el_calculo_escalar(self):
+        rnd = random.Random(11)
+        for _ in range(300):
+            altas = self._altas_aleatorias(rnd, 40) + [None]
+            referencias = [rnd.choice(self.REFERENCIAS + self._altas_aleatorias(rnd, 1)) for _ in altas]
+            self.assertEqual(
+                calcular_dias_vacaciones_lote(altas, referencias),
+                [calcular_dias_vacaciones(a, r) for a, r in zip(altas, referencias)],
+            )
+
+    def test_bordes_de_tramos_y_corte_de_junio(self):
+        for referencia in self.REFERENCIAS:
+            altas = [
+                referencia.replace(year=referencia.year - anios, day=min(referencia.day, 28)) + timedelta(days=delta)
+                for anios in (0, 1, 5, 10, 20)
+                for delta in (-1, 0, 1, -200, 200)
+            ] + [date(referencia.year, 6, d) for d in (1, 2)] + [date(referencia.year, 5, 31)]
+            self.assertEqual(
+                calcular_dias_vacaciones_lote(altas, referencia),
+                [calcular_dias_vacaciones(a, referencia) for a in altas],
+            )
+
+    def test_proyeccion_de_plantilla_en_varias_fechas(self):
+        altas = self._altas_aleatorias(random.Random(2), 200)
+        proyeccion = proyectar_dias_vacaciones(altas, self.REFERENCIAS)
+        self.assertEqual(list(proyeccion), self.REFERENCIAS)
+        for referencia, dias in proyeccion.items():
+            self.assertEqual(dias, [calcular_dias_vacaciones(a, referencia) for a in altas])
+
+    def test_longitudes_distintas(self):
+        with self.assertRaises(ValueError):
+            calcular_dias_vacaciones_lote([date(2020, 1, 1)], [date(2025, 1, 1), date(2026, 1, 1)])
@@ -0,0 +1,71 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from nucleo.models import (
+    Empleado_el, Empleado_eo, Estado_empleado, Convenio, Puesto,
+)
+from nucleo.tests.utils import crear_catalogos, crear_empleado, crear_sucursales
+
+
+class VerEmpleadosQueryCountTest(TestCase):
+    def setUp(self):
+        # id=1 queda excluido del listado, igual que en producción
+        admin = User.objects.create_user(username='admin', password='pass')
+        admin.is_staff = True
+        admin.save()
+        self.client = Client()
+        self.client.login(username='admin', password='pass')
+
+        self.catalogos = crear_catalogos()
+        self.sucursal, = crear_sucursales('Centro')
+        self.activo = Estado_empleado.objects.create(estado='Activo')
+        self.baja = Estado_empleado.objects.create(estado='Baja')
+        self.convenio = Convenio.objects.create(tipo_convenio='Comercio')
+        self.puesto = Puesto.objects.create(tipo_puesto='Cajero')
+        self.creados = 0
+
+    def _crear_empleados(self, cantidad):
+        for _ in range(cantidad):
+            self.creados += 1
+            n = self.creados
+            user = User.objects.create_user(username=f'emp{n}', password='p', email=f'emp{n}@x.com')
+            emp = crear_empleado(n, self.catalogos, usuario=user)
+            Empleado_el.objects.create(idempleado=emp, id_estado=self.activo, id_convenio=self.convenio,
+                                       id_puesto=self.puesto, alta_ant=date(2020, 1, 1))
+            Empleado_el.objects.create(idempleado=emp, id_estado=self.baja, id_convenio=self.convenio,
+                                       id_puesto=self.puesto, alta_ant=date(2020, 1, 1))
+            Empleado_eo.objects.create(idempleado=emp, id_sucursal=self.sucursal)
+
+    def _contar_queries(self, params):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse('nucleo:ver_empleados'), params)
+        self.assertEqual(resp.status_code, 200)
+        return len(ctx.captured_queries), resp
+
+    def test_cantidad_de_queries_no_crece_con_la_plantilla(self):
+        for params in ({}, {'vista_ampliada': '1'}, {'solo_estado_actual': '1', 'vista_ampliada': '1'}):
+            self._crear_empleados(2)
+            pocos, _ = self._contar_queries(params)
+            self._crear_empleados(8)
+            muchos, _ = self._contar_queries(params)
+            self.assertEqual(pocos, muchos, f'La vista escala con la cantidad de empleados ({params})')
+
+    def test_filas_actuales_e_historicas(self):
+        self._crear_empleados(3)
+        _, resp = self._contar_queries({'vista_ampliada': '1'})
+        filas = resp.context['empleados']
+        self.assertEqual(len(filas), 6)
+        actuales = [f for f in filas if not f['is_historical']]
+        self.assertEqual(len(actuales), 3)
+        self.assertTrue(all(f['estado'] == 'Baja' for f in actuales))
+        self.assertTrue(all(f['sucursal'] == 'Centro' for f in filas))
+
+        _, resp = self._contar_queries({'solo_estado_actual': '1'})
+        filas = resp.context['empleados']
+        self.assertEqual(len(filas), 3)
+        self.assertTrue(all(f['estado'] == 'Baja' and not f['is_historical'] for f in filas))
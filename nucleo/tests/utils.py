@@ -0,0 +1,43 @@
+"""Datos comunes de los tests: catálogos del domicilio, empleados y sucursales."""
+from datetime import date
+
+from django.contrib.auth.models import User
+
+from nucleo.models import Empleado, EstadoCivil, Localidad, Nacionalidad, Pers_juridica, Provincia, Sexo, Sucursal
+
+
+def crear_catalogos(localidad='L', provincia='P', sexo='M'):
+    """Nacionalidad, estado civil, sexo y localidad, con los nombres de campo de Empleado."""
+    return {
+        'id_nacionalidad': Nacionalidad.objects.create(nacionalidad='Arg'),
+        'id_civil': EstadoCivil.objects.create(estado_civil='Soltero'),
+        'id_sexo': Sexo.objects.create(sexo=sexo),
+        'id_localidad': Localidad.objects.create(
+            localidad=localidad, provincia=Provincia.objects.create(provincia=provincia),
+        ),
+    }
+
+
+def crear_empleado(n, catalogos, usuario=None, **campos):
+    """Empleado número ``n`` (dni y cuil salen de ``n``); sin ``usuario`` se crea ``emp<n>``.
+
+    ``campos`` reemplaza cualquiera de los valores por defecto.
+    """
+    if usuario is None:
+        usuario = User.objects.create_user(username=f'emp{n}', password='p')
+    datos = {
+        'nombres': f'N{n}', 'apellido': f'A{n}', 'dni': f'{n:08d}', 'cuil': f'20-{n:08d}-1',
+        'fecha_nac': date(1990, 1, 1), 'dr_personal': '', 'telefono': '', **catalogos, **campos,
+    }
+    return Empleado.objects.create(idempleado=usuario, **datos)
+
+
+def crear_sucursales(*nombres):
+    """Sucursales ``nombres`` de una misma persona jurídica."""
+    empresa = Pers_juridica.objects.create(
+        pers_juridica='Empresa X', domicilio='Av 1', cond_iva='RI', cuit='30-1', cond_iibb='Exento',
+    )
+    return [
+        Sucursal.objects.create(sucursal=nombre, suc_dire='Calle 1', suc_mail='s@example.com', id_pers_juridica=empresa)
+        for nombre in nombres
+    ]
@@ -38,9 +38,12 @@ urlpatterns = [
     path('solicitar_licencia/', solicitar_licencia, name='solicitar_licencia'),  
     path('consultar_licencia/', consultar_licencia, name='consultar_licencia'),
     path('gestion_reporte_licencias/', gestion_reporte_licencias, name='gestion_reporte_licencias'),
+    path('exportar_reporte_licencias/', views.exportar_reporte_licencias, name='exportar_reporte_licencias'),
     path('gestionar_estado_solicitud/', views.gestionar_estado_solicitud, name='gestionar_estado_solicitud'),
+    path('gestionar_estado_solicitudes_lote/', views.gestionar_estado_solicitudes_lote, name='gestionar_estado_solicitudes_lote'),
     path('gestion_solicitudes/', views.gestionar_solicitudes, name='gestion_solicitudes'),
     path('detalle_licencia/<int:solicitud_id>/', detalle_licencia, name='detalle_licencia'),
+    path('adjunto_licencia/<int:solicitud_id>/', views.adjunto_licencia, name='adjunto_licencia'),
     path('eliminar_solicitud/', eliminar_solicitud, name='eliminar_solicitud'),
     path('alta_tipo_licencia/', alta_tipo_licencia, name='alta_tipo_licencia'),
     path('modificar_borrar_licencia/', modificar_borrar_licencia, name='modificar_borrar_licencia'),
@@ -50,6 +53,7 @@ urlpatterns = [
     path('ver_feriados/', ver_feriados, name='ver_feriados'),
     path('generar_vacaciones/', generar_vacaciones, name='generar_vacaciones'),
     path('emitir_certificado/<int:empleado_id>/', views.emitir_certificado, name='emitir_certificado'),
+    path('emitir_certificado/<int:empleado_id>/pdf/', views.descargar_certificado, name='descargar_certificado'),
     path('ver_empleados/', ver_empleados, name='ver_empleados'),
     path('exportar_empleados_excel/', views.exportar_empleados_excel, name='exportar_empleados_excel'),
     path('log_auditoria/', ver_log_auditoria, name='log_auditoria'),
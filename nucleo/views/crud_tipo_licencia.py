@@ -2,6 +2,7 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.shortcuts import render
 
+from nucleo.logic import catalogos
 from nucleo.models import (
     Tipo_licencia,
     Solicitud_licencia,
@@ -175,12 +176,12 @@ def modificar_borrar_licencia(request):
                 if accion_post == "aprobar" and usuario_actual.id == solicitud.idempleado.id:
                     messages.error(request, "No puedes aprobar tus propias solicitudes, debe hacerlo otro gestor.")
                 elif accion_post == "aprobar":
-                    estado_aceptada = Estado_lic_vac.objects.get(estado__iexact="Aceptada")
+                    estado_aceptada = catalogos.obtener(Estado_lic_vac, "Aceptada")
                     solicitud.id_estado = estado_aceptada
                     solicitud.save()
                     messages.success(request, "Solicitud aprobada correctamente.")
                 elif accion_post == "rechazar":
-                    estado_rechazada = Estado_lic_vac.objects.get(estado__iexact="Rechazada")
+                    estado_rechazada = catalogos.obtener(Estado_lic_vac, "Rechazada")
                     solicitud.id_estado = estado_rechazada
                     solicitud.texto_gestor = texto_gestor
                     solicitud.save()
@@ -194,21 +195,23 @@ def modificar_borrar_licencia(request):
                 if accion == "aprobar" and usuario_actual.id == solicitud.idempleado.id:
                     messages.error(request, "No puedes aprobar tus propias solicitudes, debe hacerlo otro gestor.")
                 elif accion == "aprobar":
-                    estado_aceptada = Estado_lic_vac.objects.get(estado__iexact="Aceptada")
+                    estado_aceptada = catalogos.obtener(Estado_lic_vac, "Aceptada")
                     solicitud.id_estado = estado_aceptada
                     solicitud.save()
-                    from nucleo.models import Vacaciones_otorgadas
+                    from nucleo.models import Movimiento_vacaciones, Vacaciones_otorgadas
+                    from nucleo.logic.saldo_vacaciones import movimiento
 
-                    Vacaciones_otorgadas.objects.create(
-                        idempleado=solicitud.idempleado,
-                        inicio_consumo=solicitud.fecha_desde,
-                        fin_consumo=solicitud.fecha_hasta,
-                        dias_disponibles=(solicitud.fecha_hasta - solicitud.fecha_desde).days + 1,
-                        dias_consumidos=(solicitud.fecha_hasta - solicitud.fecha_desde).days + 1,
-                    )
+                    with movimiento(Movimiento_vacaciones.CONSUMO, solicitud):
+                        Vacaciones_otorgadas.objects.create(
+                            idempleado=solicitud.idempleado,
+                            inicio_consumo=solicitud.fecha_desde,
+                            fin_consumo=solicitud.fecha_hasta,
+                            dias_disponibles=(solicitud.fecha_hasta - solicitud.fecha_desde).days + 1,
+                            dias_consumidos=(solicitud.fecha_hasta - solicitud.fecha_desde).days + 1,
+                        )
                     messages.success(request, "Solicitud aprobada correctamente.")
                 elif accion == "rechazar":
-                    estado_rechazada = Estado_lic_vac.objects.get(estado__iexact="Rechazada")
+                    estado_rechazada = catalogos.obtener(Estado_lic_vac, "Rechazada")
                     solicitud.id_estado = estado_rechazada
                     solicitud.save()
                     messages.success(request, "Solicitud rechazada correctamente.")
@@ -2,10 +2,13 @@ from django.views.decorators.cache import never_cache
 import logging
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
+from django.http import Http404
 from django.shortcuts import render, redirect
 from datetime import date
-from django.db import models
-from nucleo.models import Solicitud_licencia, Solicitud_vacaciones, Vacaciones_otorgadas, Empleado_el, Empleado
+from nucleo.models import Solicitud_licencia, Solicitud_vacaciones, Empleado_el, Empleado
+from nucleo.logic.empleado_actual import obtener_empleado_actual
+from nucleo.logic.empleado_request import empleado_de
+from nucleo.logic.saldo_vacaciones import obtener_saldo, totales_del_periodo
 from nucleo.views.utils import (
     actualizar_licencias_consumidas,
     actualizar_vacaciones_consumidas,
@@ -112,13 +115,12 @@ def _reset_failed_attempts(request):
 
 def _check_employee_status(user):
     try:
-        empleado_obj = Empleado.objects.filter(idempleado=user).first()
-        if empleado_obj:
-            el_latest = Empleado_el.objects.filter(idempleado=empleado_obj).order_by('-fecha_el', '-id').first()
-            estado_id = getattr(getattr(el_latest, 'id_estado', None), 'id_estado', None) if el_latest else None
+        actual = obtener_empleado_actual(user.pk)
+        if actual:
+            estado_id = actual.id_estado_id
             try:
                 with open('/tmp/login_blocked_debug.log', 'a') as _f:
-                    _f.write(f"LOGIN_CHECK user={getattr(user,'username',None)} empleado_id={getattr(empleado_obj,'idempleado_id',None)} estado_id={estado_id}\n")
+                    _f.write(f"LOGIN_CHECK user={getattr(user,'username',None)} empleado_id={actual.idempleado_id} estado_id={estado_id}\n")
             except Exception:
                 pass
             if estado_id == 2:
@@ -139,7 +141,7 @@ def profile(request):
 def mi_perfil(request):
     # Mostrar ficha de solo lectura del empleado logueado
     user = request.user
-    empleado = Empleado.objects.filter(idempleado=user).first()
+    empleado = empleado_de(request)
 
     perfil = None
     if empleado:
@@ -227,28 +229,22 @@ def mi_perfil(request):
         except Exception:
             pass
 
-        # Sucursal más reciente
+        from nucleo.models import Plan_trabajo as PlanModel
+        # Sucursal y estado laboral / puesto / convenio / fechas vigentes (Empleado_actual)
         try:
-            from nucleo.models import Empleado_eo, Plan_trabajo as PlanModel
-            eo = Empleado_eo.objects.filter(idempleado=empleado).order_by('-fecha_eo').first()
-            if eo and getattr(eo, 'id_sucursal', None):
-                suc = eo.id_sucursal
+            actual = obtener_empleado_actual(empleado)
+            if actual and actual.id_sucursal:
+                suc = actual.id_sucursal
                 perfil['sucursal'] = getattr(suc, 'sucursal', '')
                 perfil['sucursal_direccion'] = getattr(suc, 'suc_dire', '')
                 perfil['sucursal_mail'] = getattr(suc, 'suc_mail', '')
-        except Exception:
-            pass
-
-        # Estado laboral / puesto / convenio / fechas desde Empleado_el (último)
-        try:
-            emp_el = Empleado_el.objects.filter(idempleado=empleado).order_by('-fecha_el', '-id').first()
-            if emp_el:
-                perfil['estado'] = getattr(emp_el.id_estado, 'estado', '')
-                perfil['puesto'] = getattr(emp_el.id_puesto, 'tipo_puesto', '')
-                perfil['convenio'] = getattr(emp_el.id_convenio, 'tipo_convenio', '')
-                perfil['fecha_est'] = getattr(emp_el, 'fecha_est', None) or getattr(emp_el, 'fecha_el', None)
-                perfil['fecha_alta'] = getattr(emp_el, 'fecha_el', None)
-                perfil['alta_ant'] = getattr(emp_el, 'alta_ant', None)
+            if actual and actual.id_empleado_el:
+                perfil['estado'] = getattr(actual.id_estado, 'estado', '')
+                perfil['puesto'] = getattr(actual.id_puesto, 'tipo_puesto', '')
+                perfil['convenio'] = getattr(actual.id_convenio, 'tipo_convenio', '')
+                perfil['fecha_est'] = actual.fecha_est or actual.fecha_el
+                perfil['fecha_alta'] = actual.fecha_el
+                perfil['alta_ant'] = actual.alta_ant
         except Exception:
             pass
 
@@ -299,8 +295,9 @@ def dashboard_empleado(request):
     actualizar_licencias_consumidas()
     actualizar_vacaciones_consumidas()
     eliminar_licencias_discontinuadas_sin_solicitudes()
-    user = request.user
-    empleado = Empleado.objects.get(idempleado=user)
+    empleado = empleado_de(request)
+    if empleado is None:
+        raise Http404
     # Licencias (contar días, no solicitudes)
     # Licencias (contar solicitudes por estado)
     licencias = Solicitud_licencia.objects.filter(idempleado=empleado)
@@ -311,17 +308,14 @@ def dashboard_empleado(request):
 
     # Vacaciones
     year = date.today().year
-    empleado_el = Empleado_el.objects.filter(idempleado=empleado).order_by('-fecha_el').first()
-    alta_ant = empleado_el.alta_ant if empleado_el else None
+    actual = obtener_empleado_actual(empleado)
+    alta_ant = actual.alta_ant if actual else None
 
     from nucleo.views.vacaciones import calcular_dias_vacaciones
-    # Use actual Vacaciones_otorgadas DB values when present (prefer authoritative source)
-    vac_agg = Vacaciones_otorgadas.objects.filter(idempleado=empleado, inicio_consumo__year=year).aggregate(
-        total_otorgados=models.Sum('dias_disponibles'),
-        total_consumidos=models.Sum('dias_consumidos')
-    )
-    total_otorgados = vac_agg.get('total_otorgados') or 0
-    total_consumidos = vac_agg.get('total_consumidos') or 0
+    # Saldo del año mantenido por el libro de movimientos de vacaciones
+    saldo = obtener_saldo(empleado, year)
+    total_otorgados = saldo.dias_otorgados
+    total_consumidos = saldo.dias_consumidos
     # Subtract also the days currently in 'En espera' from disponibles
     # Compute total 'En espera' days overlapping the year for this empleado
     from datetime import date as _date
@@ -452,7 +446,6 @@ def dashboard_gestor(request):
 
     # Vacaciones de toda la plantilla (año actual)
     year = date.today().year
-    empleados = Empleado.objects.all()
     from nucleo.views.vacaciones import calcular_dias_vacaciones
 
     # Vacaciones por estado (general) - sumar días, no cantidad de solicitudes
@@ -462,13 +455,8 @@ def dashboard_gestor(request):
     vac_espera_qs = Solicitud_vacaciones.objects.filter(fecha_desde__year=year, id_estado__estado__iexact="En espera")
     vac_rechazadas = Solicitud_vacaciones.objects.filter(fecha_desde__year=year, id_estado__estado__iexact="Rechazada").count()
 
-    # Aggregate Vacaciones_otorgadas across all employees for the year
-    vac_agg_all = Vacaciones_otorgadas.objects.filter(inicio_consumo__year=year).aggregate(
-        total_otorgados=models.Sum('dias_disponibles'),
-        total_consumidos=models.Sum('dias_consumidos')
-    )
-    total_otorgados_all = vac_agg_all.get('total_otorgados') or 0
-    total_consumidos_all = vac_agg_all.get('total_consumidos') or 0
+    # Totales del año de toda la plantilla (una fila de saldo por empleado)
+    total_otorgados_all, total_consumidos_all = totales_del_periodo(year)
     
     # vac_aprobadas = 0  # Comentado: necesitamos mostrar días aprobados/consumidos
     vac_aprobadas = int(total_consumidos_all)  # Días ya consumidos/aprobados
@@ -478,10 +466,10 @@ def dashboard_gestor(request):
     dias_disponibles = max(int(total_otorgados_all) - int(total_consumidos_all) - int(vac_espera), 0)
 
     # Solicitudes totals (days requested) across all employees
-    dias_solicitados = 0
-    for emp in empleados:
-        solicitudes_vac = Solicitud_vacaciones.objects.filter(idempleado=emp, fecha_desde__year=year)
-        dias_solicitados += sum((s.fecha_hasta - s.fecha_desde).days + 1 for s in solicitudes_vac)
+    dias_solicitados = sum(
+        (hasta - desde).days + 1
+        for desde, hasta in Solicitud_vacaciones.objects.filter(fecha_desde__year=year).values_list('fecha_desde', 'fecha_hasta')
+    )
     dias_consumidos = int(total_consumidos_all)
 
     context = {
@@ -512,7 +500,7 @@ def dashboard_gestor(request):
     except Exception:
         pass
     # Mis licencias: métricas del gestor actual (si existe un Empleado asociado al user)
-    emp_gestor = Empleado.objects.filter(idempleado=request.user).first()
+    emp_gestor = empleado_de(request)
     if emp_gestor:
         mis_licencias = Solicitud_licencia.objects.filter(idempleado=emp_gestor)
         mis_lic_aprobadas = mis_licencias.filter(id_estado__estado__iexact="Aceptada").count()
@@ -530,14 +518,11 @@ def dashboard_gestor(request):
         mis_vac_espera = suma_dias(mis_vac_espera_qs)
         mis_vac_rechazadas = suma_dias(mis_vac_rechazadas_qs)
         
-        mis_vac_agg = Vacaciones_otorgadas.objects.filter(idempleado=emp_gestor, inicio_consumo__year=year).aggregate(
-            total_otorgados=models.Sum('dias_disponibles'),
-            total_consumidos=models.Sum('dias_consumidos')
-        )
+        mi_saldo = obtener_saldo(emp_gestor, year)
         # Calcular mis días disponibles: días otorgados menos días consumidos
         # Los días aprobados ya están incluidos en dias_consumidos cuando se actualizan
         # Also subtract pending (en espera) days from the manager's own disponibles
-        mis_vac_disponibles = max((mis_vac_agg.get('total_otorgados') or 0) - (mis_vac_agg.get('total_consumidos') or 0) - int(mis_vac_espera or 0), 0)
+        mis_vac_disponibles = max(mi_saldo.dias_otorgados - mi_saldo.dias_consumidos - int(mis_vac_espera or 0), 0)
     else:
         mis_lic_aprobadas = mis_lic_espera = mis_lic_rechazadas = 0
         mis_vac_aprobadas = mis_vac_espera = mis_vac_rechazadas = 0
@@ -2,9 +2,8 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.db.models import Q
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, FileResponse
 from django.core.paginator import Paginator
-import csv
 import json
 import sys
 import traceback
@@ -16,6 +15,13 @@ import unicodedata
 # MODELOS Y FORMULARIOS
 from nucleo.models import Empleado, Empleado_el, Empleado_eo, Plan_trabajo, Sucursal, Provincia, Estado_empleado, Log_auditoria, Nacionalidad, EstadoCivil, Sexo, Localidad
 from nucleo.forms import EmpleadoModificarForm, EmpleadoELForm
+from nucleo.logic import (
+    busqueda_empleados, cache_auditoria, catalogos, certificado_pdf, certificados, exportacion, exportacion_empleados,
+)
+from nucleo.logic.busqueda_auditoria import filtrar_por_campo, filtrar_por_empleado, filtrar_por_fechas
+from nucleo.logic.referencias_auditoria import ReferenciasAuditoria
+from nucleo.logic.registro_auditoria import auditoria_en_lote, registro_de
+from nucleo.logic.empleados_listado import filas_ver_empleados, registros_el_por_empleado
 from django.contrib.auth.models import User
 # LOGGER
 import logging
@@ -379,31 +385,14 @@ def _minimal_changed(old, new):
     return {'id': _make_json_safe(id_val), 'changed': changed}
 
 def _create_log_if_new(request, nombre_tabla, idregistro, accion, cambio):
-    """Create a Log_auditoria unless the most recent identical entry exists.
-    This reduces duplicate/noise audit rows where the payload is identical.
-    Returns the created Log_auditoria or None if skipped/failed.
+    """Register a Log_auditoria in the request's audit sink (see nucleo.logic.registro_auditoria).
+    The entry is skipped at write time if it is identical to the most recent one for the
+    same (tabla, idregistro, accion). Returns the (possibly not yet saved) entry or None on failure.
     """
     try:
-        safe = _make_json_safe(cambio)
-        dump = json.dumps(safe, default=str, sort_keys=True)
-        last = Log_auditoria.objects.filter(nombre_tabla=nombre_tabla, idregistro=idregistro, accion=accion).order_by('-id').first()
-        if last is not None:
-            try:
-                last_dump = json.dumps(_make_json_safe(last.cambio), default=str, sort_keys=True)
-            except Exception:
-                last_dump = None
-            if last_dump == dump:
-                return None
-        log_entry = Log_auditoria.objects.create(
-            idusuario=request.user if hasattr(request, 'user') and request.user.is_authenticated else None,
-            nombre_tabla=nombre_tabla,
-            idregistro=idregistro,
-            accion=accion,
-            cambio=safe,
-        )
-        return log_entry
+        return registro_de(request).registrar(nombre_tabla, idregistro, accion, _make_json_safe(cambio))
     except Exception as e:
-        logger.exception('Failed creating unique Log_auditoria')
+        logger.exception('Failed registering Log_auditoria')
         return None
 
 def _is_plan_only_entry_text(text):
@@ -466,6 +455,7 @@ def _is_sucursal_change_text(text):
 
 
 @login_required
+@auditoria_en_lote
 def modificar_borrar_empleado(request, empleado_id=None):
     # Limpiar datos de sesión al recargar la página (GET)
     if request.method == 'GET':
@@ -1236,15 +1226,15 @@ def modificar_borrar_empleado(request, empleado_id=None):
                     try:
                         from nucleo.models import Log_auditoria
 
-                        seen_logs = set()
+                        seen_logs = {}
                         def _create_log_unique(nombre_tabla, idregistro, accion, cambio):
                             """Create a Log_auditoria once per (tabla, idregistro, accion)."""
                             key = (str(nombre_tabla), str(idregistro), str(accion))
                             if key in seen_logs:
                                 logger.debug('Duplicate audit key found for %s id=%s accion=%s — attempting to update existing log', nombre_tabla, idregistro, accion)
-                                # Try to find an existing Log_auditoria in DB and add target_username if missing
+                                # Complete the entry registered for this key (still pending in the audit sink, or already saved)
                                 try:
-                                    existing = Log_auditoria.objects.filter(nombre_tabla=nombre_tabla, idregistro=idregistro, accion=accion).order_by('-fecha_cambio').first()
+                                    existing = seen_logs[key]
                                     if existing:
                                         try:
                                             parsed = None
@@ -1262,14 +1252,16 @@ def modificar_borrar_empleado(request, empleado_id=None):
                                                     parsed = dict(parsed)
                                                     parsed['target_username'] = user.username
                                                     existing.cambio = _make_json_safe(parsed)
-                                                    existing.save()
+                                                    if existing.pk:
+                                                        existing.save()
                                                     updated = True
                                             else:
                                                 # convert raw cambio into structured payload including target_username
                                                 if user and getattr(user, 'username', None):
                                                     new_payload = {'raw': parsed, 'target_username': user.username}
                                                     existing.cambio = _make_json_safe(new_payload)
-                                                    existing.save()
+                                                    if existing.pk:
+                                                        existing.save()
                                                     updated = True
 
                                             if updated:
@@ -1284,7 +1276,7 @@ def modificar_borrar_empleado(request, empleado_id=None):
                                 except Exception:
                                     logger.exception('Error while searching/updating existing Log_auditoria for duplicate key')
                                     return None
-                            seen_logs.add(key)
+                            seen_logs[key] = None
                             try:
                                 # If cambio is a dict and doesn't already include target_username,
                                 # try to attach the username of the empleado being deleted (if available)
@@ -1302,13 +1294,10 @@ def modificar_borrar_empleado(request, empleado_id=None):
                                 except Exception:
                                     pass
 
-                                return Log_auditoria.objects.create(
-                                    idusuario=request.user if hasattr(request, 'user') and request.user.is_authenticated else None,
-                                    nombre_tabla=nombre_tabla,
-                                    idregistro=idregistro,
-                                    accion=accion,
-                                    cambio=_make_json_safe(cambio)
+                                seen_logs[key] = registro_de(request).registrar(
+                                    nombre_tabla, idregistro, accion, _make_json_safe(cambio), deduplicar=False
                                 )
+                                return seen_logs[key]
                             except Exception:
                                 logger.exception('Failed to create Log_auditoria for %s id=%s', nombre_tabla, idregistro)
                                 return None
@@ -1550,13 +1539,13 @@ def modificar_borrar_empleado(request, empleado_id=None):
                             # Para campos ForeignKey, convertir a objeto para comparar
                             if field == 'id_estado':
                                 from nucleo.models import Estado_empleado
-                                new = Estado_empleado.objects.get(pk=int(new_raw))
+                                new = catalogos.obtener_por_id(Estado_empleado, new_raw)
                             elif field == 'id_puesto':
                                 from nucleo.models import Puesto
-                                new = Puesto.objects.get(pk=int(new_raw))
+                                new = catalogos.obtener_por_id(Puesto, new_raw)
                             elif field == 'id_convenio':
                                 from nucleo.models import Convenio
-                                new = Convenio.objects.get(pk=int(new_raw))
+                                new = catalogos.obtener_por_id(Convenio, new_raw)
                         except:
                             new = new_raw
                     else:
@@ -1612,7 +1601,7 @@ def modificar_borrar_empleado(request, empleado_id=None):
             old_sucursal = sucursal_actual_obj.pk if sucursal_actual_obj else None
             if str(old_sucursal) != str(nuevo_sucursal):
                 try:
-                    nueva_sucursal_obj = Sucursal.objects.get(pk=nuevo_sucursal) if nuevo_sucursal else None
+                    nueva_sucursal_obj = catalogos.obtener_por_id(Sucursal, nuevo_sucursal) if nuevo_sucursal else None
                     text = f"Sucursal: {sucursal_actual_obj} → {nueva_sucursal_obj}"
                     cambios.append(text)
                     cambios_laboral.append(text)
@@ -2122,152 +2111,11 @@ def ver_empleados(request):
     empleados_qs = Empleado.objects.exclude(idempleado_id=1)
     if q:
         empleados_qs = empleados_qs.filter(nombres__icontains=q) | empleados_qs.filter(apellido__icontains=q)
-    empleados = []
-    
-    for emp in empleados_qs:
-        # Datos básicos del empleado que no cambian
-        base_data = {
-            'idempleado_id': emp.idempleado.id,
-            'nombres': emp.nombres,
-            'apellido': emp.apellido,
-            'dni': emp.dni,
-            'fecha_nac': emp.fecha_nac,
-            'id_nacionalidad': emp.id_nacionalidad.id if emp.id_nacionalidad else '',
-            'nacionalidad_nombre': emp.id_nacionalidad.nacionalidad if emp.id_nacionalidad else '',
-            'id_civil': emp.id_civil.id if emp.id_civil else '',
-            'civil_nombre': emp.id_civil.estado_civil if emp.id_civil else '',
-            'id_sexo': emp.id_sexo.id if emp.id_sexo else '',
-            'sexo_nombre': emp.id_sexo.sexo if emp.id_sexo else '',
-            'id_localidad': emp.id_localidad.id if emp.id_localidad else '',
-            'localidad_nombre': emp.id_localidad.localidad if emp.id_localidad else '',
-            'dr_personal': emp.dr_personal,
-            'email': emp.idempleado.email if getattr(emp, 'idempleado', None) else '',
-        }
-        
-        # Obtener registro laboral actual de la base de datos
-        el_actual = Empleado_el.objects.filter(idempleado=emp).order_by('-fecha_el', '-id').first()
-        
-        if solo_estado_actual:
-            # Solo mostrar el registro actual
-            if el_actual:
-                data = base_data.copy()
-                data.update({
-                    'estado': el_actual.id_estado.estado if el_actual.id_estado else '',
-                    'fecha_estado': el_actual.fecha_est if el_actual.fecha_est else el_actual.fecha_el,
-                    'puesto': el_actual.id_puesto.tipo_puesto if el_actual.id_puesto else '',
-                    'id_puesto': el_actual.id_puesto.id_puesto if el_actual.id_puesto else '',
-                    'is_historical': False,
-                    'fecha_el': el_actual.fecha_el,
-                })
-                
-                if vista_ampliada:
-                    eo = Empleado_eo.objects.filter(idempleado=emp).order_by('-fecha_eo').first()
-                    plan = Plan_trabajo.objects.filter(idempleado=emp).first()
-                    suc = eo.id_sucursal if eo else None
-                    pers_jur = suc.id_pers_juridica if suc else None
-                    data.update({
-                        'num_hijos': emp.num_hijos,
-                        'telefono': emp.telefono,
-                        'cuil': emp.cuil,
-                        'convenio': el_actual.id_convenio.tipo_convenio if el_actual.id_convenio else '',
-                        'puesto': el_actual.id_puesto.tipo_puesto if el_actual.id_puesto else '',
-                        'fecha_antiguedad': el_actual.alta_ant if el_actual.alta_ant else '',
-                        'sucursal': suc.sucursal if suc else '',
-                        'suc_dire': suc.suc_dire if suc else '',
-                        'pers_juridica': pers_jur.pers_juridica if pers_jur else '',
-                        'domicilio_pers_juridica': pers_jur.domicilio if pers_jur else '',
-                        'cond_iva': pers_jur.cond_iva if pers_jur else '',
-                        'cuit': pers_jur.cuit if pers_jur else '',
-                        'cond_iibb': pers_jur.cond_iibb if pers_jur else '',
-                    })
-                
-                empleados.append(data)
-            else:
-                # Si no hay registro laboral, crear una fila básica
-                empleados.append(base_data.copy())
-        else:
-            # Mostrar historial completo (actual + histórico)
-            registros_mostrados = []
-            
-            # 1. Agregar registro actual de la BD
-            if el_actual:
-                data = base_data.copy()
-                data.update({
-                    'estado': el_actual.id_estado.estado if el_actual.id_estado else '',
-                    'fecha_estado': el_actual.fecha_est if el_actual.fecha_est else el_actual.fecha_el,
-                    'puesto': el_actual.id_puesto.tipo_puesto if el_actual.id_puesto else '',
-                    'id_puesto': el_actual.id_puesto.id_puesto if el_actual.id_puesto else '',
-                    'is_historical': False,
-                    'fecha_el': el_actual.fecha_el,
-                })
-                
-                if vista_ampliada:
-                    eo = Empleado_eo.objects.filter(idempleado=emp).order_by('-fecha_eo').first()
-                    plan = Plan_trabajo.objects.filter(idempleado=emp).first()
-                    suc = eo.id_sucursal if eo else None
-                    pers_jur = suc.id_pers_juridica if suc else None
-                    data.update({
-                        'num_hijos': emp.num_hijos,
-                        'telefono': emp.telefono,
-                        'cuil': emp.cuil,
-                        'convenio': el_actual.id_convenio.tipo_convenio if el_actual.id_convenio else '',
-                        'puesto': el_actual.id_puesto.tipo_puesto if el_actual.id_puesto else '',
-                        'fecha_antiguedad': el_actual.alta_ant if el_actual.alta_ant else '',
-                        'sucursal': suc.sucursal if suc else '',
-                        'suc_dire': suc.suc_dire if suc else '',
-                        'pers_juridica': pers_jur.pers_juridica if pers_jur else '',
-                        'domicilio_pers_juridica': pers_jur.domicilio if pers_jur else '',
-                        'cond_iva': pers_jur.cond_iva if pers_jur else '',
-                        'cuit': pers_jur.cuit if pers_jur else '',
-                        'cond_iibb': pers_jur.cond_iibb if pers_jur else '',
-                    })
-                
-                registros_mostrados.append(data)
-            
-            
-            # 2. Agregar registros históricos de la base de datos
-            registros_historicos = Empleado_el.objects.filter(idempleado=emp).order_by('-fecha_el', '-id')
-            for el_historico in registros_historicos[1:]:  # Omitir el primero (ya agregado como actual)
-                data_hist = base_data.copy()
-                data_hist.update({
-                    'estado': el_historico.id_estado.estado if el_historico.id_estado else '',
-                    'fecha_estado': el_historico.fecha_est,
-                    'puesto': el_historico.id_puesto.tipo_puesto if el_historico.id_puesto else '',
-                    'is_historical': True,
-                    'fecha_el': el_historico.fecha_el,
-                    'id_estado': el_historico.id_estado_id if el_historico.id_estado else '',
-                    'id_puesto': el_historico.id_puesto_id if el_historico.id_puesto else '',
-                })
-                
-                if vista_ampliada:
-                    # Para registros históricos, usar datos de empleado actual para campos no laborales
-                    eo = Empleado_eo.objects.filter(idempleado=emp).order_by('-fecha_eo').first()
-                    suc = eo.id_sucursal if eo else None
-                    pers_jur = suc.id_pers_juridica if suc else None
-                    data_hist.update({
-                        'num_hijos': emp.num_hijos,
-                        'telefono': emp.telefono,
-                        'cuil': emp.cuil,
-                        'convenio': el_historico.id_convenio.tipo_convenio if el_historico.id_convenio else '',
-                        'puesto': el_historico.id_puesto.tipo_puesto if el_historico.id_puesto else '',
-                        'fecha_antiguedad': el_historico.alta_ant or el_historico.fecha_el,
-                        'sucursal': suc.sucursal if suc else '',
-                        'suc_dire': suc.suc_dire if suc else '',
-                        'pers_juridica': pers_jur.pers_juridica if pers_jur else '',
-                        'domicilio_pers_juridica': pers_jur.domicilio if pers_jur else '',
-                        'cond_iva': pers_jur.cond_iva if pers_jur else '',
-                        'cuit': pers_jur.cuit if pers_jur else '',
-                        'cond_iibb': pers_jur.cond_iibb if pers_jur else '',
-                    })
-                
-                registros_mostrados.append(data_hist)
-            
-            
-            # Si no hay registros, crear uno básico
-            if not registros_mostrados:
-                registros_mostrados.append(base_data.copy())
-            
-            empleados.extend(registros_mostrados)
+    empleados = filas_ver_empleados(
+        empleados_qs,
+        vista_ampliada=vista_ampliada,
+        solo_estado_actual=solo_estado_actual,
+    )
 
     return render(request, "nucleo/ver_empleados.html", {
         "empleados": empleados,
@@ -2291,56 +2139,31 @@ def ver_empleados(request):
 
 @login_required
 def emitir_certificado(request, empleado_id):
-    empleado = get_object_or_404(Empleado, pk=empleado_id)
-    empleado_eo = Empleado_eo.objects.filter(idempleado=empleado).order_by('-fecha_eo').first()
-    sucursal = empleado_eo.id_sucursal.sucursal if empleado_eo and getattr(empleado_eo, 'id_sucursal', None) else "Sin sucursal"
-    # Resolve puesto: prefer empleado_eo.id_puesto.tipo_puesto, fallback to empleado_el.id_puesto.tipo_puesto, else default
-    puesto = "Responsable de farmacia"
-    try:
-        if empleado_eo and getattr(empleado_eo, 'id_puesto', None):
-            puesto = getattr(empleado_eo.id_puesto, 'tipo_puesto', puesto) or puesto
-    except Exception:
-        pass
-    try:
-        empleado_el = Empleado_el.objects.filter(idempleado=empleado).order_by('-fecha_el', '-id').first()
-        if (not puesto or puesto == "Responsable de farmacia") and empleado_el and getattr(empleado_el, 'id_puesto', None):
-            puesto = getattr(empleado_el.id_puesto, 'tipo_puesto', puesto) or puesto
-    except Exception:
-        pass
-    
-    # Obtener el registro laboral (Empleado_el) más reciente para este empleado
-    empleado_el = Empleado_el.objects.filter(idempleado=empleado).order_by('-fecha_el', '-id').first()
-    fecha_ingreso = empleado_el.fecha_est if empleado_el and empleado_el.fecha_est else None
-
-    fecha_emision = date.today()
-
-    # Formato de fecha en español
-    meses = [
-        '', 'enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio',
-        'julio', 'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre'
-    ]
-    fecha_emision_larga = f"{fecha_emision.day} de {meses[fecha_emision.month]} del año {fecha_emision.year}"
-    # Extraer el convenio legible desde el registro laboral más reciente (Empleado_el)
-    try:
-        convenio_val = ''
-        if empleado_el and getattr(empleado_el, 'id_convenio', None):
-            # id_convenio es una FK a Convenio; preferir el campo tipo_convenio
-            convenio_val = getattr(empleado_el.id_convenio, 'tipo_convenio', '') or str(empleado_el.id_convenio)
-    except Exception:
-        convenio_val = ''
-
+    # Empleado con su puesto, convenio y sucursal vigentes (Empleado_actual) en una consulta
+    empleado = get_object_or_404(Empleado.objects.select_related(*certificados.RELACIONES), pk=empleado_id)
+    datos = certificados.datos_certificado(empleado)
+    fecha_emision = date.fromisoformat(datos['fecha_emision'])
     return render(request, "nucleo/emitir_certificado.html", {
         "empleado": empleado,
-        "empresa": f"Farmacia Gómez de Galarze, {sucursal}",
-        "puesto": puesto,
-        "fecha_ingreso": fecha_ingreso,
+        "empresa": datos['empresa'],
+        "puesto": datos['puesto'],
         "fecha_emision": fecha_emision,
-        "fecha_emision_larga": fecha_emision_larga,
-        "fecha_ant": fecha_ingreso.strftime('%d/%m/%Y') if fecha_ingreso else "No disponible",
-        "convenio": convenio_val,
+        "fecha_emision_larga": certificado_pdf.fecha_larga(fecha_emision),
+        "fecha_ant": datos['fecha_ant'],
+        "convenio": datos['convenio'],
     })
 
 
+@login_required
+def descargar_certificado(request, empleado_id):
+    """PDF del certificado laboral, desde el cache en disco si los datos del empleado no cambiaron."""
+    empleado = get_object_or_404(Empleado.objects.select_related(*certificados.RELACIONES), pk=empleado_id)
+    return FileResponse(
+        certificados.obtener_pdf(empleado), content_type='application/pdf',
+        filename=f'certificado_{empleado.apellido}.pdf',
+    )
+
+
 @login_required
 def buscar_empleados_ajax(request):
     q = request.GET.get('q', '').strip()
@@ -2449,24 +2272,24 @@ def buscar_empleados_ajax(request):
                 'month': month_filter_int,
             }
 
-    # Generic text/id search (still applied whether filtro used or not)
-    if q:
-        if q.isdigit():
-            empleados = empleados.filter(
-                Q(pk=int(q)) |
-                Q(nombres__icontains=q) |
-                Q(apellido__icontains=q)
-            )
-        else:
-            empleados = empleados.filter(
-                Q(nombres__icontains=q) |
-                Q(apellido__icontains=q)
-            )
-    
     force_actual_only = solo_estado_actual
 
+    # Catálogos y estado vigente (Empleado_actual) en la misma consulta que la búsqueda
+    empleados = empleados.select_related(
+        'idempleado', 'id_nacionalidad', 'id_civil', 'id_sexo', 'id_localidad',
+        'empleado_actual__id_estado', 'empleado_actual__id_puesto', 'empleado_actual__id_convenio',
+        'empleado_actual__id_sucursal__id_pers_juridica',
+    )
+    # Búsqueda por nombre/apellido/DNI/CUIL (o id), ordenada por parecido.
+    # Limitamos a 15 empleados base para evitar demasiados resultados
+    seleccion = busqueda_empleados.buscar(empleados, q, limite=15)
+    # El historial laboral sólo hace falta si se muestran registros anteriores: una consulta para todos
+    historial = {} if force_actual_only else registros_el_por_empleado(
+        Empleado.objects.filter(pk__in=[emp.pk for emp in seleccion])
+    )
+
     resultados = []
-    for emp in empleados[:15]:  # Limitamos a 15 empleados base para evitar demasiados resultados
+    for emp in seleccion:
         # Datos básicos del empleado que no cambian
         empleado_usuario = getattr(emp, 'idempleado', None)
         base_data = {
@@ -2488,8 +2311,14 @@ def buscar_empleados_ajax(request):
             'email': empleado_usuario.email if empleado_usuario else '',
         }
         
-        registros_laborales = list(Empleado_el.objects.filter(idempleado=emp).order_by('-fecha_el', '-id'))
-        el_actual = registros_laborales[0] if registros_laborales else None
+        actual = getattr(emp, 'empleado_actual', None)
+        if force_actual_only:
+            # Empleado_actual tiene los mismos campos que el Empleado_el vigente que usa build_row
+            el_actual = actual if actual and actual.id_empleado_el else None
+            registros_laborales = [el_actual] if el_actual else []
+        else:
+            registros_laborales = historial.get(emp.pk, [])
+            el_actual = registros_laborales[0] if registros_laborales else None
 
         def matches_estado(el_obj):
             if estado_filter_id is None:
@@ -2529,8 +2358,7 @@ def buscar_empleados_ajax(request):
                 })
 
                 if vista_ampliada:
-                    eo = Empleado_eo.objects.filter(idempleado=emp).order_by('-fecha_eo').first()
-                    suc = eo.id_sucursal if eo else None
+                    suc = actual.id_sucursal if actual else None
                     pers_jur = suc.id_pers_juridica if suc else None
                     fecha_ant = ''
                     if el.alta_ant:
@@ -2616,12 +2444,14 @@ def ver_log_auditoria(request):
         order_by = f'-{order_field}'
     
     # Obtener todos los logs de auditoría con ordenación
-    logs = Log_auditoria.objects.all().order_by(order_by)
+    logs = Log_auditoria.objects.select_related('idusuario').order_by(order_by)
     
     # Filtros opcionales
     tabla = request.GET.get('tabla', '')
     usuario = request.GET.get('usuario', '').strip()
     modificado = request.GET.get('modificado', '').strip()
+    campo = request.GET.get('campo', '').strip()
+    valor = request.GET.get('valor', '').strip()
     fecha_desde = request.GET.get('fecha_desde', '')
     fecha_hasta = request.GET.get('fecha_hasta', '')
     rango_fecha = request.GET.get('rango_fecha', '')  # checkbox: present when checked
@@ -2640,126 +2470,42 @@ def ver_log_auditoria(request):
         else:
             logs = logs.filter(idusuario__username__icontains=usuario)
 
-    if modificado:
-        # Prefer structured matching against empleados and related records
-        try:
-            modificado_id = int(modificado)
-        except (TypeError, ValueError):
-            modificado_id = None
-
-        # Build a Q that matches logs that target the given empleado (by id or by related records)
-        mod_q = Q()
-
-        # If the input is numeric treat it as an id: match direct idregistro hits
-        if modificado_id is not None:
-            mod_q |= Q(idregistro=modificado_id)
-
-        # Try to match Empleado by name/surname when the input is textual
-        if modificado and not modificado_id:
-            nombre_txt = modificado.strip()
-            # Find empleados whose nombre or apellido match the query (case-insensitive)
-            empleados_qs = Empleado.objects.filter(
-                Q(nombres__icontains=nombre_txt) | Q(apellido__icontains=nombre_txt)
-            )
-        else:
-            empleados_qs = Empleado.objects.none()
-
-        # Collect candidate idregistro values for different tabla types related to the found empleados
-        empleado_ids = []
-        empleado_el_ids = []
-        empleado_eo_ids = []
-        plan_ids = []
-        for emp in empleados_qs:
-            # Empleado logs typically store the empleado's user/id in idregistro
-            try:
-                empleado_ids.append(getattr(emp, 'idempleado_id') or None)
-            except Exception:
-                pass
-            try:
-                empleado_el_ids += list(Empleado_el.objects.filter(idempleado=emp).values_list('id', flat=True))
-            except Exception:
-                pass
-            try:
-                empleado_eo_ids += list(Empleado_eo.objects.filter(idempleado=emp).values_list('id', flat=True))
-            except Exception:
-                pass
-            try:
-                plan_ids += list(Plan_trabajo.objects.filter(idempleado=emp).values_list('id', flat=True))
-            except Exception:
-                pass
+    # Empleado afectado (columna indexada idempleado) y campo/valor del cambio (índices GIN en PostgreSQL)
+    logs = filtrar_por_empleado(logs, modificado)
+    logs = filtrar_por_campo(logs, campo, valor)
 
-        if empleado_ids:
-            mod_q |= Q(nombre_tabla='Empleado', idregistro__in=empleado_ids)
-        if empleado_el_ids:
-            mod_q |= Q(nombre_tabla='Empleado_el', idregistro__in=empleado_el_ids)
-        if empleado_eo_ids:
-            mod_q |= Q(nombre_tabla='Empleado_eo', idregistro__in=empleado_eo_ids)
-        if plan_ids:
-            mod_q |= Q(nombre_tabla='Plan_trabajo', idregistro__in=plan_ids)
-
-        # As a last resort, if modificado looks numeric we already included idregistro match above.
-        # Do NOT match against raw JSON text to avoid spurious substring matches.
-        if mod_q:
-            logs = logs.filter(mod_q)
-
-    if fecha_desde:
-        if rango_fecha:
-            # rango activo: use >=
-            logs = logs.filter(fecha_cambio__date__gte=fecha_desde)
-        else:
-            # single date: match exact day
-            logs = logs.filter(fecha_cambio__date=fecha_desde)
-    if fecha_hasta and rango_fecha:
-        # only apply fecha_hasta when rango is enabled
-        logs = logs.filter(fecha_cambio__date__lte=fecha_hasta)
+    # Rango directo sobre fecha_cambio (no __date): así PostgreSQL sólo lee las particiones de esas fechas.
+    # Sin rango se filtra el día exacto de fecha_desde; fecha_hasta sólo aplica con rango.
+    logs = filtrar_por_fechas(logs, fecha_desde, fecha_hasta if rango_fecha else None, rango=bool(rango_fecha))
     
     # Paginación - incrementar a 50 registros para mostrar más datos
     paginator = Paginator(logs, 50)  # 50 registros por página
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    # HTML de render_cambio ya calculado para las filas de la página (una lectura de caché)
+    cache_auditoria.precargar(page_obj)
     
-    # Build a mapping of log.id -> human-friendly target name when applicable
+    # Registros referenciados por la página (un in_bulk por modelo) y nombre del empleado afectado por fila
+    referencias = ReferenciasAuditoria.de_logs(page_obj)
     log_targets = {}
-    try:
-        # Only inspect logs on the current page to limit DB queries
-        page_log_ids = [l.id for l in page_obj]
-        page_logs = Log_auditoria.objects.filter(id__in=page_log_ids)
-        for l in page_logs:
-            target_name = None
-            try:
-                if l.nombre_tabla == 'Empleado' and l.idregistro:
-                    emp = Empleado.objects.filter(idempleado_id=l.idregistro).first()
-                    if emp:
-                        target_name = f"{emp.apellido}, {emp.nombres} ({getattr(emp, 'idempleado_id', '')})"
-                elif l.nombre_tabla == 'Empleado_el' and l.idregistro:
-                    el = Empleado_el.objects.filter(id=l.idregistro).select_related('idempleado').first()
-                    if el and el.idempleado:
-                        emp = el.idempleado
-                        target_name = f"{emp.apellido}, {emp.nombres} ({getattr(emp, 'idempleado_id', '')})"
-                elif l.nombre_tabla == 'Empleado_eo' and l.idregistro:
-                    eo = Empleado_eo.objects.filter(id=l.idregistro).select_related('idempleado').first()
-                    if eo and eo.idempleado:
-                        emp = eo.idempleado
-                        target_name = f"{emp.apellido}, {emp.nombres} ({getattr(emp, 'idempleado_id', '')})"
-                elif l.nombre_tabla == 'Plan_trabajo' and l.idregistro:
-                    plan_obj = Plan_trabajo.objects.filter(id=l.idregistro).select_related('idempleado').first()
-                    if plan_obj and plan_obj.idempleado:
-                        emp = plan_obj.idempleado
-                        target_name = f"{emp.apellido}, {emp.nombres} ({getattr(emp, 'idempleado_id', '')})"
-            except Exception:
-                target_name = None
-            if target_name:
-                log_targets[l.id] = target_name
-    except Exception:
-        log_targets = {}
+    for l in page_obj:
+        try:
+            emp = referencias.empleado_de(l)
+        except Exception:
+            emp = None
+        if emp:
+            log_targets[l.id] = f"{emp.apellido}, {emp.nombres} ({getattr(emp, 'idempleado_id', '')})"
 
     context = {
         'logs': page_obj,
         'log_targets': log_targets,
+        'referencias': referencias,
         'filtros': {
             'tabla': tabla,
             'usuario': usuario,
             'modificado': modificado,
+            'campo': campo,
+            'valor': valor,
             'rango_fecha': bool(rango_fecha),
             'fecha_desde': fecha_desde,
             'fecha_hasta': fecha_hasta,
@@ -2774,10 +2520,29 @@ def ver_log_auditoria(request):
 
 @login_required
 def exportar_empleados_excel(request):
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="empleados.csv"'
-    writer = csv.writer(response)
-    writer.writerow(['ID', 'Nombre', 'Apellido', 'DNI'])
-    for emp in Empleado.objects.exclude(idempleado_id=1):
-        writer.writerow([emp.idempleado, emp.nombres, emp.apellido, emp.dni])
-    return response
+    """Exporta los empleados en CSV, JSON Lines o XLSX (``formato``), a medida que se leen.
+
+    ``columnas`` elige y ordena las columnas (claves de
+    ``exportacion_empleados.COLUMNAS``, repetido o separado por comas); sin
+    ``columnas`` se exportan todas. ``periodo`` es el año del saldo de vacaciones.
+    Sólo para staff: incluye datos personales de todo el personal.
+    """
+    if not request.user.is_staff:
+        return HttpResponseForbidden()
+    claves = [c for valor in request.GET.getlist('columnas') for c in valor.split(',')]
+    try:
+        columnas = exportacion_empleados.columnas_elegidas(claves)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    try:
+        periodo = int(request.GET.get('periodo') or date.today().year)
+    except ValueError:
+        return HttpResponseBadRequest('Periodo inválido')
+    formato = request.GET.get('formato')
+    if formato not in exportacion.FORMATOS:
+        formato = 'csv'
+    return exportacion.respuesta(
+        formato, 'empleados', exportacion_empleados.encabezados(columnas),
+        exportacion_empleados.filas(Empleado.objects.exclude(idempleado_id=1), columnas, periodo=periodo),
+        claves=columnas, hoja='Empleados',
+    )
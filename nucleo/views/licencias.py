@@ -3,9 +3,8 @@ from typing import List, Optional
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden
+from django.http import Http404, HttpResponseForbidden, JsonResponse
 from django.shortcuts import get_object_or_404, render, redirect
-from django.core.paginator import Paginator
 from django.db import models, transaction
 from django.utils import timezone
 from django.utils.http import url_has_allowed_host_and_scheme
@@ -20,11 +19,31 @@ from nucleo.models import (
     Solicitud_licencia,
     Solicitud_vacaciones,
     Estado_lic_vac,
+    Movimiento_vacaciones,
     Vacaciones_otorgadas,
-    Feriado,
 )
+from nucleo.logic.colisiones import (
+    ESTADOS_ACTIVOS,
+    ESTADOS_APROBADOS,
+    buscar_colisiones,
+    colisiones_en_lote,
+    solicitudes_solapadas,
+)
+from nucleo.logic.reporte_solicitudes import (
+    COLUMNAS_EXPORTACION,
+    FiltrosReporte,
+    filas_exportacion,
+    paginar_solicitudes,
+)
+from nucleo.logic.saldo_vacaciones import movimiento
+from nucleo.logic import adjuntos, calendario_feriados, catalogos, dias_habiles, exportacion
+from nucleo.logic.correo_saliente import encolar_varios
+from nucleo.logic.empleado_request import empleado_de
+from nucleo.logic.validaciones import ContextoValidacion, ValidacionError, validar_solicitud_licencia
 from nucleo.views.vacaciones import (
     aprobar_solicitud_vacaciones,
+    comentario_con_motivo_rechazo,
+    consumir_dias_vacaciones,
     rechazar_solicitud_vacaciones,
 )
 
@@ -39,6 +58,7 @@ class AccionSolicitudResult:
     error: Optional[str] = None
     warnings: List[str] = field(default_factory=list)
     tipo: Optional[str] = None
+    solicitud_id: Optional[int] = None
 
 
 def _determinar_tipo_solicitud(solicitud) -> Optional[str]:
@@ -61,19 +81,31 @@ def _obtener_email_y_nombre(solicitud):
     return email, nombre
 
 
+def _agregar_linea(texto, linea):
+    texto = (texto or "").strip()
+    linea = (linea or "").strip()
+    if not linea:
+        return texto
+    return f"{texto}\n{linea}".strip() if texto else linea
+
+
+def _texto_aprobacion(texto_gestor, comentario, warnings_list):
+    """texto_gestor de una licencia aprobada: el anterior más el comentario y las advertencias."""
+    nuevo_texto = _agregar_linea(texto_gestor, comentario)
+    if warnings_list:
+        nuevo_texto = _agregar_linea(nuevo_texto, "Advertencias: " + "; ".join(warnings_list))
+    return nuevo_texto
+
+
 def aprobar_solicitud_licencia(solicitud, comentario=None, enviar_notificacion=True) -> AccionSolicitudResult:
     if solicitud is None:
         return AccionSolicitudResult(success=False, error="Solicitud de licencia inválida", tipo="licencia")
 
-    from nucleo.logic.validaciones import validar_solicitud_licencia, ValidacionError
-
     try:
         _, warnings = validar_solicitud_licencia(solicitud)
     except ValidacionError as ve:
-        estado_rechazada = Estado_lic_vac.objects.get(estado__iexact="Rechazada")
-        texto_actual = (solicitud.texto_gestor or "").strip()
-        motivo = str(ve).strip()
-        nuevo_texto = f"{texto_actual}\n{motivo}".strip() if texto_actual else motivo
+        estado_rechazada = catalogos.obtener(Estado_lic_vac, "Rechazada")
+        nuevo_texto = _agregar_linea(solicitud.texto_gestor, str(ve))
         Solicitud_licencia.objects.filter(pk=solicitud.pk).update(
             id_estado_id=estado_rechazada.id_estado,
             texto_gestor=nuevo_texto,
@@ -86,15 +118,9 @@ def aprobar_solicitud_licencia(solicitud, comentario=None, enviar_notificacion=T
         )
 
     warnings_list = list(warnings or [])
-    nuevo_texto = (solicitud.texto_gestor or "").strip()
-    comentario = (comentario or "").strip()
-    if comentario:
-        nuevo_texto = f"{nuevo_texto}\n{comentario}".strip() if nuevo_texto else comentario
-    if warnings_list:
-        advertencias_txt = "Advertencias: " + "; ".join(warnings_list)
-        nuevo_texto = f"{nuevo_texto}\n{advertencias_txt}".strip() if nuevo_texto else advertencias_txt
+    nuevo_texto = _texto_aprobacion(solicitud.texto_gestor, comentario, warnings_list)
 
-    estado_aceptada = Estado_lic_vac.objects.get(estado__iexact="Aceptada")
+    estado_aceptada = catalogos.obtener(Estado_lic_vac, "Aceptada")
     texto_gestor_actualizado = nuevo_texto if nuevo_texto else ""
     Solicitud_licencia.objects.filter(pk=solicitud.pk).update(
         id_estado_id=estado_aceptada.id_estado,
@@ -134,7 +160,7 @@ def rechazar_solicitud_licencia(solicitud, motivo=None, enviar_notificacion=True
     if solicitud is None:
         return AccionSolicitudResult(success=False, error="Solicitud de licencia inválida", tipo="licencia")
 
-    estado_rechazada = Estado_lic_vac.objects.get(estado__iexact="Rechazada")
+    estado_rechazada = catalogos.obtener(Estado_lic_vac, "Rechazada")
     texto = (motivo or "").strip()
     texto_gestor_actualizado = texto if texto else ""
     Solicitud_licencia.objects.filter(pk=solicitud.pk).update(
@@ -224,6 +250,184 @@ def procesar_accion_solicitud(solicitud, accion, usuario_actual, comentario=None
         return AccionSolicitudResult(success=True, message="Comentario guardado correctamente", tipo=tipo)
 
     return AccionSolicitudResult(success=False, error="Acción no reconocida.", tipo=tipo)
+
+
+def _cargar_para_lote(modelo, ids):
+    qs = modelo.objects.select_related("idempleado__idempleado", "id_estado")
+    if transaction.get_connection().features.has_select_for_update_of:
+        qs = qs.select_for_update(of=("self",))
+    return qs.in_bulk(ids)
+
+
+def procesar_acciones_en_lote(seleccion, accion, usuario_actual, comentario=None, enviar_notificacion=True) -> List[AccionSolicitudResult]:
+    """Aprueba o rechaza varias solicitudes en una sola transacción.
+
+    ``seleccion`` es una lista de (tipo, id) con tipo "licencia" o "vacacion";
+    sólo se procesan las que están "En espera". Se recorren en ese orden
+    contra un único ContextoValidacion en el que cada aprobación (licencia o
+    vacación) se registra antes de validar la siguiente licencia, como al
+    aprobarlas de a una. Los cambios de estado se
+    guardan con un UPDATE por modelo y las notificaciones se encolan juntas.
+    Sólo para staff, tanto para aprobar como para rechazar.
+    Devuelve un AccionSolicitudResult por ítem, en el orden de ``seleccion``.
+    """
+    comentario = (comentario or "").strip()
+    seleccion = list(dict.fromkeys(seleccion))
+
+    def _error(tipo, pk, error):
+        return AccionSolicitudResult(success=False, error=error, tipo=tipo, solicitud_id=pk)
+
+    if accion not in ("aprobar", "rechazar"):
+        return [_error(tipo, pk, "Acción no reconocida.") for tipo, pk in seleccion]
+    if not (usuario_actual and usuario_actual.is_staff):
+        verbo = "aprobar" if accion == "aprobar" else "rechazar"
+        return [_error(tipo, pk, f"No tienes permisos para {verbo} solicitudes en lote.") for tipo, pk in seleccion]
+
+    estado_aceptada = catalogos.obtener(Estado_lic_vac, "Aceptada")
+    estado_rechazada = catalogos.obtener(Estado_lic_vac, "Rechazada")
+    resultados = {}
+    notificaciones = []
+
+    def _notificar(solicitud, tipo, estado, texto):
+        email, nombre_empleado = _obtener_email_y_nombre(solicitud)
+        if email:
+            from nucleo.utils_mail import mensaje_estado_licencia
+
+            asunto, mensaje = mensaje_estado_licencia(
+                nombre_empleado, tipo, estado, texto, solicitud.fecha_desde, solicitud.fecha_hasta
+            )
+            notificaciones.append((asunto, mensaje, [email]))
+
+    with transaction.atomic():
+        cargadas = {
+            "licencia": _cargar_para_lote(Solicitud_licencia, [pk for tipo, pk in seleccion if tipo == "licencia"]),
+            "vacacion": _cargar_para_lote(Solicitud_vacaciones, [pk for tipo, pk in seleccion if tipo == "vacacion"]),
+        }
+        licencias, vacaciones, pendientes = [], [], []
+        for tipo, pk in seleccion:
+            solicitud = cargadas.get(tipo, {}).get(pk)
+            if solicitud is None:
+                resultados[(tipo, pk)] = _error(tipo, pk, "No se encontró la solicitud.")
+            elif solicitud.id_estado.estado.lower() != "en espera":
+                resultados[(tipo, pk)] = _error(tipo, pk, f"La solicitud no está en espera ({solicitud.id_estado.estado}).")
+            elif accion == "aprobar" and usuario_actual and usuario_actual.pk == solicitud.idempleado_id:
+                resultados[(tipo, pk)] = _error(tipo, pk, "❌ No puedes aprobar tus propias solicitudes. Debe hacerlo otro gestor.")
+            else:
+                (licencias if tipo == "licencia" else vacaciones).append(solicitud)
+                pendientes.append((tipo, solicitud))
+
+        if accion == "aprobar":
+            # Una sola pasada en el orden de la selección: cada aprobación (licencia o
+            # vacación) queda registrada en el contexto antes de validar la siguiente
+            contexto = ContextoValidacion.para(licencias)
+            vacaciones_aprobadas = []
+            for tipo, solicitud in pendientes:
+                clave = (tipo, solicitud.pk)
+                if tipo == "vacacion":
+                    solicitud.id_estado = estado_aceptada
+                    vacaciones_aprobadas.append(solicitud)
+                    contexto.registrar_aprobada(solicitud)
+                    resultados[clave] = AccionSolicitudResult(
+                        success=True, message="Solicitud aprobada correctamente", tipo="vacacion", solicitud_id=solicitud.pk,
+                    )
+                    _notificar(solicitud, "vacaciones", "Aceptada", comentario or None)
+                    continue
+                try:
+                    _, warnings = validar_solicitud_licencia(solicitud, contexto)
+                except ValidacionError as ve:
+                    solicitud.id_estado = estado_rechazada
+                    solicitud.texto_gestor = _agregar_linea(solicitud.texto_gestor, str(ve))
+                    resultados[clave] = _error("licencia", solicitud.pk, f"Solicitud rechazada automáticamente: {ve}")
+                    continue
+                contexto.registrar_aprobada(solicitud)
+                solicitud.id_estado = estado_aceptada
+                solicitud.texto_gestor = _texto_aprobacion(solicitud.texto_gestor, comentario, warnings)
+                resultados[clave] = AccionSolicitudResult(
+                    success=True, message="Solicitud aprobada correctamente", warnings=list(warnings),
+                    tipo="licencia", solicitud_id=solicitud.pk,
+                )
+                _notificar(solicitud, "licencia", "Aceptada", solicitud.texto_gestor)
+            Solicitud_licencia.objects.bulk_update(licencias, ["id_estado", "texto_gestor"])
+
+            Solicitud_vacaciones.objects.filter(pk__in=[s.pk for s in vacaciones_aprobadas]).update(id_estado=estado_aceptada)
+            for solicitud in vacaciones_aprobadas:
+                # El consumo reparte días entre periodos y deja movimientos: sigue siendo por solicitud
+                consumir_dias_vacaciones(solicitud.idempleado, solicitud.fecha_desde, solicitud.fecha_hasta, solicitud=solicitud)
+        else:
+            Solicitud_licencia.objects.filter(pk__in=[s.pk for s in licencias]).update(
+                id_estado=estado_rechazada, texto_gestor=comentario,
+            )
+            for solicitud in vacaciones:
+                solicitud.id_estado = estado_rechazada
+                solicitud.comentario = comentario_con_motivo_rechazo(solicitud.comentario, comentario)
+            Solicitud_vacaciones.objects.bulk_update(vacaciones, ["id_estado", "comentario"])
+            for tipo, solicitudes in (("licencia", licencias), ("vacacion", vacaciones)):
+                for solicitud in solicitudes:
+                    resultados[(tipo, solicitud.pk)] = AccionSolicitudResult(
+                        success=True, message="Solicitud rechazada correctamente", tipo=tipo, solicitud_id=solicitud.pk,
+                    )
+                    _notificar(solicitud, "licencia" if tipo == "licencia" else "vacaciones", "Rechazada", comentario)
+
+        if enviar_notificacion and notificaciones:
+            encolar_varios(notificaciones)
+
+    return [resultados[item] for item in seleccion]
+
+
+def _leer_seleccion(valores):
+    """Valores "tipo:id" del formulario -> lista de (tipo, id); ignora los mal formados."""
+    seleccion = []
+    for valor in valores:
+        tipo, _, pk = (valor or "").partition(":")
+        if tipo in ("licencia", "vacacion") and pk.isdigit():
+            seleccion.append((tipo, int(pk)))
+    return seleccion
+
+
+@login_required
+def gestionar_estado_solicitudes_lote(request):
+    """POST con varias ``seleccion`` ("licencia:12", "vacacion:7") y ``accion`` aprobar/rechazar.
+
+    Con ``Accept: application/json`` responde el resultado de cada ítem; si no,
+    redirige al reporte con un resumen y un mensaje por cada ítem no procesado.
+    """
+    if request.method != "POST":
+        return redirect("nucleo:gestion_reporte_licencias")
+    seleccion = _leer_seleccion(request.POST.getlist("seleccion"))
+    accion = (request.POST.get("accion") or "").lower()
+    resultados = procesar_acciones_en_lote(
+        seleccion, accion, request.user, comentario=request.POST.get("motivo_rechazo", ""),
+    )
+
+    if "application/json" in request.headers.get("Accept", ""):
+        return JsonResponse({"resultados": [
+            {
+                "tipo": r.tipo,
+                "id": r.solicitud_id,
+                "ok": r.success,
+                "mensaje": r.message if r.success else r.error,
+                "advertencias": r.warnings,
+            }
+            for r in resultados
+        ]})
+
+    if not seleccion:
+        mensaje_error = "No se seleccionó ninguna solicitud."
+        messages.error(request, mensaje_error)
+        return redirect(_build_redirect_with_filters_from_post(request, mensaje_error, message_type="error"))
+
+    procesadas = [r for r in resultados if r.success]
+    for r in resultados:
+        if not r.success:
+            messages.error(request, f"Solicitud {r.solicitud_id}: {r.error}")
+        for advertencia in r.warnings:
+            messages.warning(request, f"Solicitud {r.solicitud_id}: {advertencia}")
+    verbo = "aprobadas" if accion == "aprobar" else "rechazadas"
+    resumen = f"{len(procesadas)} de {len(resultados)} solicitudes {verbo}."
+    tipo_mensaje = "success" if procesadas else "error"
+    return redirect(_build_redirect_with_filters_from_post(request, resumen, message_type=tipo_mensaje))
+
+
 @login_required
 def eliminar_solicitud(request):
     """Endpoint POST para marcar o eliminar una solicitud.
@@ -310,47 +514,47 @@ def eliminar_solicitud(request):
     # Si es una vacación aprobada/aceptada, revertir el consumo de días antes de eliminar
     if tipo == 'vacaciones' and estado_text in ['aceptada', 'aprobada']:
         try:
-            from nucleo.models import Vacaciones_otorgadas
             dias_a_liberar = (solicitud.fecha_hasta - solicitud.fecha_desde).days + 1
             
             # Buscar los registros de Vacaciones_otorgadas que fueron afectados
             # Primero el año actual, luego años anteriores
             year_solicitud = solicitud.fecha_desde.year
-            vac_actual = Vacaciones_otorgadas.objects.filter(
-                idempleado=solicitud.idempleado,
-                inicio_consumo__year=year_solicitud
-            ).first()
+            with movimiento(Movimiento_vacaciones.CANCELACION, solicitud):
+                vac_actual = Vacaciones_otorgadas.objects.filter(
+                    idempleado=solicitud.idempleado,
+                    inicio_consumo__year=year_solicitud
+                ).first()
             
-            if vac_actual and vac_actual.dias_consumidos >= dias_a_liberar:
-                # Si el año actual tiene suficientes días consumidos, revertir ahí
-                vac_actual.dias_consumidos -= dias_a_liberar
-                vac_actual.save()
-            else:
-                # Si no, hay que revertir proporcionalmente en múltiples años
-                restante = dias_a_liberar
-                
-                # Empezar por el año actual si tiene días consumidos
-                if vac_actual and vac_actual.dias_consumidos > 0:
-                    a_revertir = min(vac_actual.dias_consumidos, restante)
-                    vac_actual.dias_consumidos -= a_revertir
+                if vac_actual and vac_actual.dias_consumidos >= dias_a_liberar:
+                    # Si el año actual tiene suficientes días consumidos, revertir ahí
+                    vac_actual.dias_consumidos -= dias_a_liberar
                     vac_actual.save()
-                    restante -= a_revertir
+                else:
+                    # Si no, hay que revertir proporcionalmente en múltiples años
+                    restante = dias_a_liberar
+                
+                    # Empezar por el año actual si tiene días consumidos
+                    if vac_actual and vac_actual.dias_consumidos > 0:
+                        a_revertir = min(vac_actual.dias_consumidos, restante)
+                        vac_actual.dias_consumidos -= a_revertir
+                        vac_actual.save()
+                        restante -= a_revertir
                 
-                # Luego años anteriores, empezando por el más reciente
-                if restante > 0:
-                    vac_anteriores = Vacaciones_otorgadas.objects.filter(
-                        idempleado=solicitud.idempleado,
-                        inicio_consumo__lt=solicitud.fecha_desde
-                    ).order_by('-inicio_consumo')  # Más reciente primero
+                    # Luego años anteriores, empezando por el más reciente
+                    if restante > 0:
+                        vac_anteriores = Vacaciones_otorgadas.objects.filter(
+                            idempleado=solicitud.idempleado,
+                            inicio_consumo__lt=solicitud.fecha_desde
+                        ).order_by('-inicio_consumo')  # Más reciente primero
                     
-                    for vac in vac_anteriores:
-                        if restante <= 0:
-                            break
-                        if vac.dias_consumidos > 0:
-                            a_revertir = min(vac.dias_consumidos, restante)
-                            vac.dias_consumidos -= a_revertir
-                            vac.save()
-                            restante -= a_revertir
+                        for vac in vac_anteriores:
+                            if restante <= 0:
+                                break
+                            if vac.dias_consumidos > 0:
+                                a_revertir = min(vac.dias_consumidos, restante)
+                                vac.dias_consumidos -= a_revertir
+                                vac.save()
+                                restante -= a_revertir
             
         except Exception as e:
             import logging
@@ -359,7 +563,7 @@ def eliminar_solicitud(request):
 
     # Intentar cambiar a estado 'Cancelada' si existe
     try:
-        estado_cancelada = Estado_lic_vac.objects.filter(estado__iexact='Cancelada').first()
+        estado_cancelada = catalogos.por_nombre(Estado_lic_vac, 'Cancelada')
         if estado_cancelada:
             solicitud.id_estado = estado_cancelada
             # También añadir texto_gestor si lo borró un gestor
@@ -442,6 +646,17 @@ def detalle_licencia(request, solicitud_id):
     })
 
 
+@login_required
+def adjunto_licencia(request, solicitud_id):
+    """Descarga del adjunto de una solicitud (gestores o el propio empleado); el cuerpo lo envía nginx."""
+    solicitud = get_object_or_404(Solicitud_licencia, pk=solicitud_id)
+    if not request.user.is_staff and solicitud.idempleado_id != request.user.pk:
+        return HttpResponseForbidden()
+    if not solicitud.archivo:
+        raise Http404("La solicitud no tiene adjunto")
+    return adjuntos.respuesta_descarga(solicitud.archivo, solicitud.archivo_nombre)
+
+
 @login_required
 def solicitar_licencia(request):
     # DEBUG seguro: Si necesitas depurar, usa logging en vez de print para evitar errores en producción
@@ -452,15 +667,14 @@ def solicitar_licencia(request):
     dias_por_licencia = {str(t.id_licencia): (t.dias if t.dias is not None else None) for t in tipos_licencia}
     # Feriados como lista de strings YYYY-MM-DD
     from datetime import date
-    feriados_qs = Feriado.objects.all()
-    feriados = [f.fecha.strftime('%Y-%m-%d') for f in feriados_qs]
+    feriados = [f.strftime('%Y-%m-%d') for f in calendario_feriados.fechas()]
     # Información de vacaciones real para el usuario actual:
     # total disponible, total consumido y periodos otorgados (inicio/fin/dias)
     from nucleo.models import Vacaciones_otorgadas
     # Resolver el objeto Empleado de forma robusta: por pk (id), por relación al User
     # o por campos de usuario si fuera necesario. Esto evita que `empleado_obj` quede None
     # y se saltee la validación del Plan_trabajo en la creación de solicitudes.
-    empleado_obj = Empleado.objects.filter(idempleado_id=request.user.id).first()
+    empleado_obj = empleado_de(request)
     if not empleado_obj:
         # intentar por relación inversa (idempleado es OneToOne a User)
         empleado_obj = Empleado.objects.filter(idempleado__username=request.user.username).first()
@@ -594,27 +808,17 @@ def solicitar_licencia(request):
         comentario = request.POST.get("comentario")
         archivo = request.FILES.get("archivo")
         try:
-            tipo_lic = Tipo_licencia.objects.get(pk=id_licencia)
+            tipo_lic = catalogos.obtener_por_id(Tipo_licencia, id_licencia)
         except Exception:
             tipo_lic = None
         try:
-            estado = Estado_lic_vac.objects.get(estado__iexact="En espera")
+            estado = catalogos.obtener(Estado_lic_vac, "En espera")
         except Exception:
             estado = None
 
         es_licencia_libre = bool(tipo_lic) and getattr(tipo_lic, "dias", None) is None
 
-        archivo_url = None
-        if archivo:
-            carpeta = os.path.join("media", "licencias")
-            os.makedirs(carpeta, exist_ok=True)
-            archivo_url = f"licencias/{archivo.name}"
-            ruta_archivo = os.path.join("media", archivo_url)
-            with open(ruta_archivo, "wb+") as destination:
-                for chunk in archivo.chunks():
-                    destination.write(chunk)
-
-        from datetime import datetime, timedelta
+        from datetime import datetime
         try:
             fecha_desde_dt = datetime.strptime(fecha_desde, "%Y-%m-%d").date()
             fecha_hasta_dt = datetime.strptime(fecha_hasta, "%Y-%m-%d").date()
@@ -634,20 +838,15 @@ def solicitar_licencia(request):
             })
 
         feriados_warning_message = None
-        feriados_qs = Feriado.objects.all()
-        feriados_fechas = {f.fecha for f in feriados_qs}
         # Lista legible de feriados en el rango
-        feriados_en_rango = [f.strftime("%d/%m/%Y") for f in sorted(feriados_fechas) if fecha_desde_dt <= f <= fecha_hasta_dt]
+        feriados_en_rango = [f.strftime("%d/%m/%Y") for f in calendario_feriados.feriados_entre(fecha_desde_dt, fecha_hasta_dt)]
         if feriados_en_rango:
-            total_days = (fecha_hasta_dt - fecha_desde_dt).days + 1
-            dias_solicitados_set = {fecha_desde_dt + timedelta(days=i) for i in range(total_days)}
-
             if es_licencia_libre:
                 mensaje_error = (
                     "No se puede solicitar una licencia libre en días feriados. "
                     f"Fechas alcanzadas: {', '.join(feriados_en_rango)}."
                 )
-            elif dias_solicitados_set.issubset(feriados_fechas):
+            elif calendario_feriados.dias_laborables(fecha_desde_dt, fecha_hasta_dt) == 0:
                 mensaje_error = "No se puede solicitar una licencia exclusivamente en días feriados."
             else:
                 # Mezcla de días hábiles y feriados: preparar advertencia (se unirá con la del plan)
@@ -655,40 +854,23 @@ def solicitar_licencia(request):
                     f"Atención: Las fechas seleccionadas incluyen feriados: {', '.join(feriados_en_rango)}."
                 )
 
-        colisiones = []
-        licencias_colision = Solicitud_licencia.objects.filter(
-            idempleado=empleado_obj,
-            fecha_desde__lte=fecha_hasta_dt,
-            fecha_hasta__gte=fecha_desde_dt,
-            id_estado__estado__in=["En espera", "Aceptada"]
-        )
-        vacaciones_colision = Solicitud_vacaciones.objects.filter(
-            idempleado=empleado_obj,
-            fecha_desde__lte=fecha_hasta_dt,
-            fecha_hasta__gte=fecha_desde_dt,
-            id_estado__estado__in=["En espera", "Aceptada"]
-        )
-        for l in licencias_colision:
-            colisiones.append(f"Licencia: {l.fecha_desde.strftime('%d/%m/%Y')} - {l.fecha_hasta.strftime('%d/%m/%Y')}")
-        for v in vacaciones_colision:
-            colisiones.append(f"Vacaciones: {v.fecha_desde.strftime('%d/%m/%Y')} - {v.fecha_hasta.strftime('%d/%m/%Y')}")
+        colisiones = [
+            f"{'Licencia' if c.tipo == 'licencia' else 'Vacaciones'}: {c.rango_texto()}"
+            for c in buscar_colisiones(fecha_desde_dt, fecha_hasta_dt, ESTADOS_ACTIVOS, empleado=empleado_obj)
+        ]
         if colisiones:
             mensaje_error = "Colisión con licencias/vacaciones ya solicitadas en las siguientes fechas: " + "; ".join(colisiones)
 
         # Detectar colisiones con solicitudes ACEPTADAS de OTROS empleados -> mostrar advertencia
         try:
-            from django.db.models import Q
-            # Buscar licencias ACEPTADAS/APROBADAS de OTROS empleados que solapen
-            other_lic_aprobada = Solicitud_licencia.objects.filter(~Q(idempleado=empleado_obj)).filter(
-                Q(id_estado__estado__iexact='Aceptada') | Q(id_estado__estado__iexact='Aprobada')
-            ).filter(fecha_desde__lte=fecha_hasta_dt, fecha_hasta__gte=fecha_desde_dt)
-            # Buscar vacaciones de OTROS empleados que solapen (incluir En espera/Aceptada/Aprobada)
-            other_vac_aprobada = Solicitud_vacaciones.objects.filter(~Q(idempleado=empleado_obj)).filter(
-                id_estado__estado__in=['En espera', 'Aceptada', 'Aprobada']
-            ).filter(fecha_desde__lte=fecha_hasta_dt, fecha_hasta__gte=fecha_desde_dt)
-
-            lic_exists = other_lic_aprobada.exists()
-            vac_exists = other_vac_aprobada.exists()
+            # Licencias ACEPTADAS/APROBADAS y vacaciones En espera/Aceptada/Aprobada de OTROS empleados
+            lic_exists = solicitudes_solapadas(
+                Solicitud_licencia, fecha_desde_dt, fecha_hasta_dt, ESTADOS_APROBADOS, excluir_empleado=empleado_obj
+            ).exists()
+            vac_exists = solicitudes_solapadas(
+                Solicitud_vacaciones, fecha_desde_dt, fecha_hasta_dt, ('En espera',) + ESTADOS_APROBADOS,
+                excluir_empleado=empleado_obj,
+            ).exists()
             if lic_exists or vac_exists:
                 tipos = []
                 if lic_exists:
@@ -735,22 +917,14 @@ def solicitar_licencia(request):
                 })
             plan = planes_qs.first() if planes_qs.exists() else None
             if plan:
-                plan_schedule = {
-                    0: bool(getattr(plan, "lunes", False)),
-                    1: bool(getattr(plan, "martes", False)),
-                    2: bool(getattr(plan, "miercoles", False)),
-                    3: bool(getattr(plan, "jueves", False)),
-                    4: bool(getattr(plan, "viernes", False)),
-                    5: bool(getattr(plan, "sabado", False)),
-                    6: bool(getattr(plan, "domingo", False)),
-                }
+                mascara = dias_habiles.mascara_plan(plan)
                 d = fecha_desde_dt
                 weekday = d.weekday()  # 0=lunes .. 6=domingo
-                works = plan_schedule.get(weekday, False)
+                works = dias_habiles.trabaja(mascara, d)
 
                 nombre_dias = ['lunes', 'martes', 'miércoles', 'jueves', 'viernes', 'sábado', 'domingo']
                 nombre_dia = nombre_dias[weekday]
-                primer_dia_feriado = fecha_desde_dt in feriados_fechas
+                primer_dia_feriado = calendario_feriados.es_feriado(fecha_desde_dt)
 
                 if dias_solicitados == 1:
                     fecha_str = fecha_desde_dt.strftime('%d/%m/%Y')
@@ -790,24 +964,11 @@ def solicitar_licencia(request):
                         })
 
                 if not mensaje_error:
-                    total_rango = (fecha_hasta_dt - fecha_desde_dt).days + 1
-                    dias_laborables_noferiado = []
-                    dias_no_laborables_plan = []
-                    dias_feriados_plan = []
-                    for offset in range(total_rango):
-                        dia = fecha_desde_dt + timedelta(days=offset)
-                        dia_weekday = dia.weekday()
-                        works_day = plan_schedule.get(dia_weekday, False)
-                        es_feriado = dia in feriados_fechas
-                        if works_day and not es_feriado:
-                            dias_laborables_noferiado.append(dia)
-                        else:
-                            if not works_day:
-                                dias_no_laborables_plan.append(dia)
-                            if es_feriado:
-                                dias_feriados_plan.append(dia)
+                    resumen = dias_habiles.analizar(mascara, fecha_desde_dt, fecha_hasta_dt)
+                    dias_no_laborables_plan = resumen.dias_libres
+                    dias_feriados_plan = resumen.feriados
 
-                    if not dias_laborables_noferiado:
+                    if not resumen.hay_laborables:
                         detalle_partes = []
                         if dias_no_laborables_plan:
                             detalle_partes.append("días no laborables según tu plan de trabajo")
@@ -884,6 +1045,7 @@ def solicitar_licencia(request):
                 comentario=comentario or "",
             )
         else:
+            # El adjunto se guarda recién con la solicitud válida, una sola vez por contenido
             Solicitud_licencia.objects.create(
                 idempleado=empleado_obj,
                 id_licencia=tipo_lic,
@@ -891,7 +1053,8 @@ def solicitar_licencia(request):
                 fecha_hasta=fecha_hasta_dt,
                 comentario=comentario or "",
                 texto_gestor="",
-                archivo=archivo_url,
+                archivo=adjuntos.guardar(archivo) if archivo else None,
+                archivo_nombre=os.path.basename(archivo.name)[:200] if archivo else None,
                 id_estado=estado,
             )
 
@@ -938,7 +1101,9 @@ def solicitar_licencia(request):
 def consultar_licencia(request):
     from datetime import datetime
     
-    empleado_obj = get_object_or_404(Empleado, pk=request.user.id)
+    empleado_obj = empleado_de(request)
+    if empleado_obj is None:
+        raise Http404
     licencias = list(Solicitud_licencia.objects.filter(idempleado=empleado_obj).select_related('id_licencia', 'id_estado'))
     vacaciones = list(Solicitud_vacaciones.objects.filter(idempleado=empleado_obj).select_related('id_estado'))
     
@@ -1272,9 +1437,10 @@ def gestion_reporte_licencias(request):
     except Exception:
         pass
 
-    # Filtros GET
-    anio = request.GET.get('anio') if 'anio' in request.GET else None
-    empleado_filtro = request.GET.get('empleado') if 'empleado' in request.GET else None
+    # Filtros GET (los mismos que usa exportar_reporte_licencias)
+    filtros = FiltrosReporte.de_get(request.GET)
+    anio = filtros.anio
+    empleado_filtro = filtros.empleado
     empleado_display = None
     if empleado_filtro:
         if empleado_filtro.isdigit():
@@ -1285,92 +1451,23 @@ def gestion_reporte_licencias(request):
                 empleado_display = empleado_filtro
         else:
             empleado_display = empleado_filtro
-    tipo_id = request.GET.get('tipo') if 'tipo' in request.GET else None
-    estado = request.GET.get('estado') if 'estado' in request.GET else None
+    tipo_id = filtros.tipo_id
+    estado = filtros.estado
     # Fecha simple / rango
-    fecha_desde_str = request.GET.get('fecha_desde') if 'fecha_desde' in request.GET else None
-    fecha_hasta_str = request.GET.get('fecha_hasta') if 'fecha_hasta' in request.GET else None
-    fecha_rango = request.GET.get('fecha_rango') if 'fecha_rango' in request.GET else None
-
-    solicitudes = Solicitud_licencia.objects.select_related('idempleado', 'id_licencia', 'id_estado')
-    vacaciones = Solicitud_vacaciones.objects.select_related('idempleado', 'id_estado')
-    # Aplica filtros a ambas
-    if anio:
-        solicitudes = solicitudes.filter(fecha_desde__year=anio)
-        vacaciones = vacaciones.filter(fecha_desde__year=anio)
-    if tipo_id:
-        solicitudes = solicitudes.filter(id_licencia__id_licencia=tipo_id)
-        # Vacaciones solo si el tipo es "Vacaciones"
-        tipo_vacaciones = Tipo_licencia.objects.filter(descripcion__iexact="Vacaciones").first()
-        if tipo_vacaciones and str(tipo_vacaciones.id_licencia) == str(tipo_id):
-            pass  # mostrar vacaciones
-        else:
-            vacaciones = vacaciones.none()
-    if estado:
-        solicitudes = solicitudes.filter(id_estado__estado__iexact=estado)
-        vacaciones = vacaciones.filter(id_estado__estado__iexact=estado)
-    if empleado_filtro:
-        if empleado_filtro.isdigit():
-            solicitudes = solicitudes.filter(idempleado__idempleado=empleado_filtro)
-            vacaciones = vacaciones.filter(idempleado__idempleado=empleado_filtro)
-        else:
-            solicitudes = solicitudes.filter(
-                models.Q(idempleado__nombres__icontains=empleado_filtro) |
-                models.Q(idempleado__apellido__icontains=empleado_filtro)
-            )
-            vacaciones = vacaciones.filter(
-                models.Q(idempleado__nombres__icontains=empleado_filtro) |
-                models.Q(idempleado__apellido__icontains=empleado_filtro)
-            )
-
-    # (fecha filter intentionally handled below so it applies regardless of empleado filter)
-
-    # Aplicar filtro por fecha (contención dentro del rango) - debe aplicarse
-    # independientemente de si se filtró por empleado u otros campos.
-    if fecha_desde_str:
-        try:
-            from datetime import datetime as _dt
-            fecha_desde = _dt.strptime(fecha_desde_str, '%Y-%m-%d').date()
-            # Si el usuario definió un rango explícito (checkbox), aplicamos
-            # contención: la solicitud completa debe estar dentro del rango.
-            if fecha_rango and fecha_hasta_str:
-                fecha_hasta = _dt.strptime(fecha_hasta_str, '%Y-%m-%d').date()
-                # Contención: fecha_desde >= filtro_desde AND fecha_hasta <= filtro_hasta
-                solicitudes = solicitudes.filter(fecha_desde__gte=fecha_desde, fecha_hasta__lte=fecha_hasta)
-                vacaciones = vacaciones.filter(fecha_desde__gte=fecha_desde, fecha_hasta__lte=fecha_hasta)
-            else:
-                # Single-date semantics: devolver solicitudes cuya ventana contenga
-                # la fecha seleccionada. Es decir: fecha_desde <= fecha_sel <= fecha_hasta
-                solicitudes = solicitudes.filter(fecha_desde__lte=fecha_desde, fecha_hasta__gte=fecha_desde)
-                vacaciones = vacaciones.filter(fecha_desde__lte=fecha_desde, fecha_hasta__gte=fecha_desde)
-        except Exception:
-            # Si la fecha no es válida, ignorar el filtro
-            pass
+    fecha_desde_str = filtros.fecha_desde
+    fecha_hasta_str = filtros.fecha_hasta
+    fecha_rango = filtros.fecha_rango
+
+    # idempleado__idempleado: la plantilla compara el usuario de cada fila con request.user
+    solicitudes, vacaciones = filtros.aplicar(
+        Solicitud_licencia.objects.select_related('idempleado__idempleado', 'id_licencia', 'id_estado'),
+        Solicitud_vacaciones.objects.select_related('idempleado__idempleado', 'id_estado'),
+    )
 
-    # Unifica ambas listas
-    solicitudes_list = list(solicitudes)
-    for v in vacaciones:
-        v.id_licencia = Tipo_licencia.objects.filter(descripcion__iexact="Vacaciones").first()
-        v.archivo = None
-        v.comentario = getattr(v, "comentario", "")
-        v.dias = (v.fecha_hasta - v.fecha_desde).days + 1
-        # Añadir idempleado_id para mostrar en la tabla
-        v.idempleado_id = getattr(v.idempleado, 'idempleado_id', getattr(v.idempleado, 'pk', None))
-        solicitudes_list.append(v)
-    # Calcula los días para licencias
-    for s in solicitudes_list:
-        if not hasattr(s, "dias"):
-            s.dias = (s.fecha_hasta - s.fecha_desde).days + 1
-        # Añadir idempleado_id para mostrar en la tabla
-        s.idempleado_id = getattr(s.idempleado, 'idempleado_id', getattr(s.idempleado, 'pk', None))
-
-    # Ordena por fecha desde descendente
-    solicitudes_list.sort(key=lambda x: x.fecha_desde, reverse=True)
-
-    # Paginación
-    page_number = request.GET.get('page')
-    paginator = Paginator(solicitudes_list, 12)
-    page_obj = paginator.get_page(page_number)
+    # Listado unificado ordenado y paginado en SQL (ver nucleo.logic.reporte_solicitudes)
+    page_obj = paginar_solicitudes(
+        solicitudes, vacaciones, request.GET.get('page'), cursor=request.GET.get('cursor')
+    )
 
     # Para los combos
     empleados = Empleado.objects.all()
@@ -1378,26 +1475,11 @@ def gestion_reporte_licencias(request):
     estados = Estado_lic_vac.objects.all().order_by('estado')
     anios = Solicitud_licencia.objects.dates('fecha_desde', 'year')
 
-    colisiones_por_solicitud = {}
-
-    for s in page_obj:
-        colisiones_otros = []
-        licencias_otros = Solicitud_licencia.objects.filter(
-            fecha_desde__lte=s.fecha_hasta,
-            fecha_hasta__gte=s.fecha_desde,
-            id_estado__estado__in=["En espera", "Aceptada"]
-        ).exclude(idempleado=s.idempleado)
-        vacaciones_otros = Solicitud_vacaciones.objects.filter(
-            fecha_desde__lte=s.fecha_hasta,
-            fecha_hasta__gte=s.fecha_desde,
-            id_estado__estado__in=["En espera", "Aceptada"]
-        ).exclude(idempleado=s.idempleado)
-        for l in licencias_otros:
-            colisiones_otros.append(f"{l.idempleado.nombres} {l.idempleado.apellido}: {l.fecha_desde.strftime('%d/%m/%Y')} - {l.fecha_hasta.strftime('%d/%m/%Y')}")
-        for v in vacaciones_otros:
-            colisiones_otros.append(f"{v.idempleado.nombres} {v.idempleado.apellido}: {v.fecha_desde.strftime('%d/%m/%Y')} - {v.fecha_hasta.strftime('%d/%m/%Y')}")
-        if colisiones_otros:
-            colisiones_por_solicitud[s.pk] = colisiones_otros
+    # Colisiones con otros empleados para toda la página: dos consultas en total
+    colisiones_por_solicitud = {
+        pk: [f"{c.empleado}: {c.rango_texto()}" for c in colisiones]
+        for pk, colisiones in colisiones_en_lote(page_obj, ESTADOS_ACTIVOS).items()
+    }
 
     try:
         logger.info(f"[VIEW DEBUG] mensaje_unico={mensaje_unico}, mensajes_exito={mensajes_exito}, mensajes_error={mensajes_error}, mensajes_advertencia={mensajes_advertencia}, messages_list_len={len(messages_list) if 'messages_list' in locals() else 0}")
@@ -1407,7 +1489,6 @@ def gestion_reporte_licencias(request):
     # Preparar respuesta
     response = render(request, "nucleo/gestion_reporte_licencias.html", {
         "solicitudes": page_obj,
-        "solicitudes_completas": solicitudes_list,
         "empleados": empleados,
         "tipos": tipos,
         "estados": estados,
@@ -1436,13 +1517,39 @@ def gestion_reporte_licencias(request):
     
     return response
 
+@login_required
+def exportar_reporte_licencias(request):
+    """Exporta todas las licencias y vacaciones que coinciden con los filtros del reporte.
+
+    Mismos parámetros GET que gestion_reporte_licencias; ``formato`` es
+    ``csv`` (por defecto), ``jsonl`` o ``xlsx``. La respuesta se genera a
+    medida que se leen las filas.
+    """
+    if not request.user.is_staff:
+        return HttpResponseForbidden()
+    licencias, vacaciones = FiltrosReporte.de_get(request.GET).aplicar(
+        Solicitud_licencia.objects.all(), Solicitud_vacaciones.objects.all(),
+    )
+    formato = request.GET.get('formato')
+    if formato not in exportacion.FORMATOS:
+        formato = 'csv'
+    return exportacion.respuesta(
+        formato, 'licencias',
+        [titulo for _, titulo in COLUMNAS_EXPORTACION],
+        filas_exportacion(licencias, vacaciones),
+        claves=[clave for clave, _ in COLUMNAS_EXPORTACION],
+        hoja='Licencias',
+    )
+
 @login_required
 def gestionar_solicitudes(request):
     # Solo admin puede ver todas las solicitudes
     es_admin = request.user.is_superuser or request.user.has_perm('nucleo.ver_todas_las_solicitudes')
     empleado_obj = None
     if not es_admin:
-        empleado_obj = get_object_or_404(Empleado, pk=request.user.id)
+        empleado_obj = empleado_de(request)
+        if empleado_obj is None:
+            raise Http404
 
     solicitudes = Solicitud_licencia.objects.select_related('idempleado', 'id_licencia', 'id_estado')
     vacaciones = Solicitud_vacaciones.objects.select_related('idempleado', 'id_estado')
@@ -1470,11 +1577,11 @@ def gestionar_solicitudes(request):
                     if usuario_actual.id == solicitud.idempleado.id:
                         mensaje_error = "No puedes aprobar tus propias solicitudes, debe hacerlo otro gestor."
                     else:
-                        solicitud.id_estado = Estado_lic_vac.objects.get(estado__iexact='Aceptada')
+                        solicitud.id_estado = catalogos.obtener(Estado_lic_vac, 'Aceptada')
                         solicitud.save()
                         mensaje_exito = 'Solicitud aprobada correctamente.'
                 elif accion == 'rechazar':
-                    solicitud.id_estado = Estado_lic_vac.objects.get(estado__iexact='Rechazada')
+                    solicitud.id_estado = catalogos.obtener(Estado_lic_vac, 'Rechazada')
                     solicitud.texto_gestor = texto_gestor
                     solicitud.save()
                     mensaje_exito = 'Solicitud rechazada correctamente.'
@@ -1488,18 +1595,19 @@ def gestionar_solicitudes(request):
                         if usuario_actual.id == solicitud.idempleado.id:
                             mensaje_error = "No puedes aprobar tus propias solicitudes, debe hacerlo otro gestor."
                         else:
-                            solicitud.id_estado = Estado_lic_vac.objects.get(estado__iexact='Aceptada')
+                            solicitud.id_estado = catalogos.obtener(Estado_lic_vac, 'Aceptada')
                             solicitud.save()
-                            Vacaciones_otorgadas.objects.create(
-                                idempleado=solicitud.idempleado,
-                                inicio_consumo=solicitud.fecha_desde,
-                                fin_consumo=solicitud.fecha_hasta,
-                                dias_disponibles=(solicitud.fecha_hasta - solicitud.fecha_desde).days + 1,
-                                dias_consumidos=(solicitud.fecha_hasta - solicitud.fecha_desde).days + 1,
-                            )
+                            with movimiento(Movimiento_vacaciones.CONSUMO, solicitud):
+                                Vacaciones_otorgadas.objects.create(
+                                    idempleado=solicitud.idempleado,
+                                    inicio_consumo=solicitud.fecha_desde,
+                                    fin_consumo=solicitud.fecha_hasta,
+                                    dias_disponibles=(solicitud.fecha_hasta - solicitud.fecha_desde).days + 1,
+                                    dias_consumidos=(solicitud.fecha_hasta - solicitud.fecha_desde).days + 1,
+                                )
                             mensaje_exito = 'Solicitud aprobada correctamente.'
                     elif accion == 'rechazar':
-                        solicitud.id_estado = Estado_lic_vac.objects.get(estado__iexact='Rechazada')
+                        solicitud.id_estado = catalogos.obtener(Estado_lic_vac, 'Rechazada')
                         solicitud.save()
                         mensaje_exito = 'Solicitud rechazada correctamente.'
         except Exception as e:
@@ -1511,7 +1619,7 @@ def gestionar_solicitudes(request):
         vacaciones = vacaciones.filter(fecha_desde__year=anio)
     if tipo_id:
         solicitudes = solicitudes.filter(id_licencia__id_licencia=tipo_id)
-        tipo_vacaciones = Tipo_licencia.objects.filter(descripcion__iexact="Vacaciones").first()
+        tipo_vacaciones = catalogos.por_nombre(Tipo_licencia, "Vacaciones")
         if tipo_vacaciones and str(tipo_vacaciones.id_licencia) == str(tipo_id):
             pass
         else:
@@ -1533,26 +1641,10 @@ def gestionar_solicitudes(request):
                 models.Q(idempleado__apellido__icontains=empleado_filtro)
             )
 
-    # Unifica ambas listas
-    solicitudes_list = list(solicitudes)
-    for v in vacaciones:
-        v.id_licencia = Tipo_licencia.objects.filter(descripcion__iexact="Vacaciones").first()
-        v.archivo = None
-        v.comentario = getattr(v, "comentario", "")
-        v.dias = (v.fecha_hasta - v.fecha_desde).days + 1
-        solicitudes_list.append(v)
-    # Calcula los días para licencias
-    for s in solicitudes_list:
-        if not hasattr(s, "dias"):
-            s.dias = (s.fecha_hasta - s.fecha_desde).days + 1
-
-    # Ordena por fecha desde descendente
-    solicitudes_list.sort(key=lambda x: x.fecha_desde, reverse=True)
-
-    # Paginación
-    page_number = request.GET.get('page')
-    paginator = Paginator(solicitudes_list, 12)
-    page_obj = paginator.get_page(page_number)
+    # Listado unificado ordenado y paginado en SQL (ver nucleo.logic.reporte_solicitudes)
+    page_obj = paginar_solicitudes(
+        solicitudes, vacaciones, request.GET.get('page'), cursor=request.GET.get('cursor')
+    )
 
     # Para los combos
     empleados = Empleado.objects.all()
@@ -1642,7 +1734,7 @@ def ver_feriados(request):
     current_year = int(request.GET.get('year', date.today().year))
     
     # Filtrar feriados por el año seleccionado
-    feriados = Feriado.objects.filter(fecha__year=current_year).order_by('fecha')
+    feriados = calendario_feriados.del_anio(current_year)
     
     # Si es una petición AJAX, devolver JSON
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
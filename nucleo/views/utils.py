@@ -14,7 +14,6 @@ def buscar_localidades(request):
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from django.http import JsonResponse
-from django.core.mail import send_mail
 from django.conf import settings
 from django.contrib import messages
 from django.shortcuts import render, redirect
@@ -25,6 +24,8 @@ import json
 
 from nucleo.models import Localidad, Provincia, Sucursal, Empleado_el, Vacaciones_otorgadas, Solicitud_licencia, Estado_empleado
 from nucleo.forms import PasswordResetUsernameForm
+from nucleo.logic import catalogos
+from nucleo.logic.correo_saliente import encolar
 
 # AJAX: crear nueva localidad
 @csrf_exempt
@@ -54,7 +55,7 @@ def localidades_por_provincia(request):
 def direccion_sucursal(request):
     sucursal_id = request.GET.get('sucursal_id')
     try:
-        sucursal = Sucursal.objects.get(pk=sucursal_id)
+        sucursal = catalogos.obtener_por_id(Sucursal, sucursal_id)
         direccion = sucursal.suc_dire
         mail = sucursal.suc_mail
     except Sucursal.DoesNotExist:
@@ -79,12 +80,10 @@ def password_reset_request(request):
                 new_password = ''.join(random.choices(string.ascii_letters + string.digits, k=8))
                 user.set_password(new_password)
                 user.save()
-                send_mail(
-                    subject="Recuperación de contraseña GRHP",
-                    message=f"Su nueva contraseña es: {new_password}\nPor favor, cámbiela luego de ingresar.",
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[user.email],
-                    fail_silently=False,
+                encolar(
+                    asunto="Recuperación de contraseña GRHP",
+                    mensaje=f"Su nueva contraseña es: {new_password}\nPor favor, cámbiela luego de ingresar.",
+                    destinatarios=[user.email],
                 )
                 message = "Se ha enviado una nueva contraseña a su email."
         except User.DoesNotExist:
@@ -173,8 +172,9 @@ def actualizar_licencias_consumidas():
     return
 
 def actualizar_vacaciones_consumidas():
-    from nucleo.models import Solicitud_vacaciones, Estado_lic_vac, Vacaciones_otorgadas
-    estado_aceptada = Estado_lic_vac.objects.get(estado__iexact="Aceptada")
+    from nucleo.models import Solicitud_vacaciones, Estado_lic_vac, Vacaciones_otorgadas, Movimiento_vacaciones
+    from nucleo.logic.saldo_vacaciones import movimiento
+    estado_aceptada = catalogos.obtener(Estado_lic_vac, "Aceptada")
     hoy = date.today()
     solicitudes = Solicitud_vacaciones.objects.filter(id_estado=estado_aceptada, fecha_hasta__lte=hoy)
     for s in solicitudes:
@@ -189,7 +189,9 @@ def actualizar_vacaciones_consumidas():
             inicio_consumo=s.fecha_desde,
             fin_consumo=s.fecha_hasta
         ).first()
-        if vac_otorgada:
-            vac_otorgada.dias_consumidos = (s.fecha_hasta - s.fecha_desde).days + 1
-            vac_otorgada.save()
+        dias = (s.fecha_hasta - s.fecha_desde).days + 1
+        if vac_otorgada and vac_otorgada.dias_consumidos != dias:
+            vac_otorgada.dias_consumidos = dias
+            with movimiento(Movimiento_vacaciones.CONSUMO, s):
+                vac_otorgada.save()
 
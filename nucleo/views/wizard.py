@@ -17,6 +17,7 @@ from nucleo.models import (
     Empleado_el, Empleado_eo, Tipo_licencia, Solicitud_licencia, Estado_lic_vac,
     Feriado, Vacaciones_otorgadas, Plan_trabajo, Solicitud_vacaciones
 )
+from nucleo.logic.registro_auditoria import auditoria_en_lote, registro_de
 from nucleo.views.utils import calcular_antiguedad, calcular_edad, formatear_jornada_laboral, localidades_por_provincia
 
 FORMS = [
@@ -54,7 +55,10 @@ class AltaEmpleadoWizard(SessionWizardView):
             context['localidad_id'] = localidad_id
         return context
 
+    @auditoria_en_lote
     def done(self, form_list, **kwargs):
+        # Auditoría del alta: se escribe en un solo lote al terminar (ver nucleo.logic.registro_auditoria)
+        registro = registro_de(self.request)
         form_personales = self.get_cleaned_data_for_step("personales")
         form_laborales = self.get_cleaned_data_for_step("laborales")
 
@@ -89,13 +93,11 @@ class AltaEmpleadoWizard(SessionWizardView):
         user.save()
         # Log de creación de usuario en auth_user
         try:
-            from nucleo.models import Log_auditoria
-            Log_auditoria.objects.create(
-                idusuario=self.request.user,
-                nombre_tabla='auth_user',
-                idregistro=user.id,
-                accion='insert',
-                cambio={
+            registro.registrar(
+                'auth_user',
+                user.id,
+                'insert',
+                {
                     'username': user.username,
                     'email': user.email,
                     'first_name': user.first_name,
@@ -107,7 +109,6 @@ class AltaEmpleadoWizard(SessionWizardView):
             pass
 
         try:
-            from nucleo.models import Log_auditoria
             with transaction.atomic():
                 empleado = Empleado.objects.create(
                     idempleado=user,
@@ -124,12 +125,11 @@ class AltaEmpleadoWizard(SessionWizardView):
                     telefono=form_personales['telefono'],
                     cuil=form_personales['cuil'],
                 )
-                Log_auditoria.objects.create(
-                    idusuario=self.request.user,
-                    nombre_tabla='Empleado',
-                    idregistro=empleado.idempleado.id,
-                    accion='insert',
-                    cambio={
+                registro.registrar(
+                    'Empleado',
+                    empleado.idempleado.id,
+                    'insert',
+                    {
                         'nombres': empleado.nombres,
                         'apellido': empleado.apellido,
                         'dni': empleado.dni,
@@ -148,12 +148,11 @@ class AltaEmpleadoWizard(SessionWizardView):
                     id_puesto=form_laborales['id_puesto'],
                     alta_ant=form_laborales['alta_ant']
                 )
-                Log_auditoria.objects.create(
-                    idusuario=self.request.user,
-                    nombre_tabla='Empleado_el',
-                    idregistro=empleado_el.id,
-                    accion='insert',
-                    cambio={
+                registro.registrar(
+                    'Empleado_el',
+                    empleado_el.id,
+                    'insert',
+                    {
                         'id_estado': empleado_el.id_estado_id,
                         'id_convenio': empleado_el.id_convenio_id,
                         'id_puesto': empleado_el.id_puesto_id,
@@ -180,12 +179,11 @@ class AltaEmpleadoWizard(SessionWizardView):
                     plan_trabajo.domingo,
                 ]) or (getattr(plan_trabajo, 'start_time', None) is not None) or (getattr(plan_trabajo, 'end_time', None) is not None)
                 if plan_has_meaningful:
-                    Log_auditoria.objects.create(
-                        idusuario=self.request.user,
-                        nombre_tabla='Plan_trabajo',
-                        idregistro=plan_trabajo.id,
-                        accion='insert',
-                        cambio={
+                    registro.registrar(
+                        'Plan_trabajo',
+                        plan_trabajo.id,
+                        'insert',
+                        {
                             'idempleado': empleado.idempleado.id,
                             'nombres': empleado.nombres,
                             'apellido': empleado.apellido,
@@ -208,12 +206,11 @@ class AltaEmpleadoWizard(SessionWizardView):
                     idempleado=empleado,
                     id_sucursal=form_laborales['id_sucursal']
                 )
-                Log_auditoria.objects.create(
-                    idusuario=self.request.user,
-                    nombre_tabla='Empleado_eo',
-                    idregistro=empleado_eo.id,
-                    accion='insert',
-                    cambio={
+                registro.registrar(
+                    'Empleado_eo',
+                    empleado_eo.id,
+                    'insert',
+                    {
                         'idempleado': empleado.idempleado.id,
                         'nombres': empleado.nombres,
                         'apellido': empleado.apellido,